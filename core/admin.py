@@ -4,9 +4,10 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
 from .models import (BackupRecord, BackupSchedule, Client, CompanionLeave,
-                     Doctor, Hospital, LeaveInvoice, LeavePrice, Patient,
-                     Payment, PaymentDetail, SickLeave, SystemSettings, User,
-                     UserProfile)
+                     DailyStatistic, Doctor, Hospital, LeaveInvoice, LeavePrice,
+                     NumberSequence, Patient, Payment, PaymentDetail,
+                     SickLeave, SystemSettings, TranslationJob,
+                     TranslationMemo, User, UserProfile)
 
 
 @admin.register(User)
@@ -68,6 +69,9 @@ class ClientAdmin(admin.ModelAdmin):
     search_fields = ('name', 'phone', 'email')
     readonly_fields = ('created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_balances()
+
 
 @admin.register(LeavePrice)
 class LeavePriceAdmin(admin.ModelAdmin):
@@ -156,3 +160,34 @@ class BackupScheduleAdmin(admin.ModelAdmin):
     list_filter = ('backup_type', 'frequency', 'is_active', 'created_at')
     search_fields = ('name', 'created_by__username')
     readonly_fields = ('last_run', 'next_run', 'created_at', 'updated_at')
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(admin.ModelAdmin):
+    list_display = ('model_label', 'object_id', 'target_field', 'source_text', 'status', 'attempts', 'updated_at')
+    list_filter = ('status', 'model_label', 'target_field')
+    search_fields = ('source_text',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(TranslationMemo)
+class TranslationMemoAdmin(admin.ModelAdmin):
+    list_display = ('source_text', 'translated_text', 'source_lang', 'target_lang', 'updated_at')
+    list_filter = ('source_lang', 'target_lang')
+    search_fields = ('source_text', 'translated_text')
+    readonly_fields = ('source_hash', 'created_at', 'updated_at')
+
+
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ('key', 'last_value', 'updated_at')
+    search_fields = ('key',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(DailyStatistic)
+class DailyStatisticAdmin(admin.ModelAdmin):
+    list_display = ('entity', 'date', 'status', 'count', 'amount')
+    list_filter = ('entity', 'status')
+    date_hierarchy = 'date'
+    readonly_fields = ('entity', 'date', 'status', 'count', 'amount')
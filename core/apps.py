@@ -5,3 +5,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """تسجيل إشارات التطبيق"""
+        from core import signals  # noqa: F401
@@ -0,0 +1,49 @@
+"""
+أمر توزيع الدفعات غير المخصصة على أقدم الفواتير غير المدفوعة
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.payment_allocation_service import PaymentAllocationService
+
+
+class Command(BaseCommand):
+    help = 'توزيع المبالغ غير المخصصة لجميع الدفعات على أقدم الفواتير غير المدفوعة لعملائها'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client-id',
+            type=int,
+            help='توزيع دفعات عميل محدد فقط',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='عرض الدفعات غير المخصصة دون توزيعها',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('بدء توزيع الدفعات...'))
+
+        try:
+            payments = list(PaymentAllocationService.get_unallocated_payments(options['client_id']))
+
+            if not payments:
+                self.stdout.write(self.style.WARNING('لا توجد دفعات بمبالغ غير مخصصة'))
+                return
+
+            if options['dry_run']:
+                for payment in payments:
+                    self.stdout.write(f'{payment.payment_number}: غير مخصص {payment.amount - (payment.allocated or 0)}')
+                self.stdout.write(self.style.WARNING(f'توجد {len(payments)} دفعة بمبالغ غير مخصصة'))
+                return
+
+            results = PaymentAllocationService.allocate(payments)
+            invoices_count = sum(count for count, total in results.values())
+            total_allocated = sum(total for count, total in results.values())
+
+            self.stdout.write(self.style.SUCCESS(
+                f'تم توزيع مبلغ {total_allocated} ريال من {len(payments)} دفعة على {invoices_count} فاتورة بنجاح'
+            ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء توزيع الدفعات: {str(e)}'))
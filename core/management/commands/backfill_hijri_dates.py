@@ -0,0 +1,87 @@
+"""
+أمر تعبئة التواريخ الهجرية الفارغة للإجازات
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.models import CompanionLeave, SickLeave
+from core.services.hijri_service import HijriCalendar
+
+
+class Command(BaseCommand):
+    help = 'تعبئة حقول التواريخ الهجرية الفارغة (النصية والرقمية) في الإجازات المرضية وإجازات المرافقين'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='عدد الإجازات في كل دفعة (الافتراضي: 1000)',
+        )
+
+    def get_missing_filter(self, model):
+        """الإجازات التي ينقصها تاريخ هجري نصي أو رقمي"""
+        missing = Q()
+        for field in model.hijri_date_fields:
+            missing |= Q(**{f'{field}__isnull': False}) & (
+                Q(**{f'{field}_hijri__isnull': True}) | Q(**{f'{field}_hijri': ''})
+            )
+        for field in model.hijri_number_fields:
+            missing |= Q(**{f'{field}__isnull': False, f'{field}_hijri_number__isnull': True})
+        return missing
+
+    def backfill(self, model, batch_size):
+        """تعبئة الحقول الهجرية لنموذج واحد على دفعات، ويعيد عدد الإجازات المحدثة"""
+        fields = model.hijri_date_fields
+        hijri_fields = [f'{field}_hijri' for field in fields]
+        number_fields = [f'{field}_hijri_number' for field in model.hijri_number_fields]
+        missing = self.get_missing_filter(model)
+
+        updated = 0
+        last_pk = 0
+        while True:
+            leaves = list(
+                model.objects.filter(missing, pk__gt=last_pk).order_by('pk')
+                .only('pk', *fields, *hijri_fields, *number_fields)[:batch_size]
+            )
+            if not leaves:
+                break
+            last_pk = leaves[-1].pk
+
+            # تحويل كل عمود تاريخ دفعة واحدة
+            for field in fields:
+                numbers = HijriCalendar.to_hijri_many([getattr(leave, field) for leave in leaves])
+                texts = HijriCalendar.to_hijri_many([getattr(leave, field) for leave in leaves],
+                                                    HijriCalendar.STORAGE_FORMAT)
+                for leave, number, text in zip(leaves, numbers, texts):
+                    if not getattr(leave, f'{field}_hijri'):
+                        setattr(leave, f'{field}_hijri', text or None)
+                    if field in model.hijri_number_fields:
+                        setattr(leave, f'{field}_hijri_number', number)
+
+            model.objects.bulk_update(leaves, hijri_fields + number_fields)
+            updated += len(leaves)
+
+        return updated
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        self.stdout.write(self.style.SUCCESS('بدء تعبئة التواريخ الهجرية...'))
+
+        try:
+            sick_updated = self.backfill(SickLeave, batch_size)
+            companion_updated = self.backfill(CompanionLeave, batch_size)
+
+            self.stdout.write(f'الإجازات المرضية: {sick_updated}')
+            self.stdout.write(f'إجازات المرافقين: {companion_updated}')
+
+            if sick_updated + companion_updated == 0:
+                self.stdout.write(self.style.WARNING('لا توجد إجازات بتواريخ هجرية فارغة'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'تم تعبئة التواريخ الهجرية لـ {sick_updated + companion_updated} إجازة بنجاح'
+                ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء تعبئة التواريخ الهجرية: {str(e)}'))
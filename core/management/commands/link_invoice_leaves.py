@@ -0,0 +1,46 @@
+"""
+أمر ربط فواتير الإجازات غير المرتبطة بإجازاتها
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.invoice_leave_service import InvoiceLeaveService
+
+
+class Command(BaseCommand):
+    help = 'ملء المفتاحين sick_leave و companion_leave في فواتير الإجازات من رقم الإجازة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='عرض عدد الفواتير التي سيتم ربطها دون ربطها',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='عدد الفواتير في كل دفعة تحديث (الافتراضي: 500)',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+
+        self.stdout.write(self.style.SUCCESS('بدء ربط الفواتير بالإجازات...'))
+
+        try:
+            results = InvoiceLeaveService.link(batch_size=options['batch_size'], dry_run=verify)
+
+            for leave_type, result in results.items():
+                self.stdout.write(
+                    f'{leave_type}: {result["linked"]} فاتورة قابلة للربط، '
+                    f'{result["missing"]} فاتورة بدون إجازة مطابقة'
+                )
+
+            linked = sum(result['linked'] for result in results.values())
+            if verify:
+                self.stdout.write(self.style.WARNING(f'توجد {linked} فاتورة غير مرتبطة بإجازتها'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'تم ربط {linked} فاتورة بإجازاتها بنجاح'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء ربط الفواتير بالإجازات: {str(e)}'))
@@ -0,0 +1,80 @@
+"""
+أمر معالجة طابور الترجمة المؤجلة
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.translation_service import (TranslationMemoService,
+                                               TranslationQueue)
+
+
+class Command(BaseCommand):
+    help = 'ترجمة الحقول الإنجليزية الفارغة من طابور مهام الترجمة على دفعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TranslationQueue.DEFAULT_BATCH_SIZE,
+            help='عدد المهام في كل دفعة',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='الحد الأقصى لعدد الدفعات في كل تشغيل',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='الاستمرار في مراقبة الطابور ومعالجته',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=int,
+            default=30,
+            help='مدة الانتظار بالثواني بين دورات المعالجة عند استخدام --loop',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        max_batches = options['max_batches']
+
+        self.stdout.write(self.style.SUCCESS('بدء معالجة طابور الترجمة...'))
+
+        try:
+            while True:
+                results = TranslationQueue.process_all(batch_size=batch_size, max_batches=max_batches)
+
+                if results['processed']:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f'تمت معالجة {results["processed"]} مهمة في {results["batches"]} دفعة: '
+                            f'{results["translated"]} مترجمة، {results["skipped"]} متجاوزة'
+                        )
+                    )
+                    if results['failed'] > 0:
+                        self.stdout.write(self.style.ERROR(f'فشلت ترجمة {results["failed"]} مهمة'))
+                elif not options['loop']:
+                    self.stdout.write(self.style.WARNING('لا توجد مهام ترجمة معلقة'))
+
+                # ترجمة النصوص التي سجلتها القوالب كمفقودة في ذاكرة الترجمات
+                memo_results = TranslationMemoService.fill_missing(batch_size=batch_size, max_batches=max_batches)
+                if memo_results['processed']:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f'تمت ترجمة {memo_results["translated"]} من {memo_results["processed"]} '
+                            f'نص مفقود في ذاكرة الترجمات'
+                        )
+                    )
+
+                if not options['loop']:
+                    break
+
+                time.sleep(options['sleep'])
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('تم إيقاف معالجة طابور الترجمة'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء معالجة طابور الترجمة: {str(e)}'))
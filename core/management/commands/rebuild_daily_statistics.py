@@ -0,0 +1,32 @@
+"""
+أمر إعادة بناء جدول الإحصائيات اليومية من الجداول الأصلية
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.statistics_service import DailyStatisticsService
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء جدول الإحصائيات اليومية (الأعداد والمبالغ لكل يوم وحالة) من الإجازات والفواتير والمدفوعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            choices=list(DailyStatisticsService.TRACKED),
+            help='نوع السجل المراد إعادة بنائه (يمكن تكراره، الافتراضي: الكل)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('بدء إعادة بناء الإحصائيات اليومية...'))
+
+        try:
+            results = DailyStatisticsService.rebuild(options['entity'])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء إعادة بناء الإحصائيات اليومية: {str(e)}'))
+            return
+
+        for entity, rows in results.items():
+            self.stdout.write(f'{entity}: {rows} صف')
+
+        self.stdout.write(self.style.SUCCESS('تمت إعادة بناء الإحصائيات اليومية بنجاح'))
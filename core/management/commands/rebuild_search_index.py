@@ -0,0 +1,38 @@
+"""
+أمر إعادة بناء فهرس البحث للمرضى والأطباء والعملاء والإجازات
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.search_service import SearchIndexService
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس البحث (الكلمات الموحدة للأسماء وأرقام الهوية والهاتف والإجازات)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            action='append',
+            choices=list(SearchIndexService.FIELDS),
+            help='نوع السجل المراد إعادة فهرسته (يمكن تكراره، الافتراضي: الكل)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='عدد السجلات في كل دفعة (الافتراضي: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('بدء إعادة بناء فهرس البحث...'))
+
+        try:
+            results = SearchIndexService.rebuild(options['entity'], batch_size=options['batch_size'])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء إعادة بناء فهرس البحث: {str(e)}'))
+            return
+
+        for entity, count in results.items():
+            self.stdout.write(f'{entity}: {count} سجل')
+
+        self.stdout.write(self.style.SUCCESS('تمت إعادة بناء فهرس البحث بنجاح'))
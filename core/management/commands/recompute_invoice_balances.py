@@ -0,0 +1,49 @@
+"""
+أمر إعادة حساب المبالغ المدفوعة والمتبقية المخزنة في الفواتير
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.invoice_balance_service import InvoiceBalanceService
+
+
+class Command(BaseCommand):
+    help = 'التحقق من الحقلين paid_amount و remaining_amount في الفواتير وإعادة حسابهما من تفاصيل الدفعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='عرض الفواتير المختلفة دون تصحيحها',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='عدد الفواتير في كل دفعة تحديث (الافتراضي: 500)',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+
+        self.stdout.write(self.style.SUCCESS('بدء التحقق من مجاميع الفواتير...'))
+
+        try:
+            mismatches = InvoiceBalanceService.recompute(batch_size=options['batch_size'], dry_run=verify)
+
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS('جميع مجاميع الفواتير مطابقة لتفاصيل الدفعات'))
+                return
+
+            for invoice in mismatches:
+                self.stdout.write(
+                    f'{invoice.invoice_number}: المدفوع الفعلي {invoice.paid_total}، '
+                    f'المتبقي الفعلي {invoice.remaining_total}'
+                )
+
+            if verify:
+                self.stdout.write(self.style.WARNING(f'توجد {len(mismatches)} فاتورة بمجاميع غير مطابقة'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'تم تصحيح مجاميع {len(mismatches)} فاتورة بنجاح'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء إعادة حساب مجاميع الفواتير: {str(e)}'))
@@ -17,6 +17,11 @@ class Command(BaseCommand):
             action='store_true',
             help='عرض النسخ المجدولة دون تنفيذها',
         )
+        parser.add_argument(
+            '--update-leaves-status',
+            action='store_true',
+            help='تحديث حالات الإجازات المنتهية بعد تشغيل النسخ الاحتياطي',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -59,5 +64,12 @@ class Command(BaseCommand):
                     else:
                         self.stdout.write(self.style.ERROR(f'✗ {detail["schedule_name"]}: {detail.get("error", "خطأ غير معروف")}'))
 
+                if options['update_leaves_status']:
+                    status_results = scheduler_service.run_leave_status_update()
+                    if 'error' in status_results:
+                        self.stdout.write(self.style.ERROR(f'فشل تحديث حالات الإجازات: {status_results["error"]}'))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'تم تحديث حالة {status_results["total"]} إجازة'))
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء تشغيل النسخ الاحتياطي المجدولة: {str(e)}'))
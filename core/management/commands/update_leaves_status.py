@@ -0,0 +1,43 @@
+"""
+أمر تحديث حالات الإجازات بشكل جماعي
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.leave_status_service import LeaveStatusService
+
+
+class Command(BaseCommand):
+    help = 'تحديث حالة الإجازات المرضية وإجازات المرافقين (نشطة/منتهية) حسب تاريخ النهاية'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='عرض عدد الإجازات التي ستتغير حالتها دون تحديثها',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS('بدء تحديث حالات الإجازات...'))
+
+        try:
+            results = LeaveStatusService.update_all(dry_run=dry_run)
+
+            verb = 'ستتغير' if dry_run else 'تغيرت'
+            self.stdout.write(
+                f'الإجازات المرضية: {verb} حالة {results["sick_updated"]} إجازة '
+                f'({results["sick_expired"]} منتهية، {results["sick_reactivated"]} نشطة)'
+            )
+            self.stdout.write(
+                f'إجازات المرافقين: {verb} حالة {results["companion_updated"]} إجازة '
+                f'({results["companion_expired"]} منتهية، {results["companion_reactivated"]} نشطة)'
+            )
+
+            if results['total'] == 0:
+                self.stdout.write(self.style.WARNING('لا توجد إجازات تحتاج لتحديث حالتها'))
+            elif not dry_run:
+                self.stdout.write(self.style.SUCCESS(f'تم تحديث حالة {results["total"]} إجازة بنجاح'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء تحديث حالات الإجازات: {str(e)}'))
@@ -0,0 +1,39 @@
+"""
+أمر تعبئة ذاكرة الترجمات من الحقول الإنجليزية الموجودة
+"""
+from django.core.management.base import BaseCommand
+
+from core.services.translation_service import TranslationMemoService
+
+
+class Command(BaseCommand):
+    help = 'تعبئة ذاكرة الترجمات من أزواج النصوص العربية والإنجليزية المحفوظة في النماذج'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='عدد الترجمات التي تُحفظ في كل دفعة',
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='استبدال الترجمات المحفوظة مسبقًا في الذاكرة',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('بدء تعبئة ذاكرة الترجمات...'))
+
+        try:
+            results = TranslationMemoService.warm_from_models(
+                batch_size=options['batch_size'],
+                overwrite=options['overwrite'],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'تمت قراءة {results["pairs"]} زوج ترجمة وحفظ {results["stored"]} ترجمة في الذاكرة'
+                )
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'حدث خطأ أثناء تعبئة ذاكرة الترجمات: {str(e)}'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_add_hospital_to_leaves'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='النموذج')),
+                ('object_id', models.BigIntegerField(verbose_name='معرف الكائن')),
+                ('source_field', models.CharField(max_length=50, verbose_name='الحقل المصدر')),
+                ('target_field', models.CharField(max_length=50, verbose_name='الحقل الهدف')),
+                ('source_text', models.TextField(verbose_name='النص المصدر')),
+                ('status', models.CharField(choices=[('pending', 'في الانتظار'), ('done', 'مكتملة'), ('failed', 'فشلت')], default='pending', max_length=20, verbose_name='الحالة')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='عدد المحاولات')),
+                ('last_error', models.TextField(blank=True, verbose_name='آخر خطأ')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'مهمة ترجمة',
+                'verbose_name_plural': 'مهام الترجمة',
+                'indexes': [models.Index(fields=['status', 'id'], name='translation_job_status_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translationjob',
+            constraint=models.UniqueConstraint(fields=('model_label', 'object_id', 'target_field'), name='unique_translation_job'),
+        ),
+    ]
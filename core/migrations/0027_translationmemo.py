@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_translationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_lang', models.CharField(default='ar', max_length=10, verbose_name='لغة المصدر')),
+                ('target_lang', models.CharField(default='en', max_length=10, verbose_name='لغة الهدف')),
+                ('source_hash', models.CharField(max_length=40, verbose_name='بصمة النص')),
+                ('source_text', models.TextField(verbose_name='النص المصدر')),
+                ('translated_text', models.TextField(verbose_name='النص المترجم')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'ترجمة محفوظة',
+                'verbose_name_plural': 'الترجمات المحفوظة',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translationmemo',
+            constraint=models.UniqueConstraint(fields=('source_lang', 'target_lang', 'source_hash'), name='unique_translation_memo'),
+        ),
+    ]
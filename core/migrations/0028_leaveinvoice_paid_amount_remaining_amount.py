@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:13
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_invoice_totals(apps, schema_editor):
+    """حساب المبالغ المدفوعة والمتبقية للفواتير الحالية من تفاصيل الدفعات"""
+    LeaveInvoice = apps.get_model('core', 'LeaveInvoice')
+    PaymentDetail = apps.get_model('core', 'PaymentDetail')
+
+    amount_field = models.DecimalField(max_digits=12, decimal_places=2)
+    paid = (
+        PaymentDetail.objects.filter(invoice=models.OuterRef('pk'))
+        .order_by()
+        .values('invoice')
+        .annotate(total=models.Sum('amount'))
+        .values('total')
+    )
+    LeaveInvoice.objects.update(
+        paid_amount=Coalesce(models.Subquery(paid, output_field=amount_field),
+                             models.Value(0, output_field=amount_field), output_field=amount_field),
+    )
+    LeaveInvoice.objects.update(remaining_amount=models.F('amount') - models.F('paid_amount'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_translationmemo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaveinvoice',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='المبلغ المدفوع'),
+        ),
+        migrations.AddField(
+            model_name='leaveinvoice',
+            name='remaining_amount',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='المبلغ المتبقي'),
+        ),
+        migrations.RunPython(backfill_invoice_totals, migrations.RunPython.noop),
+    ]
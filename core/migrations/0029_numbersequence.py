@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_leaveinvoice_paid_amount_remaining_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='المفتاح')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='آخر رقم محجوز')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'تسلسل ترقيم',
+                'verbose_name_plural': 'تسلسلات الترقيم',
+            },
+        ),
+    ]
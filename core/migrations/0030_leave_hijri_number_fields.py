@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_numbersequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companionleave',
+            name='end_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ النهاية (هجري رقمي)'),
+        ),
+        migrations.AddField(
+            model_name='companionleave',
+            name='issue_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ الإصدار (هجري رقمي)'),
+        ),
+        migrations.AddField(
+            model_name='companionleave',
+            name='start_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ البداية (هجري رقمي)'),
+        ),
+        migrations.AddField(
+            model_name='sickleave',
+            name='end_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ النهاية (هجري رقمي)'),
+        ),
+        migrations.AddField(
+            model_name='sickleave',
+            name='issue_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ الإصدار (هجري رقمي)'),
+        ),
+        migrations.AddField(
+            model_name='sickleave',
+            name='start_date_hijri_number',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='تاريخ البداية (هجري رقمي)'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:31
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+# نفس تعريف DailyStatisticsService.TRACKED: (النموذج، حقل التاريخ، حقل الحالة، حقل المبلغ)
+TRACKED = {
+    'sick_leave': ('SickLeave', 'issue_date', 'status', None),
+    'companion_leave': ('CompanionLeave', 'issue_date', 'status', None),
+    'invoice': ('LeaveInvoice', 'issue_date', 'status', 'amount'),
+    'payment': ('Payment', 'payment_date', 'payment_method', 'amount'),
+    'client': ('Client', 'created_at', None, None),
+    'patient': ('Patient', 'created_at', None, None),
+    'doctor': ('Doctor', 'created_at', None, None),
+}
+
+
+def build_daily_statistics(apps, schema_editor):
+    """حساب الإحصائيات اليومية للسجلات الحالية"""
+    DailyStatistic = apps.get_model('core', 'DailyStatistic')
+    amount_field = models.DecimalField(max_digits=14, decimal_places=2)
+
+    statistics = []
+    for entity, (model_name, date_field, status_field, amount_name) in TRACKED.items():
+        model = apps.get_model('core', model_name)
+        values = {'stat_date': TruncDate(date_field) if date_field == 'created_at' else models.F(date_field)}
+        if status_field:
+            values['stat_status'] = models.F(status_field)
+        rows = model.objects.order_by().values(**values).annotate(
+            row_count=models.Count('pk'),
+            row_amount=models.Sum(amount_name) if amount_name else models.Value(0, output_field=amount_field),
+        )
+        statistics.extend(
+            DailyStatistic(entity=entity, date=row['stat_date'], status=row.get('stat_status') or '',
+                           count=row['row_count'], amount=row['row_amount'] or 0)
+            for row in rows
+        )
+    DailyStatistic.objects.bulk_create(statistics, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_leave_hijri_number_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('sick_leave', 'إجازة مرضية'), ('companion_leave', 'إجازة مرافق'), ('invoice', 'فاتورة'), ('payment', 'دفعة'), ('client', 'عميل'), ('patient', 'مريض'), ('doctor', 'طبيب')], max_length=30, verbose_name='نوع السجل')),
+                ('date', models.DateField(blank=True, null=True, verbose_name='التاريخ')),
+                ('status', models.CharField(blank=True, default='', max_length=30, verbose_name='الحالة')),
+                ('count', models.IntegerField(default=0, verbose_name='العدد')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='المبلغ')),
+            ],
+            options={
+                'verbose_name': 'إحصائية يومية',
+                'verbose_name_plural': 'الإحصائيات اليومية',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystatistic',
+            constraint=models.UniqueConstraint(fields=('entity', 'date', 'status'), name='unique_daily_statistic'),
+        ),
+        migrations.RunPython(build_daily_statistics, migrations.RunPython.noop),
+    ]
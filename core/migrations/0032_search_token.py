@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    """فهرسة السجلات الحالية"""
+    from core.services.search_service import SearchIndexService
+
+    SearchToken = apps.get_model('core', 'SearchToken')
+    for entity, (model, fields) in SearchIndexService.FIELDS.items():
+        historical_model = apps.get_model('core', model.__name__)
+        SearchIndexService.index_queryset(entity, historical_model.objects.all(), token_model=SearchToken)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_daily_statistic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('patient', 'مريض'), ('doctor', 'طبيب'), ('client', 'عميل'), ('sick_leave', 'إجازة مرضية'), ('companion_leave', 'إجازة مرافق')], max_length=20, verbose_name='نوع السجل')),
+                ('object_id', models.BigIntegerField(verbose_name='معرف السجل')),
+                ('token', models.CharField(max_length=64, verbose_name='الكلمة')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='الوزن')),
+            ],
+            options={
+                'verbose_name': 'كلمة بحث',
+                'verbose_name_plural': 'فهرس البحث',
+                'indexes': [models.Index(fields=['entity', 'token', 'object_id'], name='search_token_prefix_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchtoken',
+            constraint=models.UniqueConstraint(fields=('entity', 'object_id', 'token'), name='unique_search_token'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_search_token'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='companionleave',
+            index=models.Index(fields=['created_at', 'id'], name='companion_leave_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companionleave',
+            index=models.Index(fields=['status', 'created_at'], name='companion_leave_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companionleave',
+            index=models.Index(fields=['start_date', 'id'], name='companion_leave_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companionleave',
+            index=models.Index(fields=['end_date', 'status'], name='companion_leave_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['national_id'], name='doctor_national_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveinvoice',
+            index=models.Index(fields=['client', 'status', 'issue_date'], name='invoice_allocation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveinvoice',
+            index=models.Index(fields=['leave_id', 'leave_type'], name='invoice_leave_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveinvoice',
+            index=models.Index(fields=['status', 'issue_date'], name='invoice_status_issue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveinvoice',
+            index=models.Index(fields=['issue_date', 'id'], name='invoice_issue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveinvoice',
+            index=models.Index(fields=['created_at', 'id'], name='invoice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date', 'id'], name='payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['client', 'payment_date'], name='payment_client_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sickleave',
+            index=models.Index(fields=['created_at', 'id'], name='sick_leave_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sickleave',
+            index=models.Index(fields=['status', 'created_at'], name='sick_leave_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sickleave',
+            index=models.Index(fields=['start_date', 'id'], name='sick_leave_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sickleave',
+            index=models.Index(fields=['end_date', 'status'], name='sick_leave_end_idx'),
+        ),
+    ]
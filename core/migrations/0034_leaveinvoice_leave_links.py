@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_invoice_leaves(apps, schema_editor):
+    """ربط الفواتير الحالية بإجازاتها من نوع ورقم الإجازة"""
+    LeaveInvoice = apps.get_model('core', 'LeaveInvoice')
+    for leave_type, model_name in (('sick_leave', 'SickLeave'), ('companion_leave', 'CompanionLeave')):
+        leaves = apps.get_model('core', model_name).objects.filter(leave_id=models.OuterRef('leave_id'))
+        LeaveInvoice.objects.filter(leave_type=leave_type).update(
+            **{leave_type: models.Subquery(leaves.values('pk')[:1])}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaveinvoice',
+            name='companion_leave',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leave_invoices', to='core.companionleave', verbose_name='إجازة المرافق'),
+        ),
+        migrations.AddField(
+            model_name='leaveinvoice',
+            name='sick_leave',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leave_invoices', to='core.sickleave', verbose_name='الإجازة المرضية'),
+        ),
+        migrations.RunPython(link_invoice_leaves, migrations.RunPython.noop),
+    ]
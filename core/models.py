@@ -4,11 +4,131 @@ from datetime import datetime, timedelta
 
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Cast, Coalesce, Mod
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+class TranslatableModelMixin:
+    """
+    خلط للنماذج التي تحتوي على حقول إنجليزية تُترجم تلقائيًا
+
+    translatable_fields: أزواج (الحقل العربي، الحقل الإنجليزي)
+    الترجمة لا تتم أثناء الحفظ، بل تُسجل كمهام في TranslationJob
+    ويعالجها أمر process_translations لاحقًا.
+    """
+    translatable_fields = ()
+
+    def queue_missing_translations(self):
+        """جدولة ترجمة الحقول الإنجليزية الفارغة"""
+        from core.services.translation_service import TranslationQueue
+        return TranslationQueue.enqueue_missing(self)
+
+
+class HijriDatesMixin:
+    """
+    خلط للنماذج التي تحفظ نسخة هجرية من تواريخها في حقول <الحقل>_hijri
+
+    hijri_date_fields: أسماء حقول التاريخ الميلادي
+    """
+    hijri_date_fields = ()
+    # حقول التاريخ التي لها عمود هجري رقمي مفهرس <الحقل>_hijri_number بالتنسيق YYYYMMDD
+    hijri_number_fields = ()
+
+    def fill_hijri_dates(self):
+        """تعبئة الحقول الهجرية الفارغة من التواريخ الميلادية"""
+        from core.services.hijri_service import HijriCalendar
+        for field_name in self.hijri_date_fields:
+            value = getattr(self, field_name)
+            if value and not getattr(self, f'{field_name}_hijri'):
+                setattr(self, f'{field_name}_hijri', HijriCalendar.format(value))
+
+        # الأعمدة الرقمية تُشتق دائمًا من التاريخ الميلادي لتبقى صالحة للفرز والتصفية
+        for field_name in self.hijri_number_fields:
+            setattr(self, f'{field_name}_hijri_number', HijriCalendar.to_hijri_number(getattr(self, field_name)))
+
+
+class InvoicedLeaveMixin:
+    """
+    خلط للإجازات التي ترتبط بها فواتير LeaveInvoice عبر مفتاح أجنبي
+
+    leave_type: نوع الإجازة في الفاتورة، وهو أيضًا اسم حقل الربط في LeaveInvoice
+    """
+    leave_type = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_leave_id = instance.__dict__.get('leave_id')
+        return instance
+
+    def sync_invoices(self, adding):
+        """ربط الفواتير المنشأة برقم الإجازة قبلها، وتحديث رقم الإجازة في فواتيرها إذا تغير"""
+        if adding:
+            LeaveInvoice.objects.filter(
+                leave_type=self.leave_type, leave_id=self.leave_id, **{f'{self.leave_type}__isnull': True}
+            ).update(**{self.leave_type: self})
+        elif getattr(self, '_loaded_leave_id', self.leave_id) != self.leave_id:
+            LeaveInvoice.objects.filter(**{self.leave_type: self}).update(leave_id=self.leave_id)
+        self._loaded_leave_id = self.leave_id
+
+
+class LeaveQuerySet(models.QuerySet):
+    """استعلامات الإجازات مع التصفية والتجميع بالتاريخ الهجري عبر الأعمدة الرقمية المفهرسة"""
+
+    STATUSES = ('active', 'cancelled', 'expired')
+
+    def hijri_between(self, start, end, field='start_date'):
+        """الإجازات التي يقع تاريخها الهجري بين رقمين YYYYMMDD (شاملة البداية، غير شاملة النهاية)"""
+        return self.filter(**{f'{field}_hijri_number__gte': start, f'{field}_hijri_number__lt': end})
+
+    def hijri_year(self, year, field='start_date'):
+        """الإجازات في سنة هجرية"""
+        year = int(year)
+        return self.hijri_between(year * 10000, (year + 1) * 10000, field)
+
+    def hijri_month(self, year, month, field='start_date'):
+        """الإجازات في شهر هجري"""
+        start = int(year) * 10000 + int(month) * 100
+        return self.hijri_between(start, start + 100, field)
+
+    def filter_hijri(self, year=None, month=None, field='start_date'):
+        """تطبيق فلتر السنة والشهر الهجريين من قيم نصية (مثل معاملات الطلب) مع تجاهل القيم غير الصحيحة"""
+        try:
+            year = int(year) if year else None
+            month = int(month) if month else None
+        except (TypeError, ValueError):
+            return self
+
+        if year and month and 1 <= month <= 12:
+            return self.hijri_month(year, month, field)
+        if year:
+            return self.hijri_year(year, field)
+        return self
+
+    def count_by_hijri_month(self, field='start_date'):
+        """عدد الإجازات لكل شهر هجري، مرتبة من الأحدث: [{'hijri_month': YYYYMM, 'count': n}, ...]"""
+        number = models.F(f'{field}_hijri_number')
+        return (
+            self.filter(**{f'{field}_hijri_number__isnull': False})
+            .annotate(hijri_month=Cast(
+                (number - Mod(number, 100)) / 100, models.IntegerField()
+            ))
+            .order_by()
+            .values('hijri_month')
+            .annotate(count=models.Count('id'))
+            .order_by('-hijri_month')
+        )
+
+    def status_counts(self):
+        """عدد الإجازات الكلي ولكل حالة باستعلام تجميعي واحد: {'total', 'active', 'cancelled', 'expired'}"""
+        return self.order_by().aggregate(
+            total=models.Count('id'),
+            **{status: models.Count('id', filter=models.Q(status=status)) for status in self.STATUSES},
+        )
+
+
 class UserManager(BaseUserManager):
     def create_user(self, username, email, password=None, **extra_fields):
         """إنشاء مستخدم جديد"""
@@ -63,8 +183,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.username
 
 
-class Hospital(models.Model):
+class Hospital(TranslatableModelMixin, models.Model):
     """نموذج المستشفى"""
+    translatable_fields = (
+        ('name', 'name_en'),
+        ('address', 'address_en'),
+    )
+
     name = models.CharField(max_length=100, verbose_name='اسم المستشفى')
     name_en = models.CharField(max_length=100, blank=True, null=True, verbose_name='اسم المستشفى (بالإنجليزية)')
     address = models.CharField(max_length=200, blank=True, null=True, verbose_name='العنوان')
@@ -86,28 +211,12 @@ class Hospital(models.Model):
         return self.doctors.count()
 
     def save(self, *args, **kwargs):
-        """حفظ المستشفى مع ترجمة البيانات تلقائيًا"""
-        # ترجمة الاسم والعنوان إلى الإنجليزية إذا كانت فارغة
-        if self.name and not self.name_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.name, src='ar', dest='en')
-                self.name_en = translation.text
-            except Exception:
-                pass
-
-        if self.address and not self.address_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.address, src='ar', dest='en')
-                self.address_en = translation.text
-            except Exception:
-                pass
-
+        """حفظ المستشفى مع جدولة ترجمة البيانات"""
         super().save(*args, **kwargs)
 
+        # ترجمة الاسم والعنوان إلى الإنجليزية تتم لاحقًا عبر طابور الترجمة
+        self.queue_missing_translations()
+
     def delete(self, *args, **kwargs):
         """حذف المستشفى وملف الشعار المرتبط به"""
         # حذف ملف الشعار إذا كان موجودًا
@@ -139,8 +248,13 @@ class Employer(models.Model):
         return self.name
 
 
-class Doctor(models.Model):
+class Doctor(TranslatableModelMixin, models.Model):
     """نموذج الطبيب"""
+    translatable_fields = (
+        ('name', 'name_en'),
+        ('position', 'position_en'),
+    )
+
     national_id = models.CharField(max_length=20, blank=True, null=True, verbose_name='رقم الهوية')
     name = models.CharField(max_length=100, verbose_name='اسم الطبيب')
     name_en = models.CharField(max_length=100, blank=True, null=True, verbose_name='اسم الطبيب (بالإنجليزية)')
@@ -155,36 +269,30 @@ class Doctor(models.Model):
     class Meta:
         verbose_name = 'طبيب'
         verbose_name_plural = 'الأطباء'
+        indexes = [
+            models.Index(fields=['national_id'], name='doctor_national_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        """حفظ الطبيب مع ترجمة البيانات تلقائيًا"""
-        # ترجمة الاسم والمنصب إلى الإنجليزية إذا كانت فارغة
-        if self.name and not self.name_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.name, src='ar', dest='en')
-                self.name_en = translation.text
-            except Exception:
-                pass
-
-        if self.position and not self.position_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.position, src='ar', dest='en')
-                self.position_en = translation.text
-            except Exception:
-                pass
-
+        """حفظ الطبيب مع جدولة ترجمة البيانات"""
         super().save(*args, **kwargs)
 
+        # ترجمة الاسم والمنصب إلى الإنجليزية تتم لاحقًا عبر طابور الترجمة
+        self.queue_missing_translations()
+
 
-class Patient(models.Model):
+class Patient(TranslatableModelMixin, models.Model):
     """نموذج المريض"""
+    translatable_fields = (
+        ('name', 'name_en'),
+        ('nationality', 'nationality_en'),
+        ('employer_name', 'employer_name_en'),
+        ('address', 'address_en'),
+    )
+
     national_id = models.CharField(max_length=20, unique=True, blank=True, null=True, verbose_name='رقم الهوية')
     name = models.CharField(max_length=100, verbose_name='اسم المريض')
     name_en = models.CharField(max_length=100, blank=True, null=True, verbose_name='اسم المريض (بالإنجليزية)')
@@ -207,49 +315,78 @@ class Patient(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        """حفظ المريض مع ترجمة البيانات تلقائيًا"""
-        # ترجمة الاسم والجنسية وجهة العمل والعنوان إلى الإنجليزية إذا كانت فارغة
-        if self.name and not self.name_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.name, src='ar', dest='en')
-                self.name_en = translation.text
-            except Exception:
-                pass
-
-        if self.nationality and not self.nationality_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.nationality, src='ar', dest='en')
-                self.nationality_en = translation.text
-            except Exception:
-                pass
-
-        if self.employer_name and not self.employer_name_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.employer_name, src='ar', dest='en')
-                self.employer_name_en = translation.text
-            except Exception:
-                pass
-
-        if self.address and not self.address_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.address, src='ar', dest='en')
-                self.address_en = translation.text
-            except Exception:
-                pass
-
+        """حفظ المريض مع جدولة ترجمة البيانات"""
         super().save(*args, **kwargs)
 
+        # ترجمة الاسم والجنسية وجهة العمل والعنوان إلى الإنجليزية تتم لاحقًا عبر طابور الترجمة
+        self.queue_missing_translations()
+
+
+class ClientQuerySet(models.QuerySet):
+    """استعلامات العملاء مع أرصدتهم"""
+
+    # حالات الفواتير التي تدخل في حساب الرصيد (الفواتير الملغية مستثناة)
+    BALANCE_INVOICE_STATUSES = ['unpaid', 'partially_paid', 'paid']
+
+    @staticmethod
+    def _client_subquery(queryset, aggregate, output_field):
+        """استعلام فرعي يحسب قيمة تجميعية لكل عميل"""
+        subquery = (
+            queryset.filter(client=models.OuterRef('pk'))
+            .order_by()
+            .values('client')
+            .annotate(value=aggregate)
+            .values('value')
+        )
+        default = models.Value(0, output_field=output_field)
+        return Coalesce(
+            models.Subquery(subquery, output_field=output_field), default, output_field=output_field
+        )
+
+    def with_balances(self, status_counts=False):
+        """
+        إضافة إجماليات الفواتير والمدفوعات والرصيد لكل عميل في نفس الاستعلام
+
+        الحقول المضافة: invoices_count, invoices_total, payments_count,
+        payments_total, balance، ومع status_counts=True أيضًا:
+        unpaid_invoices, partially_paid_invoices, paid_invoices.
+        الرصيد يطابق get_balance (الفواتير الملغية مستثناة).
+        """
+        amount_field = models.DecimalField(max_digits=14, decimal_places=2)
+        count_field = models.IntegerField()
+        invoices = LeaveInvoice.objects.filter(status__in=self.BALANCE_INVOICE_STATUSES)
+        payments = Payment.objects.all()
+
+        queryset = self.annotate(
+            invoices_count=self._client_subquery(invoices, models.Count('id'), count_field),
+            invoices_total=self._client_subquery(invoices, models.Sum('amount'), amount_field),
+            payments_count=self._client_subquery(payments, models.Count('id'), count_field),
+            payments_total=self._client_subquery(payments, models.Sum('amount'), amount_field),
+        ).annotate(
+            balance=models.ExpressionWrapper(
+                models.F('invoices_total') - models.F('payments_total'), output_field=amount_field
+            )
+        )
+
+        if status_counts:
+            queryset = queryset.annotate(**{
+                f'{status}_invoices': self._client_subquery(
+                    LeaveInvoice.objects.filter(status=status), models.Count('id'), count_field
+                )
+                for status in self.BALANCE_INVOICE_STATUSES
+            })
+
+        return queryset
+
 
-class Client(models.Model):
+class Client(TranslatableModelMixin, models.Model):
     """نموذج العميل"""
+    translatable_fields = (
+        ('name', 'name_en'),
+        ('address', 'address_en'),
+        ('notes', 'notes_en'),
+    )
+
     name = models.CharField(max_length=100, verbose_name='اسم العميل')
     name_en = models.CharField(max_length=100, blank=True, null=True, verbose_name='اسم العميل (بالإنجليزية)')
     phone = models.CharField(max_length=20, unique=True, blank=True, null=True, verbose_name='رقم الهاتف')
@@ -261,6 +398,8 @@ class Client(models.Model):
     created_at = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ الإنشاء')
     updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, verbose_name='تاريخ التحديث')
 
+    objects = ClientQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'عميل'
         verbose_name_plural = 'العملاء'
@@ -269,39 +408,18 @@ class Client(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        """حفظ العميل مع ترجمة البيانات تلقائيًا"""
-        # ترجمة الاسم والعنوان والملاحظات إلى الإنجليزية إذا كانت فارغة
-        if self.name and not self.name_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.name, src='ar', dest='en')
-                self.name_en = translation.text
-            except Exception:
-                pass
-
-        if self.address and not self.address_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.address, src='ar', dest='en')
-                self.address_en = translation.text
-            except Exception:
-                pass
-
-        if self.notes and not self.notes_en:
-            try:
-                from googletrans import Translator
-                translator = Translator()
-                translation = translator.translate(self.notes, src='ar', dest='en')
-                self.notes_en = translation.text
-            except Exception:
-                pass
-
+        """حفظ العميل مع جدولة ترجمة البيانات"""
         super().save(*args, **kwargs)
 
+        # ترجمة الاسم والعنوان والملاحظات إلى الإنجليزية تتم لاحقًا عبر طابور الترجمة
+        self.queue_missing_translations()
+
     def get_balance(self):
         """حساب رصيد العميل"""
+        # استخدام الرصيد المحسوب مسبقًا إذا تم جلب العميل عبر with_balances()
+        if 'balance' in self.__dict__:
+            return self.__dict__['balance']
+
         from django.db.models import Sum
 
         # إجمالي الفواتير (استثناء الفواتير الملغية)
@@ -376,115 +494,37 @@ class LeavePrice(models.Model):
 
         يعيد:
         - سعر الإجازة
+
+        ترتيب البحث (أسعار العميل أولاً ثم الأسعار العامة):
+        سعر يومي بمدة مطابقة، ثم سعر ثابت، ثم أقرب مدة أقل، ثم أقرب مدة أكبر.
+        يتم الحساب من جدول أسعار مُجمَّع في الذاكرة (انظر PricingService).
         """
-        from decimal import Decimal
-
-        # التحقق من صحة المدخلات
-        if not leave_type or not isinstance(duration_days, (int, float)) or duration_days <= 0:
-            return Decimal('0')
-
-        # أولاً: البحث عن أسعار مخصصة للعميل
-        if client:
-            # 1. البحث عن سعر يومي مخصص للعميل بمدة مطابقة تمامًا
-            price = cls.objects.filter(
-                leave_type=leave_type,
-                duration_days=duration_days,
-                client=client,
-                pricing_type='per_day',
-                is_active=True
-            ).first()
-            if price:
-                return price.price
-
-            # 2. البحث عن سعر ثابت مخصص للعميل
-            fixed_price = cls.objects.filter(
-                leave_type=leave_type,
-                client=client,
-                pricing_type='fixed',
-                is_active=True
-            ).first()
-            if fixed_price:
-                return fixed_price.price
-
-            # 3. البحث عن أقرب سعر يومي مخصص للعميل (أقل مدة أو تساوي المدة المطلوبة)
-            price = cls.objects.filter(
-                leave_type=leave_type,
-                duration_days__lte=duration_days,
-                client=client,
-                pricing_type='per_day',
-                is_active=True
-            ).order_by('-duration_days').first()
-            if price and price.duration_days > 0:
-                # حساب السعر بناءً على السعر اليومي
-                daily_price = price.price / price.duration_days
-                return daily_price * Decimal(str(duration_days))
-
-            # 4. البحث عن أقرب سعر يومي مخصص للعميل (أكبر مدة من المدة المطلوبة)
-            price = cls.objects.filter(
-                leave_type=leave_type,
-                duration_days__gt=duration_days,
-                client=client,
-                pricing_type='per_day',
-                is_active=True
-            ).order_by('duration_days').first()
-            if price and price.duration_days > 0:
-                # حساب السعر بناءً على السعر اليومي
-                daily_price = price.price / price.duration_days
-                return daily_price * Decimal(str(duration_days))
-
-        # ثانياً: البحث عن أسعار عامة
-        # 5. البحث عن سعر يومي عام بمدة مطابقة تمامًا
-        price = cls.objects.filter(
-            leave_type=leave_type,
-            duration_days=duration_days,
-            client__isnull=True,
-            pricing_type='per_day',
-            is_active=True
-        ).first()
-        if price:
-            return price.price
-
-        # 6. البحث عن سعر ثابت عام
-        fixed_price = cls.objects.filter(
-            leave_type=leave_type,
-            client__isnull=True,
-            pricing_type='fixed',
-            is_active=True
-        ).first()
-        if fixed_price:
-            return fixed_price.price
-
-        # 7. البحث عن أقرب سعر يومي عام (أقل مدة أو تساوي المدة المطلوبة)
-        price = cls.objects.filter(
-            leave_type=leave_type,
-            duration_days__lte=duration_days,
-            client__isnull=True,
-            pricing_type='per_day',
-            is_active=True
-        ).order_by('-duration_days').first()
-        if price and price.duration_days > 0:
-            # حساب السعر بناءً على السعر اليومي
-            daily_price = price.price / price.duration_days
-            return daily_price * Decimal(str(duration_days))
-
-        # 8. البحث عن أقرب سعر يومي عام (أكبر مدة من المدة المطلوبة)
-        price = cls.objects.filter(
-            leave_type=leave_type,
-            duration_days__gt=duration_days,
-            client__isnull=True,
-            pricing_type='per_day',
-            is_active=True
-        ).order_by('duration_days').first()
-        if price and price.duration_days > 0:
-            # حساب السعر بناءً على السعر اليومي
-            daily_price = price.price / price.duration_days
-            return daily_price * Decimal(str(duration_days))
-
-        return Decimal('0')  # لا يوجد سعر مناسب
-
-
-class SickLeave(models.Model):
+        from core.services.pricing_service import PricingService
+        return PricingService.get_price(leave_type, duration_days, client)
+
+    @classmethod
+    def get_prices(cls, batch):
+        """
+        الحصول على أسعار مجموعة إجازات دفعة واحدة
+
+        المعلمات:
+        - batch: قائمة من (leave_type, duration_days, client) أو قواميس بنفس المفاتيح
+
+        يعيد:
+        - قائمة الأسعار بنفس ترتيب المدخلات
+        """
+        from core.services.pricing_service import PricingService
+        return [quote.price for quote in PricingService.quote_many(batch)]
+
+
+class SickLeave(InvoicedLeaveMixin, HijriDatesMixin, models.Model):
     """نموذج الإجازة المرضية"""
+    leave_type = 'sick_leave'
+    # العلاقات المعروضة في الطباعة، وتدخل في إصدار ملف PDF المخزن
+    print_related = ('patient', 'doctor', 'hospital')
+    hijri_date_fields = ('start_date', 'end_date', 'admission_date', 'discharge_date', 'issue_date')
+    hijri_number_fields = ('start_date', 'end_date', 'issue_date')
+
     leave_id = models.CharField(max_length=20, unique=True, verbose_name='رقم الإجازة')
     prefix = models.CharField(max_length=3, choices=[('PSL', 'PSL'), ('GSL', 'GSL')], default='PSL', verbose_name='بادئة الإجازة')
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='sick_leaves', verbose_name='المريض')
@@ -502,6 +542,12 @@ class SickLeave(models.Model):
     discharge_date_hijri = models.CharField(max_length=20, blank=True, null=True, verbose_name='تاريخ الخروج (هجري)')
     issue_date = models.DateField(verbose_name='تاريخ الإصدار')
     issue_date_hijri = models.CharField(max_length=20, blank=True, null=True, verbose_name='تاريخ الإصدار (هجري)')
+    start_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                          verbose_name='تاريخ البداية (هجري رقمي)')
+    end_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                        verbose_name='تاريخ النهاية (هجري رقمي)')
+    issue_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                          verbose_name='تاريخ الإصدار (هجري رقمي)')
     created_date = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ إنشاء الإجازة')
     status = models.CharField(max_length=20, choices=[
         ('active', 'نشطة'),
@@ -511,9 +557,19 @@ class SickLeave(models.Model):
     created_at = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ الإنشاء')
     updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, verbose_name='تاريخ التحديث')
 
+    objects = LeaveQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'إجازة مرضية'
         verbose_name_plural = 'الإجازات المرضية'
+        # فهارس أنماط القوائم: الترتيب الافتراضي (-created_at)، فلتر الحالة، ترتيب تاريخي
+        # البداية والنهاية مع id لفك التعادل في الترقيم بالمؤشر، وتحديث الحالات حسب end_date
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sick_leave_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='sick_leave_status_idx'),
+            models.Index(fields=['start_date', 'id'], name='sick_leave_start_idx'),
+            models.Index(fields=['end_date', 'status'], name='sick_leave_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.leave_id} - {self.patient.name}"
@@ -534,90 +590,17 @@ class SickLeave(models.Model):
             else:
                 self.status = 'active'
 
-        # تحويل التواريخ الميلادية إلى هجرية
-        from hijri_converter import Gregorian
-        if self.start_date and not self.start_date_hijri:
-            g_date = Gregorian(self.start_date.year, self.start_date.month, self.start_date.day)
-            hijri_date = g_date.to_hijri()
-            self.start_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.end_date and not self.end_date_hijri:
-            g_date = Gregorian(self.end_date.year, self.end_date.month, self.end_date.day)
-            hijri_date = g_date.to_hijri()
-            self.end_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.admission_date and not self.admission_date_hijri:
-            g_date = Gregorian(self.admission_date.year, self.admission_date.month, self.admission_date.day)
-            hijri_date = g_date.to_hijri()
-            self.admission_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.discharge_date and not self.discharge_date_hijri:
-            g_date = Gregorian(self.discharge_date.year, self.discharge_date.month, self.discharge_date.day)
-            hijri_date = g_date.to_hijri()
-            self.discharge_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.issue_date and not self.issue_date_hijri:
-            g_date = Gregorian(self.issue_date.year, self.issue_date.month, self.issue_date.day)
-            hijri_date = g_date.to_hijri()
-            self.issue_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        # ملء حقول الترجمة الإنجليزية للمريض والطبيب إذا كانت فارغة
-        from googletrans import Translator
-        translator = Translator()
-
-        # ترجمة بيانات المريض
-        if self.patient:
-            if self.patient.name and not self.patient.name_en:
-                try:
-                    translation = translator.translate(self.patient.name, src='ar', dest='en')
-                    self.patient.name_en = translation.text
-                    self.patient.save(update_fields=['name_en'])
-                except Exception:
-                    pass
-
-            if self.patient.nationality and not self.patient.nationality_en:
-                try:
-                    translation = translator.translate(self.patient.nationality, src='ar', dest='en')
-                    self.patient.nationality_en = translation.text
-                    self.patient.save(update_fields=['nationality_en'])
-                except Exception:
-                    pass
-
-            if self.patient.employer_name and not self.patient.employer_name_en:
-                try:
-                    translation = translator.translate(self.patient.employer_name, src='ar', dest='en')
-                    self.patient.employer_name_en = translation.text
-                    self.patient.save(update_fields=['employer_name_en'])
-                except Exception:
-                    pass
-
-            if self.patient.address and not self.patient.address_en:
-                try:
-                    translation = translator.translate(self.patient.address, src='ar', dest='en')
-                    self.patient.address_en = translation.text
-                    self.patient.save(update_fields=['address_en'])
-                except Exception:
-                    pass
-
-        # ترجمة بيانات الطبيب
-        if self.doctor:
-            if self.doctor.name and not self.doctor.name_en:
-                try:
-                    translation = translator.translate(self.doctor.name, src='ar', dest='en')
-                    self.doctor.name_en = translation.text
-                    self.doctor.save(update_fields=['name_en'])
-                except Exception:
-                    pass
-
-            if self.doctor.position and not self.doctor.position_en:
-                try:
-                    translation = translator.translate(self.doctor.position, src='ar', dest='en')
-                    self.doctor.position_en = translation.text
-                    self.doctor.save(update_fields=['position_en'])
-                except Exception:
-                    pass
+        # تحويل التواريخ الميلادية إلى هجرية من جدول الأيام
+        self.fill_hijri_dates()
 
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        self.sync_invoices(adding)
+
+        # جدولة ترجمة بيانات المريض والطبيب بدلاً من ترجمتها أثناء الحفظ
+        for related in (self.patient, self.doctor):
+            if related is not None:
+                related.queue_missing_translations()
 
     def update_status(self):
         """تحديث حالة الإجازة بناءً على التواريخ"""
@@ -634,8 +617,17 @@ class SickLeave(models.Model):
                 self.save()
 
 
-class CompanionLeave(models.Model):
+class CompanionLeave(InvoicedLeaveMixin, HijriDatesMixin, TranslatableModelMixin, models.Model):
     """نموذج إجازة المرافق"""
+    translatable_fields = (
+        ('relation', 'relation_en'),
+    )
+    leave_type = 'companion_leave'
+    # العلاقات المعروضة في الطباعة، وتدخل في إصدار ملف PDF المخزن
+    print_related = ('patient', 'companion', 'doctor', 'hospital')
+    hijri_date_fields = ('start_date', 'end_date', 'admission_date', 'discharge_date', 'issue_date')
+    hijri_number_fields = ('start_date', 'end_date', 'issue_date')
+
     leave_id = models.CharField(max_length=20, unique=True, verbose_name='رقم الإجازة')
     prefix = models.CharField(max_length=3, choices=[('PSL', 'PSL'), ('GSL', 'GSL')], default='PSL', verbose_name='بادئة الإجازة')
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='companion_leaves_as_patient', verbose_name='المريض')
@@ -656,6 +648,12 @@ class CompanionLeave(models.Model):
     discharge_date_hijri = models.CharField(max_length=20, blank=True, null=True, verbose_name='تاريخ الخروج (هجري)')
     issue_date = models.DateField(verbose_name='تاريخ الإصدار')
     issue_date_hijri = models.CharField(max_length=20, blank=True, null=True, verbose_name='تاريخ الإصدار (هجري)')
+    start_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                          verbose_name='تاريخ البداية (هجري رقمي)')
+    end_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                        verbose_name='تاريخ النهاية (هجري رقمي)')
+    issue_date_hijri_number = models.PositiveIntegerField(blank=True, null=True, db_index=True, editable=False,
+                                                          verbose_name='تاريخ الإصدار (هجري رقمي)')
     created_date = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ إنشاء الإجازة')
     status = models.CharField(max_length=20, choices=[
         ('active', 'نشطة'),
@@ -665,9 +663,19 @@ class CompanionLeave(models.Model):
     created_at = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ الإنشاء')
     updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, verbose_name='تاريخ التحديث')
 
+    objects = LeaveQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'إجازة مرافق'
         verbose_name_plural = 'إجازات المرافقين'
+        # فهارس أنماط القوائم: الترتيب الافتراضي (-created_at)، فلتر الحالة، ترتيب تاريخي
+        # البداية والنهاية مع id لفك التعادل في الترقيم بالمؤشر، وتحديث الحالات حسب end_date
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='companion_leave_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='companion_leave_status_idx'),
+            models.Index(fields=['start_date', 'id'], name='companion_leave_start_idx'),
+            models.Index(fields=['end_date', 'status'], name='companion_leave_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.leave_id} - {self.patient.name} - {self.companion.name}"
@@ -688,132 +696,18 @@ class CompanionLeave(models.Model):
             else:
                 self.status = 'active'
 
-        # تحويل التواريخ الميلادية إلى هجرية
-        from hijri_converter import Gregorian
-        if self.start_date and not self.start_date_hijri:
-            g_date = Gregorian(self.start_date.year, self.start_date.month, self.start_date.day)
-            hijri_date = g_date.to_hijri()
-            self.start_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.end_date and not self.end_date_hijri:
-            g_date = Gregorian(self.end_date.year, self.end_date.month, self.end_date.day)
-            hijri_date = g_date.to_hijri()
-            self.end_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.admission_date and not self.admission_date_hijri:
-            g_date = Gregorian(self.admission_date.year, self.admission_date.month, self.admission_date.day)
-            hijri_date = g_date.to_hijri()
-            self.admission_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.discharge_date and not self.discharge_date_hijri:
-            g_date = Gregorian(self.discharge_date.year, self.discharge_date.month, self.discharge_date.day)
-            hijri_date = g_date.to_hijri()
-            self.discharge_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        if self.issue_date and not self.issue_date_hijri:
-            g_date = Gregorian(self.issue_date.year, self.issue_date.month, self.issue_date.day)
-            hijri_date = g_date.to_hijri()
-            self.issue_date_hijri = f"{hijri_date.year}-{hijri_date.month}-{hijri_date.day}"
-
-        # ملء حقول الترجمة الإنجليزية للمريض والمرافق والطبيب إذا كانت فارغة
-        from googletrans import Translator
-        translator = Translator()
-
-        # ترجمة بيانات المريض
-        if self.patient:
-            if self.patient.name and not self.patient.name_en:
-                try:
-                    translation = translator.translate(self.patient.name, src='ar', dest='en')
-                    self.patient.name_en = translation.text
-                    self.patient.save(update_fields=['name_en'])
-                except Exception:
-                    pass
-
-            if self.patient.nationality and not self.patient.nationality_en:
-                try:
-                    translation = translator.translate(self.patient.nationality, src='ar', dest='en')
-                    self.patient.nationality_en = translation.text
-                    self.patient.save(update_fields=['nationality_en'])
-                except Exception:
-                    pass
-
-            if self.patient.employer_name and not self.patient.employer_name_en:
-                try:
-                    translation = translator.translate(self.patient.employer_name, src='ar', dest='en')
-                    self.patient.employer_name_en = translation.text
-                    self.patient.save(update_fields=['employer_name_en'])
-                except Exception:
-                    pass
-
-            if self.patient.address and not self.patient.address_en:
-                try:
-                    translation = translator.translate(self.patient.address, src='ar', dest='en')
-                    self.patient.address_en = translation.text
-                    self.patient.save(update_fields=['address_en'])
-                except Exception:
-                    pass
-
-        # ترجمة بيانات المرافق
-        if self.companion:
-            if self.companion.name and not self.companion.name_en:
-                try:
-                    translation = translator.translate(self.companion.name, src='ar', dest='en')
-                    self.companion.name_en = translation.text
-                    self.companion.save(update_fields=['name_en'])
-                except Exception:
-                    pass
-
-            if self.companion.nationality and not self.companion.nationality_en:
-                try:
-                    translation = translator.translate(self.companion.nationality, src='ar', dest='en')
-                    self.companion.nationality_en = translation.text
-                    self.companion.save(update_fields=['nationality_en'])
-                except Exception:
-                    pass
-
-            if self.companion.employer_name and not self.companion.employer_name_en:
-                try:
-                    translation = translator.translate(self.companion.employer_name, src='ar', dest='en')
-                    self.companion.employer_name_en = translation.text
-                    self.companion.save(update_fields=['employer_name_en'])
-                except Exception:
-                    pass
-
-            if self.companion.address and not self.companion.address_en:
-                try:
-                    translation = translator.translate(self.companion.address, src='ar', dest='en')
-                    self.companion.address_en = translation.text
-                    self.companion.save(update_fields=['address_en'])
-                except Exception:
-                    pass
-
-        # ترجمة بيانات الطبيب
-        if self.doctor:
-            if self.doctor.name and not self.doctor.name_en:
-                try:
-                    translation = translator.translate(self.doctor.name, src='ar', dest='en')
-                    self.doctor.name_en = translation.text
-                    self.doctor.save(update_fields=['name_en'])
-                except Exception:
-                    pass
-
-            if self.doctor.position and not self.doctor.position_en:
-                try:
-                    translation = translator.translate(self.doctor.position, src='ar', dest='en')
-                    self.doctor.position_en = translation.text
-                    self.doctor.save(update_fields=['position_en'])
-                except Exception:
-                    pass
-
-        # ترجمة صلة القرابة
-        if self.relation and not self.relation_en:
-            try:
-                translation = translator.translate(self.relation, src='ar', dest='en')
-                self.relation_en = translation.text
-            except Exception:
-                pass
+        # تحويل التواريخ الميلادية إلى هجرية من جدول الأيام
+        self.fill_hijri_dates()
 
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        self.sync_invoices(adding)
+
+        # جدولة ترجمة صلة القرابة وبيانات المريض والمرافق والطبيب بدلاً من ترجمتها أثناء الحفظ
+        self.queue_missing_translations()
+        for related in (self.patient, self.companion, self.doctor):
+            if related is not None:
+                related.queue_missing_translations()
 
     def update_status(self):
         """تحديث حالة الإجازة بناءً على التواريخ"""
@@ -833,6 +727,48 @@ class CompanionLeave(models.Model):
 
 
 
+class LeaveInvoiceQuerySet(models.QuerySet):
+    """استعلامات الفواتير مع المبالغ المدفوعة والمتبقية"""
+
+    def with_paid_amounts(self):
+        """إضافة المبلغ المدفوع (paid_total) والمتبقي (remaining_total) لكل فاتورة في نفس الاستعلام"""
+        amount_field = models.DecimalField(max_digits=12, decimal_places=2)
+        paid = (
+            PaymentDetail.objects.filter(invoice=models.OuterRef('pk'))
+            .order_by()
+            .values('invoice')
+            .annotate(total=models.Sum('amount'))
+            .values('total')
+        )
+        return self.annotate(
+            paid_total=Coalesce(models.Subquery(paid, output_field=amount_field),
+                                models.Value(0, output_field=amount_field), output_field=amount_field),
+        ).annotate(
+            remaining_total=models.ExpressionWrapper(models.F('amount') - models.F('paid_total'),
+                                                     output_field=amount_field),
+        )
+
+    def totals(self):
+        """
+        الإجماليات الدقيقة لجميع الفواتير في الاستعلام (استعلامان تجميعيان)
+
+        يعيد قاموسًا بالمفاتيح: count, total_amount, total_paid, total_remaining
+        """
+        invoices = self.order_by()
+        totals = invoices.aggregate(count=models.Count('id'), total_amount=models.Sum('amount'))
+        total_paid = PaymentDetail.objects.filter(
+            invoice__in=invoices.values('pk')
+        ).aggregate(total=models.Sum('amount'))['total'] or 0
+        total_amount = totals['total_amount'] or 0
+
+        return {
+            'count': totals['count'],
+            'total_amount': total_amount,
+            'total_paid': total_paid,
+            'total_remaining': total_amount - total_paid,
+        }
+
+
 class LeaveInvoice(models.Model):
     """نموذج فاتورة الإجازة"""
     invoice_number = models.CharField(max_length=20, unique=True, verbose_name='رقم الفاتورة')
@@ -842,6 +778,12 @@ class LeaveInvoice(models.Model):
         ('companion_leave', 'إجازة مرافق')
     ], verbose_name='نوع الإجازة')
     leave_id = models.CharField(max_length=20, verbose_name='رقم الإجازة')
+    # ربط فعلي بالإجازة يُحدَّد تلقائيًا من leave_type و leave_id عند الحفظ،
+    # ويملؤه للفواتير القديمة أمر link_invoice_leaves
+    sick_leave = models.ForeignKey(SickLeave, on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+                                   related_name='leave_invoices', verbose_name='الإجازة المرضية')
+    companion_leave = models.ForeignKey(CompanionLeave, on_delete=models.SET_NULL, null=True, blank=True,
+                                        editable=False, related_name='leave_invoices', verbose_name='إجازة المرافق')
     amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='المبلغ')
     status = models.CharField(max_length=20, choices=[
         ('unpaid', 'غير مدفوعة'),
@@ -854,20 +796,108 @@ class LeaveInvoice(models.Model):
     notes = models.TextField(blank=True, null=True, verbose_name='ملاحظات')
     created_at = models.DateTimeField(default=timezone.now, blank=True, null=True, verbose_name='تاريخ الإنشاء')
     updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, verbose_name='تاريخ التحديث')
+    # مجاميع مخزنة تحدّثها إشارات PaymentDetail، ويعيد حسابها أمر recompute_invoice_balances
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False,
+                                      verbose_name='المبلغ المدفوع')
+    remaining_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False,
+                                           db_index=True, verbose_name='المبلغ المتبقي')
+
+    objects = LeaveInvoiceQuerySet.as_manager()
+
+    # حقول لا تُكتب عند حفظ الفاتورة، لأن قيمها في الذاكرة قد تكون أقدم من قاعدة البيانات
+    PAYMENT_TOTAL_FIELDS = ('paid_amount', 'remaining_amount')
+    # حقل الربط بالإجازة لكل نوع إجازة
+    LEAVE_LINK_FIELDS = {'sick_leave': 'sick_leave', 'companion_leave': 'companion_leave'}
+    # العلاقات اللازمة لعرض الإجازة مع الفاتورة في استعلام واحد
+    LEAVE_RELATED = ('sick_leave__patient', 'sick_leave__doctor', 'companion_leave__patient',
+                     'companion_leave__companion', 'companion_leave__doctor')
 
     class Meta:
         verbose_name = 'فاتورة إجازة'
         verbose_name_plural = 'فواتير الإجازات'
+        indexes = [
+            # الفواتير المفتوحة للعميل من الأقدم عند توزيع الدفعات
+            models.Index(fields=['client', 'status', 'issue_date'], name='invoice_allocation_idx'),
+            # فواتير الإجازة في صفحات الإجازات (leave_id غير فريد)
+            models.Index(fields=['leave_id', 'leave_type'], name='invoice_leave_idx'),
+            models.Index(fields=['status', 'issue_date'], name='invoice_status_issue_idx'),
+            models.Index(fields=['issue_date', 'id'], name='invoice_issue_date_idx'),
+            models.Index(fields=['created_at', 'id'], name='invoice_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.invoice_number} - {self.client.name} - {self.amount}"
 
+    @property
+    def leave(self):
+        """الإجازة المرتبطة بالفاتورة (مرضية أو مرافق) أو None"""
+        field = self.LEAVE_LINK_FIELDS.get(self.leave_type)
+        return getattr(self, field) if field else None
+
+    def link_leave(self):
+        """تحديد الإجازة المرتبطة من نوع ورقم الإجازة، دون استعلام إذا كان الربط الحالي مطابقًا"""
+        field = self.LEAVE_LINK_FIELDS.get(self.leave_type)
+        for other in self.LEAVE_LINK_FIELDS.values():
+            if other != field:
+                setattr(self, other, None)
+        if field is None:
+            return
+
+        linked = self._meta.get_field(field)
+        if getattr(self, linked.attname) is not None:
+            cached = linked.get_cached_value(self, default=None)
+            if cached is not None and cached.leave_id == self.leave_id:
+                return
+            if cached is None and getattr(self, '_loaded_leave_key', None) == (self.leave_type, self.leave_id):
+                return
+
+        setattr(self, linked.attname, linked.related_model.objects.filter(
+            leave_id=self.leave_id
+        ).values_list('pk', flat=True).first())
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # نوع ورقم الإجازة كما حُمّلا، لتجنب إعادة البحث عن الإجازة عند الحفظ إذا لم يتغيرا
+        instance._loaded_leave_key = (instance.__dict__.get('leave_type'), instance.__dict__.get('leave_id'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'leave_type', 'leave_id'} & set(update_fields):
+            self.link_leave()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.LEAVE_LINK_FIELDS.values())
+
+        if self._state.adding or kwargs.get('force_insert'):
+            self.paid_amount = self.paid_amount or 0
+            self.remaining_amount = (self.amount or 0) - self.paid_amount
+            super().save(*args, **kwargs)
+            self._loaded_leave_key = (self.leave_type, self.leave_id)
+            return
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [field.name for field in self._meta.concrete_fields
+                             if not field.primary_key and field.name not in self.PAYMENT_TOTAL_FIELDS]
+            kwargs['update_fields'] = update_fields
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if 'amount' in update_fields:
+                # إعادة حساب المتبقي من المبلغ الجديد والمدفوع المخزن في قاعدة البيانات
+                LeaveInvoice.objects.filter(pk=self.pk).update(
+                    remaining_amount=models.F('amount') - models.F('paid_amount')
+                )
+                self.refresh_from_db(fields=self.PAYMENT_TOTAL_FIELDS)
+        self._loaded_leave_key = (self.leave_type, self.leave_id)
+
     def get_total_paid(self):
         """إجمالي المبلغ المدفوع للفاتورة"""
-        from django.db.models import Sum
-        total = self.payment_details.aggregate(Sum('amount'))['amount__sum'] or 0
-        # print(f"إجمالي المبلغ المدفوع للفاتورة {self.invoice_number}: {total}")
-        return total
+        # استخدام المبلغ المحسوب مسبقًا إذا تم جلب الفاتورة عبر with_paid_amounts()
+        if 'paid_total' in self.__dict__:
+            return self.__dict__['paid_total']
+        return self.paid_amount
 
     def get_remaining(self):
         """المبلغ المتبقي للفاتورة"""
@@ -883,7 +913,9 @@ class LeaveInvoice(models.Model):
         if self.status == 'cancelled':
             return self.status
 
-        total_paid = self.get_total_paid()
+        # قراءة المدفوع المخزن من قاعدة البيانات، فقد تكون الدفعات أُضيفت عبر نسخة أخرى من الفاتورة
+        self.refresh_from_db(fields=self.PAYMENT_TOTAL_FIELDS)
+        total_paid = self.paid_amount
         old_status = self.status
 
         if total_paid <= 0:
@@ -896,7 +928,7 @@ class LeaveInvoice(models.Model):
         # تحديث الحالة فقط إذا تغيرت
         if old_status != new_status:
             self.status = new_status
-            self.save()
+            self.save(update_fields=['status', 'updated_at'])
 
         return self.status
 
@@ -921,6 +953,11 @@ class Payment(models.Model):
     class Meta:
         verbose_name = 'دفعة'
         verbose_name_plural = 'الدفعات'
+        indexes = [
+            models.Index(fields=['payment_date', 'id'], name='payment_date_idx'),
+            # دفعات العميل حسب التاريخ (صفحة العميل والدفعات غير الموزعة)
+            models.Index(fields=['client', 'payment_date'], name='payment_client_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.payment_number} - {self.client.name} - {self.amount}"
@@ -933,55 +970,9 @@ class Payment(models.Model):
         - عدد الفواتير التي تم تسديدها
         - إجمالي المبلغ الذي تم تخصيصه
         """
-        from django.db.models import Sum
-
-        # حساب المبلغ غير المخصص
-        allocated_amount = self.payment_details.aggregate(Sum('amount'))['amount__sum'] or 0
-        unallocated_amount = self.amount - allocated_amount
-
-        # إذا لم يكن هناك مبلغ غير مخصص، نعيد 0
-        if unallocated_amount <= 0:
-            return 0, 0
-
-        # الحصول على الفواتير غير المدفوعة أو المدفوعة جزئيًا للعميل مرتبة من الأقدم إلى الأحدث
-        unpaid_invoices = LeaveInvoice.objects.filter(
-            client=self.client,
-            status__in=['unpaid', 'partially_paid']
-        ).order_by('issue_date', 'id')  # ترتيب حسب تاريخ الإصدار ثم المعرف
-
-        invoices_paid = 0
-        total_allocated = 0
-
-        # توزيع المبلغ على الفواتير
-        for invoice in unpaid_invoices:
-            # حساب المبلغ المتبقي للفاتورة
-            remaining_invoice_amount = invoice.get_remaining()
-
-            # إذا كان المبلغ المتبقي للفاتورة أكبر من 0
-            if remaining_invoice_amount > 0:
-                # المبلغ الذي سيتم تخصيصه لهذه الفاتورة
-                amount_to_allocate = min(remaining_invoice_amount, unallocated_amount)
-
-                # إنشاء تفصيل دفع جديد
-                PaymentDetail.objects.create(
-                    payment=self,
-                    invoice=invoice,
-                    amount=amount_to_allocate
-                )
-
-                # تحديث حالة الفاتورة
-                invoice.update_status()
-
-                # تحديث المبلغ غير المخصص
-                unallocated_amount -= amount_to_allocate
-                total_allocated += amount_to_allocate
-                invoices_paid += 1
-
-                # إذا تم تخصيص كل المبلغ، نخرج من الحلقة
-                if unallocated_amount <= 0:
-                    break
-
-        return invoices_paid, total_allocated
+        from core.services.payment_allocation_service import \
+            PaymentAllocationService
+        return PaymentAllocationService.allocate_payment(self)
 
 
 class PaymentDetail(models.Model):
@@ -998,6 +989,11 @@ class PaymentDetail(models.Model):
     def __str__(self):
         return f"{self.payment.payment_number} - {self.invoice.invoice_number} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        # الحفظ وتحديث مجاميع الفاتورة (عبر الإشارات) في نفس المعاملة
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class SystemSettings(models.Model):
     """إعدادات النظام"""
@@ -1162,3 +1158,135 @@ class BackupSchedule(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.get_frequency_display()}"
+
+
+class TranslationJob(models.Model):
+    """مهمة ترجمة مؤجلة لحقل إنجليزي فارغ"""
+    STATUS_CHOICES = [
+        ('pending', 'في الانتظار'),
+        ('done', 'مكتملة'),
+        ('failed', 'فشلت'),
+    ]
+
+    model_label = models.CharField(max_length=100, verbose_name="النموذج")
+    object_id = models.BigIntegerField(verbose_name="معرف الكائن")
+    source_field = models.CharField(max_length=50, verbose_name="الحقل المصدر")
+    target_field = models.CharField(max_length=50, verbose_name="الحقل الهدف")
+    source_text = models.TextField(verbose_name="النص المصدر")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="الحالة")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="عدد المحاولات")
+    last_error = models.TextField(blank=True, verbose_name="آخر خطأ")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+
+    class Meta:
+        verbose_name = "مهمة ترجمة"
+        verbose_name_plural = "مهام الترجمة"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'object_id', 'target_field'],
+                name='unique_translation_job'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='translation_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id}.{self.target_field} - {self.get_status_display()}"
+
+
+class TranslationMemo(models.Model):
+    """ذاكرة الترجمات المحفوظة لتجنب إعادة ترجمة النصوص المتكررة"""
+    source_lang = models.CharField(max_length=10, default='ar', verbose_name="لغة المصدر")
+    target_lang = models.CharField(max_length=10, default='en', verbose_name="لغة الهدف")
+    source_hash = models.CharField(max_length=40, verbose_name="بصمة النص")
+    source_text = models.TextField(verbose_name="النص المصدر")
+    translated_text = models.TextField(verbose_name="النص المترجم")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+
+    class Meta:
+        verbose_name = "ترجمة محفوظة"
+        verbose_name_plural = "الترجمات المحفوظة"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_lang', 'target_lang', 'source_hash'],
+                name='unique_translation_memo'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_text} -> {self.translated_text}"
+
+
+class NumberSequence(models.Model):
+    """عداد أرقام الإجازات والفواتير والمدفوعات، تُحجز منه كتل من الأرقام دفعة واحدة"""
+    key = models.CharField(max_length=50, unique=True, verbose_name="المفتاح")
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name="آخر رقم محجوز")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+
+    class Meta:
+        verbose_name = "تسلسل ترقيم"
+        verbose_name_plural = "تسلسلات الترقيم"
+
+    def __str__(self):
+        return f"{self.key}: {self.last_value}"
+
+
+class DailyStatistic(models.Model):
+    """عدد السجلات ومجموع مبالغها لكل يوم ونوع سجل وحالة، يُحدَّث تدريجيًا عند الحفظ والحذف"""
+    ENTITY_CHOICES = [
+        ('sick_leave', 'إجازة مرضية'),
+        ('companion_leave', 'إجازة مرافق'),
+        ('invoice', 'فاتورة'),
+        ('payment', 'دفعة'),
+        ('client', 'عميل'),
+        ('patient', 'مريض'),
+        ('doctor', 'طبيب'),
+    ]
+
+    entity = models.CharField(max_length=30, choices=ENTITY_CHOICES, verbose_name="نوع السجل")
+    date = models.DateField(blank=True, null=True, verbose_name="التاريخ")
+    status = models.CharField(max_length=30, blank=True, default='', verbose_name="الحالة")
+    count = models.IntegerField(default=0, verbose_name="العدد")
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="المبلغ")
+
+    class Meta:
+        verbose_name = "إحصائية يومية"
+        verbose_name_plural = "الإحصائيات اليومية"
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'date', 'status'], name='unique_daily_statistic'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_display()} {self.date} {self.status}: {self.count}"
+
+
+class SearchToken(models.Model):
+    """كلمة موحدة (عربية أو لاتينية أو رقم) من حقول سجل، تُبحث بالبادئة في فهرس (النوع، الكلمة)"""
+    ENTITY_CHOICES = [
+        ('patient', 'مريض'),
+        ('doctor', 'طبيب'),
+        ('client', 'عميل'),
+        ('sick_leave', 'إجازة مرضية'),
+        ('companion_leave', 'إجازة مرافق'),
+    ]
+
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES, verbose_name="نوع السجل")
+    object_id = models.BigIntegerField(verbose_name="معرف السجل")
+    token = models.CharField(max_length=64, verbose_name="الكلمة")
+    weight = models.PositiveSmallIntegerField(default=1, verbose_name="الوزن")
+
+    class Meta:
+        verbose_name = "كلمة بحث"
+        verbose_name_plural = "فهرس البحث"
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'object_id', 'token'], name='unique_search_token'),
+        ]
+        indexes = [
+            models.Index(fields=['entity', 'token', 'object_id'], name='search_token_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity}#{self.object_id}: {self.token}"
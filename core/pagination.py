@@ -0,0 +1,203 @@
+"""
+التقسيم إلى صفحات بالمؤشر (Keyset Pagination)
+
+بدلًا من OFFSET و COUNT(*) تُجلب كل صفحة باستعلام واحد يبدأ بعد آخر صف في الصفحة
+السابقة حسب حقول الترتيب (مع id لفك التعادل)، فتكلفة الصفحة 500 مثل الصفحة الأولى.
+المؤشر نص مُرمَّز لا يعتمد عليه المستخدم (base64 لقيم حقول الترتيب واتجاه التنقل
+وحقول الترتيب نفسها، فمؤشر من ترتيب آخر يُعامل كأنه غير موجود).
+"""
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+from core.services.count_service import CountService
+
+
+class KeysetPage:
+    """صفحة من النتائج مع مؤشري الصفحة التالية والسابقة"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, query='', total_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        # باقي معلمات الطلب (الفلاتر) لإضافتها إلى روابط التنقل
+        self.query = query
+        # العدد التقريبي لكل النتائج (اختياري، من CountService)
+        self.total_count = total_count
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    تقسيم استعلام إلى صفحات حسب حقول ترتيب ثابتة
+
+    ordering: حقول الترتيب مثل ('-start_date', '-id') أو حقول مرتبطة مثل 'patient__name'
+    (مع select_related)، ويُضاف id تلقائيًا إذا لم يكن موجودًا. القيم الفارغة (NULL)
+    تأتي في نهاية الترتيب دائمًا.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, ordering, per_page=50):
+        ordering = list(ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('-id' if ordering and ordering[0].startswith('-') else 'id')
+
+        self.queryset = queryset
+        self.fields = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.per_page = per_page
+
+    # ترميز المؤشر
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _get_value(obj, name):
+        """قيمة حقل الترتيب في الكائن، مع تتبع العلاقات (patient__name)"""
+        for attribute in name.split('__'):
+            if obj is None:
+                return None
+            obj = getattr(obj, attribute)
+        return obj
+
+    @property
+    def ordering_key(self) -> str:
+        return ','.join(('-' if descending else '') + name for name, descending in self.fields)
+
+    def encode_cursor(self, obj, direction) -> str:
+        values = [self._serialize(self._get_value(obj, name)) for name, descending in self.fields]
+        data = json.dumps({'v': values, 'd': direction, 'o': self.ordering_key}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """يعيد (القيم، الاتجاه)، أو None إذا كان المؤشر غير صالح"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values, direction, ordering = data['v'], data['d'], data['o']
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields) \
+                or direction not in (self.NEXT, self.PREVIOUS) or ordering != self.ordering_key:
+            return None
+        return values, direction
+
+    # بناء الاستعلام
+
+    def _order_by(self, reverse=False):
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        return [
+            F(name).desc(**nulls) if descending != reverse else F(name).asc(**nulls)
+            for name, descending in self.fields
+        ]
+
+    def _after(self, name, descending, value):
+        """الصفوف التي تأتي بعد القيمة في ترتيب هذا الحقل (الفارغة في النهاية)"""
+        if value is None:
+            return None
+        lookup = 'lt' if descending else 'gt'
+        return Q(**{f'{name}__{lookup}': value}) | Q(**{f'{name}__isnull': True})
+
+    def _before(self, name, descending, value):
+        """الصفوف التي تأتي قبل القيمة في ترتيب هذا الحقل"""
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        lookup = 'gt' if descending else 'lt'
+        return Q(**{f'{name}__{lookup}': value})
+
+    def _keyset_filter(self, values, direction):
+        """شرط (a, b, id) بعد/قبل قيم المؤشر: أول حقل مختلف يحدد الموضع"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            compare = self._after if direction == self.NEXT else self._before
+            position = compare(name, descending, value)
+            if position is not None:
+                condition |= equal & position
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+
+    def get_page(self, cursor=None, query='', total_count=None) -> KeysetPage:
+        """صفحة النتائج بعد المؤشر أو قبله (باستعلام واحد)"""
+        decoded = self.decode_cursor(cursor)
+        queryset = self.queryset
+        if decoded is not None:
+            try:
+                queryset = queryset.filter(self._keyset_filter(*decoded))
+            except (ValidationError, ValueError, TypeError):
+                # قيم مؤشر لا تناسب أنواع الحقول
+                decoded = None
+                queryset = self.queryset
+
+        if decoded is None:
+            rows = list(queryset.order_by(*self._order_by())[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_before = False
+        else:
+            values, direction = decoded
+            if direction == self.NEXT:
+                rows = list(queryset.order_by(*self._order_by())[:self.per_page + 1])
+                has_more = len(rows) > self.per_page
+                rows = rows[:self.per_page]
+                has_before = True
+            else:
+                rows = list(queryset.order_by(*self._order_by(reverse=True))[:self.per_page + 1])
+                has_before = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                has_more = True
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], self.NEXT) if has_more and rows else None,
+            previous_cursor=self.encode_cursor(rows[0], self.PREVIOUS) if has_before and rows else None,
+            query=query,
+            total_count=total_count,
+        )
+
+
+def paginate_keyset(request, queryset, ordering, per_page=50, cursor_param='cursor',
+                    estimate_total=False) -> KeysetPage:
+    """
+    صفحة من الاستعلام حسب المؤشر في الطلب، مع الاحتفاظ بباقي معلمات الطلب لروابط التنقل
+
+    مع estimate_total=True يُضاف عدد النتائج (page.total_count) من CountService: دقيق
+    للاستعلامات المصفاة الصغيرة، وتقريبي للجداول الكاملة والنتائج الكبيرة.
+    """
+    params = request.GET.copy()
+    cursor = params.pop(cursor_param, [None])[-1]
+    params.pop('page', None)
+    total_count = CountService.count(queryset) if estimate_total else None
+    return KeysetPaginator(queryset, ordering, per_page).get_page(cursor, query=params.urlencode(),
+                                                                  total_count=total_count)
@@ -16,6 +16,7 @@ from django.utils import timezone
 
 from core.models import BackupRecord, BackupSchedule, SystemSettings
 from core.services.settings_service import SettingsService
+from core.services.statistics_service import DailyStatisticsService
 
 
 class BackupService:
@@ -440,6 +441,9 @@ class BackupService:
             # تحميل البيانات الجديدة
             call_command('loaddata', db_file)
 
+            # loaddata لا يرسل إشارات التحديث التدريجي للإحصائيات اليومية
+            DailyStatisticsService.rebuild()
+
             return True
         except Exception as e:
             raise Exception(f"فشل في استعادة قاعدة البيانات: {str(e)}")
@@ -0,0 +1,128 @@
+"""
+خدمة الكاش المُصدَّر للوحة التحكم والتقارير
+
+لكل نموذج رقم إصدار في الكاش يتغير عند حفظ أو حذف أي سجل منه (عبر الإشارات في
+core/signals.py)، ويُشتق مفتاح النتيجة من إصدارات النماذج التي تعتمد عليها ومن معلمات
+الطلب، فلا حاجة لحذف النتائج القديمة: تتغير المفاتيح بعد أي كتابة وتنتهي القديمة وحدها.
+مدة الصلاحية من إعدادي cache_timeout_reports و cache_timeout_statistics.
+"""
+import hashlib
+import json
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import (Client, CompanionLeave, Doctor, Hospital,
+                         LeaveInvoice, Patient, Payment, PaymentDetail,
+                         SickLeave)
+from core.services.settings_service import SettingsService
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedCacheService:
+    """خدمة تخزين نتائج الحسابات في الكاش بمفاتيح مرتبطة بإصدارات النماذج"""
+
+    # النماذج التي يتغير إصدارها عند الحفظ والحذف (عبر الإشارات)
+    VERSIONED_MODELS = (
+        SickLeave, CompanionLeave, LeaveInvoice, Payment, PaymentDetail,
+        Client, Patient, Doctor, Hospital,
+    )
+
+    VERSION_PREFIX = 'model_version_'
+    RESULT_PREFIX = 'versioned_'
+
+    TIMEOUT_SETTINGS = {
+        'default': ('cache_timeout_default', 3600),
+        'reports': ('cache_timeout_reports', 1800),
+        'statistics': ('cache_timeout_statistics', 900),
+        'typeahead': ('cache_timeout_typeahead', 60),
+    }
+
+    _missing = object()
+
+    @staticmethod
+    def get_label(model) -> str:
+        return model._meta.label_lower
+
+    @classmethod
+    def get_version_key(cls, model) -> str:
+        return f"{cls.VERSION_PREFIX}{cls.get_label(model)}"
+
+    @classmethod
+    def get_versions(cls, models) -> list:
+        """إصدارات النماذج بقراءة واحدة من الكاش، مع إنشاء الإصدارات غير الموجودة"""
+        keys = [cls.get_version_key(model) for model in models]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                version = uuid.uuid4().hex
+                # add لا يستبدل إصدارًا أنشأته عملية أخرى في نفس اللحظة
+                versions[key] = version if cache.add(key, version, None) else cache.get(key, version)
+        return [versions[key] for key in keys]
+
+    @classmethod
+    def bump(cls, *models):
+        """تغيير إصدار النماذج فتصبح كل النتائج المعتمدة عليها قديمة"""
+        cache.set_many({cls.get_version_key(model): uuid.uuid4().hex for model in models}, None)
+
+    @classmethod
+    def bump_on_commit(cls, *models):
+        """تغيير الإصدار فورًا ثم مرة أخرى بعد تأكيد المعاملة"""
+        cls.bump(*models)
+        transaction.on_commit(lambda: cls.bump(*models))
+
+    @staticmethod
+    def normalize_params(params) -> list:
+        """معلمات الطلب بترتيب ثابت (تقبل QueryDict أو قاموسًا)"""
+        if params is None:
+            return []
+        if hasattr(params, 'lists'):
+            items = params.lists()
+        else:
+            items = ((key, value if isinstance(value, (list, tuple)) else [value]) for key, value in params.items())
+        return sorted((str(key), [str(value) for value in values]) for key, values in items)
+
+    @classmethod
+    def make_key(cls, name, models, params=None) -> str:
+        """مفتاح النتيجة من اسمها وإصدارات نماذجها ومعلمات الطلب"""
+        payload = json.dumps([cls.get_versions(models), cls.normalize_params(params)], separators=(',', ':'))
+        return f"{cls.RESULT_PREFIX}{name}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(SettingsService.get_setting('enable_cache', True))
+
+    @classmethod
+    def get_timeout(cls, timeout_type='default') -> int:
+        setting_key, default = cls.TIMEOUT_SETTINGS.get(timeout_type, cls.TIMEOUT_SETTINGS['default'])
+        return SettingsService.get_setting(setting_key, default)
+
+    @classmethod
+    def get_or_set(cls, name, models, compute, params=None, timeout_type='reports'):
+        """
+        النتيجة من الكاش، أو حسابها بـ compute() وتخزينها
+
+        المعلمات:
+        - name: اسم النتيجة (مثل report_invoices)
+        - models: النماذج التي تعتمد عليها النتيجة
+        - params: معلمات الطلب التي تغير النتيجة (مثل request.GET)
+        - timeout_type: نوع مهلة الكاش (reports أو statistics أو typeahead)
+        """
+        if not cls.is_enabled():
+            return compute()
+
+        key = cls.make_key(name, models, params)
+        value = cache.get(key, cls._missing)
+        if value is not cls._missing:
+            return value
+
+        value = compute()
+        try:
+            cache.set(key, value, cls.get_timeout(timeout_type))
+        except Exception as e:
+            # نتيجة لا يمكن تخزينها في الكاش لا تمنع عرض الصفحة
+            logger.warning(f"تعذر تخزين {name} في الكاش: {str(e)}")
+        return value
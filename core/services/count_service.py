@@ -0,0 +1,147 @@
+"""
+خدمة عدّ السجلات للقوائم ولوحة التحكم
+
+COUNT(*) على جدول InnoDB كبير يمسح فهرسًا كاملًا، لذلك:
+- الاستعلام بدون فلاتر يُعدّ من جدول الإحصائيات اليومية المجمع (عدادات تُحدَّث بالإشارات)،
+  أو من إحصائيات الجدول في قاعدة البيانات للنماذج غير المتتبعة.
+- الاستعلام المصفّى يُعدّ عدًّا دقيقًا محدودًا بحد أقصى (LIMIT)، وإذا تجاوزه يُقدَّر العدد
+  من خطة التنفيذ (EXPLAIN).
+"""
+import json
+import logging
+
+from django.db import connections, models
+
+from core.models import DailyStatistic, LeaveQuerySet
+from core.services.statistics_service import DailyStatisticsService
+
+logger = logging.getLogger(__name__)
+
+
+class CountService:
+    """خدمة العدد الدقيق أو التقريبي لاستعلامات القوائم"""
+
+    # أقصى عدد يُحسب بدقة للاستعلامات المصفاة
+    EXACT_COUNT_THRESHOLD = 1000
+
+    @staticmethod
+    def is_unfiltered(queryset) -> bool:
+        """هل يشمل الاستعلام كل صفوف الجدول (بدون شروط أو تكرار أو حدود)"""
+        query = queryset.query
+        return (
+            not query.where
+            and not query.distinct
+            and not query.combinator
+            and query.low_mark == 0
+            and query.high_mark is None
+        )
+
+    @classmethod
+    def get_counter(cls, model, statuses=False):
+        """
+        عدد سجلات النموذج من جدول الإحصائيات اليومية، أو None إذا لم يكن متتبعًا
+
+        مع statuses=True يعيد {الحالة: العدد} بدل العدد الكلي.
+        """
+        entity = DailyStatisticsService.get_entity(model)
+        if entity is None:
+            return None
+
+        rows = DailyStatistic.objects.filter(entity=entity)
+        if not statuses:
+            return rows.aggregate(total=models.Sum('count'))['total'] or 0
+        return {
+            row['status']: row['total'] or 0
+            for row in rows.values('status').annotate(total=models.Sum('count')).order_by()
+        }
+
+    @staticmethod
+    def get_table_estimate(model):
+        """عدد صفوف الجدول من إحصائيات قاعدة البيانات (MySQL و PostgreSQL)، أو None"""
+        connection = connections[model.objects.db]
+        table = model._meta.db_table
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'mysql':
+                    cursor.execute(
+                        'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table]
+                    )
+                elif connection.vendor == 'postgresql':
+                    cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+                else:
+                    return None
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.warning(f"تعذر قراءة إحصائيات الجدول {table}: {str(e)}")
+            return None
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    @staticmethod
+    def get_plan_estimate(queryset):
+        """عدد الصفوف المتوقع من خطة التنفيذ (EXPLAIN) على MySQL و PostgreSQL، أو None"""
+        connection = connections[queryset.db]
+        if connection.vendor not in ('mysql', 'postgresql'):
+            return None
+
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                    plan = cursor.fetchone()[0]
+                    plan = json.loads(plan) if isinstance(plan, str) else plan
+                    return int(plan[0]['Plan']['Plan Rows'])
+
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0].lower() for column in cursor.description]
+                row = dict(zip(columns, cursor.fetchone()))
+        except Exception as e:
+            logger.warning(f"تعذر تقدير عدد الصفوف من خطة التنفيذ: {str(e)}")
+            return None
+        # صفوف الجدول الأول بعد نسبة الشروط (الجداول المربوطة بـ select_related صف لكل صف)
+        return int((row.get('rows') or 0) * float(row.get('filtered') or 100) / 100)
+
+    @classmethod
+    def count(cls, queryset, threshold=None) -> int:
+        """
+        عدد صفوف الاستعلام: دقيق حتى الحد، وتقريبي لما بعده أو للجداول الكاملة
+
+        - بدون فلاتر: عداد الإحصائيات اليومية، ثم إحصائيات الجدول
+        - مع فلاتر: عدّ محدود بالحد، ثم تقدير خطة التنفيذ (لا يقل عن الحد)
+        """
+        threshold = cls.EXACT_COUNT_THRESHOLD if threshold is None else threshold
+
+        if cls.is_unfiltered(queryset):
+            total = cls.get_counter(queryset.model)
+            if total is None:
+                total = cls.get_table_estimate(queryset.model)
+            if total is not None:
+                return total
+        else:
+            bounded = queryset.order_by().values('pk')[:threshold + 1].count()
+            if bounded <= threshold:
+                return bounded
+            estimate = cls.get_plan_estimate(queryset)
+            if estimate is not None:
+                return max(estimate, bounded)
+
+        return queryset.count()
+
+    @classmethod
+    def status_counts(cls, queryset) -> dict:
+        """
+        عدد الإجازات الكلي ولكل حالة: {'total', 'active', 'cancelled', 'expired'}
+
+        بدون فلاتر تُقرأ من جدول الإحصائيات اليومية، وإلا باستعلام تجميعي واحد.
+        """
+        if cls.is_unfiltered(queryset):
+            counts = cls.get_counter(queryset.model, statuses=True)
+            if counts is not None:
+                return {
+                    'total': sum(counts.values()),
+                    **{status: counts.get(status, 0) for status in LeaveQuerySet.STATUSES},
+                }
+        return queryset.status_counts()
@@ -0,0 +1,184 @@
+"""
+خدمة تصدير التقارير
+
+تصدّر صفوف التقرير بتدفق (StreamingHttpResponse) مع values_list().iterator() على
+الأعمدة المطلوبة فقط، فلا يُحمَّل الاستعلام كاملًا في الذاكرة:
+- CSV: يُكتب على دفعات ويضغطه GZipMiddleware أثناء الإرسال إذا دعمه المتصفح.
+- XLSX: مصنف openpyxl بوضع الكتابة فقط (حزمة اختيارية) يُكتب في ملف مؤقت ثم يُرسل.
+"""
+import csv
+import datetime
+import tempfile
+
+from django.core.exceptions import FieldDoesNotExist
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+
+class ExportError(Exception):
+    """خطأ في تصدير التقرير"""
+
+
+class _RowBuffer:
+    """مخزن نصي بسيط يجمع الأسطر التي يكتبها csv.writer"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, value):
+        self.parts.append(value)
+
+    def pop(self) -> str:
+        value = ''.join(self.parts)
+        self.parts = []
+        return value
+
+
+class ReportExportService:
+    """تصدير استعلامات التقارير بصيغتي CSV و XLSX"""
+
+    FORMATS = ('csv', 'xlsx')
+    CHUNK_SIZE = 2000
+
+    CONTENT_TYPES = {
+        'csv': 'text/csv; charset=utf-8',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    @staticmethod
+    def is_xlsx_available() -> bool:
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @classmethod
+    def filter_formats(cls, formats) -> list:
+        """الصيغ المدعومة من قائمة صيغ، مع استبعاد XLSX إذا لم تكن openpyxl مثبتة"""
+        xlsx_available = cls.is_xlsx_available()
+        return [export_format for export_format in formats
+                if export_format in cls.FORMATS and (export_format != 'xlsx' or xlsx_available)]
+
+    @classmethod
+    def get_default_format(cls, preferred=None) -> str:
+        """الصيغة الافتراضية للتصدير: الصيغة المفضلة إذا كانت متاحة، وإلا CSV"""
+        return preferred if cls.filter_formats([preferred]) else 'csv'
+
+    @staticmethod
+    def resolve_field(model, lookup):
+        """الحقل النهائي لمسار مثل patient__name، أو None للحقول المحسوبة (annotate)"""
+        field = None
+        for name in lookup.split('__'):
+            try:
+                field = model._meta.get_field(name)
+            except (FieldDoesNotExist, AttributeError):
+                return None
+            model = field.related_model
+        return field
+
+    @classmethod
+    def get_columns(cls, model, columns) -> list:
+        """
+        تجهيز الأعمدة: كل عمود مسار حقل، أو (مسار، عنوان) للحقول المحسوبة
+
+        يعيد قائمة من (المسار، العنوان، قاموس الخيارات لعرض القيم)
+        """
+        prepared = []
+        for column in columns:
+            lookup, header = column if isinstance(column, tuple) else (column, None)
+            field = cls.resolve_field(model, lookup)
+            if header is None:
+                header = str(field.verbose_name) if field is not None else lookup
+            choices = {key: str(label) for key, label in field.flatchoices} if field is not None and field.choices else None
+            prepared.append((lookup, header, choices))
+        return prepared
+
+    @staticmethod
+    def format_value(value, choices=None):
+        if value is None:
+            return ''
+        if choices is not None:
+            return choices.get(value, value)
+        if isinstance(value, datetime.datetime):
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            return value.strftime('%Y-%m-%d %H:%M')
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return value
+
+    @classmethod
+    def iter_rows(cls, queryset, columns, chunk_size=None):
+        """صفوف الاستعلام بالأعمدة المطلوبة فقط، على دفعات من قاعدة البيانات"""
+        lookups = [lookup for lookup, header, choices in columns]
+        choices_list = [choices for lookup, header, choices in columns]
+        rows = queryset.values_list(*lookups).iterator(chunk_size=chunk_size or cls.CHUNK_SIZE)
+        for row in rows:
+            yield [cls.format_value(value, choices) for value, choices in zip(row, choices_list)]
+
+    @classmethod
+    def stream_csv(cls, rows, headers, chunk_size=None):
+        """نص CSV على دفعات (سطر العناوين مسبوق بـ BOM ليتعرف Excel على الترميز)"""
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        buffer = _RowBuffer()
+        writer = csv.writer(buffer)
+
+        buffer.write('\ufeff')
+        writer.writerow(headers)
+        yield buffer.pop()
+
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % chunk_size == 0:
+                yield buffer.pop()
+
+        remaining = buffer.pop()
+        if remaining:
+            yield remaining
+
+    @classmethod
+    def write_xlsx(cls, rows, headers, title):
+        """كتابة الصفوف في مصنف بوضع الكتابة فقط، ويعيد ملفًا مؤقتًا مفتوحًا للقراءة"""
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise ExportError("تصدير Excel يتطلب تثبيت الحزمة openpyxl") from e
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(title=title[:31])
+        worksheet.sheet_view.rightToLeft = True
+        worksheet.append(headers)
+        for row in rows:
+            worksheet.append(row)
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+    @classmethod
+    def export(cls, queryset, columns, export_format, filename, title=None):
+        """
+        استجابة تصدير متدفقة للاستعلام
+
+        columns: مسارات الحقول، أو (مسار، عنوان) للحقول المحسوبة
+        """
+        if export_format not in cls.FORMATS:
+            raise ExportError(f"صيغة التصدير غير مدعومة: {export_format}")
+
+        columns = cls.get_columns(queryset.model, columns)
+        headers = [header for lookup, header, choices in columns]
+        rows = cls.iter_rows(queryset, columns)
+        filename = f'{filename}-{timezone.localdate().isoformat()}.{export_format}'
+
+        if export_format == 'xlsx':
+            output = cls.write_xlsx(rows, headers, title or filename)
+            return FileResponse(output, as_attachment=True, filename=filename,
+                                content_type=cls.CONTENT_TYPES['xlsx'])
+
+        response = StreamingHttpResponse(cls.stream_csv(rows, headers), content_type=cls.CONTENT_TYPES['csv'])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,117 @@
+"""
+خدمة التقويم الهجري
+
+جدول أيام مُجمَّع يُبنى مرة واحدة عند الاستيراد من بدايات أشهر تقويم أم القرى
+(hijri_converter.ummalqura): كل يوم ميلادي في النطاق المدعوم (1924-08-01 إلى
+2077-11-16) يقابله عنصر في مصفوفة بالفهرس date.toordinal()، قيمته التاريخ الهجري
+مضغوطًا في عدد صحيح YYYYMMDD. التحويل بعد ذلك عملية فهرسة واحدة دون حساب.
+"""
+import datetime
+from array import array
+
+from hijri_converter import ummalqura
+
+# الفرق بين رقم اليوم الجولياني المختصر (RJD) و date.toordinal()
+RJD_TO_ORDINAL = 678575
+
+
+class HijriCalendar:
+    """تحويل التواريخ الميلادية إلى هجرية من جدول الأيام"""
+
+    # تنسيق الحفظ في حقول *_hijri بالنماذج، وتنسيق العرض في القوالب
+    STORAGE_FORMAT = '{year}-{month}-{day}'
+    DISPLAY_FORMAT = '{day:02d}-{month:02d}-{year}'
+
+    MONTH_NAMES = (
+        'محرم', 'صفر', 'ربيع الأول', 'ربيع الآخر', 'جمادى الأولى', 'جمادى الآخرة',
+        'رجب', 'شعبان', 'رمضان', 'شوال', 'ذو القعدة', 'ذو الحجة',
+    )
+
+    _table = array('I')
+    _first_ordinal = 0
+
+    @classmethod
+    def load(cls):
+        """بناء جدول الأيام من بدايات الأشهر الهجرية"""
+        month_starts = ummalqura.MONTH_STARTS
+        table = array('I')
+        for index in range(len(month_starts) - 1):
+            months = index + ummalqura.HIJRI_OFFSET
+            base = (months // 12 + 1) * 10000 + (months % 12 + 1) * 100
+            table.extend(range(base + 1, base + month_starts[index + 1] - month_starts[index] + 1))
+
+        cls._first_ordinal = month_starts[0] + RJD_TO_ORDINAL
+        cls._table = table
+
+    @classmethod
+    def get_range(cls) -> tuple:
+        """أول وآخر تاريخ ميلادي مدعوم"""
+        return (datetime.date.fromordinal(cls._first_ordinal),
+                datetime.date.fromordinal(cls._first_ordinal + len(cls._table) - 1))
+
+    @classmethod
+    def to_hijri_number(cls, value):
+        """التاريخ الهجري كعدد صحيح YYYYMMDD، أو None إذا كان التاريخ فارغًا أو خارج النطاق"""
+        if not value:
+            return None
+        if isinstance(value, datetime.datetime):
+            value = value.date()
+
+        index = value.toordinal() - cls._first_ordinal
+        if 0 <= index < len(cls._table):
+            return cls._table[index]
+        return None
+
+    @classmethod
+    def to_hijri(cls, value):
+        """التاريخ الهجري كثلاثية (سنة، شهر، يوم)، أو None"""
+        number = cls.to_hijri_number(value)
+        if number is None:
+            return None
+        return number // 10000, number // 100 % 100, number % 100
+
+    @classmethod
+    def format(cls, value, pattern=STORAGE_FORMAT) -> str:
+        """تنسيق التاريخ الهجري، ويعيد نصًا فارغًا إذا تعذر التحويل"""
+        hijri = cls.to_hijri(value)
+        if hijri is None:
+            return ''
+        return pattern.format(year=hijri[0], month=hijri[1], day=hijri[2])
+
+    @classmethod
+    def month_label(cls, year_month) -> str:
+        """اسم الشهر الهجري والسنة من عدد YYYYMM (مثل: ذو القعدة 1446)"""
+        year, month = divmod(int(year_month), 100)
+        if not 1 <= month <= 12:
+            return str(year_month)
+        return f'{cls.MONTH_NAMES[month - 1]} {year}'
+
+    @classmethod
+    def to_hijri_many(cls, values, pattern=None) -> list:
+        """
+        تحويل عمود كامل من التواريخ دفعة واحدة (للتقارير وتعبئة البيانات)
+
+        يعيد قائمة بنفس الترتيب: أعداد YYYYMMDD، أو نصوص منسقة إذا تم تحديد pattern.
+        التواريخ الفارغة أو خارج النطاق تقابلها None (أو نص فارغ مع pattern).
+        """
+        table = cls._table
+        first = cls._first_ordinal
+        size = len(table)
+
+        numbers = []
+        for value in values:
+            if not value:
+                numbers.append(None)
+                continue
+            index = (value.date() if isinstance(value, datetime.datetime) else value).toordinal() - first
+            numbers.append(table[index] if 0 <= index < size else None)
+
+        if pattern is None:
+            return numbers
+        return [
+            pattern.format(year=number // 10000, month=number // 100 % 100, day=number % 100) if number else ''
+            for number in numbers
+        ]
+
+
+HijriCalendar.load()
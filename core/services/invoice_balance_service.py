@@ -0,0 +1,77 @@
+"""
+خدمة مجاميع الفواتير المخزنة
+
+تحافظ على الحقلين paid_amount و remaining_amount في LeaveInvoice متزامنين مع
+تفاصيل الدفعات بتحديثات F() داخل المعاملات، وتعيد حسابهما والتحقق منهما عند الحاجة.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import models, transaction
+
+from core.models import LeaveInvoice
+from core.services.cache_service import VersionedCacheService
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceBalanceService:
+    """خدمة تحديث وإعادة حساب المبالغ المدفوعة والمتبقية للفواتير"""
+
+    @classmethod
+    def apply_delta(cls, invoice_id, delta, invoice=None):
+        """
+        إضافة فرق إلى المبلغ المدفوع للفاتورة (وطرحه من المتبقي) باستعلام UPDATE واحد
+
+        invoice: نسخة الفاتورة في الذاكرة (إن وجدت) لتحديث قيمها أيضًا
+        """
+        if not invoice_id or not delta:
+            return 0
+
+        updated = LeaveInvoice.objects.filter(pk=invoice_id).update(
+            paid_amount=models.F('paid_amount') + delta,
+            remaining_amount=models.F('remaining_amount') - delta,
+        )
+
+        if invoice is not None and updated:
+            invoice.paid_amount = (invoice.paid_amount or 0) + delta
+            invoice.remaining_amount = (invoice.amount or 0) - invoice.paid_amount
+
+        return updated
+
+    @classmethod
+    def find_mismatches(cls, queryset=None):
+        """الفواتير التي تختلف مجاميعها المخزنة عن مجموع تفاصيل دفعاتها"""
+        queryset = LeaveInvoice.objects.all() if queryset is None else queryset
+        return queryset.with_paid_amounts().filter(
+            ~models.Q(paid_amount=models.F('paid_total')) | ~models.Q(remaining_amount=models.F('remaining_total'))
+        ).order_by('pk')
+
+    @classmethod
+    def recompute(cls, queryset=None, batch_size=500, dry_run=False):
+        """
+        إعادة حساب المجاميع المخزنة للفواتير المختلفة فقط
+
+        يعيد قائمة بالفواتير التي تم (أو سيتم في وضع المعاينة) تصحيحها.
+        """
+        mismatches = list(cls.find_mismatches(queryset))
+        if dry_run or not mismatches:
+            return mismatches
+
+        for invoice in mismatches:
+            invoice.paid_amount = invoice.paid_total
+            invoice.remaining_amount = invoice.remaining_total
+
+        with transaction.atomic():
+            LeaveInvoice.objects.bulk_update(mismatches, ['paid_amount', 'remaining_amount'],
+                                             batch_size=batch_size)
+            VersionedCacheService.bump_on_commit(LeaveInvoice)
+
+        logger.info(f"تم تصحيح المجاميع المخزنة لـ {len(mismatches)} فاتورة")
+        return mismatches
+
+    @classmethod
+    def get_outstanding_total(cls, queryset=None) -> Decimal:
+        """إجمالي المبالغ المتبقية من الحقول المخزنة"""
+        queryset = LeaveInvoice.objects.all() if queryset is None else queryset
+        return queryset.aggregate(total=models.Sum('remaining_amount'))['total'] or Decimal('0')
@@ -0,0 +1,86 @@
+"""
+خدمة ربط فواتير الإجازات بالإجازات
+
+الفاتورة تحفظ نوع الإجازة ورقمها نصًا (leave_type و leave_id)، والربط الفعلي في
+المفتاحين الأجنبيين sick_leave و companion_leave. تملأ هذه الخدمة الربط للفواتير
+القديمة على دفعات، وتعرض معلومات الإجازة لصفحات الفاتورة.
+"""
+import logging
+
+from django.db import transaction
+
+from core.models import CompanionLeave, LeaveInvoice, SickLeave
+from core.services.cache_service import VersionedCacheService
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceLeaveService:
+    """خدمة الربط بين فواتير الإجازات والإجازات"""
+
+    LEAVE_MODELS = {'sick_leave': SickLeave, 'companion_leave': CompanionLeave}
+
+    @classmethod
+    def link(cls, batch_size=500, dry_run=False) -> dict:
+        """
+        ربط الفواتير غير المرتبطة بإجازاتها من رقم الإجازة، على دفعات بالمفتاح الأساسي
+
+        يعيد {نوع الإجازة: {'linked': عدد الفواتير المرتبطة, 'missing': عدد الفواتير بلا إجازة}}.
+        """
+        results = {}
+        for leave_type, leave_model in cls.LEAVE_MODELS.items():
+            field = LeaveInvoice.LEAVE_LINK_FIELDS[leave_type]
+            unlinked = LeaveInvoice.objects.filter(leave_type=leave_type, **{f'{field}__isnull': True})
+            linked = missing = 0
+            last_pk = 0
+
+            while True:
+                batch = list(unlinked.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'leave_id')[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+
+                leaves = dict(leave_model.objects.filter(
+                    leave_id__in={leave_id for _, leave_id in batch}
+                ).values_list('leave_id', 'pk'))
+                invoices = [
+                    LeaveInvoice(pk=pk, **{f'{field}_id': leaves[leave_id]})
+                    for pk, leave_id in batch if leave_id in leaves
+                ]
+                missing += len(batch) - len(invoices)
+                linked += len(invoices)
+
+                if invoices and not dry_run:
+                    with transaction.atomic():
+                        LeaveInvoice.objects.bulk_update(invoices, [field])
+
+            results[leave_type] = {'linked': linked, 'missing': missing}
+
+        if not dry_run and any(result['linked'] for result in results.values()):
+            VersionedCacheService.bump_on_commit(LeaveInvoice)
+            logger.info(f"تم ربط الفواتير بالإجازات: {results}")
+        return results
+
+    @staticmethod
+    def get_leave_info(invoice):
+        """معلومات الإجازة المرتبطة بالفاتورة للعرض والطباعة، أو None"""
+        leave = invoice.leave
+        if leave is None:
+            return None
+
+        leave_info = {
+            'type': invoice.leave_type,
+            'type_display': invoice.get_leave_type_display(),
+            'leave': leave,
+            'id': leave.id,  # معرف الإجازة للاستخدام في الروابط
+            'leave_id': leave.leave_id,
+            'patient': leave.patient,
+            'doctor': leave.doctor,
+            'start_date': leave.start_date,
+            'end_date': leave.end_date,
+            'duration_days': leave.duration_days,
+            'status': leave.status
+        }
+        if invoice.leave_type == 'companion_leave':
+            leave_info['companion'] = leave.companion
+        return leave_info
@@ -0,0 +1,93 @@
+"""
+خدمة تحديث حالات الإجازات
+
+تحدّث حالة جميع الإجازات باستعلامات UPDATE جماعية بدلاً من تحميل كل إجازة
+وحفظها، فلا تُعاد عمليات التحويل الهجري أو جدولة الترجمة لكل صف.
+"""
+import logging
+from datetime import date
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import CompanionLeave, SickLeave
+from core.services.cache_service import VersionedCacheService
+from core.services.statistics_service import DailyStatisticsService
+
+logger = logging.getLogger(__name__)
+
+
+class LeaveStatusService:
+    """خدمة تحديث حالات الإجازات بشكل جماعي"""
+
+    LEAVE_MODELS = (
+        ('sick', SickLeave),
+        ('companion', CompanionLeave),
+    )
+
+    STATISTIC_ENTITIES = {
+        'sick': 'sick_leave',
+        'companion': 'companion_leave',
+    }
+
+    @classmethod
+    def get_pending_changes(cls, model, today: date) -> dict:
+        """
+        الاستعلامات التي تحدد الإجازات التي تحتاج لتغيير حالتها
+
+        نفس قاعدة update_status: الإجازة غير الملغية تكون منتهية إذا كان تاريخ
+        نهايتها قبل اليوم، ونشطة فيما عدا ذلك.
+        """
+        return {
+            'expired': model.objects.filter(end_date__lt=today).exclude(status__in=['cancelled', 'expired']),
+            'active': model.objects.filter(end_date__gte=today).exclude(status__in=['cancelled', 'active']),
+        }
+
+    @classmethod
+    def update_all(cls, today: Optional[date] = None, dry_run: bool = False) -> dict:
+        """
+        تحديث حالة جميع الإجازات المرضية وإجازات المرافقين
+
+        يعيد قاموسًا بعدد الإجازات المنتهية والمعاد تنشيطها لكل نوع.
+        """
+        today = today or timezone.now().date()
+        now = timezone.now()
+        results = {'total': 0}
+
+        with transaction.atomic():
+            for prefix, model in cls.LEAVE_MODELS:
+                changes = cls.get_pending_changes(model, today)
+
+                # updated_at لا يتحدث تلقائيًا مع update()، لذلك نمرره صراحة
+                if dry_run:
+                    expired = changes['expired'].count()
+                    reactivated = changes['active'].count()
+                else:
+                    # update() لا يرسل إشارات، لذلك تُحسب فروق الإحصائيات اليومية قبل التحديث
+                    entity = cls.STATISTIC_ENTITIES[prefix]
+                    expired_deltas = DailyStatisticsService.get_status_change_deltas(
+                        entity, changes['expired'], 'expired')
+                    active_deltas = DailyStatisticsService.get_status_change_deltas(
+                        entity, changes['active'], 'active')
+
+                    expired = changes['expired'].update(status='expired', updated_at=now)
+                    reactivated = changes['active'].update(status='active', updated_at=now)
+
+                    DailyStatisticsService.apply(entity, expired_deltas)
+                    DailyStatisticsService.apply(entity, active_deltas)
+                    if expired or reactivated:
+                        VersionedCacheService.bump_on_commit(model)
+
+                results[f'{prefix}_expired'] = expired
+                results[f'{prefix}_reactivated'] = reactivated
+                results[f'{prefix}_updated'] = expired + reactivated
+                results['total'] += expired + reactivated
+
+        if not dry_run and results['total']:
+            logger.info(
+                f"تم تحديث حالة {results['sick_updated']} إجازة مرضية "
+                f"و {results['companion_updated']} إجازة مرافق"
+            )
+
+        return results
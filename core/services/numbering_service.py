@@ -0,0 +1,129 @@
+"""
+خدمة ترقيم الإجازات والفواتير والمدفوعات
+
+تعتمد على جدول NumberSequence: تحجز كل عملية كتلة من الأرقام بمعاملة واحدة
+(قفل صف العداد وزيادته بحجم الكتلة) ثم توزعها من الذاكرة دون أي استعلام، فلا
+توجد حلقة تحقق exists() ولا احتمال لتكرار الرقم عند الإنشاء المتزامن.
+قد تظهر فجوات في الترقيم عند إعادة تشغيل العملية قبل استهلاك كتلتها.
+"""
+import datetime
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import (CompanionLeave, LeaveInvoice, NumberSequence, Payment,
+                         SickLeave)
+
+logger = logging.getLogger(__name__)
+
+
+class NumberSequenceService:
+    """خدمة حجز الأرقام المتسلسلة وتنسيقها"""
+
+    # بادئات الإجازات التي تستخدم التنسيق PREFIX + YYMMDD + 4 أرقام (10 أرقام بعد البادئة)
+    LEAVE_PREFIXES = ('PSL', 'GSL')
+    LEAVE_SEQUENCE_DIGITS = 4
+    # باقي البادئات تستخدم التنسيق PREFIX-YYYY-NNNNNN
+    YEARLY_SEQUENCE_DIGITS = 6
+
+    NUMBER_FIELDS = {
+        SickLeave: 'leave_id',
+        CompanionLeave: 'leave_id',
+        LeaveInvoice: 'invoice_number',
+        Payment: 'payment_number',
+    }
+
+    # الكتل المحجوزة في هذه العملية: المفتاح -> [الرقم التالي، آخر رقم محجوز]
+    _blocks = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_block_size(cls) -> int:
+        return max(1, getattr(settings, 'NUMBER_SEQUENCE_BLOCK_SIZE', 20))
+
+    @classmethod
+    def get_stem(cls, prefix, today=None) -> tuple:
+        """جذر الرقم (البادئة مع التاريخ) وعدد أرقام التسلسل بعده"""
+        today = today or datetime.date.today()
+        if prefix in cls.LEAVE_PREFIXES:
+            return f'{prefix}{today.strftime("%y%m%d")}', cls.LEAVE_SEQUENCE_DIGITS
+        return f'{prefix}-{today.strftime("%Y")}-', cls.YEARLY_SEQUENCE_DIGITS
+
+    @classmethod
+    def get_existing_max(cls, model, stem, digits) -> int:
+        """أكبر تسلسل مستخدم مسبقًا بنفس الجذر (يُستدعى مرة واحدة عند إنشاء العداد)"""
+        field_name = cls.NUMBER_FIELDS.get(model)
+        if not field_name:
+            return 0
+
+        numbers = model.objects.filter(**{f'{field_name}__startswith': stem}).values_list(field_name, flat=True)
+        sequences = [int(number[len(stem):]) for number in numbers
+                     if len(number) == len(stem) + digits and number[len(stem):].isdigit()]
+        return max(sequences, default=0)
+
+    @classmethod
+    def reserve_block(cls, key, size, start_from=0) -> tuple:
+        """
+        حجز كتلة من الأرقام للمفتاح في قاعدة البيانات
+
+        يعيد (أول رقم، آخر رقم) في الكتلة المحجوزة.
+        """
+        with transaction.atomic():
+            sequence, created = NumberSequence.objects.select_for_update().get_or_create(
+                key=key, defaults={'last_value': start_from}
+            )
+            first = sequence.last_value + 1
+            sequence.last_value += size
+            sequence.save(update_fields=['last_value', 'updated_at'])
+
+        return first, sequence.last_value
+
+    @classmethod
+    def next_value(cls, key, start_from=None) -> int:
+        """
+        الرقم التالي للمفتاح من الكتلة المحجوزة في الذاكرة
+
+        start_from: دالة تعيد أكبر رقم مستخدم، تُستدعى فقط عند إنشاء عداد جديد
+        """
+        with cls._lock:
+            block = cls._blocks.get(key)
+            if block is not None and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+
+        initial = 0
+        if start_from and not NumberSequence.objects.filter(key=key).exists():
+            initial = start_from()
+        first, last = cls.reserve_block(key, cls.get_block_size(), initial)
+
+        if first < last:
+            if transaction.get_connection().in_atomic_block:
+                # قد يُلغى الحجز مع المعاملة الخارجية، لذلك لا تُحفظ بقية الكتلة إلا بعد تأكيدها
+                transaction.on_commit(lambda: cls._store_block(key, first + 1, last))
+            else:
+                cls._store_block(key, first + 1, last)
+        return first
+
+    @classmethod
+    def _store_block(cls, key, first, last):
+        with cls._lock:
+            cls._blocks[key] = [first, last]
+
+    @classmethod
+    def generate(cls, prefix, model=None, today=None) -> str:
+        """توليد رقم جديد للبادئة، مثل PSL2505180001 أو INV-2025-000001"""
+        stem, digits = cls.get_stem(prefix, today)
+        value = cls.next_value(stem, lambda: cls.get_existing_max(model, stem, digits) if model else 0)
+
+        if value >= 10 ** digits:
+            logger.warning(f"تجاوز التسلسل {stem} عدد الأرقام المخصص له ({digits})")
+        return f'{stem}{str(value).zfill(digits)}'
+
+    @classmethod
+    def clear_local(cls):
+        """تفريغ الكتل المحجوزة في هذه العملية (تُفقد الأرقام غير المستخدمة منها)"""
+        with cls._lock:
+            cls._blocks.clear()
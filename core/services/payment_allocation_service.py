@@ -0,0 +1,156 @@
+"""
+خدمة توزيع الدفعات على الفواتير
+
+تقفل الفواتير المفتوحة للعملاء (select_for_update) وتحسب خطة التوزيع كاملة في
+الذاكرة، ثم تكتب تفاصيل الدفع باستعلام bulk_create واحد وتحدّث الفواتير
+باستعلام bulk_update واحد، فلا تتجاوز دفعتان متزامنتان المبلغ المتبقي للفاتورة.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import LeaveInvoice, Payment, PaymentDetail
+from core.services.cache_service import VersionedCacheService
+from core.services.statistics_service import DailyStatisticsService
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentAllocationService:
+    """خدمة توزيع مبالغ الدفعات على أقدم الفواتير غير المدفوعة"""
+
+    OPEN_STATUSES = ('unpaid', 'partially_paid')
+
+    @staticmethod
+    def get_invoice_status(invoice):
+        """حالة الفاتورة حسب المبلغ المدفوع (نفس قاعدة LeaveInvoice.update_status)"""
+        if invoice.status == 'cancelled':
+            return invoice.status
+        if invoice.paid_amount <= 0:
+            return 'unpaid'
+        if invoice.paid_amount < invoice.amount:
+            return 'partially_paid'
+        return 'paid'
+
+    @classmethod
+    def get_unallocated_amounts(cls, payment_ids) -> dict:
+        """المبلغ غير المخصص لكل دفعة باستعلام تجميعي واحد"""
+        payments = Payment.objects.filter(pk__in=payment_ids).annotate(
+            allocated=models.Sum('payment_details__amount')
+        ).values_list('pk', 'amount', 'allocated')
+        return {pk: amount - (allocated or 0) for pk, amount, allocated in payments}
+
+    @classmethod
+    def plan(cls, payments, invoices_by_client, unallocated) -> list:
+        """
+        حساب خطة التوزيع في الذاكرة
+
+        يعدّل paid_amount و remaining_amount للفواتير في الذاكرة، ويعيد قائمة
+        بتفاصيل الدفع الجديدة (غير محفوظة).
+        """
+        details = []
+        for payment in payments:
+            remaining_payment = unallocated.get(payment.pk, Decimal('0'))
+            for invoice in invoices_by_client.get(payment.client_id, ()):
+                if remaining_payment <= 0:
+                    break
+                if invoice.remaining_amount <= 0:
+                    continue
+
+                amount = min(invoice.remaining_amount, remaining_payment)
+                details.append(PaymentDetail(payment=payment, invoice=invoice, amount=amount))
+
+                invoice.paid_amount += amount
+                invoice.remaining_amount -= amount
+                remaining_payment -= amount
+        return details
+
+    @classmethod
+    def allocate(cls, payments) -> dict:
+        """
+        توزيع مجموعة دفعات على أقدم الفواتير المفتوحة لعملائها
+
+        تُوزع الدفعات حسب تاريخ الدفع ثم المعرف. يعيد قاموسًا لكل دفعة:
+        {payment_id: (عدد الفواتير، إجمالي المبلغ المخصص)}
+        """
+        payment_ids = [payment.pk if isinstance(payment, Payment) else payment for payment in payments]
+        if not payment_ids:
+            return {}
+
+        results = {payment_id: (0, Decimal('0')) for payment_id in payment_ids}
+
+        with transaction.atomic():
+            # قفل الدفعات أولًا ثم الفواتير بترتيب ثابت لتجنب الجمود بين العمليات المتزامنة
+            locked_payments = list(
+                Payment.objects.select_for_update().filter(pk__in=payment_ids).order_by('pk')
+            )
+            unallocated = cls.get_unallocated_amounts(payment_ids)
+            payments_to_allocate = sorted(
+                (payment for payment in locked_payments if unallocated.get(payment.pk, 0) > 0),
+                key=lambda payment: (payment.payment_date or timezone.now().date(), payment.pk),
+            )
+            if not payments_to_allocate:
+                return results
+
+            client_ids = {payment.client_id for payment in payments_to_allocate}
+            invoices = LeaveInvoice.objects.select_for_update().filter(
+                client_id__in=client_ids,
+                status__in=cls.OPEN_STATUSES,
+                remaining_amount__gt=0,
+            ).order_by('client_id', 'issue_date', 'id')
+
+            invoices_by_client = defaultdict(list)
+            for invoice in invoices:
+                invoices_by_client[invoice.client_id].append(invoice)
+
+            details = cls.plan(payments_to_allocate, invoices_by_client, unallocated)
+            if not details:
+                return results
+
+            # bulk_create لا يرسل إشارات PaymentDetail، لذلك تُحدَّث مجاميع الفواتير هنا
+            PaymentDetail.objects.bulk_create(details)
+
+            now = timezone.now()
+            changed_invoices = {detail.invoice.pk: detail.invoice for detail in details}.values()
+            statistic_deltas = DailyStatisticsService.new_deltas()
+            for invoice in changed_invoices:
+                previous_key = DailyStatisticsService.get_key('invoice', invoice)
+                invoice.status = cls.get_invoice_status(invoice)
+                invoice.updated_at = now
+                DailyStatisticsService.add_change(
+                    statistic_deltas, previous_key, DailyStatisticsService.get_key('invoice', invoice)
+                )
+            LeaveInvoice.objects.bulk_update(
+                changed_invoices, ['paid_amount', 'remaining_amount', 'status', 'updated_at']
+            )
+            # bulk_update لا يرسل إشارات، لذلك تُطبق فروق الحالات على الإحصائيات اليومية هنا
+            DailyStatisticsService.apply('invoice', statistic_deltas)
+            VersionedCacheService.bump_on_commit(LeaveInvoice, PaymentDetail)
+
+        for detail in details:
+            invoices_count, total = results[detail.payment.pk]
+            results[detail.payment.pk] = (invoices_count + 1, total + detail.amount)
+
+        logger.info(f"تم توزيع {len(payments_to_allocate)} دفعة على {len(changed_invoices)} فاتورة")
+        return results
+
+    @classmethod
+    def allocate_payment(cls, payment):
+        """توزيع دفعة واحدة، ويعيد (عدد الفواتير، إجمالي المبلغ المخصص)"""
+        return cls.allocate([payment])[payment.pk]
+
+    @classmethod
+    def get_unallocated_payments(cls, client_id=None):
+        """الدفعات التي لم يُخصص كامل مبلغها بعد"""
+        payments = Payment.objects.annotate(
+            allocated=models.Sum('payment_details__amount')
+        ).filter(
+            amount__gt=Coalesce('allocated', models.Value(0), output_field=models.DecimalField())
+        )
+        if client_id:
+            payments = payments.filter(client_id=client_id)
+        return payments.order_by('payment_date', 'pk')
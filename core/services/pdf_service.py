@@ -0,0 +1,208 @@
+"""
+خدمة تحويل صفحات الطباعة إلى PDF
+
+تستخدم WeasyPrint (حزمة اختيارية تُثبَّت محليًا: pip install weasyprint) لتحويل قوالب
+طباعة الإجازات والفواتير إلى PDF في الخادم، وتحفظ الناتج على القرص بمفتاح يتكون من
+نوع المستند ورقمه وتاريخ تحديثه (updated_at) ونوع القالب، فلا يُعاد عرض القالب
+وتوليد رمز QR واستدعاء فلاتر الترجمة إلا عند تعديل المستند.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from core.services.qrcode_service import QRCodeService
+
+logger = logging.getLogger(__name__)
+
+# أكبر عدد من المستندات في ملف الطباعة الجماعية
+PDF_BATCH_LIMIT = 200
+
+# الأجزاء المسموحة في مسار الملف المخزن (نوع المستند ونوع القالب)
+PATH_PART_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class PDFRenderError(Exception):
+    """خطأ في تحويل المستند إلى PDF"""
+
+
+class PDFRenderService:
+    """عرض قوالب الطباعة كملفات PDF مع تخزين الناتج مؤقتًا"""
+
+    CONTENT_TYPE = 'application/pdf'
+
+    @staticmethod
+    def is_available() -> bool:
+        """هل محرك التحويل (WeasyPrint) مثبت؟"""
+        try:
+            import weasyprint  # noqa: F401
+        except (ImportError, OSError):
+            # OSError: الحزمة مثبتة لكن مكتبات النظام (Pango) غير موجودة
+            return False
+        return True
+
+    @staticmethod
+    def get_cache_dir() -> str:
+        return getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'var', 'pdf_cache'))
+
+    @staticmethod
+    def make_version(*parts) -> str:
+        """بصمة القيم التي يتغير المستند بتغيرها (تاريخ التحديث، نوع القالب...)"""
+        content = '\x1f'.join(part.isoformat() if hasattr(part, 'isoformat') else str(part) for part in parts)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+    @staticmethod
+    def get_version_parts(obj, *relations) -> tuple:
+        """
+        قيم إصدار المستند: updated_at للكائن وللكائنات المرتبطة المعروضة فيه
+
+        relations: مسارات العلاقات بصيغة select_related (مثل 'patient' أو 'sick_leave__doctor')
+        """
+        parts = [obj.updated_at]
+        for relation in relations:
+            related = obj
+            for name in relation.split('__'):
+                related = getattr(related, name, None) if related is not None else None
+            parts.append(getattr(related, 'updated_at', None))
+        return tuple(parts)
+
+    @classmethod
+    def get_path(cls, kind, object_id, variant, version) -> str:
+        """مسار الملف المخزن، مع رفض أي جزء قد يخرج المسار من مجلد الذاكرة المؤقتة"""
+        for part in (kind, str(object_id), variant, version):
+            if not PATH_PART_PATTERN.match(part):
+                raise PDFRenderError("اسم ملف PDF غير صالح")
+
+        cache_dir = os.path.realpath(cls.get_cache_dir())
+        path = os.path.realpath(os.path.join(cache_dir, kind, str(object_id), f'{variant}-{version}.pdf'))
+        if os.path.commonpath([cache_dir, path]) != cache_dir:
+            raise PDFRenderError("اسم ملف PDF غير صالح")
+        return path
+
+    @classmethod
+    def read_cached(cls, path):
+        try:
+            with open(path, 'rb') as pdf_file:
+                return pdf_file.read()
+        except OSError:
+            return None
+
+    @classmethod
+    def write_cached(cls, path, data):
+        """حفظ الملف مع حذف النسخ الأقدم لنفس المستند ونوع القالب"""
+        directory, filename = os.path.split(path)
+        variant = filename.rsplit('-', 1)[0]
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+
+            for name in os.listdir(directory):
+                if name != filename and name.endswith('.pdf') and name.rsplit('-', 1)[0] == variant:
+                    os.remove(os.path.join(directory, name))
+        except OSError as e:
+            logger.warning(f"تعذر حفظ ملف PDF في الذاكرة المؤقتة: {str(e)}")
+
+    @staticmethod
+    def url_fetcher(url):
+        """
+        جلب الملفات المرتبطة بالصفحة من الخادم نفسه دون طلبات HTTP:
+        صور QR من ذاكرتها المؤقتة، والملفات الثابتة من مجلداتها
+        """
+        import weasyprint
+
+        path = urlparse(url).path
+        if path.startswith('/qrcode/') and path.endswith('.png'):
+            data = QRCodeService.get_image(path[len('/qrcode/'):-len('.png')])
+            if data is not None:
+                return {'string': data, 'mime_type': 'image/png'}
+
+        if path.startswith(settings.STATIC_URL):
+            relative_path = path[len(settings.STATIC_URL):]
+            file_path = finders.find(relative_path)
+            if not file_path and settings.STATIC_ROOT:
+                file_path = os.path.join(settings.STATIC_ROOT, relative_path)
+            if file_path and os.path.exists(file_path):
+                with open(file_path, 'rb') as static_file:
+                    return {'string': static_file.read(), 'mime_type': mimetypes.guess_type(file_path)[0]}
+
+        return weasyprint.default_url_fetcher(url)
+
+    @classmethod
+    def render_document(cls, html, base_url=None):
+        """تحويل HTML إلى مستند WeasyPrint (قبل الكتابة) لإمكانية دمج الصفحات"""
+        try:
+            import weasyprint
+        except (ImportError, OSError) as e:
+            raise PDFRenderError("محرك تحويل PDF (WeasyPrint) غير مثبت") from e
+        return weasyprint.HTML(string=html, base_url=base_url, url_fetcher=cls.url_fetcher).render()
+
+    @classmethod
+    def render_pdf(cls, documents) -> bytes:
+        """كتابة مستند أو أكثر في ملف PDF واحد"""
+        pages = [page for document in documents for page in document.pages]
+        return documents[0].copy(pages).write_pdf()
+
+    @classmethod
+    def get_pdf(cls, kind, object_id, template_name, context, variant='default', version_parts=(),
+                request=None) -> bytes:
+        """
+        ملف PDF لمستند واحد من الذاكرة المؤقتة، أو بعرض القالب وتحويله ثم حفظه
+
+        version_parts: القيم التي يتغير المستند بتغيرها (مثل updated_at)
+        """
+        path = cls.get_path(kind, object_id, variant, cls.make_version(template_name, *version_parts))
+        data = cls.read_cached(path)
+        if data is not None:
+            return data
+
+        html = render_to_string(template_name, context, request=request)
+        base_url = request.build_absolute_uri('/') if request else None
+        data = cls.render_pdf([cls.render_document(html, base_url)])
+        cls.write_cached(path, data)
+        return data
+
+    @classmethod
+    def get_batch_pdf(cls, kind, items, request=None) -> bytes:
+        """
+        دمج عدة مستندات في ملف PDF واحد للطباعة الجماعية
+
+        items: قائمة من (رقم المستند، القالب، السياق، نوع القالب، قيم الإصدار)
+        """
+        if not items:
+            raise PDFRenderError("لا توجد مستندات للطباعة")
+
+        version = cls.make_version(*[
+            part for object_id, template_name, context, variant, version_parts in items
+            for part in (object_id, template_name, variant, *version_parts)
+        ])
+        path = cls.get_path(kind, 'batch', 'batch', version)
+        data = cls.read_cached(path)
+        if data is not None:
+            return data
+
+        base_url = request.build_absolute_uri('/') if request else None
+        documents = [
+            cls.render_document(render_to_string(template_name, context, request=request), base_url)
+            for object_id, template_name, context, variant, version_parts in items
+        ]
+        data = cls.render_pdf(documents)
+        cls.write_cached(path, data)
+        return data
+
+    @classmethod
+    def make_response(cls, data, filename) -> HttpResponse:
+        """استجابة PDF تُعرض في المتصفح"""
+        response = HttpResponse(data, content_type=cls.CONTENT_TYPE)
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        return response
@@ -0,0 +1,228 @@
+"""
+خدمة تسعير الإجازات
+
+تُحمَّل جميع أسعار الإجازات النشطة مرة واحدة في جدول مُجمَّع داخل العملية،
+مفهرس حسب (نوع الإجازة، العميل)، مع مصفوفة مرتبة للمدد يُبحث فيها بـ bisect.
+يُلغى الجدول عند حفظ أو حذف أي سعر (عبر الإشارات في core/signals.py)، ويُتحقق
+دوريًا من رقم إصدار في الكاش ومن بصمة الأسعار في قاعدة البيانات (آخر تحديث وعدد
+الأسعار) حتى تلاحظ العمليات الأخرى التغيير ولو لم يكن الكاش مشتركًا بينها.
+"""
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from core.models import LeavePrice
+
+PRICE_SOURCE_LABELS = {
+    'client_per_day': 'سعر يومي مخصص للعميل',
+    'client_fixed': 'سعر ثابت مخصص للعميل',
+    'client_computed': 'سعر محسوب من أسعار العميل',
+    'global_per_day': 'سعر يومي عام',
+    'global_fixed': 'سعر ثابت عام',
+    'global_computed': 'سعر محسوب',
+    'none': 'غير محدد',
+}
+
+
+class PriceQuote(NamedTuple):
+    """نتيجة التسعير: السعر وطريقة التسعير ومصدر السعر"""
+    price: Decimal
+    pricing_type: str
+    source: str
+    price_id: Optional[int] = None
+
+    @property
+    def source_display(self):
+        return PRICE_SOURCE_LABELS.get(self.source, self.source)
+
+
+class PriceGroup:
+    """أسعار نوع إجازة واحد لعميل واحد (أو الأسعار العامة)"""
+    __slots__ = ('fixed', 'exact', 'durations', 'rates')
+
+    def __init__(self):
+        self.fixed = None
+        self.exact = {}
+        self.durations = []
+        self.rates = []
+
+    def add(self, price_id, pricing_type, duration_days, price):
+        # عند تكرار السعر نعتمد الأقدم (أصغر معرف) كما يفعل first()
+        if pricing_type == 'fixed':
+            if self.fixed is None:
+                self.fixed = (price, price_id)
+        elif pricing_type == 'per_day':
+            self.exact.setdefault(duration_days, (price, price_id))
+
+    def compile(self):
+        self.durations = sorted(self.exact)
+        self.rates = [self.exact[duration] for duration in self.durations]
+
+    def resolve(self, duration_days, scope) -> Optional[PriceQuote]:
+        """تطبيق قواعد التسعير بالترتيب: مدة مطابقة، سعر ثابت، أقرب مدة أقل، أقرب مدة أكبر"""
+        exact = self.exact.get(duration_days)
+        if exact is not None:
+            return PriceQuote(exact[0], 'per_day', f'{scope}_per_day', exact[1])
+
+        if self.fixed is not None:
+            return PriceQuote(self.fixed[0], 'fixed', f'{scope}_fixed', self.fixed[1])
+
+        index = bisect_right(self.durations, duration_days)
+        candidates = []
+        if index > 0:
+            candidates.append(index - 1)
+        if index < len(self.durations):
+            candidates.append(index)
+
+        for position in candidates:
+            base_duration = self.durations[position]
+            if base_duration > 0:
+                price, price_id = self.rates[position]
+                daily_price = price / base_duration
+                return PriceQuote(daily_price * Decimal(str(duration_days)), 'per_day',
+                                  f'{scope}_computed', price_id)
+            # أقرب مدة أقل غير صالحة، ننتقل إلى أقرب مدة أكبر
+
+        return None
+
+
+class PricingService:
+    """خدمة حساب أسعار الإجازات من الجدول المُجمَّع"""
+
+    VERSION_CACHE_KEY = 'leave_price_table_version'
+    VERSION_CHECK_SECONDS = 30
+
+    _table: Optional[Dict[Tuple[str, Optional[int]], PriceGroup]] = None
+    _version = None
+    _signature = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_signature(cls) -> Tuple:
+        """بصمة الأسعار في قاعدة البيانات: آخر وقت تحديث وعدد الأسعار"""
+        result = LeavePrice.objects.aggregate(last_updated=Max('updated_at'), count=Count('id'))
+        return result['last_updated'], result['count']
+
+    @classmethod
+    def build_table(cls) -> Tuple[Dict[Tuple[str, Optional[int]], PriceGroup], Tuple]:
+        """
+        تحميل جميع الأسعار في استعلام واحد وبناء الجدول من النشطة منها
+
+        يعيد الجدول وبصمة الأسعار المحسوبة من نفس الصفوف، بنفس شكل get_signature.
+        """
+        table = {}
+        last_updated = None
+        rows = LeavePrice.objects.order_by('id').values_list(
+            'id', 'leave_type', 'client_id', 'pricing_type', 'duration_days', 'price', 'is_active', 'updated_at'
+        )
+        count = 0
+        for price_id, leave_type, client_id, pricing_type, duration_days, price, is_active, updated_at in rows:
+            count += 1
+            if updated_at is not None and (last_updated is None or updated_at > last_updated):
+                last_updated = updated_at
+            if not is_active:
+                continue
+            group = table.get((leave_type, client_id))
+            if group is None:
+                group = table[(leave_type, client_id)] = PriceGroup()
+            group.add(price_id, pricing_type, duration_days, price)
+
+        for group in table.values():
+            group.compile()
+        return table, (last_updated, count)
+
+    @classmethod
+    def get_table(cls) -> Dict[Tuple[str, Optional[int]], PriceGroup]:
+        """الحصول على الجدول المُجمَّع مع إعادة بنائه عند تغير الإصدار أو بصمة الأسعار"""
+        now = time.monotonic()
+        table = cls._table
+        if table is not None and now - cls._checked_at < cls.VERSION_CHECK_SECONDS:
+            return table
+
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        with cls._lock:
+            if cls._table is None or version != cls._version or cls.get_signature() != cls._signature:
+                cls._table, cls._signature = cls.build_table()
+                cls._version = version
+            cls._checked_at = now
+            return cls._table
+
+    @classmethod
+    def invalidate(cls, broadcast: bool = True):
+        """إلغاء الجدول في هذه العملية، وإبلاغ العمليات الأخرى عبر الكاش إن كان مشتركًا"""
+        with cls._lock:
+            cls._table = None
+        if broadcast:
+            cache.set(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+    @classmethod
+    def invalidate_on_commit(cls):
+        """إلغاء الجدول فورًا ثم مرة أخرى بعد تأكيد المعاملة"""
+        cls.invalidate()
+        transaction.on_commit(cls.invalidate)
+
+    @classmethod
+    def quote(cls, leave_type, duration_days, client=None) -> PriceQuote:
+        """
+        حساب سعر الإجازة بدون أي استعلام (بعد تحميل الجدول)
+
+        المعلمات:
+        - leave_type: نوع الإجازة (sick_leave أو companion_leave)
+        - duration_days: مدة الإجازة بالأيام
+        - client: العميل أو معرفه (اختياري)
+        """
+        if not leave_type or not isinstance(duration_days, (int, float)) or duration_days <= 0:
+            return PriceQuote(Decimal('0'), 'per_day', 'none')
+
+        table = cls.get_table()
+        client_id = getattr(client, 'pk', client)
+
+        # أولاً: أسعار العميل، ثانيًا: الأسعار العامة
+        scopes = []
+        if client_id:
+            scopes.append(((leave_type, client_id), 'client'))
+        scopes.append(((leave_type, None), 'global'))
+
+        for key, scope in scopes:
+            group = table.get(key)
+            if group is None:
+                continue
+            quote = group.resolve(duration_days, scope)
+            if quote is not None:
+                return quote
+
+        return PriceQuote(Decimal('0'), 'per_day', 'none')
+
+    @classmethod
+    def get_price(cls, leave_type, duration_days, client=None) -> Decimal:
+        """الحصول على سعر الإجازة فقط"""
+        return cls.quote(leave_type, duration_days, client).price
+
+    @classmethod
+    def quote_many(cls, items: Iterable) -> List[PriceQuote]:
+        """
+        تسعير مجموعة إجازات دفعة واحدة بنفس ترتيب المدخلات
+
+        كل عنصر إما tuple بالشكل (leave_type, duration_days, client)
+        أو قاموس يحتوي على المفاتيح leave_type و duration_days و client_id.
+        يُحمَّل الجدول مرة واحدة على الأكثر مهما كان عدد العناصر.
+        """
+        cls.get_table()
+        quotes = []
+        for item in items:
+            if isinstance(item, dict):
+                leave_type = item.get('leave_type')
+                duration_days = item.get('duration_days')
+                client = item.get('client_id', item.get('client'))
+            else:
+                leave_type, duration_days, client = (tuple(item) + (None,))[:3]
+            quotes.append(cls.quote(leave_type, duration_days, client))
+        return quotes
@@ -0,0 +1,125 @@
+"""
+خدمة رموز QR
+
+تُولَّد صورة الرمز مرة واحدة لكل مجموعة (رابط، حجم، حدود، ألوان) وتُحفظ بمفتاح هو
+بصمة SHA-256 لهذه المعلمات: المستوى الأول ذاكرة LRU داخل العملية، والمستوى الثاني
+ملفات PNG في QRCODE_CACHE_DIR. محتوى المفتاح لا يتغير أبدًا، لذلك تُخدَم الصورة من
+رابط ثابت بترويسة ETag وCache-Control: immutable.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+
+from core.services.translation_service import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QRCODE_CACHE_SIZE = 256
+
+
+class QRCodeService:
+    """توليد صور QR وتخزينها مؤقتًا في الذاكرة وعلى القرص"""
+
+    KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+    _memory = LRUCache(getattr(settings, 'QRCODE_CACHE_SIZE', DEFAULT_QRCODE_CACHE_SIZE))
+
+    @staticmethod
+    def make_key(url, size=200, border=4, fill_color='black', back_color='white') -> str:
+        """بصمة معلمات الصورة المستخدمة كاسم للملف وقيمة ETag"""
+        content = '\x1f'.join(str(part) for part in (url, int(size), int(border), fill_color, back_color))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_cache_dir() -> str:
+        return getattr(settings, 'QRCODE_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'qrcodes'))
+
+    @classmethod
+    def get_path(cls, key) -> str:
+        return os.path.join(cls.get_cache_dir(), f'{key}.png')
+
+    @staticmethod
+    def render(url, size=200, border=4, fill_color='black', back_color='white') -> bytes:
+        """إنشاء صورة الرمز بتنسيق PNG"""
+        # حساب حجم المربع بناءً على الحجم المطلوب
+        box_size = max(1, int(int(size) / 25))
+
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=box_size,
+            border=int(border),
+        )
+        qr.add_data(url)
+        qr.make(fit=True)
+
+        img = qr.make_image(fill_color=fill_color, back_color=back_color)
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    @classmethod
+    def write_file(cls, key, data):
+        """حفظ الصورة على القرص بكتابة ملف مؤقت ثم إعادة تسميته (لا تُقرأ صورة ناقصة)"""
+        directory = cls.get_cache_dir()
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, cls.get_path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def get_or_create(cls, url, size=200, border=4, fill_color='black', back_color='white') -> tuple:
+        """
+        مفتاح الصورة مع إنشائها عند الحاجة
+
+        يعيد (المفتاح، البيانات): البيانات None إذا كانت الصورة محفوظة مسبقًا ولم تُقرأ،
+        أو بايتات PNG إذا تعذر حفظها على القرص حتى يمكن تضمينها مباشرة.
+        """
+        key = cls.make_key(url, size, border, fill_color, back_color)
+        if cls._memory.get(key) is not None or os.path.exists(cls.get_path(key)):
+            return key, None
+
+        data = cls.render(url, size, border, fill_color, back_color)
+        try:
+            cls.write_file(key, data)
+        except OSError as e:
+            # لا تُحفظ في الذاكرة حتى لا يُرجع رابط لا تستطيع العمليات الأخرى خدمته
+            logger.warning(f"تعذر حفظ صورة QR على القرص: {str(e)}")
+            return key, data
+        cls._memory.set(key, data)
+        return key, None
+
+    @classmethod
+    def get_image(cls, key):
+        """بايتات الصورة من الذاكرة ثم من القرص، أو None إذا لم تكن موجودة"""
+        if not cls.KEY_PATTERN.match(key):
+            return None
+
+        data = cls._memory.get(key)
+        if data is not None:
+            return data
+
+        try:
+            with open(cls.get_path(key), 'rb') as image_file:
+                data = image_file.read()
+        except OSError:
+            return None
+
+        cls._memory.set(key, data)
+        return data
+
+    @classmethod
+    def clear_memory(cls):
+        cls._memory.clear()
@@ -9,6 +9,7 @@ from django.utils import timezone
 
 from core.models import BackupSchedule
 from core.services.backup_service import BackupService
+from core.services.leave_status_service import LeaveStatusService
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,14 @@ class SchedulerService:
         
         return results
     
+    def run_leave_status_update(self) -> dict:
+        """تحديث حالات الإجازات المنتهية كمهمة مجدولة"""
+        try:
+            return LeaveStatusService.update_all()
+        except Exception as e:
+            logger.error(f"خطأ في تحديث حالات الإجازات: {str(e)}")
+            return {'total': 0, 'error': str(e)}
+
     def _execute_scheduled_backup(self, schedule: BackupSchedule, current_time: datetime) -> dict:
         """تنفيذ نسخة احتياطية مجدولة"""
         try:
@@ -0,0 +1,294 @@
+"""
+خدمة فهرس البحث
+
+تحتفظ بجدول SearchToken بكلمات موحدة لكل مريض وطبيب وعميل وإجازة: الأسماء العربية
+بعد توحيد الألف والهمزة والتاء المربوطة والياء وحذف التشكيل والتطويل، والأسماء
+اللاتينية بأحرف صغيرة، وأرقام الهوية والهاتف والإجازة. البحث يطابق بادئة كل كلمة من
+الاستعلام في الفهرس (entity, token)، فلا يحتاج إلى icontains يمسح الجدول كاملًا،
+ويرتب النتائج حسب التطابق التام ثم وزن الحقول المطابقة.
+يُحدَّث الفهرس بالإشارات في core/signals.py، ويُعاد بناؤه بالأمر rebuild_search_index.
+"""
+import logging
+import re
+import unicodedata
+from collections import namedtuple
+
+from django.db import models, transaction
+
+from core.models import (Client, CompanionLeave, Doctor, Patient,
+                         SearchToken, SickLeave)
+from core.services.translation_service import ARABIC_DIACRITICS_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# توحيد أشكال الحروف العربية والأرقام العربية والفارسية
+SEARCH_CHARACTER_MAP = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+})
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+ARABIC_ARTICLE = 'ال'
+MAX_TOKEN_LENGTH = 64
+
+# أنواع الحقول: نص (كلمات)، رمز (رقم هوية أو إجازة)، هاتف
+TEXT, CODE, PHONE = 'text', 'code', 'phone'
+
+SearchField = namedtuple('SearchField', ['lookup', 'kind', 'weight'])
+
+
+def normalize_search_text(text) -> str:
+    """توحيد النص للبحث: أحرف صغيرة، بدون تشكيل، وأشكال موحدة للألف والياء والتاء المربوطة"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text)).lower()
+    text = ARABIC_DIACRITICS_PATTERN.sub('', text)
+    return text.translate(SEARCH_CHARACTER_MAP)
+
+
+def tokenize(text) -> list:
+    """الكلمات الموحدة في النص بدون تكرار"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(normalize_search_text(text)):
+        token = token[:MAX_TOKEN_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+class SearchIndexService:
+    """خدمة تحديث فهرس البحث والبحث فيه"""
+
+    FIELDS = {
+        'patient': (Patient, (
+            SearchField('name', TEXT, 2),
+            SearchField('name_en', TEXT, 2),
+            SearchField('national_id', CODE, 3),
+            SearchField('phone', PHONE, 3),
+            SearchField('email', TEXT, 1),
+        )),
+        'doctor': (Doctor, (
+            SearchField('name', TEXT, 2),
+            SearchField('name_en', TEXT, 2),
+            SearchField('national_id', CODE, 3),
+            SearchField('phone', PHONE, 3),
+        )),
+        'client': (Client, (
+            SearchField('name', TEXT, 2),
+            SearchField('name_en', TEXT, 2),
+            SearchField('phone', PHONE, 3),
+            SearchField('email', TEXT, 1),
+        )),
+        'sick_leave': (SickLeave, (
+            SearchField('leave_id', CODE, 3),
+            SearchField('patient__name', TEXT, 2),
+            SearchField('patient__national_id', CODE, 2),
+            SearchField('doctor__name', TEXT, 1),
+        )),
+        'companion_leave': (CompanionLeave, (
+            SearchField('leave_id', CODE, 3),
+            SearchField('patient__name', TEXT, 2),
+            SearchField('patient__national_id', CODE, 2),
+            SearchField('companion__name', TEXT, 2),
+            SearchField('companion__national_id', CODE, 2),
+            SearchField('doctor__name', TEXT, 1),
+        )),
+    }
+
+    # الإجازات التي تحتوي كلماتها على بيانات المريض أو الطبيب: النوع -> [(نوع الإجازة، الحقول)]
+    DEPENDENTS = {
+        'patient': (('sick_leave', ('patient',)), ('companion_leave', ('patient', 'companion'))),
+        'doctor': (('sick_leave', ('doctor',)), ('companion_leave', ('doctor',))),
+    }
+
+    MAX_QUERY_TOKENS = 5
+    DEFAULT_LIMIT = 10
+
+    @classmethod
+    def get_entity(cls, model):
+        """اسم نوع السجل للنموذج، أو None إذا لم يكن مفهرسًا"""
+        for entity, (indexed_model, fields) in cls.FIELDS.items():
+            if indexed_model is model:
+                return entity
+        return None
+
+    @staticmethod
+    def get_field_tokens(value, kind) -> list:
+        """كلمات قيمة حقل واحد مع صيغها البديلة"""
+        tokens = tokenize(value)
+        variants = []
+        for token in tokens:
+            if kind == TEXT and token.startswith(ARABIC_ARTICLE) and len(token) > len(ARABIC_ARTICLE) + 2:
+                # "العتيبي" تُفهرس أيضًا بدون أداة التعريف
+                variants.append(token[len(ARABIC_ARTICLE):])
+            elif kind == CODE:
+                digits = re.sub(r'\D', '', token)
+                if digits and digits != token:
+                    variants.append(digits)
+
+        if kind == PHONE and value:
+            digits = re.sub(r'\D', '', normalize_search_text(value))
+            if digits.startswith('966'):
+                variants.append('0' + digits[3:])
+            variants.extend([digits, digits.lstrip('0')])
+
+        return tokens + [variant[:MAX_TOKEN_LENGTH] for variant in variants if variant]
+
+    @classmethod
+    def build_tokens(cls, entity, row) -> dict:
+        """كلمات سجل من قيم حقوله: {الكلمة: الوزن}"""
+        tokens = {}
+        for field in cls.FIELDS[entity][1]:
+            for token in cls.get_field_tokens(row.get(field.lookup), field.kind):
+                tokens[token] = max(tokens.get(token, 0), field.weight)
+        return tokens
+
+    @classmethod
+    def iter_rows(cls, entity, queryset, batch_size=1000):
+        """(المعرف، الكلمات) لكل سجل في الاستعلام من قيم حقوله فقط"""
+        lookups = [field.lookup for field in cls.FIELDS[entity][1]]
+        for row in queryset.order_by().values('pk', *lookups).iterator(chunk_size=batch_size):
+            yield row['pk'], cls.build_tokens(entity, row)
+
+    @classmethod
+    def write_tokens(cls, entity, rows, token_model=SearchToken):
+        """استبدال كلمات مجموعة سجلات: حذف القديمة وإدراج الجديدة باستعلامين"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        token_model.objects.filter(entity=entity, object_id__in=[pk for pk, tokens in rows]).delete()
+        objects = [
+            token_model(entity=entity, object_id=pk, token=token, weight=weight)
+            for pk, tokens in rows
+            for token, weight in tokens.items()
+        ]
+        token_model.objects.bulk_create(objects, batch_size=1000)
+        return len(objects)
+
+    @classmethod
+    def index_queryset(cls, entity, queryset, batch_size=1000, token_model=SearchToken) -> int:
+        """فهرسة كل سجلات الاستعلام على دفعات، ويعيد عدد السجلات"""
+        indexed = 0
+        batch = []
+        for row in cls.iter_rows(entity, queryset, batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cls.write_tokens(entity, batch, token_model)
+                indexed += len(batch)
+                batch = []
+        cls.write_tokens(entity, batch, token_model)
+        return indexed + len(batch)
+
+    @classmethod
+    def index_object(cls, entity, pk) -> bool:
+        """تحديث كلمات سجل واحد، ويعيد True إذا تغيرت كلماته"""
+        model = cls.FIELDS[entity][0]
+        rows = list(cls.iter_rows(entity, model.objects.filter(pk=pk)))
+        if not rows:
+            return cls.remove(entity, pk)
+
+        tokens = rows[0][1]
+        current = dict(SearchToken.objects.filter(entity=entity, object_id=pk).values_list('token', 'weight'))
+        if current == tokens:
+            return False
+        cls.write_tokens(entity, rows)
+        return True
+
+    @classmethod
+    def index_instance(cls, instance) -> bool:
+        """تحديث كلمات السجل ثم كلمات الإجازات المعتمدة عليه إذا تغيرت"""
+        entity = cls.get_entity(type(instance))
+        if entity is None or instance.pk is None:
+            return False
+
+        with transaction.atomic():
+            changed = cls.index_object(entity, instance.pk)
+            if changed:
+                cls.index_dependents(entity, instance.pk)
+        return changed
+
+    @classmethod
+    def index_many(cls, model, pks):
+        """إعادة فهرسة سجلات بمعرفاتها (للتحديثات الجماعية التي لا ترسل إشارات)"""
+        entity = cls.get_entity(model)
+        if entity is None or not pks:
+            return 0
+        with transaction.atomic():
+            indexed = cls.index_queryset(entity, model.objects.filter(pk__in=list(pks)))
+            for pk in pks:
+                cls.index_dependents(entity, pk)
+        return indexed
+
+    @classmethod
+    def index_dependents(cls, entity, pk):
+        """إعادة فهرسة الإجازات التي تتضمن كلماتها بيانات هذا السجل"""
+        for dependent, relations in cls.DEPENDENTS.get(entity, ()):
+            condition = models.Q()
+            for relation in relations:
+                condition |= models.Q(**{f'{relation}_id': pk})
+            cls.index_queryset(dependent, cls.FIELDS[dependent][0].objects.filter(condition))
+
+    @classmethod
+    def remove(cls, entity, pk) -> bool:
+        deleted, _ = SearchToken.objects.filter(entity=entity, object_id=pk).delete()
+        return bool(deleted)
+
+    @classmethod
+    def rebuild(cls, entities=None, batch_size=1000) -> dict:
+        """إعادة بناء الفهرس من الجداول الأصلية، ويعيد عدد السجلات المفهرسة لكل نوع"""
+        results = {}
+        for entity in entities or cls.FIELDS:
+            with transaction.atomic():
+                SearchToken.objects.filter(entity=entity).delete()
+                results[entity] = cls.index_queryset(entity, cls.FIELDS[entity][0].objects.all(), batch_size)
+
+        logger.info(f"تمت إعادة بناء فهرس البحث: {results}")
+        return results
+
+    @classmethod
+    def search(cls, entity, query, limit=DEFAULT_LIMIT) -> list:
+        """
+        معرفات السجلات المطابقة مرتبة حسب الصلة (استعلام واحد على الفهرس)
+
+        يجب أن تطابق كل كلمة في الاستعلام بادئة كلمة في السجل، والتطابق التام
+        والحقول الأثقل وزنًا (أرقام الهوية والهاتف والإجازة) تأتي أولًا.
+        """
+        tokens = tokenize(query)[:cls.MAX_QUERY_TOKENS]
+        if not tokens:
+            return []
+
+        condition = models.Q()
+        matches = {}
+        for index, token in enumerate(tokens):
+            condition |= models.Q(token__startswith=token)
+            matches[f'match_{index}'] = models.Max(models.Case(
+                models.When(token__startswith=token, then=1), default=0, output_field=models.IntegerField()
+            ))
+
+        rows = (
+            SearchToken.objects.filter(entity=entity).filter(condition)
+            .values('object_id')
+            .annotate(**matches)
+            .annotate(
+                matched=sum((models.F(name) for name in matches), models.Value(0)),
+                exact=models.Sum(models.Case(
+                    models.When(token__in=tokens, then='weight'), default=0, output_field=models.IntegerField()
+                )),
+                score=models.Sum('weight'),
+            )
+            .filter(matched=len(tokens))
+            .order_by('-exact', '-score', 'object_id')
+            .values_list('object_id', flat=True)[:limit]
+        )
+        return list(rows)
+
+    @classmethod
+    def search_objects(cls, entity, query, queryset=None, limit=DEFAULT_LIMIT) -> list:
+        """السجلات المطابقة بترتيب الصلة"""
+        ids = cls.search(entity, query, limit)
+        if not ids:
+            return []
+        queryset = cls.FIELDS[entity][0].objects.all() if queryset is None else queryset
+        objects = queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
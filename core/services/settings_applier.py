@@ -124,6 +124,7 @@ class SettingsApplier:
                 'settings': SettingsService.get_setting('cache_timeout_settings', 7200),
                 'reports': SettingsService.get_setting('cache_timeout_reports', 1800),
                 'statistics': SettingsService.get_setting('cache_timeout_statistics', 900),
+                'typeahead': SettingsService.get_setting('cache_timeout_typeahead', 60),
             },
             'enabled': SettingsService.get_setting('enable_cache', True),
             'key_prefix': SettingsService.get_setting('cache_key_prefix', 'sclive_'),
@@ -286,6 +286,7 @@ class DefaultSettings:
         'cache_timeout_settings': 7200,    # ساعتان
         'cache_timeout_reports': 1800,     # 30 دقيقة
         'cache_timeout_statistics': 900,   # 15 دقيقة
+        'cache_timeout_typeahead': 60,     # دقيقة واحدة
         'enable_cache': True,
         'cache_key_prefix': 'sclive_',
     }
@@ -0,0 +1,271 @@
+"""
+خدمة الإحصائيات اليومية المجمعة
+
+تحتفظ بجدول DailyStatistic (العدد ومجموع المبالغ لكل يوم ونوع سجل وحالة) متزامنًا
+مع الإجازات والفواتير والمدفوعات عبر الإشارات في core/signals.py، فتقرأ لوحة التحكم
+والتقارير الزمنية الإجماليات باستعلام واحد على الجدول المجمع. التحديثات الجماعية
+(update و bulk_update) لا ترسل إشارات، لذلك تطبق فروقها بنفسها عبر apply.
+"""
+import logging
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import ExtractMonth, TruncDate
+from django.utils import timezone
+
+from core.models import (Client, CompanionLeave, DailyStatistic, Doctor,
+                         LeaveInvoice, Patient, Payment, SickLeave)
+
+logger = logging.getLogger(__name__)
+
+# النموذج المتتبع: حقل التاريخ الذي يُجمع عليه، وحقل الحالة والمبلغ (إن وجدا)
+TrackedModel = namedtuple('TrackedModel', ['model', 'date_field', 'status_field', 'amount_field'])
+
+
+class DailyStatisticsService:
+    """خدمة تحديث وقراءة وإعادة بناء الإحصائيات اليومية"""
+
+    TRACKED = {
+        'sick_leave': TrackedModel(SickLeave, 'issue_date', 'status', None),
+        'companion_leave': TrackedModel(CompanionLeave, 'issue_date', 'status', None),
+        'invoice': TrackedModel(LeaveInvoice, 'issue_date', 'status', 'amount'),
+        # طريقة الدفع هي "حالة" الدفعة في الجدول المجمع
+        'payment': TrackedModel(Payment, 'payment_date', 'payment_method', 'amount'),
+        'client': TrackedModel(Client, 'created_at', None, None),
+        'patient': TrackedModel(Patient, 'created_at', None, None),
+        'doctor': TrackedModel(Doctor, 'created_at', None, None),
+    }
+
+    # الفواتير التي تدخل في إجمالي المبالغ المستحقة في لوحة التحكم
+    BILLED_INVOICE_STATUSES = ('unpaid', 'partially_paid', 'paid')
+
+    @classmethod
+    def get_entity(cls, model):
+        """اسم نوع السجل للنموذج، أو None إذا لم يكن متتبعًا"""
+        for entity, tracked in cls.TRACKED.items():
+            if tracked.model is model:
+                return entity
+        return None
+
+    @classmethod
+    def get_fields(cls, entity) -> list:
+        """حقول النموذج التي يؤثر تغييرها في الإحصائيات"""
+        tracked = cls.TRACKED[entity]
+        return [field for field in (tracked.date_field, tracked.status_field, tracked.amount_field) if field]
+
+    @staticmethod
+    def to_date(value):
+        if isinstance(value, datetime):
+            return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        return value
+
+    @classmethod
+    def make_key(cls, date_value, status=None, amount=None) -> tuple:
+        """مفتاح السجل في الجدول المجمع: (التاريخ، الحالة، المبلغ)"""
+        return cls.to_date(date_value), status or '', amount or Decimal('0')
+
+    @classmethod
+    def get_key(cls, entity, instance) -> tuple:
+        """مفتاح نسخة النموذج من قيمها في الذاكرة"""
+        tracked = cls.TRACKED[entity]
+        return cls.make_key(
+            getattr(instance, tracked.date_field),
+            getattr(instance, tracked.status_field) if tracked.status_field else None,
+            getattr(instance, tracked.amount_field) if tracked.amount_field else None,
+        )
+
+    @classmethod
+    def get_stored_key(cls, entity, pk):
+        """مفتاح السجل كما هو محفوظ في قاعدة البيانات (قبل التعديل)"""
+        row = cls.TRACKED[entity].model.objects.filter(pk=pk).values(*cls.get_fields(entity)).first()
+        if row is None:
+            return None
+        tracked = cls.TRACKED[entity]
+        return cls.make_key(
+            row[tracked.date_field],
+            row.get(tracked.status_field),
+            row.get(tracked.amount_field),
+        )
+
+    @staticmethod
+    def add_change(deltas, previous=None, current=None):
+        """إضافة فرق الانتقال من المفتاح السابق إلى الحالي إلى قاموس الفروق"""
+        if previous == current:
+            return deltas
+        if previous is not None:
+            date_value, status, amount = previous
+            deltas[(date_value, status)][0] -= 1
+            deltas[(date_value, status)][1] -= amount
+        if current is not None:
+            date_value, status, amount = current
+            deltas[(date_value, status)][0] += 1
+            deltas[(date_value, status)][1] += amount
+        return deltas
+
+    @staticmethod
+    def new_deltas():
+        return defaultdict(lambda: [0, Decimal('0')])
+
+    @classmethod
+    def apply(cls, entity, deltas):
+        """
+        تطبيق الفروق على الجدول المجمع
+
+        deltas: {(التاريخ، الحالة): [فرق العدد، فرق المبلغ]}
+        """
+        for (date_value, status), (count, amount) in deltas.items():
+            if not count and not amount:
+                continue
+
+            rows = DailyStatistic.objects.filter(entity=entity, date=date_value, status=status)
+            changes = {'count': models.F('count') + count, 'amount': models.F('amount') + amount}
+            if rows.update(**changes):
+                continue
+
+            try:
+                with transaction.atomic():
+                    DailyStatistic.objects.create(
+                        entity=entity, date=date_value, status=status, count=count, amount=amount
+                    )
+            except IntegrityError:
+                # أنشأت عملية متزامنة الصف نفسه
+                rows.update(**changes)
+
+    @classmethod
+    def record_change(cls, entity, previous=None, current=None):
+        """تسجيل إنشاء سجل (previous=None) أو تعديله أو حذفه (current=None)"""
+        cls.apply(entity, cls.add_change(cls.new_deltas(), previous, current))
+
+    @classmethod
+    def get_status_change_deltas(cls, entity, queryset, new_status):
+        """
+        فروق تغيير حالة كل سجلات الاستعلام إلى new_status
+
+        تُحسب باستعلام تجميعي واحد قبل تنفيذ update() على نفس الاستعلام.
+        """
+        tracked = cls.TRACKED[entity]
+        amount = models.Sum(tracked.amount_field) if tracked.amount_field else models.Value(Decimal('0'))
+        rows = queryset.order_by().values(tracked.date_field, tracked.status_field).annotate(
+            row_count=models.Count('pk'), row_amount=amount
+        )
+
+        deltas = cls.new_deltas()
+        for row in rows:
+            if row[tracked.status_field] == new_status:
+                continue
+            row_amount = row['row_amount'] or Decimal('0')
+            for status, sign in ((row[tracked.status_field], -1), (new_status, 1)):
+                key = (cls.to_date(row[tracked.date_field]), status or '')
+                deltas[key][0] += sign * row['row_count']
+                deltas[key][1] += sign * row_amount
+        return deltas
+
+    @classmethod
+    def get_totals(cls) -> dict:
+        """
+        إجماليات كل نوع سجل باستعلام واحد
+
+        يعيد {نوع السجل: {'count', 'amount', 'statuses': {الحالة: {'count', 'amount'}}}}
+        """
+        totals = {
+            entity: {'count': 0, 'amount': Decimal('0'), 'statuses': {}}
+            for entity in cls.TRACKED
+        }
+        rows = DailyStatistic.objects.values('entity', 'status').annotate(
+            total_count=models.Sum('count'), total_amount=models.Sum('amount')
+        ).order_by()
+
+        for row in rows:
+            entity_totals = totals.setdefault(row['entity'], {'count': 0, 'amount': Decimal('0'), 'statuses': {}})
+            count, amount = row['total_count'] or 0, row['total_amount'] or Decimal('0')
+            entity_totals['count'] += count
+            entity_totals['amount'] += amount
+            entity_totals['statuses'][row['status']] = {'count': count, 'amount': amount}
+        return totals
+
+    @classmethod
+    def get_dashboard_stats(cls) -> dict:
+        """إحصائيات لوحة التحكم العامة والمالية من الجدول المجمع (استعلام واحد)"""
+        totals = cls.get_totals()
+        invoice_statuses = totals['invoice']['statuses']
+        total_invoices_amount = sum(
+            (invoice_statuses.get(status, {}).get('amount', Decimal('0')) for status in cls.BILLED_INVOICE_STATUSES),
+            Decimal('0'),
+        )
+        total_payments_amount = totals['payment']['amount']
+
+        return {
+            'sick_leaves_count': totals['sick_leave']['count'],
+            'companion_leaves_count': totals['companion_leave']['count'],
+            'invoices_count': totals['invoice']['count'],
+            'payments_count': totals['payment']['count'],
+            'clients_count': totals['client']['count'],
+            'patients_count': totals['patient']['count'],
+            'doctors_count': totals['doctor']['count'],
+            'total_invoices_amount': total_invoices_amount,
+            'total_payments_amount': total_payments_amount,
+            'total_balance': total_invoices_amount - total_payments_amount,
+        }
+
+    @classmethod
+    def get_monthly_totals(cls, entity, year, statuses=None, start_date=None, end_date=None) -> dict:
+        """العدد والمبلغ لكل شهر من السنة: {الشهر: {'count', 'amount'}}"""
+        rows = DailyStatistic.objects.filter(entity=entity, date__year=year)
+        if statuses:
+            rows = rows.filter(status__in=statuses)
+        if start_date:
+            rows = rows.filter(date__gte=start_date)
+        if end_date:
+            rows = rows.filter(date__lte=end_date)
+        rows = rows.annotate(month=ExtractMonth('date')).values('month').annotate(
+            total_count=models.Sum('count'), total_amount=models.Sum('amount')
+        ).order_by('month')
+        return {row['month']: {'count': row['total_count'], 'amount': row['total_amount']} for row in rows}
+
+    @classmethod
+    def compute(cls, entity) -> list:
+        """صفوف الجدول المجمع لنوع سجل محسوبة من الجدول الأصلي مباشرة"""
+        tracked = cls.TRACKED[entity]
+        date_field = tracked.model._meta.get_field(tracked.date_field)
+        date_expression = (TruncDate(tracked.date_field) if isinstance(date_field, models.DateTimeField)
+                           else models.F(tracked.date_field))
+
+        values = {'stat_date': date_expression}
+        if tracked.status_field:
+            values['stat_status'] = models.F(tracked.status_field)
+        rows = tracked.model.objects.order_by().values(**values).annotate(
+            row_count=models.Count('pk'),
+            row_amount=models.Sum(tracked.amount_field) if tracked.amount_field else models.Value(Decimal('0')),
+        )
+
+        return [
+            DailyStatistic(
+                entity=entity,
+                date=row['stat_date'],
+                status=row.get('stat_status') or '',
+                count=row['row_count'],
+                amount=row['row_amount'] or Decimal('0'),
+            )
+            for row in rows
+        ]
+
+    @classmethod
+    def rebuild(cls, entities=None, batch_size=1000) -> dict:
+        """
+        إعادة بناء الجدول المجمع من الجداول الأصلية
+
+        يعيد عدد الصفوف المجمعة لكل نوع سجل.
+        """
+        entities = list(entities or cls.TRACKED)
+        results = {}
+        with transaction.atomic():
+            for entity in entities:
+                statistics = cls.compute(entity)
+                DailyStatistic.objects.filter(entity=entity).delete()
+                DailyStatistic.objects.bulk_create(statistics, batch_size=batch_size)
+                results[entity] = len(statistics)
+
+        logger.info(f"تمت إعادة بناء الإحصائيات اليومية: {results}")
+        return results
@@ -0,0 +1,670 @@
+"""
+خدمة الترجمة المؤجلة
+
+بدلاً من استدعاء خدمة الترجمة أثناء حفظ النماذج، تُسجَّل الحقول الإنجليزية
+الفارغة كمهام في جدول TranslationJob، ثم يقوم أمر process_translations
+بمعالجتها على دفعات باستخدام محرك الترجمة المحدد في الإعدادات.
+
+جميع الترجمات تمر عبر ذاكرة TranslationMemo (جدول في قاعدة البيانات مع
+ذاكرة LRU داخل العملية)، فلا يُرسل النص نفسه إلى خدمة الترجمة أكثر من مرة.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import (TranslatableModelMixin, TranslationJob,
+                         TranslationMemo)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSLATION_BACKEND = 'core.services.translation_service.GoogleTranslatorBackend'
+DEFAULT_TRANSLATION_MEMO_SIZE = 2048
+
+# التشكيل والتطويل لا يغيران الترجمة، لذلك يُحذفان قبل البحث في الذاكرة
+ARABIC_DIACRITICS_PATTERN = re.compile(r'[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+# فهرس ثابت لأسماء الأيام والأشهر التي تظهر في التواريخ المنسقة باللغة العربية
+STATIC_TRANSLATIONS = {
+    'السبت': 'Saturday',
+    'الأحد': 'Sunday',
+    'الاحد': 'Sunday',
+    'الاثنين': 'Monday',
+    'الإثنين': 'Monday',
+    'الثلاثاء': 'Tuesday',
+    'الأربعاء': 'Wednesday',
+    'الاربعاء': 'Wednesday',
+    'الخميس': 'Thursday',
+    'الجمعة': 'Friday',
+    'يناير': 'January',
+    'فبراير': 'February',
+    'مارس': 'March',
+    'أبريل': 'April',
+    'إبريل': 'April',
+    'ابريل': 'April',
+    'مايو': 'May',
+    'يونيو': 'June',
+    'يوليو': 'July',
+    'أغسطس': 'August',
+    'اغسطس': 'August',
+    'سبتمبر': 'September',
+    'أكتوبر': 'October',
+    'اكتوبر': 'October',
+    'نوفمبر': 'November',
+    'ديسمبر': 'December',
+}
+ARABIC_WORD_PATTERN = re.compile(r'[\u0600-\u06FF]+')
+
+
+def translate_with_static_index(normalized_text: str) -> Optional[str]:
+    """ترجمة النص كلمة بكلمة من الفهرس الثابت، ويعيد None إذا بقيت كلمة عربية غير معروفة"""
+    text = normalized_text.replace('،', ',')
+    words = ARABIC_WORD_PATTERN.findall(text)
+    if not words or any(word not in STATIC_TRANSLATIONS for word in words):
+        return None
+    return ARABIC_WORD_PATTERN.sub(lambda match: STATIC_TRANSLATIONS[match.group(0)], text)
+
+
+def normalize_source_text(text) -> str:
+    """توحيد النص المصدر: توحيد أشكال الحروف وحذف التشكيل والتطويل والمسافات الزائدة"""
+    if text is None:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    text = ARABIC_DIACRITICS_PATTERN.sub('', text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields) -> None:
+    """
+    إدراج مجموعة سجلات أو تحديثها حسب قيد فريد، بطريقة تعمل على كل قواعد البيانات
+
+    bulk_create(update_conflicts=True, unique_fields=...) غير مدعوم على MySQL، لذلك تُقرأ
+    السجلات الموجودة باستعلام واحد وتُحدَّث بـ bulk_update، ويُدرج الباقي بـ bulk_create.
+    السجل الذي يُدرج بالتزامن بين القراءة والإدراج يُحدَّث بدلاً من إدراجه.
+    """
+    objs = list(objs)
+    if not objs:
+        return
+
+    manager = model._default_manager
+    now = timezone.now()
+
+    def get_key(obj):
+        return tuple(getattr(obj, field) for field in unique_fields)
+
+    lookup = Q()
+    for obj in objs:
+        lookup |= Q(**dict(zip(unique_fields, get_key(obj))))
+        if 'updated_at' in update_fields:
+            # bulk_update و update() لا يعيّنان حقول auto_now
+            obj.updated_at = now
+    existing = {tuple(row[1:]): row[0] for row in manager.filter(lookup).values_list('pk', *unique_fields)}
+
+    to_update, to_create = [], []
+    for obj in objs:
+        pk = existing.get(get_key(obj))
+        if pk is None:
+            to_create.append(obj)
+        else:
+            obj.pk = pk
+            to_update.append(obj)
+
+    if to_update:
+        manager.bulk_update(to_update, update_fields)
+    if not to_create:
+        return
+
+    try:
+        with transaction.atomic():
+            manager.bulk_create(to_create)
+    except IntegrityError:
+        for obj in to_create:
+            values = {field: getattr(obj, field) for field in update_fields}
+            if not manager.filter(**dict(zip(unique_fields, get_key(obj)))).update(**values):
+                manager.bulk_create([obj], ignore_conflicts=True)
+
+
+def get_touch_fields(model) -> dict:
+    """
+    تحديث updated_at مع الحقول المترجمة، لأن update() لا يعيّن حقول auto_now
+
+    تاريخ التحديث يدخل في إصدار ملفات PDF المخزنة التي تعرض الأسماء الإنجليزية.
+    """
+    try:
+        model._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return {}
+    return {'updated_at': timezone.now()}
+
+
+class BaseTranslatorBackend:
+    """الواجهة الأساسية لمحركات الترجمة"""
+
+    def translate(self, text: str, src: str = 'ar', dest: str = 'en') -> Optional[str]:
+        """ترجمة نص واحد، ويعيد None في حالة الفشل"""
+        # المحرك الأساسي لا يترجم شيئًا، فتبقى المهام معلقة حتى إعادة المحاولة
+        return None
+
+    def translate_many(self, texts: Iterable[str], src: str = 'ar', dest: str = 'en') -> Dict[str, str]:
+        """ترجمة مجموعة نصوص ويعيد قاموسًا بالنصوص التي نجحت ترجمتها"""
+        results = {}
+        for text in texts:
+            translated = self.translate(text, src=src, dest=dest)
+            if translated:
+                results[text] = translated
+        return results
+
+
+class GoogleTranslatorBackend(BaseTranslatorBackend):
+    """محرك الترجمة باستخدام googletrans"""
+
+    def __init__(self):
+        self._translator = None
+
+    def _get_translator(self):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        return self._translator
+
+    def translate(self, text, src='ar', dest='en'):
+        try:
+            return self._get_translator().translate(str(text), src=src, dest=dest).text
+        except Exception as e:
+            logger.warning(f"فشل ترجمة النص '{text}': {str(e)}")
+            return None
+
+
+class DictionaryTranslatorBackend(BaseTranslatorBackend):
+    """
+    محرك ترجمة محلي يعتمد على قاموس ثابت
+
+    يقرأ القاموس من الإعداد TRANSLATION_DICTIONARY، ويُستخدم في الاختبارات
+    والبيئات التي لا تتوفر فيها خدمة الترجمة.
+    """
+
+    def __init__(self, dictionary: Optional[Dict[str, str]] = None):
+        if dictionary is None:
+            dictionary = getattr(settings, 'TRANSLATION_DICTIONARY', {})
+        self.dictionary = dict(dictionary)
+
+    def translate(self, text, src='ar', dest='en'):
+        return self.dictionary.get(str(text).strip())
+
+
+_backends: Dict[str, BaseTranslatorBackend] = {}
+
+
+def get_translator_backend() -> BaseTranslatorBackend:
+    """الحصول على محرك الترجمة المحدد في الإعدادات (نسخة واحدة لكل عملية)"""
+    path = getattr(settings, 'TRANSLATION_BACKEND', DEFAULT_TRANSLATION_BACKEND)
+    backend = _backends.get(path)
+    if backend is None:
+        try:
+            backend = import_string(path)()
+        except ImportError as e:
+            logger.error(f"تعذر تحميل محرك الترجمة {path}: {str(e)}")
+            backend = BaseTranslatorBackend()
+        _backends[path] = backend
+    return backend
+
+
+class LRUCache:
+    """ذاكرة تخزين مؤقت محدودة الحجم تحذف العناصر الأقدم استخدامًا"""
+
+    def __init__(self, max_size: int = DEFAULT_TRANSLATION_MEMO_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TranslationMemoService:
+    """
+    ذاكرة الترجمات المشتركة بين النماذج والدوال المساعدة وفلاتر القوالب
+
+    المستوى الأول ذاكرة LRU داخل العملية، والمستوى الثاني جدول TranslationMemo،
+    ولا يُستدعى محرك الترجمة إلا للنصوص غير الموجودة في المستويين.
+    """
+
+    MISS_RECHECK_SECONDS = 300
+
+    _local = LRUCache(getattr(settings, 'TRANSLATION_MEMO_SIZE', DEFAULT_TRANSLATION_MEMO_SIZE))
+    _misses = LRUCache(getattr(settings, 'TRANSLATION_MEMO_SIZE', DEFAULT_TRANSLATION_MEMO_SIZE))
+
+    @staticmethod
+    def make_hash(normalized_text: str) -> str:
+        """بصمة النص الموحد المستخدمة كمفتاح في الجدول"""
+        return hashlib.sha1(normalized_text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_many(cls, texts: Iterable[str], src: str = 'ar', dest: str = 'en') -> Dict[str, str]:
+        """البحث عن ترجمات مجموعة نصوص في الذاكرة (استعلام واحد على الأكثر)"""
+        results = {}
+        missing = {}
+        for text in texts:
+            normalized = normalize_source_text(text)
+            if not normalized:
+                continue
+            translated = cls._local.get((src, dest, normalized))
+            if translated is not None:
+                results[text] = translated
+            else:
+                missing.setdefault(cls.make_hash(normalized), []).append((text, normalized))
+
+        if missing:
+            rows = TranslationMemo.objects.filter(
+                source_lang=src, target_lang=dest, source_hash__in=list(missing)
+            ).exclude(translated_text='').values_list('source_hash', 'translated_text')
+            for source_hash, translated in rows:
+                for text, normalized in missing[source_hash]:
+                    cls._local.set((src, dest, normalized), translated)
+                    results[text] = translated
+
+        return results
+
+    @classmethod
+    def get(cls, text: str, src: str = 'ar', dest: str = 'en') -> Optional[str]:
+        """البحث عن ترجمة نص واحد في الذاكرة"""
+        return cls.get_many([text], src=src, dest=dest).get(text)
+
+    @classmethod
+    def store_many(cls, translations: Dict[str, str], src: str = 'ar', dest: str = 'en',
+                   overwrite: bool = True) -> int:
+        """حفظ مجموعة ترجمات في الجدول وفي ذاكرة العملية"""
+        memos = {}
+        for text, translated in translations.items():
+            normalized = normalize_source_text(text)
+            if not normalized or not translated:
+                continue
+            source_hash = cls.make_hash(normalized)
+            memos[source_hash] = TranslationMemo(
+                source_lang=src,
+                target_lang=dest,
+                source_hash=source_hash,
+                source_text=normalized,
+                translated_text=translated,
+            )
+
+        if memos and not overwrite:
+            # الإبقاء على الترجمات الموجودة، مع ملء النصوص المسجلة كمفقودة فقط
+            existing = TranslationMemo.objects.filter(
+                source_lang=src, target_lang=dest, source_hash__in=list(memos)
+            ).exclude(translated_text='').values_list('source_hash', flat=True)
+            for source_hash in existing:
+                memos.pop(source_hash, None)
+
+        if not memos:
+            return 0
+
+        bulk_upsert(
+            TranslationMemo, memos.values(),
+            unique_fields=['source_lang', 'target_lang', 'source_hash'],
+            update_fields=['translated_text', 'updated_at'],
+        )
+        for memo in memos.values():
+            cls._local.set((src, dest, memo.source_text), memo.translated_text)
+            cls._misses.pop((src, dest, memo.source_text))
+        return len(memos)
+
+    @classmethod
+    def lookup(cls, text: str, src: str = 'ar', dest: str = 'en') -> Optional[str]:
+        """
+        البحث عن ترجمة دون استدعاء محرك الترجمة (للاستخدام أثناء عرض القوالب)
+
+        يبحث في الفهرس الثابت ثم في ذاكرة الترجمات، وإذا لم يجد الترجمة يسجل
+        النص كمفقود في الجدول لتتم ترجمته لاحقًا عبر أمر process_translations.
+        """
+        normalized = normalize_source_text(text)
+        if not normalized:
+            return None
+
+        if src == 'ar' and dest == 'en':
+            translated = translate_with_static_index(normalized)
+            if translated is not None:
+                return translated
+
+        key = (src, dest, normalized)
+        translated = cls._local.get(key)
+        if translated is not None:
+            return translated
+
+        # تجنب تكرار الاستعلام عن نص مفقود في كل عرض للقالب
+        recorded_at = cls._misses.get(key)
+        if recorded_at is not None and time.monotonic() - recorded_at < cls.MISS_RECHECK_SECONDS:
+            return None
+
+        translated = cls.get(normalized, src=src, dest=dest)
+        if translated is None:
+            cls.record_misses([normalized], src=src, dest=dest)
+        return translated
+
+    @classmethod
+    def record_misses(cls, texts: Iterable[str], src: str = 'ar', dest: str = 'en') -> int:
+        """تسجيل نصوص بدون ترجمة في الجدول لتُترجم لاحقًا"""
+        memos = {}
+        for text in texts:
+            normalized = normalize_source_text(text)
+            if not normalized:
+                continue
+            source_hash = cls.make_hash(normalized)
+            memos[source_hash] = TranslationMemo(
+                source_lang=src,
+                target_lang=dest,
+                source_hash=source_hash,
+                source_text=normalized,
+                translated_text='',
+            )
+            cls._misses.set((src, dest, normalized), time.monotonic())
+
+        if memos:
+            TranslationMemo.objects.bulk_create(memos.values(), ignore_conflicts=True)
+        return len(memos)
+
+    @classmethod
+    def fill_missing(cls, batch_size: int = 50, max_batches: Optional[int] = None,
+                     backend: Optional[BaseTranslatorBackend] = None) -> dict:
+        """ترجمة النصوص المسجلة كمفقودة على دفعات"""
+        results = {'processed': 0, 'translated': 0}
+        last_id = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            rows = list(
+                TranslationMemo.objects.filter(translated_text='', id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'source_lang', 'target_lang', 'source_text')[:batch_size]
+            )
+            if not rows:
+                break
+
+            backend = backend or get_translator_backend()
+            by_language = {}
+            for _, src, dest, source_text in rows:
+                by_language.setdefault((src, dest), []).append(source_text)
+
+            for (src, dest), texts in by_language.items():
+                translated = backend.translate_many(texts, src=src, dest=dest)
+                results['translated'] += cls.store_many(translated, src=src, dest=dest)
+
+            results['processed'] += len(rows)
+            last_id = rows[-1][0]
+            batches += 1
+
+        return results
+
+    @classmethod
+    def translate_many(cls, texts: Iterable[str], src: str = 'ar', dest: str = 'en',
+                       backend: Optional[BaseTranslatorBackend] = None) -> Dict[str, str]:
+        """ترجمة مجموعة نصوص مع استدعاء محرك الترجمة للنصوص غير المحفوظة فقط"""
+        texts = [text for text in texts if text]
+        results = cls.get_many(texts, src=src, dest=dest)
+
+        pending = {}
+        for text in texts:
+            if text not in results:
+                pending.setdefault(normalize_source_text(text), []).append(text)
+        pending.pop('', None)
+
+        if pending:
+            backend = backend or get_translator_backend()
+            translated = backend.translate_many(list(pending), src=src, dest=dest)
+            cls.store_many(translated, src=src, dest=dest)
+            for normalized, value in translated.items():
+                for text in pending.get(normalized, ()):
+                    results[text] = value
+
+        return results
+
+    @classmethod
+    def translate(cls, text: str, src: str = 'ar', dest: str = 'en',
+                  backend: Optional[BaseTranslatorBackend] = None) -> Optional[str]:
+        """ترجمة نص واحد عبر الذاكرة، ويعيد None في حالة الفشل"""
+        if not text:
+            return None
+        return cls.translate_many([text], src=src, dest=dest, backend=backend).get(text)
+
+    @classmethod
+    def warm_from_models(cls, batch_size: int = 500, overwrite: bool = False) -> dict:
+        """تعبئة الذاكرة من أزواج (عربي، إنجليزي) الموجودة في الحقول المترجمة بالفعل"""
+        results = {'pairs': 0, 'stored': 0}
+        batch = {}
+
+        for model in apps.get_app_config('core').get_models():
+            if not issubclass(model, TranslatableModelMixin):
+                continue
+
+            for source_field, target_field in model.translatable_fields:
+                pairs = (
+                    model._default_manager
+                    .exclude(**{f'{source_field}__isnull': True})
+                    .exclude(**{source_field: ''})
+                    .exclude(**{f'{target_field}__isnull': True})
+                    .exclude(**{target_field: ''})
+                    .values_list(source_field, target_field)
+                    .distinct()
+                )
+                for source_text, translated in pairs.iterator(chunk_size=batch_size):
+                    results['pairs'] += 1
+                    batch.setdefault(source_text, translated)
+                    if len(batch) >= batch_size:
+                        results['stored'] += cls.store_many(batch, overwrite=overwrite)
+                        batch = {}
+
+        if batch:
+            results['stored'] += cls.store_many(batch, overwrite=overwrite)
+        return results
+
+    @classmethod
+    def clear_local(cls):
+        """تفريغ ذاكرة العملية (لا يؤثر على الجدول)"""
+        cls._local.clear()
+        cls._misses.clear()
+
+
+class TranslationQueue:
+    """طابور مهام الترجمة المخزن في قاعدة البيانات"""
+
+    DEFAULT_BATCH_SIZE = 50
+    MAX_ATTEMPTS = 5
+
+    @classmethod
+    def get_missing_fields(cls, instance) -> List[tuple]:
+        """الحقول التي تحتوي على نص عربي بينما الحقل الإنجليزي المقابل فارغ"""
+        missing = []
+        for source_field, target_field in getattr(instance, 'translatable_fields', ()):
+            source_text = getattr(instance, source_field, None)
+            if source_text and not getattr(instance, target_field, None):
+                missing.append((source_field, target_field, str(source_text)))
+        return missing
+
+    @classmethod
+    def enqueue_missing(cls, instance) -> int:
+        """ملء الحقول الإنجليزية الفارغة من ذاكرة الترجمات وتسجيل مهام ترجمة لما تبقى منها"""
+        if instance is None or instance.pk is None:
+            return 0
+
+        missing = cls.get_missing_fields(instance)
+        if not missing:
+            return 0
+
+        # الحقول التي لها ترجمة محفوظة تُكتب مباشرة دون انتظار الطابور
+        known = TranslationMemoService.get_many(source_text for _, _, source_text in missing)
+        if known:
+            updates = {}
+            for source_field, target_field, source_text in missing:
+                if source_text in known:
+                    updates[target_field] = known[source_text]
+                    setattr(instance, target_field, known[source_text])
+            updates.update(get_touch_fields(type(instance)))
+            type(instance)._default_manager.filter(pk=instance.pk).update(**updates)
+            if 'updated_at' in updates:
+                instance.updated_at = updates['updated_at']
+            # update() لا يرسل إشارات، والأسماء الإنجليزية جزء من فهرس البحث
+            from core.services.search_service import SearchIndexService
+            SearchIndexService.index_many(type(instance), [instance.pk])
+            missing = [item for item in missing if item[1] not in updates]
+            if not missing:
+                return 0
+
+        model_label = instance._meta.label_lower
+        jobs = [
+            TranslationJob(
+                model_label=model_label,
+                object_id=instance.pk,
+                source_field=source_field,
+                target_field=target_field,
+                source_text=source_text,
+                status='pending',
+                attempts=0,
+                last_error='',
+            )
+            for source_field, target_field, source_text in missing
+        ]
+
+        # إعادة تعيين المهمة الموجودة بدلاً من إنشاء مهمة مكررة لنفس الحقل
+        bulk_upsert(
+            TranslationJob, jobs,
+            unique_fields=['model_label', 'object_id', 'target_field'],
+            update_fields=['source_field', 'source_text', 'status', 'attempts', 'last_error', 'updated_at'],
+        )
+        return len(jobs)
+
+    @classmethod
+    def process_pending(cls, batch_size: int = DEFAULT_BATCH_SIZE, backend: Optional[BaseTranslatorBackend] = None,
+                        after_id: int = 0) -> dict:
+        """معالجة دفعة واحدة من مهام الترجمة المعلقة"""
+        results = {
+            'processed': 0,
+            'translated': 0,
+            'failed': 0,
+            'skipped': 0,
+            'last_id': after_id,
+        }
+
+        jobs = list(
+            TranslationJob.objects.filter(status='pending', id__gt=after_id).order_by('id')[:batch_size]
+        )
+        if not jobs:
+            return results
+
+        translations = TranslationMemoService.translate_many(
+            {job.source_text for job in jobs}, backend=backend
+        )
+        now = timezone.now()
+        translated_objects = {}
+
+        for job in jobs:
+            results['processed'] += 1
+            job.updated_at = now
+            translated = translations.get(job.source_text)
+
+            if not translated:
+                job.attempts += 1
+                job.last_error = 'لم يتم الحصول على ترجمة'
+                job.status = 'failed' if job.attempts >= cls.MAX_ATTEMPTS else 'pending'
+                results['failed'] += 1
+                continue
+
+            try:
+                model = apps.get_model(job.model_label)
+            except LookupError:
+                job.status = 'failed'
+                job.last_error = f'النموذج {job.model_label} غير موجود'
+                results['failed'] += 1
+                continue
+
+            # الكتابة فقط إذا كان الحقل ما زال فارغًا حتى لا نستبدل ترجمة أدخلها المستخدم
+            # نستخدم update بدلاً من save لتجنب إعادة تشغيل منطق الحفظ
+            empty_target = Q(**{f'{job.target_field}__isnull': True}) | Q(**{job.target_field: ''})
+            updated = model.objects.filter(pk=job.object_id).filter(empty_target).update(
+                **{job.target_field: translated}, **get_touch_fields(model)
+            )
+
+            job.status = 'done'
+            job.last_error = ''
+            if updated:
+                results['translated'] += 1
+                translated_objects.setdefault(model, set()).add(job.object_id)
+            else:
+                results['skipped'] += 1
+
+        TranslationJob.objects.bulk_update(jobs, ['status', 'attempts', 'last_error', 'updated_at'])
+
+        # الأسماء الإنجليزية المكتوبة بـ update() جزء من فهرس البحث
+        from core.services.search_service import SearchIndexService
+        for model, object_ids in translated_objects.items():
+            SearchIndexService.index_many(model, object_ids)
+
+        results['last_id'] = jobs[-1].id
+        return results
+
+    @classmethod
+    def process_all(cls, batch_size: int = DEFAULT_BATCH_SIZE, max_batches: Optional[int] = None) -> dict:
+        """معالجة المهام المعلقة على دفعات حتى ينتهي الطابور أو نصل للحد الأقصى من الدفعات"""
+        totals = {
+            'batches': 0,
+            'processed': 0,
+            'translated': 0,
+            'failed': 0,
+            'skipped': 0,
+        }
+        backend = get_translator_backend()
+        last_id = 0
+
+        # نتقدم حسب المعرف حتى لا تُعاد محاولة المهمة الفاشلة أكثر من مرة في نفس التشغيل
+        while max_batches is None or totals['batches'] < max_batches:
+            results = cls.process_pending(batch_size=batch_size, backend=backend, after_id=last_id)
+            if not results['processed']:
+                break
+
+            last_id = results['last_id']
+            totals['batches'] += 1
+            for key in ('processed', 'translated', 'failed', 'skipped'):
+                totals[key] += results[key]
+
+        return totals
+
+    @classmethod
+    def pending_count(cls) -> int:
+        """عدد مهام الترجمة المعلقة"""
+        return TranslationJob.objects.filter(status='pending').count()
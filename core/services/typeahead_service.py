@@ -0,0 +1,177 @@
+"""
+خدمة الإكمال التلقائي
+
+تبني نتائج واجهات البحث من فهرس البحث ثم من قيم الحقول فقط (values) بعدد ثابت من
+الاستعلامات لكل نوع، فمستشفيات الأطباء تُجلب لكل النتائج باستعلام واحد بدل استعلامين
+لكل طبيب. تُخزن نتائج كل بادئة بحث في الكاش لمدة قصيرة (إعداد cache_timeout_typeahead)
+بمفتاح مرتبط بإصدارات النماذج، فتُخدم ضغطات المفاتيح المتكررة بدون قاعدة البيانات.
+"""
+from core.models import (Client, CompanionLeave, Doctor, Hospital,
+                         LeaveInvoice, Patient, Payment, SickLeave)
+from core.services.cache_service import VersionedCacheService
+from core.services.search_service import SearchIndexService, tokenize
+
+LEAVE_STATUS_DISPLAY = {
+    'active': 'نشطة',
+    'cancelled': 'ملغية',
+    'expired': 'منتهية',
+}
+
+
+def format_date(value) -> str:
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+class TypeaheadService:
+    """خدمة نتائج الإكمال التلقائي للأطباء والمرضى والعملاء والإجازات"""
+
+    # النماذج التي تعتمد عليها نتائج كل نوع (لمفتاح الكاش)
+    MODELS = {
+        'doctor': (Doctor, Hospital),
+        'patient': (Patient,),
+        'client': (Client, LeaveInvoice, Payment),
+        'sick_leave': (SickLeave, Patient, Doctor),
+        'companion_leave': (CompanionLeave, Patient, Doctor),
+    }
+
+    # الأنواع التي تعيدها الواجهة الموحدة افتراضيًا
+    DEFAULT_ENTITIES = ('doctor', 'patient', 'client')
+
+    LEAVE_FIELDS = ('id', 'leave_id', 'patient_id', 'patient__name', 'doctor__name',
+                    'start_date', 'end_date', 'duration_days', 'status')
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    @staticmethod
+    def normalize_query(query) -> str:
+        """الاستعلام بصيغته الموحدة، فالأشكال المختلفة لنفس الكلمات تشترك في الكاش"""
+        return ' '.join(tokenize(query)[:SearchIndexService.MAX_QUERY_TOKENS])
+
+    @classmethod
+    def get_limit(cls, value) -> int:
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            return cls.DEFAULT_LIMIT
+        return max(1, min(limit, cls.MAX_LIMIT))
+
+    @classmethod
+    def search(cls, entity, query, limit=DEFAULT_LIMIT) -> list:
+        """نتائج نوع واحد بترتيب الصلة، من الكاش إن وُجدت"""
+        normalized = cls.normalize_query(query)
+        if not normalized:
+            return []
+        return VersionedCacheService.get_or_set(
+            f'typeahead_{entity}', cls.MODELS[entity],
+            lambda: cls.build_results(entity, normalized, limit),
+            params={'q': normalized, 'limit': limit},
+            timeout_type='typeahead',
+        )
+
+    @classmethod
+    def search_many(cls, entities, query, limit=DEFAULT_LIMIT) -> dict:
+        """نتائج عدة أنواع لنفس الاستعلام في طلب واحد: {النوع: النتائج}"""
+        return {entity: cls.search(entity, query, limit) for entity in entities}
+
+    @classmethod
+    def build_results(cls, entity, query, limit=DEFAULT_LIMIT) -> list:
+        """نتائج نوع واحد من الفهرس وقيم الحقول"""
+        ids = SearchIndexService.search(entity, query, limit)
+        if not ids:
+            return []
+        rows = getattr(cls, f'get_{entity}_rows')(ids)
+        return [rows[pk] for pk in ids if pk in rows]
+
+    @staticmethod
+    def get_doctor_rows(ids) -> dict:
+        hospitals = {}
+        through = Doctor.hospitals.through.objects.filter(doctor_id__in=ids).order_by('pk')
+        for doctor_id, hospital_name in through.values_list('doctor_id', 'hospital__name'):
+            hospitals.setdefault(doctor_id, []).append(hospital_name)
+
+        fields = ('id', 'name', 'national_id', 'position', 'phone', 'email')
+        return {
+            row['id']: {
+                'id': row['id'],
+                'display': row['name'],
+                'national_id': row['national_id'] or '',
+                'position': row['position'] or '',
+                'hospital': ', '.join(hospitals.get(row['id'], [])),
+                'phone': row['phone'] or '',
+                'email': row['email'] or '',
+            }
+            for row in Doctor.objects.filter(pk__in=ids).values(*fields)
+        }
+
+    @staticmethod
+    def get_patient_rows(ids) -> dict:
+        fields = ('id', 'name', 'national_id', 'nationality', 'employer_name', 'phone', 'email', 'address')
+        results = {}
+        for row in Patient.objects.filter(pk__in=ids).values(*fields):
+            national_id_display = f" ({row['national_id']})" if row['national_id'] else ""
+            results[row['id']] = {
+                'id': row['id'],
+                'text': f"{row['name']}{national_id_display}",
+                'display': row['name'],
+                'national_id': row['national_id'] or '',
+                'nationality': row['nationality'] or '',
+                'employer': row['employer_name'] or "غير محدد",
+                'phone': row['phone'] or '',
+                'email': row['email'] or '',
+                'address': row['address'] or '',
+            }
+        return results
+
+    @staticmethod
+    def get_client_rows(ids) -> dict:
+        fields = ('id', 'name', 'phone', 'email', 'address', 'balance')
+        results = {}
+        for row in Client.objects.with_balances().filter(pk__in=ids).values(*fields):
+            phone_display = f" ({row['phone']})" if row['phone'] else ""
+            results[row['id']] = {
+                'id': row['id'],
+                'text': f"{row['name']}{phone_display}",
+                'display': row['name'],
+                'phone': row['phone'] or '',
+                'email': row['email'] or '',
+                'address': row['address'] or '',
+                'balance': row['balance'],
+            }
+        return results
+
+    @staticmethod
+    def get_leave_row(row) -> dict:
+        return {
+            'id': row['id'],
+            'leave_id': row['leave_id'],
+            'patient_name': row['patient__name'],
+            'patient_id': row['patient_id'],
+            'doctor_name': row['doctor__name'] or '',
+            'start_date': format_date(row['start_date']),
+            'end_date': format_date(row['end_date']),
+            'duration_days': row['duration_days'],
+            'status': row['status'],
+            'status_display': LEAVE_STATUS_DISPLAY.get(row['status'], row['status']),
+        }
+
+    @classmethod
+    def get_sick_leave_rows(cls, ids) -> dict:
+        results = {}
+        for row in SickLeave.objects.filter(pk__in=ids).values(*cls.LEAVE_FIELDS):
+            result = cls.get_leave_row(row)
+            result['text'] = f"{row['leave_id']} - {row['patient__name']}"
+            results[row['id']] = result
+        return results
+
+    @classmethod
+    def get_companion_leave_rows(cls, ids) -> dict:
+        fields = cls.LEAVE_FIELDS + ('companion_id', 'companion__name')
+        results = {}
+        for row in CompanionLeave.objects.filter(pk__in=ids).values(*fields):
+            result = cls.get_leave_row(row)
+            result['text'] = f"{row['leave_id']} - {row['patient__name']} ({row['companion__name']})"
+            result['companion_name'] = row['companion__name']
+            result['companion_id'] = row['companion_id']
+            results[row['id']] = result
+        return results
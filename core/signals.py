@@ -0,0 +1,136 @@
+"""
+إشارات تطبيق core
+"""
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.models import Doctor, LeavePrice, PaymentDetail
+from core.services.cache_service import VersionedCacheService
+from core.services.invoice_balance_service import InvoiceBalanceService
+from core.services.pricing_service import PricingService
+from core.services.search_service import SearchIndexService
+from core.services.statistics_service import DailyStatisticsService
+
+
+@receiver([post_save, post_delete], sender=LeavePrice)
+def invalidate_price_table(sender, **kwargs):
+    """إلغاء جدول الأسعار المُجمَّع عند تعديل أي سعر"""
+    PricingService.invalidate_on_commit()
+
+
+def _cached_invoice(detail):
+    """نسخة الفاتورة المحملة مع تفصيل الدفع (إن وجدت) دون استعلام إضافي"""
+    return detail._state.fields_cache.get('invoice')
+
+
+@receiver(pre_save, sender=PaymentDetail)
+def remember_payment_detail_values(sender, instance, raw=False, **kwargs):
+    """حفظ الفاتورة والمبلغ السابقين قبل تعديل تفصيل الدفع"""
+    instance._previous_values = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    instance._previous_values = (
+        PaymentDetail.objects.filter(pk=instance.pk).values_list('invoice_id', 'amount').first()
+    )
+
+
+@receiver(post_save, sender=PaymentDetail)
+def update_invoice_totals_on_save(sender, instance, created, raw=False, **kwargs):
+    """تحديث مجاميع الفاتورة بفرق المبلغ بعد إنشاء أو تعديل تفصيل الدفع"""
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_values', None)
+    instance._previous_values = None
+
+    if created or not previous:
+        InvoiceBalanceService.apply_delta(instance.invoice_id, instance.amount, _cached_invoice(instance))
+        return
+
+    previous_invoice_id, previous_amount = previous
+    if previous_invoice_id == instance.invoice_id:
+        InvoiceBalanceService.apply_delta(instance.invoice_id, instance.amount - previous_amount,
+                                          _cached_invoice(instance))
+    else:
+        InvoiceBalanceService.apply_delta(previous_invoice_id, -previous_amount)
+        InvoiceBalanceService.apply_delta(instance.invoice_id, instance.amount, _cached_invoice(instance))
+
+
+@receiver(post_delete, sender=PaymentDetail)
+def update_invoice_totals_on_delete(sender, instance, **kwargs):
+    """طرح مبلغ تفصيل الدفع المحذوف من مجاميع الفاتورة"""
+    InvoiceBalanceService.apply_delta(instance.invoice_id, -instance.amount, _cached_invoice(instance))
+
+
+def remember_statistic_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    """حفظ مفتاح السجل في الإحصائيات اليومية (التاريخ والحالة والمبلغ) قبل تعديله"""
+    instance._previous_statistic_key = None
+    instance._statistic_unchanged = False
+    if raw or instance._state.adding or not instance.pk:
+        return
+
+    entity = DailyStatisticsService.get_entity(sender)
+    if update_fields is not None and not set(update_fields) & set(DailyStatisticsService.get_fields(entity)):
+        # الحقول المحفوظة لا تؤثر في الإحصائيات
+        instance._statistic_unchanged = True
+        return
+    instance._previous_statistic_key = DailyStatisticsService.get_stored_key(entity, instance.pk)
+
+
+def update_statistics_on_save(sender, instance, created, raw=False, **kwargs):
+    """تحديث الإحصائيات اليومية بفرق السجل بعد إنشائه أو تعديله"""
+    if raw or getattr(instance, '_statistic_unchanged', False):
+        return
+
+    previous = None if created else getattr(instance, '_previous_statistic_key', None)
+    instance._previous_statistic_key = None
+
+    entity = DailyStatisticsService.get_entity(sender)
+    DailyStatisticsService.record_change(entity, previous, DailyStatisticsService.get_key(entity, instance))
+
+
+def update_statistics_on_delete(sender, instance, **kwargs):
+    """طرح السجل المحذوف من الإحصائيات اليومية"""
+    entity = DailyStatisticsService.get_entity(sender)
+    DailyStatisticsService.record_change(entity, DailyStatisticsService.get_key(entity, instance))
+
+
+for tracked in DailyStatisticsService.TRACKED.values():
+    pre_save.connect(remember_statistic_key, sender=tracked.model)
+    post_save.connect(update_statistics_on_save, sender=tracked.model)
+    post_delete.connect(update_statistics_on_delete, sender=tracked.model)
+
+
+def bump_cache_version(sender, **kwargs):
+    """تغيير إصدار النموذج في الكاش فتُعاد حسابات لوحة التحكم والتقارير المعتمدة عليه"""
+    VersionedCacheService.bump_on_commit(sender)
+
+
+for model in VersionedCacheService.VERSIONED_MODELS:
+    post_save.connect(bump_cache_version, sender=model)
+    post_delete.connect(bump_cache_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Doctor.hospitals.through)
+def bump_doctor_hospitals_version(sender, action, **kwargs):
+    """تغيير مستشفيات الطبيب لا يرسل post_save، فيُغيَّر إصدار الأطباء هنا"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        VersionedCacheService.bump_on_commit(Doctor)
+
+
+def update_search_index_on_save(sender, instance, raw=False, **kwargs):
+    """تحديث كلمات السجل في فهرس البحث (وكلمات الإجازات المرتبطة إذا تغيرت)"""
+    if raw:
+        return
+    SearchIndexService.index_instance(instance)
+
+
+def update_search_index_on_delete(sender, instance, **kwargs):
+    """حذف كلمات السجل المحذوف من فهرس البحث"""
+    SearchIndexService.remove(SearchIndexService.get_entity(sender), instance.pk)
+
+
+for indexed_model, fields in SearchIndexService.FIELDS.values():
+    post_save.connect(update_search_index_on_save, sender=indexed_model)
+    post_delete.connect(update_search_index_on_delete, sender=indexed_model)
@@ -3,17 +3,14 @@ import datetime
 import os
 import re
 from datetime import date
-from io import BytesIO
 
-import qrcode
 from django import template
 from django.conf import settings
 from django.contrib.staticfiles import finders
-from googletrans import Translator
-from hijri_converter import Gregorian
+from django.urls import reverse
 
-# إنشاء كائن المترجم
-translator = Translator()
+from core.services.hijri_service import HijriCalendar
+from core.services.qrcode_service import QRCodeService
 
 register = template.Library()
 
@@ -148,11 +145,8 @@ def hijri_date(value):
                 except ValueError:
                     return value  # إرجاع القيمة الأصلية إذا فشل التحويل
 
-        # تحويل التاريخ الميلادي إلى هجري
-        hijri = Gregorian(value.year, value.month, value.day).to_hijri()
-
-        # إرجاع التاريخ الهجري بتنسيق "يوم-شهر-سنة"
-        return f"{hijri.day:02d}-{hijri.month:02d}-{hijri.year}"
+        # تحويل التاريخ الميلادي إلى هجري من جدول الأيام وإرجاعه بتنسيق "يوم-شهر-سنة"
+        return HijriCalendar.format(value, HijriCalendar.DISPLAY_FORMAT) or value
     except Exception:
         # إرجاع القيمة الأصلية في حالة حدوث أي خطأ
         return value
@@ -167,6 +161,9 @@ def translate_to_english(value):
 
     مثال:
     {{ "مرحبا بالعالم"|translate_to_english }} -> "Hello World"
+
+    لا يستدعي الفلتر خدمة الترجمة أثناء عرض القالب، بل يقرأ من الفهرس الثابت
+    وذاكرة الترجمات فقط، والنصوص غير المترجمة تُسجل لتُترجم لاحقًا.
     """
     if not value:
         return ""
@@ -175,9 +172,9 @@ def translate_to_english(value):
         # التحقق من أن النص يحتوي على أحرف عربية
         arabic_pattern = re.compile(r'[\u0600-\u06FF]+')
         if arabic_pattern.search(str(value)):
-            # ترجمة النص من العربية إلى الإنجليزية
-            translation = translator.translate(str(value), src='ar', dest='en')
-            return translation.text
+            from core.services.translation_service import TranslationMemoService
+            translation = TranslationMemoService.lookup(str(value), src='ar', dest='en')
+            return translation or value
         return value
     except Exception:
         # إرجاع القيمة الأصلية في حالة حدوث أي خطأ
@@ -285,28 +282,13 @@ def generate_qrcode(url, size=200, border=4, fill_color="black", back_color="whi
     - back_color: لون الخلفية (افتراضي: أبيض)
 
     يعيد:
-    - صورة QR code بتنسيق base64 يمكن استخدامها في وسم img
+    - رابط صورة QR code المخزنة مؤقتًا يمكن استخدامه في وسم img
+      (أو صورة بتنسيق base64 إذا تعذر حفظها على القرص)
     """
-    # حساب حجم المربع بناءً على الحجم المطلوب
-    box_size = max(1, int(size / 25))
-
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=box_size,
-        border=border,
-    )
-    qr.add_data(url)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color=fill_color, back_color=back_color)
-
-    # تحويل الصورة إلى base64
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-
-    return f"data:image/png;base64,{img_str}"
+    key, data = QRCodeService.get_or_create(url, size, border, fill_color, back_color)
+    if data is not None:
+        return f"data:image/png;base64,{base64.b64encode(data).decode()}"
+    return reverse('core:qrcode_image', args=[key])
 
 @register.filter(name='format_hijri')
 def format_hijri(value):
@@ -315,6 +297,9 @@ def format_hijri(value):
     """
     if not value:
         return ''
+    # الأعمدة الرقمية (*_hijri_number) لا تحتاج إلى تقسيم النص
+    if isinstance(value, int):
+        return f'{value % 100}-{value // 100 % 100}-{value // 10000}'
     subvalue=value.split('-')
 
     return f'{subvalue[-1]}-{subvalue[1]}-{subvalue[0]}' if subvalue else ''
@@ -4,6 +4,7 @@ Template tags للإعدادات
 from django import template
 from django.utils.safestring import mark_safe
 
+from core.services.export_service import ReportExportService
 from core.services.settings_service import SettingsService
 from core.services.settings_applier import SettingsApplier
 
@@ -197,6 +198,7 @@ def cache_timeout(cache_type='default'):
         'settings': 'cache_timeout_settings',
         'reports': 'cache_timeout_reports',
         'statistics': 'cache_timeout_statistics',
+        'typeahead': 'cache_timeout_typeahead',
     }
     
     setting_key = timeout_map.get(cache_type, 'cache_timeout_default')
@@ -229,10 +231,16 @@ def export_formats():
     return formats.split(',') if formats else ['xlsx']
 
 
+@register.simple_tag
+def report_export_formats():
+    """صيغ تصدير التقارير المتاحة (XLSX فقط عند تثبيت openpyxl)"""
+    return ReportExportService.filter_formats(export_formats())
+
+
 @register.simple_tag
 def default_export_format():
     """الحصول على صيغة التصدير الافتراضية"""
-    return SettingsService.get_setting('default_export_format', 'xlsx')
+    return ReportExportService.get_default_format(SettingsService.get_setting('default_export_format', 'xlsx'))
 
 
 @register.filter
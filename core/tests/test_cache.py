@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Client, LeaveInvoice, User
+from core.services.cache_service import VersionedCacheService
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'versioned-cache-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VersionedCacheTest(TestCase):
+    """اختبارات كاش لوحة التحكم والتقارير"""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        self.create_invoice("INV-001", Decimal("300.00"))
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_invoice(self, invoice_number, amount):
+        return LeaveInvoice.objects.create(invoice_number=invoice_number, client=self.client_obj,
+                                           leave_type="sick_leave", leave_id=invoice_number, amount=amount,
+                                           status="unpaid", issue_date=date.today())
+
+    def get_report(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:report_invoices'), params or {})
+        invoice_queries = [query for query in queries.captured_queries if 'core_leaveinvoice' in query['sql']]
+        return response, invoice_queries
+
+    def test_repeated_report_is_served_from_cache(self):
+        """اختبار عدم تنفيذ استعلامات إحصائيات التقرير عند تكرار نفس الطلب"""
+        response, queries = self.get_report()
+        self.assertTrue(queries)
+        self.assertEqual(response.context['total_amount'], Decimal("300.00"))
+
+        # من الكاش تأتي الإحصائيات، ويبقى استعلام صفوف الصفحة فقط
+        response, queries = self.get_report()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['total_amount'], Decimal("300.00"))
+
+        # معلمات مختلفة تعني نتيجة مختلفة
+        response, queries = self.get_report({'status': 'paid'})
+        self.assertTrue(queries)
+        self.assertEqual(response.context['total_count'], 0)
+
+    def test_write_invalidates_report(self):
+        """اختبار تحديث التقرير بعد حفظ أو حذف فاتورة"""
+        self.get_report()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = self.create_invoice("INV-002", Decimal("200.00"))
+        response, queries = self.get_report()
+        self.assertTrue(queries)
+        self.assertEqual(response.context['total_amount'], Decimal("500.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.delete()
+        response, queries = self.get_report()
+        self.assertEqual(response.context['total_amount'], Decimal("300.00"))
+
+    def test_dashboard_is_cached(self):
+        """اختبار تخزين إحصائيات لوحة التحكم في الكاش وإلغائها عند الكتابة"""
+        self.client.get(reverse('core:home'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:home'))
+        self.assertFalse(any('core_dailystatistic' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.context['stats']['invoices_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_invoice("INV-002", Decimal("200.00"))
+        response = self.client.get(reverse('core:home'))
+        self.assertEqual(response.context['stats']['invoices_count'], 2)
+
+    def test_versions(self):
+        """اختبار إنشاء الإصدارات وتغييرها"""
+        first = VersionedCacheService.get_versions([LeaveInvoice, Client])
+        self.assertEqual(VersionedCacheService.get_versions([LeaveInvoice, Client]), first)
+
+        VersionedCacheService.bump(LeaveInvoice)
+        second = VersionedCacheService.get_versions([LeaveInvoice, Client])
+        self.assertNotEqual(second[0], first[0])
+        self.assertEqual(second[1], first[1])
+
+        self.assertEqual(
+            VersionedCacheService.make_key('report', [Client], {'b': '2', 'a': '1'}),
+            VersionedCacheService.make_key('report', [Client], {'a': '1', 'b': '2'}),
+        )
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Client, Hospital, LeaveInvoice, Patient, SickLeave, User
+from core.services.count_service import CountService
+
+
+class CountServiceTest(TestCase):
+    """اختبارات خدمة العدّ"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        for index in range(5):
+            LeaveInvoice.objects.create(invoice_number=f"INV-{index}", client=self.client_obj,
+                                        leave_type="sick_leave", leave_id=f"SL-{index}",
+                                        amount=Decimal("100.00"), status="paid" if index < 2 else "unpaid",
+                                        issue_date=self.today)
+        for index in range(3):
+            SickLeave.objects.create(
+                leave_id=f"PSL00{index}", patient=self.patient, hospital=self.hospital,
+                start_date=self.today - timedelta(days=10 * index),
+                end_date=self.today - timedelta(days=10 * index - 2), issue_date=self.today,
+            )
+
+    def count_queries(self, table, callback):
+        with CaptureQueriesContext(connection) as queries:
+            result = callback()
+        return result, [query['sql'] for query in queries.captured_queries if table in query['sql']]
+
+    def test_unfiltered_count_reads_counters(self):
+        """اختبار عدّ الجدول الكامل من جدول الإحصائيات اليومية بدون COUNT على الجدول"""
+        total, queries = self.count_queries('core_leaveinvoice', lambda: CountService.count(LeaveInvoice.objects.all()))
+
+        self.assertEqual(total, 5)
+        self.assertEqual(queries, [])
+        self.assertEqual(CountService.count(Client.objects.with_balances()), 1)
+
+    def test_filtered_count_is_bounded(self):
+        """اختبار العدّ المحدود للاستعلامات المصفاة"""
+        unpaid = LeaveInvoice.objects.filter(status='unpaid')
+        total, queries = self.count_queries('core_leaveinvoice', lambda: CountService.count(unpaid))
+        self.assertEqual(total, 3)
+        self.assertIn('LIMIT', queries[0])
+
+        # بعد الحد بدون خطة تنفيذ (SQLite) يُستخدم العدد الفعلي
+        self.assertEqual(CountService.count(unpaid, threshold=2), 3)
+
+    def test_status_counts(self):
+        """اختبار عدد الإجازات لكل حالة من العدادات ومن الاستعلام المصفى"""
+        expected = SickLeave.objects.status_counts()
+        counts, queries = self.count_queries('core_sickleave', lambda: CountService.status_counts(SickLeave.objects.all()))
+
+        self.assertEqual(counts, expected)
+        self.assertEqual(queries, [])
+        self.assertEqual(counts['total'], 3)
+
+        filtered = SickLeave.objects.filter(leave_id='PSL000')
+        self.assertEqual(CountService.status_counts(filtered)['total'], 1)
+
+    def test_sick_leave_list_uses_counters(self):
+        """اختبار عدم تنفيذ COUNT على جدول الإجازات في قائمة الإجازات بدون فلاتر"""
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:sick_leave_list'))
+
+        self.assertEqual(response.context['status_counts']['total'], 3)
+        self.assertFalse(any('COUNT(' in query['sql'] and 'core_sickleave' in query['sql']
+                             for query in queries.captured_queries))
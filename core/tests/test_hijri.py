@@ -0,0 +1,157 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from hijri_converter import Gregorian
+
+from core.models import Hospital, Patient, SickLeave
+from core.services.hijri_service import HijriCalendar
+from core.templatetags.core_extras import hijri_date
+from core.utils import convert_to_hijri
+
+
+class HijriCalendarTest(SimpleTestCase):
+    """اختبارات جدول التحويل الهجري"""
+
+    def test_matches_hijri_converter(self):
+        """اختبار تطابق الجدول مع hijri_converter في كامل النطاق"""
+        first, last = HijriCalendar.get_range()
+        self.assertEqual((first, last), (date(1924, 8, 1), date(2077, 11, 16)))
+
+        day = first
+        while day <= last:
+            hijri = Gregorian(day.year, day.month, day.day).to_hijri()
+            self.assertEqual(HijriCalendar.to_hijri(day), (hijri.year, hijri.month, hijri.day))
+            day += timedelta(days=37)
+
+    def test_formats(self):
+        """اختبار تنسيقات الحفظ والعرض"""
+        self.assertEqual(HijriCalendar.to_hijri_number(date(2025, 5, 18)), 14461120)
+        self.assertEqual(HijriCalendar.format(date(2025, 5, 18)), '1446-11-20')
+        self.assertEqual(HijriCalendar.format(datetime(2023, 1, 1, 10, 30), HijriCalendar.DISPLAY_FORMAT),
+                         '08-06-1444')
+        self.assertEqual(convert_to_hijri(date(2025, 5, 18)), '1446-11-20')
+        self.assertEqual(hijri_date('2023-01-01'), '08-06-1444')
+
+    def test_out_of_range_and_empty(self):
+        """اختبار التواريخ الفارغة وخارج النطاق"""
+        self.assertIsNone(HijriCalendar.to_hijri(None))
+        self.assertIsNone(HijriCalendar.to_hijri(date(1900, 1, 1)))
+        self.assertEqual(HijriCalendar.format(date(2100, 1, 1)), '')
+        self.assertEqual(convert_to_hijri(None), '')
+
+    def test_to_hijri_many(self):
+        """اختبار تحويل عمود كامل من التواريخ"""
+        values = [date(2025, 5, 18), None, date(1900, 1, 1), datetime(2023, 1, 1)]
+
+        self.assertEqual(HijriCalendar.to_hijri_many(values), [14461120, None, None, 14440608])
+        self.assertEqual(HijriCalendar.to_hijri_many(values, HijriCalendar.STORAGE_FORMAT),
+                         ['1446-11-20', '', '', '1444-6-8'])
+
+
+class LeaveHijriDatesTest(TestCase):
+    """اختبارات تعبئة التواريخ الهجرية في الإجازات"""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+
+    def create_sick_leave(self, leave_id, **kwargs):
+        return SickLeave.objects.create(leave_id=leave_id, patient=self.patient, hospital=self.hospital,
+                                        start_date=date(2025, 5, 18), end_date=date(2025, 5, 20),
+                                        issue_date=date(2025, 5, 18), **kwargs)
+
+    def test_save_fills_hijri_dates(self):
+        """اختبار تعبئة الحقول الهجرية عند الحفظ"""
+        leave = self.create_sick_leave('PSL001')
+
+        self.assertEqual(leave.start_date_hijri, '1446-11-20')
+        self.assertEqual(leave.end_date_hijri, '1446-11-22')
+        self.assertIsNone(leave.admission_date_hijri)
+
+    def test_backfill_command(self):
+        """اختبار أمر تعبئة التواريخ الهجرية الفارغة"""
+        leave = self.create_sick_leave('PSL001', admission_date=date(2025, 5, 17))
+        SickLeave.objects.filter(pk=leave.pk).update(start_date_hijri='', admission_date_hijri=None)
+
+        call_command('backfill_hijri_dates', stdout=StringIO())
+
+        leave.refresh_from_db()
+        self.assertEqual(leave.start_date_hijri, '1446-11-20')
+        self.assertEqual(leave.admission_date_hijri, '1446-11-19')
+        self.assertEqual(leave.end_date_hijri, '1446-11-22')
+
+
+class HijriQueryTest(TestCase):
+    """اختبارات الأعمدة الهجرية الرقمية والتصفية بالشهر والسنة الهجريين"""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        # 1446-11-20 و 1446-11-29 و 1446-12-01 و 1445-11-20
+        self.leaves = [
+            self.create_sick_leave('PSL001', date(2025, 5, 18)),
+            self.create_sick_leave('PSL002', date(2025, 5, 27)),
+            self.create_sick_leave('PSL003', date(2025, 5, 28)),
+            self.create_sick_leave('PSL004', date(2024, 5, 28)),
+        ]
+
+    def create_sick_leave(self, leave_id, start_date):
+        return SickLeave.objects.create(leave_id=leave_id, patient=self.patient, hospital=self.hospital,
+                                        start_date=start_date, end_date=start_date + timedelta(days=2),
+                                        issue_date=start_date)
+
+    def test_number_fields_are_filled_on_save(self):
+        """اختبار تعبئة الأعمدة الرقمية عند الحفظ وتحديثها عند تغيير التاريخ"""
+        leave = self.leaves[0]
+        self.assertEqual(leave.start_date_hijri_number, 14461120)
+        self.assertEqual(leave.end_date_hijri_number, 14461122)
+
+        leave.start_date = date(2025, 5, 19)
+        leave.save()
+        self.assertEqual(SickLeave.objects.get(pk=leave.pk).start_date_hijri_number, 14461121)
+
+    def test_filter_by_hijri_month_and_year(self):
+        """اختبار التصفية بالشهر والسنة الهجريين"""
+        self.assertEqual(set(SickLeave.objects.hijri_month(1446, 11).values_list('leave_id', flat=True)),
+                         {'PSL001', 'PSL002'})
+        self.assertEqual(SickLeave.objects.hijri_year(1446).count(), 3)
+        self.assertEqual(SickLeave.objects.filter_hijri('1446', '12').get().leave_id, 'PSL003')
+        # القيم غير الصحيحة يتم تجاهلها
+        self.assertEqual(SickLeave.objects.filter_hijri('abc', '').count(), 4)
+
+    def test_count_by_hijri_month(self):
+        """اختبار التجميع حسب الشهر الهجري في قاعدة البيانات"""
+        stats = list(SickLeave.objects.count_by_hijri_month())
+
+        self.assertEqual(stats, [
+            {'hijri_month': 144612, 'count': 1},
+            {'hijri_month': 144611, 'count': 2},
+            {'hijri_month': 144511, 'count': 1},
+        ])
+        self.assertEqual(HijriCalendar.month_label(144611), 'ذو القعدة 1446')
+
+    def test_backfill_number_fields(self):
+        """اختبار تعبئة الأعمدة الرقمية للصفوف القديمة"""
+        SickLeave.objects.update(start_date_hijri_number=None, issue_date_hijri_number=None)
+
+        call_command('backfill_hijri_dates', '--batch-size', '3', stdout=StringIO())
+
+        self.assertFalse(SickLeave.objects.filter(start_date_hijri_number__isnull=True).exists())
+        self.assertEqual(SickLeave.objects.hijri_month(1446, 11, field='issue_date').count(), 2)
+
+    def test_list_and_report_filters(self):
+        """اختبار فلتر الشهر الهجري في قائمة الإجازات وتقريرها"""
+        from django.urls import reverse
+
+        from core.models import User
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        response = self.client.get(reverse('core:sick_leave_list'), {'hijri_year': '1446', 'hijri_month': '11'})
+        self.assertEqual({leave.leave_id for leave in response.context['sick_leaves']}, {'PSL001', 'PSL002'})
+
+        response = self.client.get(reverse('core:report_sick_leaves'), {'hijri_year': '1446'})
+        self.assertEqual(response.context['total_leaves'], 3)
+        self.assertEqual(response.context['hijri_month_stats'][0]['label'], 'ذو الحجة 1446')
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.test import TestCase
+
+from core.models import (CompanionLeave, Doctor, LeaveInvoice, Patient,
+                         Payment, SickLeave)
+
+
+class ListIndexesTest(TestCase):
+    """اختبارات استخدام الفهارس في استعلامات القوائم والتوزيع (من خطة التنفيذ)"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} غير مستخدم في:\n{plan}")
+
+    def test_leave_list_queries(self):
+        """اختبار صفحات الإجازات: الترتيب الافتراضي وفلتر الحالة وترتيب التواريخ وتحديث الحالات"""
+        for model, prefix in ((SickLeave, 'sick_leave'), (CompanionLeave, 'companion_leave')):
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(model.objects.order_by('-created_at', '-id')[:10], f'{prefix}_created_idx')
+                self.assertUsesIndex(
+                    model.objects.filter(status='active').order_by('-created_at')[:10], f'{prefix}_status_idx'
+                )
+                self.assertUsesIndex(model.objects.order_by('-start_date', '-id')[:10], f'{prefix}_start_idx')
+                self.assertUsesIndex(
+                    model.objects.filter(end_date__lt=date.today()).exclude(status__in=['cancelled', 'expired']),
+                    f'{prefix}_end_idx',
+                )
+
+    def test_invoice_queries(self):
+        """اختبار استعلامات الفواتير: التوزيع على الأقدم وفواتير الإجازة وترتيب تاريخ الإصدار"""
+        self.assertUsesIndex(
+            LeaveInvoice.objects.filter(
+                client_id__in=[1, 2], status__in=['unpaid', 'partially_paid'], remaining_amount__gt=0,
+            ).order_by('client_id', 'issue_date', 'id'),
+            'invoice_allocation_idx',
+        )
+        self.assertUsesIndex(LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id='PSL001'),
+                             'invoice_leave_idx')
+        self.assertUsesIndex(LeaveInvoice.objects.order_by('-issue_date', '-id')[:10], 'invoice_issue_date_idx')
+        self.assertUsesIndex(LeaveInvoice.objects.filter(status='unpaid').order_by('-issue_date', '-id')[:10],
+                             'invoice_status_issue_idx')
+        self.assertUsesIndex(LeaveInvoice.objects.order_by('-created_at', '-id')[:10], 'invoice_created_idx')
+
+    def test_payment_queries(self):
+        """اختبار ترتيب الدفعات حسب التاريخ ودفعات العميل"""
+        self.assertUsesIndex(Payment.objects.order_by('-payment_date', '-id')[:10], 'payment_date_idx')
+        self.assertUsesIndex(Payment.objects.filter(client_id=1).order_by('-payment_date'),
+                             'payment_client_date_idx')
+
+    def test_national_id_lookups(self):
+        """اختبار البحث برقم الهوية للطبيب والمريض"""
+        self.assertUsesIndex(Doctor.objects.filter(national_id='1234567890'), 'doctor_national_id_idx')
+        # رقم هوية المريض فريد، فيُستخدم فهرس القيد الفريد
+        self.assertNotIn('SCAN', Patient.objects.filter(national_id='1234567890').explain())
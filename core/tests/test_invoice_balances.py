@@ -0,0 +1,112 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import Client, LeaveInvoice, Payment, PaymentDetail
+from core.services.invoice_balance_service import InvoiceBalanceService
+
+
+class InvoiceBalanceTest(TestCase):
+    """اختبارات المبالغ المدفوعة والمتبقية المخزنة في الفواتير"""
+
+    def setUp(self):
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        self.invoice = self.create_invoice("INV-001", Decimal("1000.00"))
+        self.other_invoice = self.create_invoice("INV-002", Decimal("500.00"))
+        self.payment = Payment.objects.create(payment_number="PAY-001", client=self.client_obj,
+                                              amount=Decimal("900.00"), payment_method="cash",
+                                              payment_date=date.today())
+
+    def create_invoice(self, invoice_number, amount):
+        return LeaveInvoice.objects.create(invoice_number=invoice_number, client=self.client_obj,
+                                           leave_type="sick_leave", leave_id=invoice_number, amount=amount)
+
+    def assertStoredTotals(self, invoice, paid, remaining):
+        invoice = LeaveInvoice.objects.get(pk=invoice.pk)
+        self.assertEqual(invoice.paid_amount, Decimal(paid))
+        self.assertEqual(invoice.remaining_amount, Decimal(remaining))
+
+    def test_new_invoice_totals(self):
+        """اختبار القيم الأولية للفاتورة الجديدة"""
+        self.assertStoredTotals(self.invoice, "0", "1000.00")
+
+    def test_payment_detail_create_update_delete(self):
+        """اختبار تحديث المجاميع عند إنشاء وتعديل وحذف تفصيل الدفع"""
+        detail = PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("600.00"))
+        self.assertStoredTotals(self.invoice, "600.00", "400.00")
+        # نسخة الفاتورة المرتبطة بالتفصيل تُحدَّث في الذاكرة أيضًا
+        self.assertEqual(self.invoice.get_remaining(), Decimal("400.00"))
+
+        detail.amount = Decimal("700.00")
+        detail.save()
+        self.assertStoredTotals(self.invoice, "700.00", "300.00")
+
+        # نقل التفصيل إلى فاتورة أخرى
+        detail = PaymentDetail.objects.get(pk=detail.pk)
+        detail.invoice = self.other_invoice
+        detail.amount = Decimal("200.00")
+        detail.save()
+        self.assertStoredTotals(self.invoice, "0", "1000.00")
+        self.assertStoredTotals(self.other_invoice, "200.00", "300.00")
+
+        detail.delete()
+        self.assertStoredTotals(self.other_invoice, "0", "500.00")
+
+    def test_cascade_delete_of_payment(self):
+        """اختبار طرح المبالغ عند حذف الدفعة بما فيها من تفاصيل"""
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("600.00"))
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.other_invoice, amount=Decimal("300.00"))
+
+        self.payment.delete()
+
+        self.assertStoredTotals(self.invoice, "0", "1000.00")
+        self.assertStoredTotals(self.other_invoice, "0", "500.00")
+
+    def test_stale_invoice_save_keeps_totals(self):
+        """اختبار أن حفظ نسخة قديمة من الفاتورة لا يلغي المبالغ المدفوعة"""
+        stale_invoice = LeaveInvoice.objects.get(pk=self.invoice.pk)
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("600.00"))
+
+        stale_invoice.notes = "ملاحظة"
+        stale_invoice.save()
+        self.assertStoredTotals(self.invoice, "600.00", "400.00")
+
+        # تغيير مبلغ الفاتورة يعيد حساب المتبقي
+        stale_invoice.amount = Decimal("800.00")
+        stale_invoice.save()
+        self.assertEqual(stale_invoice.remaining_amount, Decimal("200.00"))
+        self.assertStoredTotals(self.invoice, "600.00", "200.00")
+
+    def test_update_status_uses_stored_totals(self):
+        """اختبار تحديث الحالة من المبلغ المدفوع المخزن"""
+        invoice = LeaveInvoice.objects.get(pk=self.invoice.pk)
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("1000.00"))
+
+        self.assertEqual(invoice.update_status(), "paid")
+        self.assertEqual(LeaveInvoice.objects.get(pk=self.invoice.pk).status, "paid")
+
+    def test_filter_and_sort_by_remaining_amount(self):
+        """اختبار الفلترة والترتيب حسب المبلغ المتبقي"""
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("900.00"))
+
+        outstanding = LeaveInvoice.objects.filter(remaining_amount__gt=0).order_by('-remaining_amount')
+        self.assertEqual(list(outstanding), [self.other_invoice, self.invoice])
+        self.assertEqual(InvoiceBalanceService.get_outstanding_total(), Decimal("600.00"))
+
+    def test_recompute_command(self):
+        """اختبار اكتشاف وتصحيح المجاميع غير المطابقة"""
+        PaymentDetail.objects.create(payment=self.payment, invoice=self.invoice, amount=Decimal("600.00"))
+        # تحديث مباشر يتجاوز الإشارات
+        PaymentDetail.objects.update(amount=Decimal("650.00"))
+
+        out = StringIO()
+        call_command('recompute_invoice_balances', '--verify', stdout=out)
+        self.assertIn("INV-001", out.getvalue())
+        self.assertStoredTotals(self.invoice, "600.00", "400.00")
+
+        call_command('recompute_invoice_balances', stdout=StringIO())
+        self.assertStoredTotals(self.invoice, "650.00", "350.00")
+        self.assertFalse(InvoiceBalanceService.find_mismatches().exists())
@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import (Client, CompanionLeave, Doctor, Hospital, LeaveInvoice,
+                         Patient, SickLeave, User)
+from core.services.invoice_leave_service import InvoiceLeaveService
+
+
+class InvoiceLeaveTestCase(TestCase):
+    """بيانات مشتركة لاختبارات ربط الفواتير بالإجازات"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار")
+        self.doctor = Doctor.objects.create(name="د. أحمد", national_id="1000000001")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد")
+        self.companion = Patient.objects.create(national_id="1234567891", name="علي")
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        self.sick_leave = self.create_sick_leave("PSL001")
+        self.companion_leave = CompanionLeave.objects.create(
+            leave_id="PCL001", patient=self.patient, companion=self.companion, doctor=self.doctor,
+            hospital=self.hospital, start_date=self.today, end_date=self.today + timedelta(days=2), issue_date=self.today,
+        )
+
+    def create_sick_leave(self, leave_id):
+        return SickLeave.objects.create(
+            leave_id=leave_id, patient=self.patient, doctor=self.doctor, hospital=self.hospital,
+            start_date=self.today, end_date=self.today + timedelta(days=2), issue_date=self.today,
+        )
+
+    def create_invoice(self, number, leave_type, leave_id, **kwargs):
+        return LeaveInvoice.objects.create(
+            invoice_number=number, client=self.client_obj, leave_type=leave_type, leave_id=leave_id,
+            amount=Decimal("100.00"), **kwargs
+        )
+
+
+class InvoiceLeaveLinkTest(InvoiceLeaveTestCase):
+    """اختبارات ربط فواتير الإجازات بالإجازات بالمفتاح الأجنبي"""
+
+    def test_invoice_is_linked_on_save(self):
+        """اختبار ربط الفاتورة بإجازتها عند الإنشاء وعند تغيير رقم الإجازة"""
+        invoice = self.create_invoice("INV-1", "sick_leave", "PSL001")
+        self.assertEqual(invoice.sick_leave, self.sick_leave)
+        self.assertEqual(invoice.leave, self.sick_leave)
+
+        invoice = LeaveInvoice.objects.get(pk=invoice.pk)
+        invoice.leave_type = "companion_leave"
+        invoice.leave_id = "PCL001"
+        invoice.save()
+        invoice.refresh_from_db()
+        self.assertIsNone(invoice.sick_leave_id)
+        self.assertEqual(invoice.companion_leave, self.companion_leave)
+
+    def test_saving_unchanged_invoice_does_not_look_up_leave(self):
+        """اختبار عدم البحث عن الإجازة عند حفظ فاتورة لم يتغير رقم إجازتها"""
+        invoice = LeaveInvoice.objects.get(pk=self.create_invoice("INV-1", "sick_leave", "PSL001").pk)
+        invoice.notes = "ملاحظة"
+
+        with CaptureQueriesContext(connection) as queries:
+            invoice.save()
+        self.assertFalse(any('core_sickleave' in query['sql'] for query in queries.captured_queries))
+
+    def test_leave_links_existing_invoices_and_updates_leave_id(self):
+        """اختبار ربط الفواتير المنشأة قبل الإجازة وتحديث رقم الإجازة فيها"""
+        invoice = self.create_invoice("INV-1", "sick_leave", "PSL002")
+        self.assertIsNone(invoice.sick_leave_id)
+
+        sick_leave = self.create_sick_leave("PSL002")
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.sick_leave, sick_leave)
+
+        sick_leave = SickLeave.objects.get(pk=sick_leave.pk)
+        sick_leave.leave_id = "PSL003"
+        sick_leave.save()
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.leave_id, "PSL003")
+        self.assertEqual(invoice.sick_leave, sick_leave)
+
+    def test_backfill_command_links_in_batches(self):
+        """اختبار ربط الفواتير القديمة على دفعات"""
+        for index in range(3):
+            self.create_invoice(f"INV-S{index}", "sick_leave", "PSL001")
+        self.create_invoice("INV-C", "companion_leave", "PCL001")
+        self.create_invoice("INV-X", "sick_leave", "PSL999")
+        LeaveInvoice.objects.update(sick_leave=None, companion_leave=None)
+
+        results = InvoiceLeaveService.link(batch_size=2, dry_run=True)
+        self.assertEqual(results['sick_leave'], {'linked': 3, 'missing': 1})
+        self.assertFalse(LeaveInvoice.objects.filter(sick_leave__isnull=False).exists())
+
+        call_command('link_invoice_leaves', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(self.sick_leave.leave_invoices.count(), 3)
+        self.assertEqual(self.companion_leave.leave_invoices.get().invoice_number, "INV-C")
+        self.assertIsNone(LeaveInvoice.objects.get(invoice_number="INV-X").sick_leave_id)
+
+
+class InvoiceLeavePagesTest(InvoiceLeaveTestCase):
+    """اختبارات صفحات الفاتورة والإجازة باستخدام الربط"""
+
+    def setUp(self):
+        super().setUp()
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_invoice_detail_reads_leave_in_one_query(self):
+        """اختبار جلب الفاتورة وإجازتها ومريضها ومرافقها وطبيبها في استعلام واحد"""
+        invoice = self.create_invoice("INV-1", "companion_leave", "PCL001")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:leave_invoice_detail', args=[invoice.pk]))
+        leave_info = response.context['leave_info']
+        self.assertEqual(leave_info['leave'], self.companion_leave)
+        self.assertEqual(leave_info['companion'], self.companion)
+        self.assertFalse(any(
+            table in query['sql'] for query in queries.captured_queries
+            for table in ('"core_companionleave"', '"core_patient"', '"core_doctor"')
+            if 'core_leaveinvoice' not in query['sql']
+        ))
+
+    def test_leave_detail_totals(self):
+        """اختبار مجاميع فواتير الإجازة في صفحة تفاصيلها"""
+        self.create_invoice("INV-1", "sick_leave", "PSL001")
+        self.create_invoice("INV-2", "sick_leave", "PSL001")
+        LeaveInvoice.objects.filter(invoice_number="INV-1").update(paid_amount=Decimal("40.00"))
+
+        response = self.client.get(reverse('core:sick_leave_detail', args=[self.sick_leave.pk]))
+        self.assertEqual(len(response.context['related_invoices']), 2)
+        self.assertEqual(response.context['total_invoices_amount'], Decimal("200.00"))
+        self.assertEqual(response.context['remaining_amount'], Decimal("160.00"))
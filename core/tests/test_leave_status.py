@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import (CompanionLeave, Hospital, Patient, SickLeave,
+                         TranslationJob, User)
+from core.services.leave_status_service import LeaveStatusService
+
+
+class LeaveStatusServiceTest(TestCase):
+    """اختبارات التحديث الجماعي لحالات الإجازات"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        self.companion = Patient.objects.create(national_id="0987654321", name="أحمد", name_en="Ahmed")
+
+        self.past_leave = self.create_sick_leave('PSL001', self.today - timedelta(days=10), self.today - timedelta(days=1))
+        self.current_leave = self.create_sick_leave('PSL002', self.today - timedelta(days=1), self.today + timedelta(days=1))
+        self.cancelled_leave = self.create_sick_leave('PSL003', self.today - timedelta(days=10), self.today - timedelta(days=5))
+        self.companion_leave = CompanionLeave.objects.create(
+            leave_id='PSL004', patient=self.patient, companion=self.companion, hospital=self.hospital,
+            start_date=self.today - timedelta(days=5), end_date=self.today - timedelta(days=2),
+            issue_date=self.today,
+        )
+
+        # حالات قديمة كما لو لم يتم تحديثها منذ فترة
+        SickLeave.objects.filter(pk=self.past_leave.pk).update(status='active')
+        SickLeave.objects.filter(pk=self.current_leave.pk).update(status='expired')
+        SickLeave.objects.filter(pk=self.cancelled_leave.pk).update(status='cancelled')
+        CompanionLeave.objects.filter(pk=self.companion_leave.pk).update(status=None)
+        TranslationJob.objects.all().delete()
+
+    def create_sick_leave(self, leave_id, start_date, end_date):
+        return SickLeave.objects.create(
+            leave_id=leave_id, patient=self.patient, hospital=self.hospital,
+            start_date=start_date, end_date=end_date, issue_date=self.today,
+        )
+
+    def test_update_all(self):
+        """اختبار انتهاء وإعادة تنشيط الإجازات مع تجاهل الإجازات الملغية"""
+        with CaptureQueriesContext(connection) as queries:
+            results = LeaveStatusService.update_all()
+
+        # استعلاما UPDATE لكل نوع إجازة بدلاً من حفظ كل إجازة
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE') and 'core_dailystatistic' not in query['sql']]
+        self.assertEqual(len(updates), 4)
+
+        self.assertEqual(results['sick_expired'], 1)
+        self.assertEqual(results['sick_reactivated'], 1)
+        self.assertEqual(results['companion_expired'], 1)
+        self.assertEqual(results['total'], 3)
+
+        self.assertEqual(SickLeave.objects.get(pk=self.past_leave.pk).status, 'expired')
+        self.assertEqual(SickLeave.objects.get(pk=self.current_leave.pk).status, 'active')
+        self.assertEqual(SickLeave.objects.get(pk=self.cancelled_leave.pk).status, 'cancelled')
+        self.assertEqual(CompanionLeave.objects.get(pk=self.companion_leave.pk).status, 'expired')
+
+        # لا تُنفذ عمليات الحفظ الكاملة (مثل جدولة الترجمة)
+        self.assertFalse(TranslationJob.objects.exists())
+
+    def test_dry_run(self):
+        """اختبار عدم تعديل البيانات في وضع المعاينة"""
+        results = LeaveStatusService.update_all(dry_run=True)
+
+        self.assertEqual(results['total'], 3)
+        self.assertEqual(SickLeave.objects.get(pk=self.past_leave.pk).status, 'active')
+
+    def test_second_run_changes_nothing(self):
+        """اختبار أن التشغيل الثاني لا يغير شيئًا"""
+        LeaveStatusService.update_all()
+        self.assertEqual(LeaveStatusService.update_all()['total'], 0)
+
+    def test_update_all_leaves_status_view(self):
+        """اختبار صفحة تحديث حالات الإجازات"""
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        response = self.client.get(reverse('core:update_all_leaves_status'))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(SickLeave.objects.get(pk=self.past_leave.pk).status, 'expired')
@@ -257,6 +257,51 @@ class ClientModelTest(TestCase):
         # التحقق من أن الرصيد هو 1000 فقط (الفاتورة الملغاة لا تدخل في الحساب)
         self.assertEqual(self.client_obj.get_balance(), Decimal("1000.00"))
 
+    def test_with_balances(self):
+        """اختبار حساب الأرصدة لجميع العملاء في استعلام واحد"""
+        other_client = Client.objects.create(name="عميل آخر", phone="0598765432")
+        LeaveInvoice.objects.create(
+            invoice_number="INV-20230101-001",
+            client=self.client_obj,
+            leave_type="sick_leave",
+            leave_id="SL-20230101-001",
+            amount=Decimal("1000.00"),
+            status="unpaid",
+            issue_date=date.today(),
+            due_date=date.today() + timedelta(days=30)
+        )
+        LeaveInvoice.objects.create(
+            invoice_number="INV-20230101-002",
+            client=self.client_obj,
+            leave_type="sick_leave",
+            leave_id="SL-20230101-002",
+            amount=Decimal("500.00"),
+            status="cancelled",
+            issue_date=date.today(),
+            due_date=date.today() + timedelta(days=30)
+        )
+        Payment.objects.create(
+            payment_number="PAY-20230101-001",
+            client=self.client_obj,
+            amount=Decimal("300.00"),
+            payment_method="cash",
+            payment_date=date.today()
+        )
+
+        with self.assertNumQueries(1):
+            clients = {client.id: client for client in Client.objects.with_balances(status_counts=True)}
+            client = clients[self.client_obj.id]
+            self.assertEqual(client.invoices_count, 1)
+            self.assertEqual(client.invoices_total, Decimal("1000.00"))
+            self.assertEqual(client.payments_count, 1)
+            self.assertEqual(client.balance, Decimal("700.00"))
+            self.assertEqual(client.unpaid_invoices, 1)
+            self.assertEqual(client.get_balance(), Decimal("700.00"))
+            self.assertEqual(clients[other_client.id].balance, 0)
+
+        # الرصيد المحسوب يطابق get_balance
+        self.assertEqual(self.client_obj.get_balance(), Decimal("700.00"))
+
 
 class LeavePriceModelTest(TestCase):
     """اختبارات نموذج سعر الإجازة"""
@@ -570,6 +615,44 @@ class LeaveInvoiceModelTest(TestCase):
         self.assertEqual(self.invoice.get_total_paid(), Decimal("600.00"))
         self.assertEqual(self.invoice.get_remaining(), Decimal("400.00"))
 
+    def test_with_paid_amounts_and_totals(self):
+        """اختبار حساب المدفوع والمتبقي لكل فاتورة والإجماليات الدقيقة"""
+        second_invoice = LeaveInvoice.objects.create(
+            invoice_number="INV-20230101-002",
+            client=self.client_obj,
+            leave_type="companion_leave",
+            leave_id="CL-20230101-001",
+            amount=Decimal("500.00"),
+            status="unpaid",
+            issue_date=date.today(),
+            due_date=date.today() + timedelta(days=30)
+        )
+        payment = Payment.objects.create(
+            payment_number="PAY-20230101-001",
+            client=self.client_obj,
+            amount=Decimal("700.00"),
+            payment_method="cash",
+            payment_date=date.today()
+        )
+        PaymentDetail.objects.create(payment=payment, invoice=self.invoice, amount=Decimal("600.00"))
+        PaymentDetail.objects.create(payment=payment, invoice=second_invoice, amount=Decimal("100.00"))
+
+        with self.assertNumQueries(1):
+            invoices = {invoice.pk: invoice for invoice in LeaveInvoice.objects.with_paid_amounts()}
+            self.assertEqual(invoices[self.invoice.pk].get_total_paid(), Decimal("600.00"))
+            self.assertEqual(invoices[self.invoice.pk].get_remaining(), Decimal("400.00"))
+            self.assertEqual(invoices[second_invoice.pk].remaining_total, Decimal("400.00"))
+
+        with self.assertNumQueries(2):
+            totals = LeaveInvoice.objects.filter(client=self.client_obj).totals()
+
+        self.assertEqual(totals['count'], 2)
+        self.assertEqual(totals['total_amount'], Decimal("1500.00"))
+        self.assertEqual(totals['total_paid'], Decimal("700.00"))
+        self.assertEqual(totals['total_remaining'], Decimal("800.00"))
+        self.assertEqual(LeaveInvoice.objects.filter(leave_type="companion_leave").totals()['total_paid'],
+                         Decimal("100.00"))
+
     def test_update_status(self):
         """اختبار تحديث حالة الفاتورة"""
         # التحقق من أن الحالة الأولية هي "غير مدفوعة"
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Client, LeaveInvoice, NumberSequence, Payment, User
+from core.services.numbering_service import NumberSequenceService
+from core.utils import (generate_invoice_number, generate_payment_number,
+                        generate_sick_leave_id, generate_unique_number)
+
+
+@override_settings(NUMBER_SEQUENCE_BLOCK_SIZE=5)
+class NumberSequenceServiceTest(TestCase):
+    """اختبارات ترقيم الإجازات والفواتير والمدفوعات بالتسلسل"""
+
+    def setUp(self):
+        NumberSequenceService.clear_local()
+        self.today = date(2025, 5, 18)
+
+    def tearDown(self):
+        NumberSequenceService.clear_local()
+
+    def test_leave_id_format(self):
+        """اختبار تنسيق رقم الإجازة (البادئة + YYMMDD + 4 أرقام)"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(NumberSequenceService.generate('PSL', today=self.today), 'PSL2505180001')
+        self.assertEqual(NumberSequenceService.generate('PSL', today=self.today), 'PSL2505180002')
+        # تسلسل مستقل لكل بادئة ويوم
+        self.assertEqual(NumberSequenceService.generate('GSL', today=self.today), 'GSL2505180001')
+        self.assertEqual(NumberSequenceService.generate('PSL', today=date(2025, 5, 19)), 'PSL2505190001')
+
+    def test_invoice_and_payment_number_format(self):
+        """اختبار تنسيق أرقام الفواتير والمدفوعات (البادئة-YYYY-6 أرقام)"""
+        year = date.today().year
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(generate_invoice_number(), f'INV-{year}-000001')
+        self.assertEqual(generate_payment_number(), f'PAY-{year}-000001')
+        self.assertEqual(generate_unique_number('INV'), f'INV-{year}-000002')
+
+    def test_numbers_are_served_from_reserved_block(self):
+        """اختبار توزيع الأرقام من الكتلة المحجوزة دون استعلامات"""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = NumberSequenceService.generate('INV', today=self.today)
+
+        with self.assertNumQueries(0):
+            numbers = [NumberSequenceService.generate('INV', today=self.today) for _ in range(4)]
+
+        self.assertEqual([first] + numbers, [f'INV-2025-00000{i}' for i in range(1, 6)])
+        self.assertEqual(NumberSequence.objects.get(key='INV-2025-').last_value, 5)
+
+        # حجز كتلة جديدة بعد استهلاك الكتلة الحالية
+        self.assertEqual(NumberSequenceService.generate('INV', today=self.today), 'INV-2025-000006')
+        self.assertEqual(NumberSequence.objects.get(key='INV-2025-').last_value, 10)
+
+    def test_uncommitted_block_is_not_reused(self):
+        """اختبار عدم الاحتفاظ ببقية الكتلة قبل تأكيد المعاملة"""
+        NumberSequenceService.generate('PAY', today=self.today)
+        self.assertEqual(NumberSequenceService._blocks, {})
+        self.assertEqual(NumberSequenceService.generate('PAY', today=self.today), 'PAY-2025-000006')
+
+    def test_new_sequence_starts_after_existing_numbers(self):
+        """اختبار بدء العداد الجديد بعد أكبر رقم موجود بنفس التنسيق"""
+        client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        year = date.today().year
+        LeaveInvoice.objects.create(invoice_number=f'INV-{year}-000041', client=client_obj,
+                                    leave_type="sick_leave", leave_id="PSL1", amount=Decimal("100.00"))
+        # أرقام التنسيق القديم لا تؤثر على التسلسل
+        LeaveInvoice.objects.create(invoice_number=f'INV-{year}-99999', client=client_obj,
+                                    leave_type="sick_leave", leave_id="PSL2", amount=Decimal("100.00"))
+        Payment.objects.create(payment_number=f'PAY-{year}-000007', client=client_obj, amount=Decimal("100.00"))
+
+        self.assertEqual(generate_invoice_number(), f'INV-{year}-000042')
+        self.assertEqual(generate_payment_number(), f'PAY-{year}-000008')
+
+    def test_generate_leave_id_api(self):
+        """اختبار واجهة توليد رقم الإجازة"""
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        first = self.client.get(reverse('core:generate_sick_leave_id_api'), {'prefix': 'GSL'}).json()['leave_id']
+        second = self.client.get(reverse('core:generate_companion_leave_id_api')).json()['leave_id']
+
+        self.assertTrue(first.startswith('GSL'))
+        self.assertEqual(len(first), 13)
+        self.assertTrue(second.startswith('PSL'))
+        self.assertNotEqual(generate_sick_leave_id(), second)
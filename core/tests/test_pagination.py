@@ -0,0 +1,220 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Client, LeaveInvoice, Payment, User
+from core.pagination import KeysetPaginator
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'report-pagination-tests',
+    }
+}
+
+
+class KeysetPaginatorTest(TestCase):
+    """اختبارات التقسيم إلى صفحات بالمؤشر"""
+
+    def setUp(self):
+        self.client_obj = Client.objects.create(name="عميل", phone="0500000000")
+        today = date.today()
+        for index in range(7):
+            LeaveInvoice.objects.create(
+                invoice_number=f"INV-{index}",
+                client=self.client_obj,
+                leave_type="sick_leave",
+                leave_id=f"SL-{index}",
+                amount=Decimal("100.00"),
+                status="unpaid",
+                # تواريخ متكررة لاختبار فك التعادل بالمعرف
+                issue_date=today - timedelta(days=index // 2),
+            )
+        self.expected = list(LeaveInvoice.objects.order_by('-issue_date', '-id'))
+
+    def get_paginator(self, per_page=3):
+        return KeysetPaginator(LeaveInvoice.objects.all(), ('-issue_date',), per_page=per_page)
+
+    def test_pages_forward_and_backward(self):
+        paginator = self.get_paginator()
+
+        first = paginator.get_page()
+        self.assertEqual(first.object_list, self.expected[:3])
+        self.assertFalse(first.has_previous)
+        self.assertTrue(first.has_next)
+
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(second.object_list, self.expected[3:6])
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(third.object_list, self.expected[6:])
+        self.assertFalse(third.has_next)
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[3:6])
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[:3])
+        self.assertFalse(back.has_previous)
+
+    def test_null_values_come_last(self):
+        LeaveInvoice.objects.filter(invoice_number__in=["INV-0", "INV-3"]).update(due_date=None)
+        LeaveInvoice.objects.exclude(invoice_number__in=["INV-0", "INV-3"]).update(due_date=date.today())
+        expected = list(LeaveInvoice.objects.order_by('due_date', 'id'))
+        expected = [obj for obj in expected if obj.due_date] + [obj for obj in expected if not obj.due_date]
+
+        paginator = KeysetPaginator(LeaveInvoice.objects.all(), ('due_date',), per_page=2)
+        seen = []
+        page = paginator.get_page()
+        while True:
+            seen.extend(page.object_list)
+            if not page.has_next:
+                break
+            page = paginator.get_page(page.next_cursor)
+        self.assertEqual(seen, expected)
+
+        page = paginator.get_page(page.previous_cursor)
+        self.assertEqual(page.object_list, expected[4:6])
+
+    def test_invalid_cursor_returns_first_page(self):
+        page = self.get_paginator().get_page('not-a-cursor')
+
+        self.assertEqual(page.object_list, self.expected[:3])
+
+    def test_each_page_is_a_single_query(self):
+        paginator = self.get_paginator()
+        cursor = paginator.get_page().next_cursor
+
+        with CaptureQueriesContext(connection) as queries:
+            paginator.get_page(cursor)
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertNotIn('OFFSET', queries.captured_queries[0]['sql'])
+
+    def test_related_ordering_field(self):
+        other = Client.objects.create(name="أ عميل", phone="0500000001")
+        LeaveInvoice.objects.filter(invoice_number__in=["INV-1", "INV-4"]).update(client=other)
+        queryset = LeaveInvoice.objects.select_related('client')
+        expected = list(queryset.order_by('client__name', 'id'))
+
+        paginator = KeysetPaginator(queryset, ('client__name',), per_page=3)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(first.object_list + second.object_list, expected[:6])
+
+    def test_cursor_from_other_ordering_is_ignored(self):
+        cursor = self.get_paginator().get_page().next_cursor
+        paginator = KeysetPaginator(LeaveInvoice.objects.all(), ('invoice_number',), per_page=3)
+
+        page = paginator.get_page(cursor)
+        self.assertEqual(page.object_list, list(LeaveInvoice.objects.order_by('invoice_number', 'id')[:3]))
+        self.assertFalse(page.has_previous)
+
+
+class ReportPaginationTest(TestCase):
+    """اختبارات صفحات التقارير"""
+
+    def setUp(self):
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        client = Client.objects.create(name="عميل", phone="0500000000")
+        for index in range(60):
+            LeaveInvoice.objects.create(
+                invoice_number=f"INV-{index}",
+                client=client,
+                leave_type="sick_leave",
+                leave_id=f"SL-{index}",
+                amount=Decimal("10.00"),
+                status="unpaid",
+                issue_date=date.today() - timedelta(days=index),
+            )
+
+    def test_invoice_report_next_page_keeps_filters(self):
+        url = reverse('core:report_invoices')
+        response = self.client.get(url, {'status': 'unpaid'})
+        page = response.context['page']
+
+        self.assertEqual(len(page), 50)
+        self.assertIn('status=unpaid', page.query)
+        self.assertEqual(response.context['total_amount'], Decimal("600.00"))
+
+        with CaptureQueriesContext(connection) as first_queries:
+            self.client.get(url, {'status': 'unpaid'})
+        with CaptureQueriesContext(connection) as next_queries:
+            response = self.client.get(url, {'status': 'unpaid', 'cursor': page.next_cursor})
+
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertEqual(len(next_queries.captured_queries), len(first_queries.captured_queries))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedReportPaginationTest(ReportPaginationTest):
+    """اختبارات صفحات التقارير مع كاش فعلي: الإحصائيات مشتركة بين الصفحات"""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_next_page_reuses_cached_stats(self):
+        url = reverse('core:report_invoices')
+        page = self.client.get(url, {'status': 'unpaid'}).context['page']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'status': 'unpaid', 'cursor': page.next_cursor})
+
+        invoice_queries = [query for query in queries.captured_queries if 'core_leaveinvoice' in query['sql']]
+        self.assertEqual(len(invoice_queries), 1)
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertEqual(response.context['total_amount'], Decimal("600.00"))
+
+
+class ListPaginationTest(TestCase):
+    """اختبارات صفحات القوائم بالمؤشر"""
+
+    def setUp(self):
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.client_obj = Client.objects.create(name="عميل", phone="0500000000")
+        for index in range(25):
+            Payment.objects.create(
+                payment_number=f"PAY-{index:02d}",
+                client=self.client_obj,
+                amount=Decimal("10.00"),
+                payment_method="cash",
+                # تواريخ متكررة لاختبار فك التعادل بالمعرف
+                payment_date=date.today() - timedelta(days=index // 3),
+            )
+
+    def test_payment_list_walks_all_pages_without_offset(self):
+        url = reverse('core:payment_list')
+        seen = []
+        params = {'payment_method': 'cash'}
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            page = response.context['payments']
+            seen.extend(payment.payment_number for payment in page)
+            self.assertEqual(page.total_count, 25)
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+            if not page.has_next:
+                break
+            params = {'payment_method': 'cash', 'cursor': page.next_cursor}
+
+        expected = list(Payment.objects.order_by('-payment_date', '-id').values_list('payment_number', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_client_list_is_paginated(self):
+        for index in range(25):
+            Client.objects.create(name=f"عميل {index:02d}", phone=f"05100000{index:02d}")
+
+        response = self.client.get(reverse('core:client_list'), {'sort': '-name'})
+        page = response.context['clients']
+        self.assertEqual(len(page), 20)
+        self.assertEqual(page.object_list[0].name, "عميل 24")
+        self.assertEqual(page.total_count, 26)
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Client, LeaveInvoice, Payment, PaymentDetail
+from core.services.invoice_balance_service import InvoiceBalanceService
+from core.services.payment_allocation_service import PaymentAllocationService
+
+
+class PaymentAllocationTest(TestCase):
+    """اختبارات توزيع الدفعات على الفواتير"""
+
+    def setUp(self):
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        self.other_client = Client.objects.create(name="شركة أخرى", phone="0587654321")
+        today = date.today()
+
+        self.old_invoice = self.create_invoice("INV-001", Decimal("300.00"), today - timedelta(days=20))
+        self.middle_invoice = self.create_invoice("INV-002", Decimal("500.00"), today - timedelta(days=10))
+        self.new_invoice = self.create_invoice("INV-003", Decimal("400.00"), today)
+        self.paid_invoice = self.create_invoice("INV-004", Decimal("100.00"), today - timedelta(days=30),
+                                                status="paid")
+        self.other_invoice = self.create_invoice("INV-005", Decimal("250.00"), today, client=self.other_client)
+
+    def create_invoice(self, invoice_number, amount, issue_date, status="unpaid", client=None):
+        return LeaveInvoice.objects.create(invoice_number=invoice_number, client=client or self.client_obj,
+                                           leave_type="sick_leave", leave_id=invoice_number, amount=amount,
+                                           status=status, issue_date=issue_date)
+
+    def create_payment(self, payment_number, amount, client=None):
+        return Payment.objects.create(payment_number=payment_number, client=client or self.client_obj,
+                                      amount=amount, payment_method="cash", payment_date=date.today())
+
+    def test_allocate_to_oldest_invoices(self):
+        """اختبار التوزيع من الأقدم إلى الأحدث"""
+        payment = self.create_payment("PAY-001", Decimal("600.00"))
+
+        invoices_paid, total_allocated = payment.allocate_to_oldest_invoices()
+
+        self.assertEqual(invoices_paid, 2)
+        self.assertEqual(total_allocated, Decimal("600.00"))
+
+        old_invoice = LeaveInvoice.objects.get(pk=self.old_invoice.pk)
+        middle_invoice = LeaveInvoice.objects.get(pk=self.middle_invoice.pk)
+        self.assertEqual(old_invoice.status, "paid")
+        self.assertEqual(middle_invoice.status, "partially_paid")
+        self.assertEqual(middle_invoice.remaining_amount, Decimal("200.00"))
+        self.assertEqual(LeaveInvoice.objects.get(pk=self.new_invoice.pk).status, "unpaid")
+        self.assertFalse(PaymentDetail.objects.filter(invoice=self.paid_invoice).exists())
+
+        # المجاميع المخزنة مطابقة لتفاصيل الدفع رغم استخدام bulk_create
+        self.assertFalse(InvoiceBalanceService.find_mismatches().exists())
+
+    def test_allocation_uses_constant_writes(self):
+        """اختبار كتابة التفاصيل والفواتير باستعلامات جماعية"""
+        payment = self.create_payment("PAY-001", Decimal("1200.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            payment.allocate_to_oldest_invoices()
+
+        # تحديثات الإحصائيات اليومية لكل يوم وحالة لا تدخل في العد
+        writes = [query['sql'] for query in queries.captured_queries if 'core_dailystatistic' not in query['sql']]
+        inserts = [sql for sql in writes if sql.startswith('INSERT')]
+        updates = [sql for sql in writes if sql.startswith('UPDATE')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(PaymentDetail.objects.filter(payment=payment).count(), 3)
+
+    def test_allocate_only_unallocated_amount(self):
+        """اختبار توزيع المبلغ غير المخصص فقط وعدم تجاوز المتبقي"""
+        payment = self.create_payment("PAY-001", Decimal("400.00"))
+        PaymentDetail.objects.create(payment=payment, invoice=self.old_invoice, amount=Decimal("300.00"))
+        self.old_invoice.update_status()
+
+        self.assertEqual(payment.allocate_to_oldest_invoices(), (1, Decimal("100.00")))
+        self.assertEqual(payment.allocate_to_oldest_invoices(), (0, Decimal("0")))
+        self.assertEqual(LeaveInvoice.objects.get(pk=self.middle_invoice.pk).paid_amount, Decimal("100.00"))
+
+    def test_allocate_many_payments(self):
+        """اختبار توزيع عدة دفعات لعدة عملاء في عملية واحدة"""
+        first = self.create_payment("PAY-001", Decimal("500.00"))
+        second = self.create_payment("PAY-002", Decimal("1000.00"))
+        other = self.create_payment("PAY-003", Decimal("100.00"), client=self.other_client)
+
+        results = PaymentAllocationService.allocate([first, second, other])
+
+        self.assertEqual(results[first.pk], (2, Decimal("500.00")))
+        # الدفعة الثانية تكمل ما تبقى بعد الأولى ولا تتجاوز إجمالي المتبقي
+        self.assertEqual(results[second.pk], (2, Decimal("700.00")))
+        self.assertEqual(results[other.pk], (1, Decimal("100.00")))
+        self.assertEqual(LeaveInvoice.objects.filter(client=self.client_obj, status="paid").count(), 4)
+        self.assertEqual(LeaveInvoice.objects.get(pk=self.other_invoice.pk).remaining_amount, Decimal("150.00"))
+
+    def test_allocate_payments_command(self):
+        """اختبار أمر توزيع الدفعات غير المخصصة"""
+        payment = self.create_payment("PAY-001", Decimal("300.00"))
+
+        out = StringIO()
+        call_command('allocate_payments', '--dry-run', stdout=out)
+        self.assertIn("PAY-001", out.getvalue())
+        self.assertFalse(PaymentDetail.objects.exists())
+
+        call_command('allocate_payments', stdout=StringIO())
+        self.assertEqual(PaymentDetail.objects.get().invoice, self.old_invoice)
+        self.assertFalse(PaymentAllocationService.get_unallocated_payments().filter(pk=payment.pk).exists())
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock, skipIf
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Hospital, Patient, SickLeave, User
+from core.services.pdf_service import PDFRenderError, PDFRenderService
+from core.services.translation_service import (DictionaryTranslatorBackend,
+                                               TranslationQueue)
+
+
+def fake_render_pdf(documents):
+    return b'%PDF-' + b'|'.join(documents)
+
+
+class PDFRenderServiceTest(TestCase):
+    """اختبارات طباعة الإجازات كملفات PDF مع التخزين المؤقت"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(PDF_CACHE_DIR=self.cache_dir)
+        self.settings_override.enable()
+
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        self.leaves = [
+            SickLeave.objects.create(leave_id=f'PSL00{i}', patient=patient, hospital=hospital,
+                                     start_date=date(2025, 5, 18), end_date=date(2025, 5, 20),
+                                     issue_date=date(2025, 5, 18))
+            for i in range(1, 3)
+        ]
+
+        # تحويل HTML إلى PDF يحتاج WeasyPrint، لذلك يُستبدل بنص يحدد المستند
+        self.render_document = mock.patch.object(
+            PDFRenderService, 'render_document',
+            side_effect=lambda html, base_url=None: (b'PSL001' if 'PSL001' in html else b'PSL002')
+        ).start()
+        mock.patch.object(PDFRenderService, 'render_pdf', side_effect=fake_render_pdf).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_pdf(self, leave, print_type='new'):
+        return self.client.get(reverse('core:sick_leave_print', args=[leave.id]),
+                               {'format': 'pdf', 'print_type': print_type})
+
+    def test_pdf_is_cached_until_leave_changes(self):
+        """اختبار إعادة استخدام ملف PDF حتى تعديل الإجازة"""
+        leave = self.leaves[0]
+
+        response = self.get_pdf(leave)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-PSL001')
+        self.get_pdf(leave)
+        self.assertEqual(self.render_document.call_count, 1)
+
+        # نوع قالب مختلف ملف مختلف
+        self.get_pdf(leave, print_type='old')
+        self.assertEqual(self.render_document.call_count, 2)
+
+        leave.save()
+        self.get_pdf(leave)
+        self.assertEqual(self.render_document.call_count, 3)
+        # حذف النسخة الأقدم لنفس نوع القالب فقط
+        files = sorted(os.listdir(os.path.join(self.cache_dir, 'sick_leave', str(leave.id))))
+        self.assertEqual([name.split('-')[0] for name in files], ['new', 'old'])
+
+    def test_pdf_is_rendered_again_when_related_data_changes(self):
+        """اختبار إعادة إنشاء ملف PDF بعد تعديل المريض أو ترجمة اسم المستشفى"""
+        leave = self.leaves[0]
+        self.get_pdf(leave)
+
+        leave.patient.save()
+        self.get_pdf(leave)
+        self.assertEqual(self.render_document.call_count, 2)
+
+        Hospital.objects.filter(pk=leave.hospital_id).update(name_en='')
+        TranslationQueue.enqueue_missing(Hospital.objects.get(pk=leave.hospital_id))
+        TranslationQueue.process_pending(backend=DictionaryTranslatorBackend({"مستشفى الاختبار": "Test Hospital"}))
+        self.get_pdf(leave)
+        self.assertEqual(self.render_document.call_count, 3)
+
+    def test_print_options_cannot_escape_cache_dir(self):
+        """اختبار تجاهل نوع الطباعة والبادئة غير المعروفين في اسم الملف المخزن"""
+        leave = self.leaves[0]
+        response = self.client.get(reverse('core:sick_leave_print', args=[leave.id]),
+                                   {'format': 'pdf', 'print_type': 'new', 'prefix': '/../../../escape/victim'})
+
+        self.assertEqual(response.content, b'%PDF-PSL001')
+        files = os.listdir(os.path.join(self.cache_dir, 'sick_leave', str(leave.id)))
+        self.assertEqual([name.split('-')[:2] for name in files], [['new', 'PSL']])
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.cache_dir), 'escape')))
+
+        for variant in ('new-/../../victim', '..', ''):
+            with self.assertRaises(PDFRenderError):
+                PDFRenderService.get_path('sick_leave', leave.id, variant, 'abc')
+
+    def test_batch_pdf_merges_leaves_in_order(self):
+        """اختبار دمج عدة إجازات في ملف واحد بترتيب الطلب"""
+        url = reverse('core:sick_leave_print_batch')
+        ids = [self.leaves[1].id, self.leaves[0].id, 999]
+
+        response = self.client.get(url, {'ids': ids})
+        self.assertEqual(response.content, b'%PDF-PSL002|PSL001')
+
+        self.client.get(url, {'ids': ids})
+        self.assertEqual(self.render_document.call_count, 2)
+
+
+class PDFFallbackTest(TestCase):
+    """اختبار الرجوع إلى صفحة الطباعة عند عدم تثبيت محرك PDF"""
+
+    @skipIf(PDFRenderService.is_available(), 'WeasyPrint مثبت')
+    def test_falls_back_to_html(self):
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        leave = SickLeave.objects.create(leave_id='PSL001', patient=patient, hospital=hospital,
+                                         start_date=date(2025, 5, 18), end_date=date(2025, 5, 20),
+                                         issue_date=date(2025, 5, 18))
+
+        response = self.client.get(reverse('core:sick_leave_print', args=[leave.id]), {'format': 'pdf'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/sick_leaves/prints/new/psl.html')
@@ -0,0 +1,159 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Client, LeavePrice, User
+from core.services.pricing_service import PricingService
+
+
+class PricingServiceTest(TestCase):
+    """اختبارات جدول الأسعار المُجمَّع"""
+
+    def setUp(self):
+        PricingService.invalidate()
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+
+        LeavePrice.objects.create(leave_type="sick_leave", duration_days=1, price=Decimal("200.00"),
+                                  pricing_type="per_day")
+        LeavePrice.objects.create(leave_type="sick_leave", duration_days=5, price=Decimal("750.00"),
+                                  pricing_type="per_day")
+        LeavePrice.objects.create(leave_type="sick_leave", duration_days=10, price=Decimal("1000.00"),
+                                  pricing_type="per_day")
+        LeavePrice.objects.create(leave_type="companion_leave", duration_days=3, price=Decimal("300.00"),
+                                  pricing_type="per_day", client=self.client_obj)
+        LeavePrice.objects.create(leave_type="companion_leave", duration_days=1, price=Decimal("500.00"),
+                                  pricing_type="fixed")
+
+    def test_exact_duration(self):
+        """اختبار السعر اليومي بمدة مطابقة"""
+        quote = PricingService.quote("sick_leave", 5)
+        self.assertEqual(quote.price, Decimal("750.00"))
+        self.assertEqual(quote.source, "global_per_day")
+
+    def test_nearest_lower_duration(self):
+        """اختبار الحساب من أقرب مدة أقل"""
+        quote = PricingService.quote("sick_leave", 7)
+        self.assertEqual(quote.price, Decimal("150.00") * 7)
+        self.assertEqual(quote.source, "global_computed")
+
+    def test_nearest_higher_duration(self):
+        """اختبار الحساب من أقرب مدة أكبر عند عدم وجود مدة أقل"""
+        LeavePrice.objects.filter(duration_days=1).delete()
+        quote = PricingService.quote("sick_leave", 2)
+        self.assertEqual(quote.price, Decimal("300.00"))
+
+    def test_client_prices_before_global(self):
+        """اختبار تقديم أسعار العميل على الأسعار العامة"""
+        self.assertEqual(PricingService.get_price("companion_leave", 6, self.client_obj), Decimal("600.00"))
+        self.assertEqual(PricingService.get_price("companion_leave", 6), Decimal("500.00"))
+
+    def test_invalid_input(self):
+        """اختبار المدخلات غير الصحيحة"""
+        self.assertEqual(PricingService.get_price("sick_leave", 0), Decimal("0"))
+        self.assertEqual(PricingService.quote("", 3).source, "none")
+
+    def test_quotes_use_no_queries_after_load(self):
+        """اختبار أن التسعير لا يحتاج أي استعلام بعد تحميل الجدول"""
+        PricingService.get_price("sick_leave", 1)
+        with self.assertNumQueries(0):
+            for duration in range(1, 30):
+                LeavePrice.get_price("sick_leave", duration, self.client_obj)
+
+    def test_get_prices_batch(self):
+        """اختبار تسعير مجموعة إجازات باستعلام واحد لتحميل الجدول"""
+        PricingService.invalidate()
+        batch = [("sick_leave", 5, None), ("sick_leave", 7, None),
+                 {"leave_type": "companion_leave", "duration_days": 6, "client_id": self.client_obj.id},
+                 ("companion_leave", 6)] * 100
+
+        with self.assertNumQueries(1):
+            prices = LeavePrice.get_prices(batch)
+
+        self.assertEqual(len(prices), 400)
+        self.assertEqual(prices[:4], [Decimal("750.00"), Decimal("1050.00"), Decimal("600.00"), Decimal("500.00")])
+
+    def test_signals_invalidate_table(self):
+        """اختبار إعادة بناء الجدول بعد تعديل أو حذف سعر"""
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("750.00"))
+
+        price = LeavePrice.objects.get(leave_type="sick_leave", duration_days=5)
+        price.price = Decimal("800.00")
+        price.save()
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("800.00"))
+
+        price.delete()
+        self.assertEqual(PricingService.quote("sick_leave", 5).source, "global_computed")
+
+    def test_table_follows_database_without_shared_cache(self):
+        """اختبار ملاحظة تغيير سعر من عملية أخرى عبر بصمة الأسعار في قاعدة البيانات"""
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("750.00"))
+
+        # تعديل بدون إشارات ولا كاش مشترك، كما لو تم في عملية أخرى
+        LeavePrice.objects.filter(leave_type="sick_leave", duration_days=5).update(
+            price=Decimal("900.00"), updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("750.00"))
+
+        PricingService._checked_at = 0.0
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("900.00"))
+
+        LeavePrice.objects.filter(leave_type="sick_leave", duration_days=5)._raw_delete(using='default')
+        PricingService._checked_at = 0.0
+        self.assertEqual(PricingService.quote("sick_leave", 5).source, "global_computed")
+
+    def test_inactive_prices_are_ignored(self):
+        """اختبار تجاهل الأسعار غير النشطة"""
+        price = LeavePrice.objects.get(leave_type="sick_leave", duration_days=5)
+        price.is_active = False
+        price.save()
+        self.assertEqual(PricingService.get_price("sick_leave", 5), Decimal("1000.00"))
+
+
+class LeavePriceApiTest(TestCase):
+    """اختبارات واجهة حساب السعر"""
+
+    def setUp(self):
+        PricingService.invalidate()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        LeavePrice.objects.create(leave_type="sick_leave", duration_days=3, price=Decimal("450.00"),
+                                  pricing_type="fixed")
+
+    def test_get_price_returns_quote_details(self):
+        """اختبار إرجاع السعر ونوعه ومصدره"""
+        response = self.client.get(reverse('core:leave_price_api_get_price'),
+                                   {'leave_type': 'sick_leave', 'duration_days': 4})
+        data = response.json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['price'], 450.0)
+        self.assertEqual(data['price_type'], 'fixed')
+        self.assertEqual(data['price_source'], 'سعر ثابت عام')
+
+    def test_get_prices_batch_endpoint(self):
+        """اختبار واجهة التسعير الجماعي"""
+        client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        items = [
+            {'leave_type': 'sick_leave', 'duration_days': 3},
+            {'leave_type': 'sick_leave', 'duration_days': 0},
+            {'leave_type': 'sick_leave', 'duration_days': 2, 'client_id': client_obj.id},
+            {'leave_type': 'sick_leave', 'duration_days': 2, 'client_id': 999999},
+        ]
+
+        response = self.client.post(reverse('core:leave_price_api_get_prices'),
+                                    data=json.dumps({'items': items}), content_type='application/json')
+        results = response.json()['results']
+
+        self.assertEqual([result['success'] for result in results], [True, False, True, False])
+        self.assertEqual(results[0]['price'], 450.0)
+        self.assertEqual(results[2]['client_name'], "شركة الاختبار")
+
+    def test_get_prices_batch_endpoint_rejects_invalid_body(self):
+        """اختبار رفض الطلبات غير الصحيحة"""
+        response = self.client.post(reverse('core:leave_price_api_get_prices'),
+                                    data='not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.services.qrcode_service import QRCodeService
+
+
+class QRCodeCacheTest(TestCase):
+    """اختبارات التخزين المؤقت لصور QR ورابط خدمتها"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(QRCODE_CACHE_DIR=self.cache_dir)
+        self.settings_override.enable()
+        QRCodeService.clear_memory()
+
+    def tearDown(self):
+        QRCodeService.clear_memory()
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def render_tag(self):
+        return Template(
+            "{% load core_extras %}{% generate_qrcode 'https://sehea.net/inquiries/slenquiry' 150 %}"
+        ).render(Context())
+
+    def test_image_is_generated_once(self):
+        """اختبار توليد الصورة مرة واحدة وإعادة استخدامها من الذاكرة ثم من القرص"""
+        with mock.patch.object(QRCodeService, 'render', wraps=QRCodeService.render) as render:
+            first = self.render_tag()
+            second = self.render_tag()
+            QRCodeService.clear_memory()
+            third = self.render_tag()
+
+        key = QRCodeService.make_key('https://sehea.net/inquiries/slenquiry', 150)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, reverse('core:qrcode_image', args=[key]))
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, f'{key}.png')))
+        # معلمات مختلفة تعطي صورة مختلفة
+        self.assertNotEqual(key, QRCodeService.make_key('https://sehea.net/inquiries/slenquiry', 300))
+
+    def test_image_endpoint_headers(self):
+        """اختبار خدمة الصورة بترويسات ETag وimmutable"""
+        url = self.render_tag()
+        QRCodeService.clear_memory()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(reverse('core:qrcode_image', args=['0' * 64]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_inline_fallback_when_disk_is_unavailable(self):
+        """اختبار تضمين الصورة مباشرة إذا تعذر حفظها على القرص"""
+        with mock.patch.object(QRCodeService, 'write_file', side_effect=OSError('read-only')):
+            result = self.render_tag()
+
+        self.assertTrue(result.startswith('data:image/png;base64,'))
+        self.assertEqual(os.listdir(self.cache_dir), [])
@@ -0,0 +1,112 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock, skipIf, skipUnless
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import (Client, Hospital, LeaveInvoice, Patient, Payment,
+                         SickLeave, User)
+from core.services.export_service import ReportExportService
+
+
+class ReportExportTest(TestCase):
+    """اختبارات تصدير التقارير بتدفق CSV و XLSX"""
+
+    def setUp(self):
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        for i, status in enumerate(['active', 'expired', 'cancelled'], start=1):
+            leave = SickLeave.objects.create(leave_id=f'PSL00{i}', patient=patient, hospital=hospital,
+                                             start_date=date(2025, 5, i), end_date=date(2025, 5, i + 2),
+                                             issue_date=date(2025, 5, i))
+            # الحالة تُحسب من التواريخ عند الحفظ
+            SickLeave.objects.filter(pk=leave.pk).update(status=status)
+
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+        LeaveInvoice.objects.create(invoice_number='INV-2025-000001', client=self.client_obj,
+                                    leave_type='sick_leave', leave_id='PSL001', amount=Decimal('300.00'))
+        Payment.objects.create(payment_number='PAY-2025-000001', client=self.client_obj,
+                               amount=Decimal('100.00'), payment_method='cash')
+
+    def read_csv(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('﻿'))
+        return list(csv.reader(io.StringIO(content[1:])))
+
+    def test_sick_leaves_csv_uses_report_filters(self):
+        """اختبار تصدير الإجازات المرضية بنفس فلاتر التقرير وعرض قيم الخيارات"""
+        response = self.client.get(reverse('core:report_sick_leaves_export'),
+                                   {'format': 'csv', 'status': 'expired'})
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="sick-leaves-', response['Content-Disposition'])
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0][:2], ['رقم الإجازة', 'بادئة الإجازة'])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], 'PSL002')
+        self.assertEqual(rows[1][-1], 'منتهية')
+        self.assertEqual(rows[1][6], '2025-05-02')
+
+    def test_csv_is_written_in_chunks(self):
+        """اختبار كتابة الصفوف على دفعات"""
+        columns = ReportExportService.get_columns(SickLeave, ['leave_id'])
+        rows = ReportExportService.iter_rows(SickLeave.objects.order_by('leave_id'), columns, chunk_size=1)
+
+        chunks = list(ReportExportService.stream_csv(rows, ['leave_id'], chunk_size=2))
+
+        self.assertEqual(chunks, ['﻿leave_id\r\n', 'PSL001\r\nPSL002\r\n', 'PSL003\r\n'])
+
+    def test_annotated_columns_and_other_reports(self):
+        """اختبار تصدير تقارير العملاء والفواتير والمدفوعات"""
+        rows = self.read_csv(self.client.get(reverse('core:report_clients_export'), {'format': 'csv'}))
+        self.assertEqual(rows[0][-1], 'الرصيد')
+        self.assertEqual(rows[1][0], 'شركة الاختبار')
+        self.assertEqual(Decimal(rows[1][-1]), Decimal('200.00'))
+
+        rows = self.read_csv(self.client.get(reverse('core:report_invoices_export'), {'format': 'csv'}))
+        self.assertEqual(rows[1][:3], ['INV-2025-000001', 'شركة الاختبار', 'إجازة مرضية'])
+
+        rows = self.read_csv(self.client.get(reverse('core:report_payments_export'),
+                                             {'format': 'csv', 'payment_method': 'cash'}))
+        self.assertEqual(rows[1][3], 'نقدًا')
+
+    @skipUnless(ReportExportService.is_xlsx_available(), 'openpyxl غير مثبت')
+    def test_xlsx_export(self):
+        """اختبار تصدير Excel بمصنف الكتابة فقط"""
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('core:report_sick_leaves_export'), {'format': 'xlsx'})
+
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(workbook.active.max_row, 4)
+
+    @skipIf(ReportExportService.is_xlsx_available(), 'openpyxl مثبت')
+    def test_xlsx_without_openpyxl_redirects(self):
+        """اختبار الرجوع إلى التقرير عند عدم تثبيت openpyxl"""
+        response = self.client.get(reverse('core:report_sick_leaves_export'), {'format': 'xlsx', 'status': 'active'})
+
+        self.assertRedirects(response, reverse('core:report_sick_leaves') + '?status=active')
+
+    def test_default_format_falls_back_to_csv(self):
+        """اختبار التصدير بصيغة CSV عند عدم تحديد الصيغة وعدم تثبيت openpyxl"""
+        with mock.patch.object(ReportExportService, 'is_xlsx_available', return_value=False):
+            self.assertEqual(ReportExportService.filter_formats(['xlsx', 'csv', 'pdf']), ['csv'])
+            response = self.client.get(reverse('core:report_sick_leaves_export'), {'status': 'expired'})
+            self.assertEqual(len(self.read_csv(response)), 2)
+
+            response = self.client.get(reverse('core:report_sick_leaves'))
+            self.assertNotContains(response, 'format=xlsx')
+            self.assertContains(response, 'format=csv')
+
+    def test_unsupported_format(self):
+        """اختبار رفض صيغة غير مدعومة"""
+        response = self.client.get(reverse('core:report_invoices_export'), {'format': 'pdf'})
+
+        self.assertEqual(response.status_code, 302)
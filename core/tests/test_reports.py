@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Client, LeaveInvoice, Payment, User
+
+
+class ClientReportTest(TestCase):
+    """اختبارات تقرير العملاء"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+        for index in range(5):
+            client = Client.objects.create(name=f"عميل {index}", phone=f"05000000{index}")
+            LeaveInvoice.objects.create(
+                invoice_number=f"INV-{index}",
+                client=client,
+                leave_type="sick_leave",
+                leave_id=f"SL-{index}",
+                amount=Decimal("100.00") * (index + 1),
+                status="unpaid",
+                issue_date=date.today(),
+                due_date=date.today() + timedelta(days=30)
+            )
+            Payment.objects.create(
+                payment_number=f"PAY-{index}",
+                client=client,
+                amount=Decimal("100.00"),
+                payment_method="cash",
+                payment_date=date.today()
+            )
+
+    def count_ledger_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:report_clients'))
+        ledger_queries = [
+            query for query in queries.captured_queries
+            if any(table in query['sql'] for table in ('"core_client"', '"core_leaveinvoice"', '"core_payment"'))
+        ]
+        return response, len(ledger_queries)
+
+    def test_report_clients_constant_queries(self):
+        """اختبار أن عدد الاستعلامات لا يعتمد على عدد العملاء"""
+        response, query_count = self.count_ledger_queries()
+
+        # الإجماليات، وصفحة العملاء، والعملاء الأكثر نشاطًا
+        self.assertEqual(query_count, 3)
+
+        self.assertEqual(response.status_code, 200)
+        client_data = response.context['client_data']
+        self.assertEqual(len(client_data), 5)
+        self.assertEqual(client_data[0]['balance'], Decimal("400.00"))
+        self.assertEqual(response.context['total_balance'], Decimal("1000.00"))
+        self.assertEqual(response.context['total_clients'], 5)
+
+        for index in range(5, 60):
+            Client.objects.create(name=f"عميل {index}", phone=f"0500000{index}")
+        response, query_count = self.count_ledger_queries()
+
+        self.assertEqual(query_count, 3)
+        self.assertEqual(len(response.context['client_data']), 50)
+        self.assertTrue(response.context['page'].has_next)
+        self.assertEqual(response.context['total_clients'], 60)
+
+    def test_report_clients_balance_filter(self):
+        """اختبار تصفية العملاء حسب الرصيد"""
+        response = self.client.get(reverse('core:report_clients'), {'balance_filter': 'zero'})
+
+        self.assertEqual([data['client'].name for data in response.context['client_data']], ["عميل 0"])
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import (Client, CompanionLeave, Doctor, Hospital, Patient,
+                         SearchToken, SickLeave)
+from core.services.search_service import SearchIndexService, tokenize
+
+
+class SearchIndexTest(TestCase):
+    """اختبارات فهرس البحث الموحد"""
+
+    def setUp(self):
+        today = date.today()
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.doctor = Doctor.objects.create(name="خالد العتيبي", national_id="1111111111")
+        self.patient = Patient.objects.create(national_id="1234567890", name="فاطِمة أحمد",
+                                              name_en="Fatima Ahmed", phone="0501234567")
+        self.other_patient = Patient.objects.create(national_id="2234567890", name="إبراهيم محمد")
+        self.companion = Patient.objects.create(national_id="0987654321", name="آمنة علي")
+        self.client_obj = Client.objects.create(name="مؤسسة الشفاء", phone="0555555555", email="info@shifa.sa")
+        self.sick_leave = SickLeave.objects.create(
+            leave_id="PSL2410180001", patient=self.patient, doctor=self.doctor, hospital=self.hospital,
+            start_date=today, end_date=today + timedelta(days=2), issue_date=today,
+        )
+        self.companion_leave = CompanionLeave.objects.create(
+            leave_id="PSL2410180002", patient=self.other_patient, companion=self.companion,
+            doctor=self.doctor, hospital=self.hospital,
+            start_date=today, end_date=today + timedelta(days=2), issue_date=today,
+        )
+
+    def test_tokenize_normalizes_arabic(self):
+        """اختبار توحيد الهمزات والتاء المربوطة وحذف التشكيل"""
+        self.assertEqual(tokenize("فاطِمة إبراهيم آمنة"), ["فاطمه", "ابراهيم", "امنه"])
+        self.assertEqual(tokenize("Fatima ٠٥٠١"), ["fatima", "0501"])
+
+    def test_search_matches_normalized_prefixes(self):
+        """اختبار البحث ببادئات الكلمات مع اختلاف أشكال الحروف"""
+        self.assertEqual(SearchIndexService.search('patient', "فاطمه"), [self.patient.pk])
+        self.assertEqual(SearchIndexService.search('patient', "ابراهيم"), [self.other_patient.pk])
+        self.assertEqual(SearchIndexService.search('patient', "fat ahm"), [self.patient.pk])
+        self.assertEqual(SearchIndexService.search('patient', "12345"), [self.patient.pk])
+        self.assertEqual(SearchIndexService.search('patient', "050123"), [self.patient.pk])
+        self.assertEqual(SearchIndexService.search('doctor', "عتيبي"), [self.doctor.pk])
+        self.assertEqual(SearchIndexService.search('client', "الشفا"), [self.client_obj.pk])
+        self.assertEqual(SearchIndexService.search('patient', "فاطمه محمد"), [])
+        self.assertEqual(SearchIndexService.search('patient', "   "), [])
+
+    def test_search_ranks_exact_matches_first(self):
+        """اختبار ترتيب التطابق التام قبل تطابق البادئة"""
+        prefix = Patient.objects.create(national_id="3000000000", name="سالمين")
+        exact = Patient.objects.create(national_id="3000000001", name="سالم")
+        self.assertEqual(SearchIndexService.search('patient', "سالم"), [exact.pk, prefix.pk])
+
+    def test_leaves_follow_patient_and_doctor_changes(self):
+        """اختبار تحديث كلمات الإجازات عند تعديل اسم المريض أو حذف الإجازة"""
+        self.assertEqual(SearchIndexService.search('sick_leave', "2410180001"), [self.sick_leave.pk])
+        self.assertEqual(SearchIndexService.search('companion_leave', "امنه"), [self.companion_leave.pk])
+
+        self.patient.name = "نورة سالم"
+        self.patient.save()
+        self.assertEqual(SearchIndexService.search('sick_leave', "نوره"), [self.sick_leave.pk])
+        self.assertEqual(SearchIndexService.search('sick_leave', "فاطمه"), [])
+
+        self.sick_leave.delete()
+        self.assertFalse(SearchToken.objects.filter(entity='sick_leave', object_id=self.sick_leave.pk).exists())
+
+    def test_search_api_uses_index(self):
+        """اختبار واجهات البحث بدون icontains"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:patient_search_api'), {'q': 'فاطمة'})
+
+        self.assertEqual([row['id'] for row in response.json()], [self.patient.pk])
+        self.assertFalse(any('LIKE' in query['sql'] and '%%' in query['sql'] for query in queries.captured_queries))
+
+        response = self.client.get(reverse('core:client_search_api'), {'q': '0555'})
+        self.assertEqual(response.json()[0]['display'], "مؤسسة الشفاء")
+        response = self.client.get(reverse('core:companion_leave_search_api'), {'q': 'PSL2410180002'})
+        self.assertEqual(response.json()[0]['id'], self.companion_leave.pk)
+
+    def test_rebuild_command(self):
+        """اختبار أمر إعادة بناء فهرس البحث"""
+        expected = set(SearchToken.objects.values_list('entity', 'object_id', 'token', 'weight'))
+        SearchToken.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+
+        self.assertEqual(set(SearchToken.objects.values_list('entity', 'object_id', 'token', 'weight')), expected)
+        self.assertIn("patient: 3", out.getvalue())
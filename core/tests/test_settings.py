@@ -4,6 +4,7 @@
 import os
 # استيراد الإعدادات الأساسية
 import sys
+import tempfile
 from pathlib import Path
 
 from sclive.settings import *
@@ -48,6 +49,10 @@ PASSWORD_HASHERS = [
 DEBUG = True
 SECRET_KEY = 'test-key'
 
+# استخدام محرك ترجمة محلي بدلاً من خدمة الترجمة عبر الإنترنت
+TRANSLATION_BACKEND = 'core.services.translation_service.DictionaryTranslatorBackend'
+TRANSLATION_DICTIONARY = {}
+
 # تعطيل البريد الإلكتروني أثناء الاختبارات
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
@@ -55,6 +60,10 @@ EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'test_media')
 MEDIA_URL = '/test_media/'
 
+# صور QR وملفات PDF المخزنة مؤقتًا تُكتب في مجلد مؤقت خارج المشروع
+QRCODE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'sclive_tests', 'qrcodes')
+PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'sclive_tests', 'pdf_cache')
+
 # تعطيل الملفات الثابتة أثناء الاختبارات
 STATIC_ROOT = os.path.join(BASE_DIR, 'test_static')
 STATIC_URL = '/test_static/'
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import (Client, DailyStatistic, Hospital, LeaveInvoice,
+                         Patient, Payment, SickLeave, User)
+from core.services.leave_status_service import LeaveStatusService
+from core.services.payment_allocation_service import PaymentAllocationService
+from core.services.statistics_service import DailyStatisticsService
+
+
+class DailyStatisticsTest(TestCase):
+    """اختبارات الإحصائيات اليومية المجمعة"""
+
+    def setUp(self):
+        self.today = date.today()
+        self.hospital = Hospital.objects.create(name="مستشفى الاختبار", name_en="Test Hospital")
+        self.patient = Patient.objects.create(national_id="1234567890", name="محمد", name_en="Mohammed")
+        self.client_obj = Client.objects.create(name="شركة الاختبار", phone="0512345678")
+
+    def create_invoice(self, invoice_number, amount, issue_date=None, status="unpaid"):
+        return LeaveInvoice.objects.create(invoice_number=invoice_number, client=self.client_obj,
+                                           leave_type="sick_leave", leave_id=invoice_number, amount=amount,
+                                           status=status, issue_date=issue_date or self.today)
+
+    def create_sick_leave(self, leave_id, end_date):
+        return SickLeave.objects.create(
+            leave_id=leave_id, patient=self.patient, hospital=self.hospital,
+            start_date=end_date - timedelta(days=2), end_date=end_date, issue_date=self.today,
+        )
+
+    def stored_rows(self):
+        return {
+            (row.entity, row.date, row.status): (row.count, row.amount)
+            for row in DailyStatistic.objects.all() if row.count or row.amount
+        }
+
+    def rebuilt_rows(self):
+        return {
+            (row.entity, row.date, row.status): (row.count, row.amount)
+            for entity in DailyStatisticsService.TRACKED
+            for row in DailyStatisticsService.compute(entity)
+        }
+
+    def test_signals_keep_rollup_in_sync(self):
+        """اختبار تطابق الجدول المجمع مع الجداول الأصلية بعد الإنشاء والتعديل والحذف"""
+        invoice = self.create_invoice("INV-001", Decimal("300.00"))
+        other = self.create_invoice("INV-002", Decimal("200.00"), self.today - timedelta(days=3))
+        payment = Payment.objects.create(payment_number="PAY-001", client=self.client_obj,
+                                         amount=Decimal("100.00"), payment_method="cash",
+                                         payment_date=self.today)
+        self.create_sick_leave("PSL001", self.today + timedelta(days=1))
+
+        invoice.amount = Decimal("350.00")
+        invoice.save()
+        other.status = "cancelled"
+        other.save(update_fields=['status', 'updated_at'])
+        payment.payment_method = "bank_transfer"
+        payment.save()
+        self.create_invoice("INV-003", Decimal("50.00")).delete()
+
+        self.assertEqual(self.stored_rows(), self.rebuilt_rows())
+        self.assertEqual(
+            self.stored_rows()[('invoice', self.today, 'unpaid')], (1, Decimal("350.00"))
+        )
+
+    def test_bulk_updates_apply_deltas(self):
+        """اختبار تحديث الجدول المجمع بعد التحديثات الجماعية التي لا ترسل إشارات"""
+        leave = self.create_sick_leave("PSL001", self.today - timedelta(days=1))
+        SickLeave.objects.filter(pk=leave.pk).update(status='active')
+        DailyStatisticsService.rebuild(['sick_leave'])
+        self.create_invoice("INV-001", Decimal("300.00"), self.today - timedelta(days=5))
+        self.create_invoice("INV-002", Decimal("500.00"))
+        payment = Payment.objects.create(payment_number="PAY-001", client=self.client_obj,
+                                         amount=Decimal("600.00"), payment_method="cash",
+                                         payment_date=self.today)
+
+        LeaveStatusService.update_all()
+        PaymentAllocationService.allocate([payment])
+
+        self.assertEqual(self.stored_rows(), self.rebuilt_rows())
+        self.assertEqual(self.stored_rows()[('sick_leave', self.today, 'expired')], (1, Decimal("0")))
+
+    def test_dashboard_reads_rollup(self):
+        """اختبار قراءة إحصائيات لوحة التحكم من الجدول المجمع"""
+        User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.create_invoice("INV-001", Decimal("300.00"))
+        self.create_invoice("INV-002", Decimal("200.00"), status="cancelled")
+        Payment.objects.create(payment_number="PAY-001", client=self.client_obj, amount=Decimal("120.00"),
+                               payment_method="cash", payment_date=self.today)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:home'))
+
+        stats = response.context['stats']
+        self.assertEqual(stats['invoices_count'], 2)
+        self.assertEqual(stats['clients_count'], 1)
+        self.assertEqual(stats['patients_count'], 1)
+        self.assertEqual(stats['total_invoices_amount'], Decimal("300.00"))
+        self.assertEqual(stats['total_balance'], Decimal("180.00"))
+
+        counts = [query for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        self.assertEqual(counts, [])
+
+    def test_rebuild_command(self):
+        """اختبار أمر إعادة بناء الإحصائيات اليومية"""
+        self.create_invoice("INV-001", Decimal("300.00"))
+        expected = self.stored_rows()
+        DailyStatistic.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_daily_statistics', stdout=out)
+
+        self.assertEqual(self.stored_rows(), expected)
+        self.assertIn("invoice: 1", out.getvalue())
@@ -0,0 +1,217 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.models import Hospital, Patient, TranslationJob, TranslationMemo
+from core.services.translation_service import (DictionaryTranslatorBackend,
+                                               LRUCache, TranslationMemoService,
+                                               TranslationQueue,
+                                               normalize_source_text)
+from core.templatetags.core_extras import translate_to_english
+
+
+class TranslationQueueTest(TestCase):
+    """اختبارات طابور الترجمة المؤجلة"""
+
+    def setUp(self):
+        TranslationMemoService.clear_local()
+        self.backend = DictionaryTranslatorBackend({
+            'مستشفى الاختبار': 'Test Hospital',
+            'الرياض': 'Riyadh',
+            'محمد': 'Mohammed',
+        })
+
+    def test_save_enqueues_missing_fields_only(self):
+        """اختبار تسجيل مهام للحقول الإنجليزية الفارغة فقط دون استدعاء خدمة الترجمة"""
+        hospital = Hospital.objects.create(name='مستشفى الاختبار', address='الرياض', address_en='Riyadh')
+
+        jobs = TranslationJob.objects.filter(model_label='core.hospital', object_id=hospital.pk)
+        self.assertEqual(list(jobs.values_list('target_field', flat=True)), ['name_en'])
+        self.assertIsNone(Hospital.objects.get(pk=hospital.pk).name_en)
+
+    def test_resave_does_not_duplicate_jobs(self):
+        """اختبار عدم تكرار المهمة عند إعادة حفظ الكائن"""
+        hospital = Hospital.objects.create(name='مستشفى الاختبار')
+        hospital.save()
+
+        self.assertEqual(TranslationJob.objects.filter(object_id=hospital.pk).count(), 1)
+
+    def test_enqueue_without_upsert_target_support(self):
+        """اختبار تسجيل المهام وإعادة تعيينها على قواعد لا تدعم تحديد قيد التعارض (مثل MySQL)"""
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            hospital = Hospital.objects.create(name='مستشفى الاختبار')
+            TranslationJob.objects.update(status='failed', attempts=3)
+            hospital.name = 'مستشفى الرياض'
+            hospital.save()
+
+        job = TranslationJob.objects.get(object_id=hospital.pk)
+        self.assertEqual((job.source_text, job.status, job.attempts), ('مستشفى الرياض', 'pending', 0))
+
+    def test_process_pending_fills_empty_fields(self):
+        """اختبار معالجة المهام وكتابة الترجمات في الحقول الفارغة"""
+        hospital = Hospital.objects.create(name='مستشفى الاختبار', address='الرياض')
+
+        results = TranslationQueue.process_pending(backend=self.backend)
+
+        hospital.refresh_from_db()
+        self.assertEqual(results['translated'], 2)
+        self.assertEqual(hospital.name_en, 'Test Hospital')
+        self.assertEqual(hospital.address_en, 'Riyadh')
+        self.assertEqual(TranslationQueue.pending_count(), 0)
+
+    def test_process_pending_keeps_manual_translation(self):
+        """اختبار عدم استبدال ترجمة أدخلها المستخدم بعد تسجيل المهمة"""
+        patient = Patient.objects.create(national_id='1234567890', name='محمد')
+        Patient.objects.filter(pk=patient.pk).update(name_en='Muhammad')
+
+        results = TranslationQueue.process_pending(backend=self.backend)
+
+        patient.refresh_from_db()
+        self.assertEqual(results['skipped'], 1)
+        self.assertEqual(patient.name_en, 'Muhammad')
+
+    def test_failed_translation_is_retried_then_marked_failed(self):
+        """اختبار إعادة المحاولة ثم تعليم المهمة كفاشلة بعد الحد الأقصى"""
+        Hospital.objects.create(name='مستشفى غير معروف')
+
+        for _ in range(TranslationQueue.MAX_ATTEMPTS):
+            TranslationQueue.process_pending(backend=self.backend)
+
+        job = TranslationJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.attempts, TranslationQueue.MAX_ATTEMPTS)
+
+    @override_settings(TRANSLATION_BACKEND='core.services.missing_backend.Backend')
+    def test_misconfigured_backend_does_not_raise(self):
+        """اختبار بقاء المهام للمحاولة لاحقًا عند تعذر تحميل محرك الترجمة"""
+        Hospital.objects.create(name='مستشفى الاختبار')
+
+        results = TranslationQueue.process_pending()
+
+        self.assertEqual(results['translated'], 0)
+        self.assertEqual(TranslationJob.objects.get().attempts, 1)
+
+
+class CountingBackend(DictionaryTranslatorBackend):
+    """محرك قاموس يحسب عدد النصوص المرسلة إليه"""
+
+    def __init__(self, dictionary):
+        super().__init__(dictionary)
+        self.calls = []
+
+    def translate(self, text, src='ar', dest='en'):
+        self.calls.append(text)
+        return super().translate(text, src=src, dest=dest)
+
+
+class TranslationMemoTest(TestCase):
+    """اختبارات ذاكرة الترجمات المشتركة"""
+
+    def setUp(self):
+        TranslationMemoService.clear_local()
+        self.backend = CountingBackend({'سعودي': 'Saudi'})
+
+    def test_normalize_source_text(self):
+        """اختبار حذف التشكيل والتطويل والمسافات الزائدة"""
+        self.assertEqual(normalize_source_text('  سَعُودِيّ  '), 'سعودي')
+        self.assertEqual(normalize_source_text('ســعودي'), 'سعودي')
+        self.assertEqual(normalize_source_text('شركة   الاختبار\n'), 'شركة الاختبار')
+
+    def test_repeated_text_calls_backend_once(self):
+        """اختبار أن النص المتكرر لا يُرسل إلى محرك الترجمة إلا مرة واحدة"""
+        self.assertEqual(TranslationMemoService.translate('سعودي', backend=self.backend), 'Saudi')
+        self.assertEqual(TranslationMemoService.translate(' سَعودي ', backend=self.backend), 'Saudi')
+        self.assertEqual(self.backend.calls, ['سعودي'])
+        self.assertEqual(TranslationMemo.objects.count(), 1)
+
+    def test_database_tier_survives_local_clear(self):
+        """اختبار قراءة الترجمة من الجدول بعد تفريغ ذاكرة العملية"""
+        TranslationMemoService.translate('سعودي', backend=self.backend)
+        TranslationMemoService.clear_local()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(TranslationMemoService.get('سعودي'), 'Saudi')
+        with self.assertNumQueries(0):
+            self.assertEqual(TranslationMemoService.get('سعودي'), 'Saudi')
+
+    def test_store_many_without_upsert_target_support(self):
+        """اختبار حفظ الترجمات وتحديث النصوص المفقودة على قواعد لا تدعم تحديد قيد التعارض (مثل MySQL)"""
+        TranslationMemoService.record_misses(['سعودي'])
+
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.assertEqual(TranslationMemoService.fill_missing(backend=self.backend)['translated'], 1)
+            TranslationMemoService.store_many({'سعودي': 'Saudi Arabian', 'محمد': 'Mohammed'})
+
+        self.assertEqual(
+            dict(TranslationMemo.objects.values_list('source_text', 'translated_text')),
+            {'سعودي': 'Saudi Arabian', 'محمد': 'Mohammed'},
+        )
+
+    def test_lru_eviction(self):
+        """اختبار حذف العنصر الأقدم استخدامًا عند امتلاء الذاكرة"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_save_fills_known_translations(self):
+        """اختبار ملء الحقول الإنجليزية من الذاكرة أثناء الحفظ دون إنشاء مهام"""
+        TranslationMemoService.store_many({'محمد': 'Mohammed', 'سعودي': 'Saudi'})
+
+        patient = Patient.objects.create(national_id='1234567890', name='محمد', nationality='سعودي')
+
+        patient.refresh_from_db()
+        self.assertEqual(patient.name_en, 'Mohammed')
+        self.assertEqual(patient.nationality_en, 'Saudi')
+        self.assertFalse(TranslationJob.objects.exists())
+
+    def test_warm_from_models(self):
+        """اختبار تعبئة الذاكرة من الحقول الإنجليزية الموجودة"""
+        Hospital.objects.create(name='مستشفى الاختبار', name_en='Test Hospital')
+        TranslationMemoService.clear_local()
+
+        results = TranslationMemoService.warm_from_models()
+
+        self.assertEqual(results['stored'], 1)
+        self.assertEqual(TranslationMemoService.get('مستشفى الاختبار'), 'Test Hospital')
+
+
+class TranslateToEnglishFilterTest(TestCase):
+    """اختبارات فلتر translate_to_english أثناء عرض القوالب"""
+
+    def setUp(self):
+        TranslationMemoService.clear_local()
+
+    def test_dates_use_static_index(self):
+        """اختبار ترجمة أسماء الأيام والأشهر دون استعلامات"""
+        with self.assertNumQueries(0):
+            self.assertEqual(translate_to_english('الاثنين، 05 مايو 2025'), 'Monday, 05 May 2025')
+
+    def test_miss_is_recorded_without_calling_backend(self):
+        """اختبار تسجيل النص غير المترجم دون استدعاء خدمة الترجمة"""
+        backend = CountingBackend({'مستشفى الاختبار': 'Test Hospital'})
+
+        self.assertEqual(translate_to_english('مستشفى الاختبار'), 'مستشفى الاختبار')
+        with self.assertNumQueries(0):
+            translate_to_english('مستشفى الاختبار')
+        self.assertEqual(TranslationMemo.objects.get().translated_text, '')
+        self.assertEqual(backend.calls, [])
+
+        results = TranslationMemoService.fill_missing(backend=backend)
+
+        self.assertEqual(results['translated'], 1)
+        self.assertEqual(translate_to_english('مستشفى الاختبار'), 'Test Hospital')
+
+    def test_recorded_miss_does_not_block_queue(self):
+        """اختبار أن النص المسجل كمفقود يُترجم عند معالجته من الطابور"""
+        TranslationMemoService.record_misses(['محمد'])
+        backend = CountingBackend({'محمد': 'Mohammed'})
+
+        self.assertEqual(TranslationMemoService.translate('محمد', backend=backend), 'Mohammed')
+        self.assertEqual(backend.calls, ['محمد'])
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Client, Doctor, Hospital, Patient
+from core.services.typeahead_service import TypeaheadService
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'typeahead-tests',
+    }
+}
+
+
+class TypeaheadTest(TestCase):
+    """اختبارات خدمة الإكمال التلقائي"""
+
+    def setUp(self):
+        self.hospitals = [Hospital.objects.create(name=f"مستشفى {index}") for index in range(3)]
+        self.patient = Patient.objects.create(national_id="1234567890", name="سعد الحربي")
+        self.client_obj = Client.objects.create(name="سعد للتجارة", phone="0555555555")
+
+    def create_doctors(self, count):
+        for index in range(count):
+            doctor = Doctor.objects.create(name=f"سعد {index}", national_id=f"10000000{index:02d}")
+            doctor.hospitals.add(*self.hospitals[:2])
+
+    def get_doctors(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:doctor_search_api'), {'q': 'سعد', 'limit': 20})
+        return response.json(), [query for query in queries.captured_queries if 'core_' in query['sql']]
+
+    def test_doctor_search_query_count_is_constant(self):
+        """اختبار جلب مستشفيات الأطباء باستعلام واحد مهما كان عدد النتائج"""
+        self.create_doctors(2)
+        results, few_queries = self.get_doctors()
+        self.assertEqual(results[0]['hospital'], "مستشفى 0, مستشفى 1")
+
+        self.create_doctors(8)
+        results, many_queries = self.get_doctors()
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(many_queries), len(few_queries))
+
+    def test_multi_entity_endpoint(self):
+        """اختبار إرجاع الأطباء والمرضى والعملاء في طلب واحد"""
+        self.create_doctors(1)
+        response = self.client.get(reverse('core:typeahead_api'), {'q': 'سعد'})
+        data = response.json()
+
+        self.assertEqual(set(data), {'doctor', 'patient', 'client'})
+        self.assertEqual([row['id'] for row in data['patient']], [self.patient.pk])
+        self.assertEqual(data['client'][0]['display'], "سعد للتجارة")
+
+        response = self.client.get(reverse('core:typeahead_api'), {'q': 'سعد', 'types': 'patient'})
+        self.assertEqual(set(response.json()), {'patient'})
+
+        response = self.client.get(reverse('core:typeahead_api'), {'q': 'سعد', 'types': 'invoice'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_prefix_results_are_cached(self):
+        """اختبار خدمة نفس البادئة من الكاش وتحديثها بعد تغيير المستشفيات"""
+        cache.clear()
+        self.create_doctors(1)
+        doctor = Doctor.objects.get()
+
+        self.assertEqual(TypeaheadService.search('doctor', "سعد")[0]['hospital'], "مستشفى 0, مستشفى 1")
+        with CaptureQueriesContext(connection) as queries:
+            # شكل مختلف لنفس الكلمة يشترك في نفس المفتاح
+            TypeaheadService.search('doctor', "سَعد")
+        self.assertFalse(any('core_searchtoken' in query['sql'] for query in queries.captured_queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor.hospitals.remove(self.hospitals[0])
+        self.assertEqual(TypeaheadService.search('doctor', "سعد")[0]['hospital'], "مستشفى 1")
+        cache.clear()
@@ -9,7 +9,9 @@ urlpatterns = [
     path('clients/api/search/', views.client_search_api, name='client_search_api'),
     path('sick-leaves/api/search/', views.sick_leave_search_api, name='sick_leave_search_api'),
     path('companion-leaves/api/search/', views.companion_leave_search_api, name='companion_leave_search_api'),
+    path('api/typeahead/', views.typeahead_api, name='typeahead_api'),
     path('leave-prices/api/get-price/', views.leave_price_api_get_price, name='leave_price_api_get_price'),
+    path('leave-prices/api/get-prices/', views.leave_price_api_get_prices, name='leave_price_api_get_prices'),
     path('api/client/<int:client_id>/unpaid-invoices/', views.api_client_unpaid_invoices, name='api_client_unpaid_invoices'),
     path('api/generate-sick-leave-id/', views.generate_sick_leave_id_api, name='generate_sick_leave_id_api'),
     path('api/generate-companion-leave-id/', views.generate_companion_leave_id_api, name='generate_companion_leave_id_api'),
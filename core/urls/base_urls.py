@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from django.views.generic import TemplateView
 
 from core import views
@@ -8,6 +8,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('verify/', views.verify, name='verify'),
+    re_path(r'^qrcode/(?P<key>[0-9a-f]{64})\.png$', views.qrcode_image, name='qrcode_image'),
     path('leaves/update-status/', views.update_all_leaves_status, name='update_all_leaves_status'),
     path('test-ajax/', TemplateView.as_view(template_name='test_ajax.html'), name='test_ajax'),
     path('test-template-tags/', views.test_template_tags, name='test_template_tags'),
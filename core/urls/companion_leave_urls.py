@@ -11,4 +11,5 @@ urlpatterns = [
     path('companion-leaves/<int:companion_leave_id>/edit/', views.companion_leave_edit, name='companion_leave_edit'),
     path('companion-leaves/<int:companion_leave_id>/delete/', views.companion_leave_delete, name='companion_leave_delete'),
     path('companion-leaves/<int:companion_leave_id>/print/', views.companion_leave_print, name='companion_leave_print'),
+    path('companion-leaves/print/batch/', views.companion_leave_print_batch, name='companion_leave_print_batch'),
 ]
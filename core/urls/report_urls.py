@@ -10,4 +10,11 @@ urlpatterns = [
     path('reports/invoices/', views.report_invoices, name='report_invoices'),
     path('reports/payments/', views.report_payments, name='report_payments'),
     path('reports/clients/', views.report_clients, name='report_clients'),
+    path('reports/sick-leaves/export/', views.report_export, {'report': 'sick_leaves'},
+         name='report_sick_leaves_export'),
+    path('reports/companion-leaves/export/', views.report_export, {'report': 'companion_leaves'},
+         name='report_companion_leaves_export'),
+    path('reports/invoices/export/', views.report_export, {'report': 'invoices'}, name='report_invoices_export'),
+    path('reports/payments/export/', views.report_export, {'report': 'payments'}, name='report_payments_export'),
+    path('reports/clients/export/', views.report_export, {'report': 'clients'}, name='report_clients_export'),
 ]
@@ -11,4 +11,5 @@ urlpatterns = [
     path('sick-leaves/<int:sick_leave_id>/edit/', views.sick_leave_edit, name='sick_leave_edit'),
     path('sick-leaves/<int:sick_leave_id>/delete/', views.sick_leave_delete, name='sick_leave_delete'),
     path('sick-leaves/<int:sick_leave_id>/print/', views.sick_leave_print, name='sick_leave_print'),
+    path('sick-leaves/print/batch/', views.sick_leave_print_batch, name='sick_leave_print_batch'),
 ]
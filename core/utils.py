@@ -1,15 +1,10 @@
-import datetime
-import random
 import re
 
-from googletrans import Translator
-from hijri_converter import Gregorian
-
 from core.models import (CompanionLeave, LeaveInvoice, LeavePrice, Payment,
                          SickLeave)
-
-# إنشاء كائن المترجم
-translator = Translator()
+from core.services.hijri_service import HijriCalendar
+from core.services.numbering_service import NumberSequenceService
+from core.services.translation_service import TranslationMemoService
 
 
 def generate_unique_number(prefix, model=None):
@@ -18,92 +13,14 @@ def generate_unique_number(prefix, model=None):
 
     المعلمات:
     - prefix: بادئة الرقم (PSL/GSL للإجازات المرضية، PSL/GSL لإجازات المرافقين، INV للفواتير، PAY للمدفوعات)
-    - model: نموذج البيانات للتحقق من عدم وجود رقم مطابق
+    - model: نموذج البيانات، يُستخدم لبدء التسلسل بعد أكبر رقم موجود عند إنشاء عداد جديد
 
     يعيد:
-    - رقم فريد بالتنسيق:
-      - للإجازات: PREFIXYYYYMMDDXXXXX (مثل PSL20250518123456)
-      - للفواتير والمدفوعات: PREFIX-YYYYMMDD-XXXXX
-    """
-    today = datetime.date.today()
-    date_string = today.strftime('%Y')
-
-    # تحديد ما إذا كانت البادئة خاصة بالإجازات (PSL أو GSL)
-    is_leave_prefix = prefix in ['PSL', 'GSL']
-
-    # استخدام نطاق أكبر من الأرقام العشوائية لتقليل احتمالية التكرار
-    if is_leave_prefix:
-        # للإجازات، نستخدم تنسيق PSL/GSL متبوعًا بـ 10 أرقام بدون فواصل
-        # نستخدم تاريخ اليوم (YYYYMMDD) متبوعًا بـ 2 أرقام عشوائية
-        date_part = today.strftime('%Y%m%d')
-        random_num = str(random.randint(10, 99))
-        unique_number = f'{prefix}{date_part}{random_num}'
-
-        # التأكد من أن طول الرقم بعد البادئة هو 10 أرقام بالضبط
-        digits_after_prefix = unique_number[len(prefix):]
-        if len(digits_after_prefix) < 10:
-            # إضافة أصفار للوصول إلى 10 أرقام
-            unique_number = f'{prefix}{digits_after_prefix.zfill(10)}'
-        elif len(digits_after_prefix) > 10:
-            # اقتطاع الأرقام الزائدة للوصول إلى 10 أرقام
-            unique_number = f'{prefix}{digits_after_prefix[:10]}'
-    else:
-        # للفواتير والمدفوعات، نستخدم التنسيق القديم
-        random_num = str(random.randint(10000, 99999))
-        unique_number = f'{prefix}-{date_string}-{random_num}'
-
-    # التحقق من عدم وجود رقم مطابق
-    if model:
-        field_name = None
-        if model == SickLeave or model == CompanionLeave:
-            field_name = 'leave_id'
-        elif model == LeaveInvoice:
-            field_name = 'invoice_number'
-        elif model == Payment:
-            field_name = 'payment_number'
-
-        if field_name:
-            # استمر في توليد أرقام عشوائية حتى تجد رقمًا فريدًا
-            attempts = 0
-            max_attempts = 100  # تحديد عدد أقصى من المحاولات لتجنب الحلقات اللانهائية
-
-            while model.objects.filter(**{field_name: unique_number}).exists() and attempts < max_attempts:
-                # استخدام مزيج من الوقت الحالي والرقم العشوائي لزيادة الفرادة
-                timestamp = datetime.datetime.now().strftime('%H%M%S')
-
-                if is_leave_prefix:
-                    # للإجازات، نستخدم تنسيق PSL/GSL متبوعًا بـ 10 أرقام بدون فواصل
-                    date_part = today.strftime('%Y%m%d')
-                    random_num = str(random.randint(10, 99))
-                    unique_number = f'{prefix}{date_part}{random_num}'
-
-                    # التأكد من أن طول الرقم بعد البادئة هو 10 أرقام بالضبط
-                    digits_after_prefix = unique_number[len(prefix):]
-                    if len(digits_after_prefix) < 10:
-                        # إضافة أصفار للوصول إلى 10 أرقام
-                        unique_number = f'{prefix}{digits_after_prefix.zfill(10)}'
-                    elif len(digits_after_prefix) > 10:
-                        # اقتطاع الأرقام الزائدة للوصول إلى 10 أرقام
-                        unique_number = f'{prefix}{digits_after_prefix[:10]}'
-                else:
-                    # للفواتير والمدفوعات، نستخدم التنسيق القديم
-                    random_num = str(random.randint(10000, 99999))
-                    unique_number = f'{prefix}-{date_string}-{random_num}'
-
-                attempts += 1
-
-            # إذا وصلنا إلى الحد الأقصى من المحاولات، نضيف طابعًا زمنيًا كاملًا للتأكد من الفرادة
-            if attempts >= max_attempts:
-                timestamp = datetime.datetime.now().strftime('%H%M%S%f')
-
-                if is_leave_prefix:
-                    # للإجازات، نستخدم تنسيق بدون فواصل
-                    unique_number = f'{prefix}{date_string}{timestamp[:10]}'
-                else:
-                    # للفواتير والمدفوعات، نستخدم التنسيق القديم
-                    unique_number = f'{prefix}-{date_string}-{timestamp}'
-
-    return unique_number
+    - رقم فريد من تسلسل NumberSequence بالتنسيق:
+      - للإجازات: PREFIXYYMMDDXXXX (مثل PSL2505180001)
+      - للفواتير والمدفوعات: PREFIX-YYYY-XXXXXX (مثل INV-2025-000001)
+    """
+    return NumberSequenceService.generate(prefix, model)
 
 
 def calculate_leave_duration(start_date, end_date):
@@ -179,7 +96,7 @@ def translate_text(text, src='ar', dest='en'):
     - dest: لغة الهدف (افتراضيًا: الإنجليزية)
 
     يعيد:
-    - النص المترجم
+    - النص المترجم (من ذاكرة الترجمات إن وجد)
     """
     if not text:
         return ""
@@ -192,9 +109,9 @@ def translate_text(text, src='ar', dest='en'):
             if not arabic_pattern.search(str(text)):
                 return text
 
-        # ترجمة النص
-        translation = translator.translate(str(text), src=src, dest=dest)
-        return translation.text
+        # ترجمة النص عبر ذاكرة الترجمات المشتركة
+        translation = TranslationMemoService.translate(str(text), src=src, dest=dest)
+        return translation or text
     except Exception as e:
         # print(f"خطأ في الترجمة: {e}")
         return text
@@ -208,18 +125,10 @@ def convert_to_hijri(date_obj):
     - date_obj: كائن تاريخ ميلادي (datetime.date)
 
     يعيد:
-    - سلسلة نصية تمثل التاريخ الهجري بتنسيق "DD-MM-YYYY"
+    - سلسلة نصية تمثل التاريخ الهجري بنفس تنسيق حقول *_hijri في النماذج "YYYY-M-D"،
+      أو نصًا فارغًا إذا كان التاريخ خارج النطاق المدعوم
     """
-    if not date_obj:
-        return ""
-
-    try:
-        g_date = Gregorian(date_obj.day, date_obj.month, date_obj.year)
-        hijri_date = g_date.to_hijri()
-        return f"{hijri_date.day}-{hijri_date.month}-{hijri_date.year}"
-    except Exception as e:
-        # print(f"خطأ في تحويل التاريخ إلى هجري: {e}")
-        return ""
+    return HijriCalendar.format(date_obj)
 
 
 def get_leave_price(leave_type, duration, client=None):
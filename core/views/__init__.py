@@ -7,11 +7,12 @@ try:
                             companion_leave_search_api, doctor_search_api,
                             generate_companion_leave_id_api,
                             generate_sick_leave_id_api,
-                            leave_price_api_get_price, patient_search_api,
-                            sick_leave_search_api)
+                            leave_price_api_get_price,
+                            leave_price_api_get_prices, patient_search_api,
+                            sick_leave_search_api, typeahead_api)
     # Auth views
     from .auth_views import password_change, register
-    from .base_views import (about, home, test_template_tags,
+    from .base_views import (about, home, qrcode_image, test_template_tags,
                              update_all_leaves_status, verify)
     from .client_ajax_views import *
     # Model views
@@ -1,93 +1,60 @@
-from django.db.models import Q
+import json
+
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_POST
 
-from core.models import (Client, CompanionLeave, Doctor, LeaveInvoice,
-                         LeavePrice, Patient, SickLeave)
+from core.models import Client, LeaveInvoice
+from core.services.pricing_service import PricingService
+from core.services.typeahead_service import TypeaheadService
 from core.utils import generate_companion_leave_id, generate_sick_leave_id
 
 
 def doctor_search_api(request):
     """واجهة برمجة تطبيقات للبحث عن الأطباء"""
-    query = request.GET.get('q', '')
-    if not query:
-        return JsonResponse([], safe=False)
+    return typeahead_response(request, 'doctor')
 
-    doctors = Doctor.objects.filter(
-        Q(name__icontains=query) | Q(national_id__icontains=query)
-    )[:10]
 
-    results = []
-    for doctor in doctors:
-        results.append({
-            'id': doctor.id,
-            'display': doctor.name,
-            'national_id': doctor.national_id or '',
-            'position': doctor.position or '',
-            'hospital': ', '.join([h.name for h in doctor.hospitals.all()]) if doctor.hospitals.exists() else '',
-            'phone': doctor.phone or '',
-            'email': doctor.email or ''
-        })
+def patient_search_api(request):
+    """واجهة برمجة تطبيقات للبحث عن المرضى"""
+    return typeahead_response(request, 'patient')
 
-    return JsonResponse(results, safe=False)
+
+def client_search_api(request):
+    """واجهة برمجة تطبيقات للبحث عن العملاء"""
+    return typeahead_response(request, 'client')
 
 
-def patient_search_api(request):
-    """واجهة برمجة تطبيقات للبحث عن المرضى"""
+def typeahead_response(request, entity):
+    """نتائج الإكمال التلقائي لنوع واحد"""
     query = request.GET.get('q', '')
     if not query:
         return JsonResponse([], safe=False)
 
-    patients = Patient.objects.filter(
-        Q(name__icontains=query) |
-        Q(national_id__icontains=query) |
-        Q(phone__icontains=query) |
-        Q(email__icontains=query)
-    )[:10]
-
-    results = []
-    for patient in patients:
-        employer_name = patient.employer_name or "غير محدد"
-        national_id_display = f" ({patient.national_id})" if patient.national_id else ""
-        results.append({
-            'id': patient.id,
-            'text': f"{patient.name}{national_id_display}",
-            'display': patient.name,
-            'national_id': patient.national_id or '',
-            'nationality': patient.nationality or '',
-            'employer': employer_name,
-            'phone': patient.phone or '',
-            'email': patient.email or '',
-            'address': patient.address or ''
-        })
+    limit = TypeaheadService.get_limit(request.GET.get('limit'))
+    return JsonResponse(TypeaheadService.search(entity, query, limit), safe=False)
 
-    return JsonResponse(results, safe=False)
 
+def typeahead_api(request):
+    """
+    واجهة الإكمال التلقائي الموحدة: نتائج عدة أنواع في طلب واحد
 
-def client_search_api(request):
-    """واجهة برمجة تطبيقات للبحث عن العملاء"""
+    المعلمات: q نص البحث، types الأنواع مفصولة بفواصل (افتراضيًا doctor,patient,client)،
+    limit عدد النتائج لكل نوع.
+    """
     query = request.GET.get('q', '')
-    if not query:
-        return JsonResponse([], safe=False)
+    types = request.GET.get('types')
+    entities = [entity.strip() for entity in types.split(',') if entity.strip()] if types else TypeaheadService.DEFAULT_ENTITIES
 
-    clients = Client.objects.filter(
-        Q(name__icontains=query) | Q(phone__icontains=query) | Q(email__icontains=query)
-    )[:10]
+    unknown = [entity for entity in entities if entity not in TypeaheadService.MODELS]
+    if unknown:
+        return JsonResponse({'success': False, 'message': f'نوع غير معروف: {", ".join(unknown)}'}, status=400)
 
-    results = []
-    for client in clients:
-        phone_display = f" ({client.phone})" if client.phone else ""
-        results.append({
-            'id': client.id,
-            'text': f"{client.name}{phone_display}",
-            'display': client.name,
-            'phone': client.phone or '',
-            'email': client.email or '',
-            'address': client.address or '',
-            'balance': client.get_balance()
-        })
+    if not query:
+        return JsonResponse({entity: [] for entity in entities})
 
-    return JsonResponse(results, safe=False)
+    limit = TypeaheadService.get_limit(request.GET.get('limit'))
+    return JsonResponse(TypeaheadService.search_many(entities, query, limit))
 
 
 def leave_price_api_get_price(request):
@@ -111,72 +78,16 @@ def leave_price_api_get_price(request):
             return JsonResponse({'success': False, 'message': 'العميل غير موجود'})
 
     try:
-        price = LeavePrice.get_price(leave_type, duration_days, client)
+        # السعر ونوعه ومصدره من نفس مسار التسعير المستخدم في LeavePrice.get_price
+        quote = PricingService.quote(leave_type, duration_days, client)
     except Exception as e:
         return JsonResponse({'success': False, 'message': f'خطأ في حساب السعر: {str(e)}'})
 
+    price = quote.price
+
     # الحصول على معلومات إضافية
     leave_type_display = 'إجازة مرضية' if leave_type == 'sick_leave' else 'إجازة مرافق'
 
-    # تحديد نوع السعر (ثابت أو يومي) ومصدر السعر
-    price_source = "غير محدد"
-    price_type = "per_day"  # افتراضي
-
-    # 1. البحث عن سعر يومي مخصص للعميل بمدة مطابقة تمامًا
-    if client:
-        exact_price = LeavePrice.objects.filter(
-            leave_type=leave_type,
-            duration_days=duration_days,
-            client=client,
-            pricing_type='per_day',
-            is_active=True
-        ).first()
-
-        if exact_price:
-            price_type = 'per_day'
-            price_source = "سعر يومي مخصص للعميل"
-        else:
-            # 2. البحث عن سعر ثابت مخصص للعميل
-            fixed_price = LeavePrice.objects.filter(
-                leave_type=leave_type,
-                client=client,
-                pricing_type='fixed',
-                is_active=True
-            ).first()
-
-            if fixed_price:
-                price_type = 'fixed'
-                price_source = "سعر ثابت مخصص للعميل"
-
-    # إذا لم يتم العثور على سعر مخصص للعميل، ابحث عن السعر العام
-    if price_source == "غير محدد":
-        # 3. البحث عن سعر يومي عام بمدة مطابقة تمامًا
-        exact_price = LeavePrice.objects.filter(
-            leave_type=leave_type,
-            duration_days=duration_days,
-            client__isnull=True,
-            pricing_type='per_day',
-            is_active=True
-        ).first()
-
-        if exact_price:
-            price_type = 'per_day'
-            price_source = "سعر يومي عام"
-        else:
-            # 4. البحث عن سعر ثابت عام
-            fixed_price = LeavePrice.objects.filter(
-                leave_type=leave_type,
-                client__isnull=True,
-                pricing_type='fixed',
-                is_active=True
-            ).first()
-
-            if fixed_price:
-                price_type = 'fixed'
-                price_source = "سعر ثابت عام"
-            else:
-                price_source = "سعر محسوب"
-
     # حساب السعر اليومي
     daily_price = float(price) / duration_days if duration_days > 0 and price else 0
 
@@ -186,94 +97,102 @@ def leave_price_api_get_price(request):
         'leave_type': leave_type,
         'leave_type_display': leave_type_display,
         'duration_days': duration_days,
-        'price_type': price_type,
-        'price_source': price_source,
+        'price_type': quote.pricing_type,
+        'price_source': quote.source_display,
         'daily_price': daily_price,
         'client_id': client.id if client else None,
         'client_name': client.name if client else None
     })
 
 
-def sick_leave_search_api(request):
-    """واجهة برمجة تطبيقات للبحث عن الإجازات المرضية"""
-    query = request.GET.get('q', '')
-    if not query:
-        return JsonResponse([], safe=False)
-
-    sick_leaves = SickLeave.objects.filter(
-        Q(leave_id__icontains=query) |
-        Q(patient__name__icontains=query) |
-        Q(patient__national_id__icontains=query) |
-        Q(doctor__name__icontains=query)
-    )[:10]
+MAX_PRICE_BATCH_SIZE = 500
 
-    results = []
-    for leave in sick_leaves:
-        # الحصول على عرض الحالة
-        status_display = {
-            'active': 'نشطة',
-            'cancelled': 'ملغية',
-            'expired': 'منتهية'
-        }.get(leave.status, leave.status)
 
-        results.append({
-            'id': leave.id,
-            'text': f"{leave.leave_id} - {leave.patient.name}",
-            'leave_id': leave.leave_id,
-            'patient_name': leave.patient.name,
-            'patient_id': leave.patient.id,
-            'doctor_name': leave.doctor.name if leave.doctor else '',
-            'start_date': leave.start_date.strftime('%Y-%m-%d') if leave.start_date else '',
-            'end_date': leave.end_date.strftime('%Y-%m-%d') if leave.end_date else '',
-            'duration_days': leave.duration_days,
-            'status': leave.status,
-            'status_display': status_display
-        })
+@require_POST
+def leave_price_api_get_prices(request):
+    """
+    واجهة برمجية لتسعير مجموعة إجازات في طلب واحد
 
-    return JsonResponse(results, safe=False)
+    جسم الطلب (JSON):
+    {"items": [{"leave_type": "sick_leave", "duration_days": 3, "client_id": 1}, ...]}
 
+    تُعاد النتائج بنفس ترتيب العناصر، وعدد الاستعلامات ثابت مهما كان عدد العناصر.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except (ValueError, TypeError):
+        return JsonResponse({'success': False, 'message': 'بيانات غير صحيحة'}, status=400)
+
+    items = payload.get('items') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'success': False, 'message': 'بيانات غير صحيحة'}, status=400)
+
+    if len(items) > MAX_PRICE_BATCH_SIZE:
+        return JsonResponse({
+            'success': False,
+            'message': f'الحد الأقصى لعدد العناصر هو {MAX_PRICE_BATCH_SIZE}'
+        }, status=400)
+
+    # تجهيز العناصر مع التحقق من صحة المدة
+    batch = []
+    client_ids = set()
+    for item in items:
+        if not isinstance(item, dict):
+            item = {}
+        try:
+            duration_days = int(item.get('duration_days') or 0)
+        except (ValueError, TypeError):
+            duration_days = 0
+        try:
+            client_id = int(item['client_id']) if item.get('client_id') else None
+        except (ValueError, TypeError):
+            client_id = None
+        if client_id:
+            client_ids.add(client_id)
+        batch.append((str(item.get('leave_type') or ''), duration_days, client_id))
 
-def companion_leave_search_api(request):
-    """واجهة برمجة تطبيقات للبحث عن إجازات المرافقين"""
-    query = request.GET.get('q', '')
-    if not query:
-        return JsonResponse([], safe=False)
+    # جلب أسماء جميع العملاء في استعلام واحد
+    client_names = dict(Client.objects.filter(id__in=client_ids).values_list('id', 'name')) if client_ids else {}
 
-    companion_leaves = CompanionLeave.objects.filter(
-        Q(leave_id__icontains=query) |
-        Q(patient__name__icontains=query) |
-        Q(patient__national_id__icontains=query) |
-        Q(companion__name__icontains=query) |
-        Q(companion__national_id__icontains=query) |
-        Q(doctor__name__icontains=query)
-    )[:10]
+    quotes = PricingService.quote_many(
+        (leave_type, duration_days, client_id if client_id in client_names else None)
+        for leave_type, duration_days, client_id in batch
+    )
 
     results = []
-    for leave in companion_leaves:
-        # الحصول على عرض الحالة
-        status_display = {
-            'active': 'نشطة',
-            'cancelled': 'ملغية',
-            'expired': 'منتهية'
-        }.get(leave.status, leave.status)
-
+    for (leave_type, duration_days, client_id), quote in zip(batch, quotes):
+        if not leave_type or duration_days <= 0:
+            results.append({'success': False, 'message': 'بيانات غير صحيحة'})
+            continue
+        if client_id and client_id not in client_names:
+            results.append({'success': False, 'message': 'العميل غير موجود'})
+            continue
+
+        price = quote.price
         results.append({
-            'id': leave.id,
-            'text': f"{leave.leave_id} - {leave.patient.name} ({leave.companion.name})",
-            'leave_id': leave.leave_id,
-            'patient_name': leave.patient.name,
-            'patient_id': leave.patient.id,
-            'companion_name': leave.companion.name,
-            'companion_id': leave.companion.id,
-            'doctor_name': leave.doctor.name if leave.doctor else '',
-            'start_date': leave.start_date.strftime('%Y-%m-%d') if leave.start_date else '',
-            'end_date': leave.end_date.strftime('%Y-%m-%d') if leave.end_date else '',
-            'duration_days': leave.duration_days,
-            'status': leave.status,
-            'status_display': status_display
+            'success': True,
+            'price': float(price) if price else 0,
+            'leave_type': leave_type,
+            'leave_type_display': 'إجازة مرضية' if leave_type == 'sick_leave' else 'إجازة مرافق',
+            'duration_days': duration_days,
+            'price_type': quote.pricing_type,
+            'price_source': quote.source_display,
+            'daily_price': float(price) / duration_days if price else 0,
+            'client_id': client_id,
+            'client_name': client_names.get(client_id),
         })
 
-    return JsonResponse(results, safe=False)
+    return JsonResponse({'success': True, 'results': results})
+
+
+def sick_leave_search_api(request):
+    """واجهة برمجة تطبيقات للبحث عن الإجازات المرضية"""
+    return typeahead_response(request, 'sick_leave')
+
+
+def companion_leave_search_api(request):
+    """واجهة برمجة تطبيقات للبحث عن إجازات المرافقين"""
+    return typeahead_response(request, 'companion_leave')
 
 
 def generate_sick_leave_id_api(request):
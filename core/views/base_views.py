@@ -1,44 +1,44 @@
 from django.contrib.auth.decorators import login_required
-from django.db import models
+from django.http import Http404, HttpResponse, HttpResponseNotModified
 from django.shortcuts import redirect, render
+from django.views.decorators.http import require_GET
 
 from core.models import (Client, CompanionLeave, Doctor, Hospital,
                          LeaveInvoice, Patient, Payment, SickLeave)
+from core.services.cache_service import VersionedCacheService
+from core.services.count_service import CountService
+from core.services.leave_status_service import LeaveStatusService
+from core.services.qrcode_service import QRCodeService
+from core.services.statistics_service import DailyStatisticsService
+
+
+# النماذج التي تعتمد عليها لوحة التحكم المخزنة في الكاش
+DASHBOARD_MODELS = (SickLeave, CompanionLeave, LeaveInvoice, Payment, Client, Patient, Doctor)
+
+
+def get_dashboard_context():
+    """الإحصائيات العامة وآخر السجلات في لوحة التحكم (مشتركة بين جميع المستخدمين)"""
+    return {
+        # الإحصائيات العامة والمالية من جدول الإحصائيات اليومية المجمع
+        'stats': DailyStatisticsService.get_dashboard_stats(),
+        # آخر الإجازات والفواتير والمدفوعات مع السجلات المرتبطة المعروضة
+        'recent_sick_leaves': list(SickLeave.objects.select_related('patient').order_by('-created_at')[:5]),
+        'recent_companion_leaves': list(
+            CompanionLeave.objects.select_related('patient', 'companion').order_by('-created_at')[:5]
+        ),
+        'recent_invoices': list(LeaveInvoice.objects.select_related('client').order_by('-created_at')[:5]),
+        'recent_payments': list(Payment.objects.select_related('client').order_by('-created_at')[:5]),
+    }
 
 
 def home(request):
     """الصفحة الرئيسية"""
     # إذا كان المستخدم مسجل الدخول، عرض لوحة التحكم
     if request.user.is_authenticated:
-        # إحصائيات عامة
-        stats = {
-            'sick_leaves_count': SickLeave.objects.count(),
-            'companion_leaves_count': CompanionLeave.objects.count(),
-            'invoices_count': LeaveInvoice.objects.count(),
-            'payments_count': Payment.objects.count(),
-            'clients_count': Client.objects.count(),
-            'patients_count': Patient.objects.count(),
-            'doctors_count': Doctor.objects.count(),
-        }
-
-        # إحصائيات مالية
-        total_invoices_amount = LeaveInvoice.objects.filter(status__in=['unpaid', 'partially_paid', 'paid']).aggregate(total=models.Sum('amount'))['total'] or 0
-        total_payments_amount = Payment.objects.aggregate(total=models.Sum('amount'))['total'] or 0
-        stats['total_invoices_amount'] = total_invoices_amount
-        stats['total_payments_amount'] = total_payments_amount
-        stats['total_balance'] = total_invoices_amount - total_payments_amount
-
-        # آخر الإجازات المرضية
-        recent_sick_leaves = SickLeave.objects.order_by('-created_at')[:5]
-
-        # آخر إجازات المرافقين
-        recent_companion_leaves = CompanionLeave.objects.order_by('-created_at')[:5]
-
-        # آخر الفواتير
-        recent_invoices = LeaveInvoice.objects.order_by('-created_at')[:5]
-
-        # آخر المدفوعات
-        recent_payments = Payment.objects.order_by('-created_at')[:5]
+        context = dict(VersionedCacheService.get_or_set(
+            'dashboard', DASHBOARD_MODELS, get_dashboard_context, timeout_type='statistics'
+        ))
+        stats = context['stats'] = dict(context['stats'])
 
         # إحصائيات خاصة بالطبيب
         if hasattr(request.user, 'is_doctor') and request.user.is_doctor():
@@ -46,19 +46,12 @@ def home(request):
             if doctor:
                 doctor_sick_leaves = SickLeave.objects.filter(doctor=doctor)
                 doctor_companion_leaves = CompanionLeave.objects.filter(doctor=doctor)
-                stats['doctor_sick_leaves_count'] = doctor_sick_leaves.count()
-                stats['doctor_companion_leaves_count'] = doctor_companion_leaves.count()
+                # عدد دقيق حتى حد CountService ثم تقديري
+                stats['doctor_sick_leaves_count'] = CountService.count(doctor_sick_leaves)
+                stats['doctor_companion_leaves_count'] = CountService.count(doctor_companion_leaves)
                 stats['doctor_recent_sick_leaves'] = doctor_sick_leaves.order_by('-created_at')[:5]
                 stats['doctor_recent_companion_leaves'] = doctor_companion_leaves.order_by('-created_at')[:5]
 
-        context = {
-            'stats': stats,
-            'recent_sick_leaves': recent_sick_leaves,
-            'recent_companion_leaves': recent_companion_leaves,
-            'recent_invoices': recent_invoices,
-            'recent_payments': recent_payments,
-        }
-
         return render(request, 'core/home.html', context)
 
     # إذا كان المستخدم غير مسجل الدخول، عرض صفحة الترحيب
@@ -132,23 +125,10 @@ def verify(request):
 @login_required
 def update_all_leaves_status(request):
     """تحديث حالة جميع الإجازات"""
-    # تحديث حالة الإجازات المرضية
-    sick_leaves = SickLeave.objects.all()
-    sick_updated = 0
-    for leave in sick_leaves:
-        old_status = leave.status
-        leave.update_status()
-        if old_status != leave.status:
-            sick_updated += 1
-
-    # تحديث حالة إجازات المرافقين
-    companion_leaves = CompanionLeave.objects.all()
-    companion_updated = 0
-    for leave in companion_leaves:
-        old_status = leave.status
-        leave.update_status()
-        if old_status != leave.status:
-            companion_updated += 1
+    # تحديث جماعي باستعلامات UPDATE بدلاً من حفظ كل إجازة على حدة
+    results = LeaveStatusService.update_all()
+    sick_updated = results['sick_updated']
+    companion_updated = results['companion_updated']
 
     from django.contrib import messages
     from django.shortcuts import redirect
@@ -159,9 +139,26 @@ def update_all_leaves_status(request):
     referer = request.META.get('HTTP_REFERER')
     if referer:
         return redirect(referer)
-    return redirect('core:dashboard')
+    return redirect('core:home')
 
 
 def test_template_tags(request):
     """صفحة اختبار Template Tags"""
     return render(request, 'test_template_tags.html')
+
+
+@require_GET
+def qrcode_image(request, key):
+    """صورة QR مخزنة مؤقتًا (المحتوى ثابت لكل مفتاح فيُخزَّن في المتصفح دون إعادة تحقق)"""
+    etag = f'"{key}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        data = QRCodeService.get_image(key)
+        if data is None:
+            raise Http404("صورة QR غير موجودة")
+        response = HttpResponse(data, content_type='image/png')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -4,12 +4,13 @@ from django.shortcuts import get_object_or_404, redirect, render
 
 from core.forms import ClientForm
 from core.models import Client, LeaveInvoice, Payment
+from core.pagination import paginate_keyset
 
 
 @login_required
 def client_list(request):
     """قائمة العملاء"""
-    clients = Client.objects.all().order_by('name')
+    clients = Client.objects.with_balances()
 
     # تطبيق الفلاتر
     name = request.GET.get('name')
@@ -25,7 +26,21 @@ def client_list(request):
     if email:
         clients = clients.filter(email__icontains=email)
 
-    return render(request, 'core/clients/list.html', {'clients': clients})
+    # الترتيب
+    sort_by = request.GET.get('sort', 'name')
+    if sort_by not in ['name', '-name']:
+        sort_by = 'name'
+
+    # الترقيم الصفحي بالمؤشر مع العدد التقريبي (20 عميلًا في كل صفحة)
+    page_obj = paginate_keyset(request, clients, (sort_by,), 20, estimate_total=True)
+
+    return render(request, 'core/clients/list.html', {
+        'clients': page_obj,
+        'name': name,
+        'phone': phone,
+        'email': email,
+        'sort': sort_by,
+    })
 
 
 @login_required
@@ -85,7 +100,8 @@ def client_delete(request, client_id):
 @login_required
 def client_detail(request, client_id):
     """تفاصيل العميل"""
-    client = get_object_or_404(Client, id=client_id)
+    # الإجماليات والرصيد محسوبة في نفس استعلام جلب العميل
+    client = get_object_or_404(Client.objects.with_balances(), id=client_id)
 
     # الحصول على الفواتير للعميل
     invoices = LeaveInvoice.objects.filter(client=client).order_by('-issue_date')
@@ -93,10 +109,10 @@ def client_detail(request, client_id):
     # الحصول على المدفوعات للعميل
     payments = Payment.objects.filter(client=client).order_by('-payment_date')
 
-    # حساب إجمالي المبالغ
-    total_invoices = sum(invoice.amount for invoice in invoices)
-    total_payments = sum(payment.amount for payment in payments)
-    balance = total_invoices - total_payments
+    # حساب إجمالي المبالغ (الفواتير الملغية مستثناة كما في get_balance)
+    total_invoices = client.invoices_total
+    total_payments = client.payments_total
+    balance = client.balance
 
     context = {
         'client': client,
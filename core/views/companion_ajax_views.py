@@ -4,7 +4,6 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 from core.models import Patient
-from core.utils import translate_text
 
 
 @login_required
@@ -75,14 +74,14 @@ def companion_create_ajax(request):
         companion = Patient(
             national_id=national_id,
             name=name,
-            name_en=name_en or translate_text(name) if name else '',
+            name_en=name_en,
             phone=phone,
             employer_name=employer_name,
-            employer_name_en=employer_name_en or translate_text(employer_name) if employer_name else '',
+            employer_name_en=employer_name_en,
             address=address,
-            address_en=address_en or translate_text(address) if address else '',
+            address_en=address_en,
             nationality=nationality,
-            nationality_en=nationality_en or translate_text(nationality) if nationality else ''
+            nationality_en=nationality_en
         )
         # استخدام دالة save() لتفعيل الترجمة التلقائية
         companion.save()
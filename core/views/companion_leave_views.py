@@ -2,7 +2,6 @@ from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q, Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -10,6 +9,11 @@ from django.utils import timezone
 from core.forms import CompanionLeaveForm, CompanionLeaveWithInvoiceForm
 from core.models import (CompanionLeave, Doctor, Hospital, LeaveInvoice,
                          LeavePrice, Patient)
+from core.pagination import paginate_keyset
+from core.services.count_service import CountService
+from core.services.hijri_service import HijriCalendar
+from core.services.pdf_service import (PDF_BATCH_LIMIT, PDFRenderError,
+                                      PDFRenderService)
 from core.utils import (convert_to_hijri, generate_companion_leave_id,
                         generate_unique_number, translate_text)
 
@@ -65,6 +69,11 @@ def companion_leave_list(request):
     if end_date_to:
         companion_leaves = companion_leaves.filter(end_date__lte=end_date_to)
 
+    # فلتر السنة والشهر الهجريين لتاريخ البداية (عبر العمود الرقمي المفهرس)
+    hijri_year = request.GET.get('hijri_year')
+    hijri_month = request.GET.get('hijri_month')
+    companion_leaves = companion_leaves.filter_hijri(hijri_year, hijri_month)
+
     # الترتيب
     sort_by = request.GET.get('sort', '-created_at')
     if sort_by not in ['leave_id', '-leave_id', 'patient__name', '-patient__name', 'companion__name', '-companion__name',
@@ -72,15 +81,12 @@ def companion_leave_list(request):
                       'duration_days', '-duration_days', 'status', '-status', 'created_at', '-created_at']:
         sort_by = '-created_at'
 
-    companion_leaves = companion_leaves.order_by(sort_by)
-
-    # الترقيم الصفحي
-    paginator = Paginator(companion_leaves, 10)  # 10 إجازات في كل صفحة
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # الترقيم الصفحي بالمؤشر على حقل الترتيب (10 إجازات في كل صفحة، بدون OFFSET)
+    page_obj = paginate_keyset(request, companion_leaves, (sort_by,), 10)
 
     context = {
         'companion_leaves': page_obj,
+        'status_counts': CountService.status_counts(companion_leaves),
         'leave_id': leave_id,
         'patient': patient,
         'companion': companion,
@@ -90,6 +96,9 @@ def companion_leave_list(request):
         'start_date_to': start_date_to,
         'end_date_from': end_date_from,
         'end_date_to': end_date_to,
+        'hijri_year': hijri_year,
+        'hijri_month': hijri_month,
+        'hijri_months': HijriCalendar.MONTH_NAMES,
         'sort': sort_by
     }
 
@@ -153,6 +162,7 @@ def companion_leave_create(request):
                     invoice_number=invoice_number,
                     client=client,
                     leave_type='companion_leave',
+                    companion_leave=companion_leave,
                     leave_id=companion_leave.leave_id,
                     amount=price,
                     issue_date=companion_leave.issue_date,
@@ -340,6 +350,7 @@ def companion_leave_create_with_invoice(request):
                     invoice_number=invoice_number,
                     client=client,
                     leave_type='companion_leave',
+                    companion_leave=companion_leave,
                     leave_id=companion_leave.leave_id,
                     amount=price,
                     issue_date=companion_leave.issue_date,
@@ -372,18 +383,15 @@ def companion_leave_create_with_invoice(request):
 @login_required
 def companion_leave_detail(request, companion_leave_id):
     """تفاصيل إجازة مرافق"""
-    companion_leave = get_object_or_404(CompanionLeave, id=companion_leave_id)
+    companion_leave = get_object_or_404(CompanionLeave.objects.select_related('patient', 'companion', 'doctor'), id=companion_leave_id)
 
     # الحصول على الفواتير المرتبطة بالإجازة
-    related_invoices = LeaveInvoice.objects.filter(leave_type='companion_leave', leave_id=companion_leave.leave_id)
+    related_invoices = companion_leave.leave_invoices.all()
 
-    # حساب المعلومات المالية
-    total_invoices_amount = related_invoices.aggregate(total=Sum('amount'))['total'] or 0
-
-    # حساب إجمالي المدفوعات
-    total_paid_amount = 0
-    for invoice in related_invoices:
-        total_paid_amount += invoice.get_total_paid()
+    # حساب المعلومات المالية وإجمالي المدفوعات من المجاميع المخزنة في استعلام واحد
+    totals = related_invoices.aggregate(total=Sum('amount'), paid=Sum('paid_amount'))
+    total_invoices_amount = totals['total'] or 0
+    total_paid_amount = totals['paid'] or 0
 
     # حساب المبلغ المتبقي
     remaining_amount = total_invoices_amount - total_paid_amount
@@ -567,7 +575,7 @@ def companion_leave_edit(request, companion_leave_id):
             updated_companion_leave = form.save()
 
             # الحصول على الفواتير المرتبطة بالإجازة
-            invoices = LeaveInvoice.objects.filter(leave_type='companion_leave', leave_id=updated_companion_leave.leave_id)
+            invoices = updated_companion_leave.leave_invoices.all()
 
             # إذا لم تكن هناك فواتير مرتبطة بالإجازة وتم تحديد عميل، نقوم بإنشاء فاتورة جديدة
             if not invoices.exists() and new_client:
@@ -583,6 +591,7 @@ def companion_leave_edit(request, companion_leave_id):
                     invoice_number=invoice_number,
                     client=new_client,
                     leave_type='companion_leave',
+                    companion_leave=updated_companion_leave,
                     leave_id=updated_companion_leave.leave_id,
                     amount=price,
                     issue_date=updated_companion_leave.issue_date,
@@ -594,7 +603,7 @@ def companion_leave_edit(request, companion_leave_id):
                 messages.success(request, f'تم إنشاء فاتورة جديدة برقم {invoice.invoice_number}')
 
                 # تحديث قائمة الفواتير
-                invoices = LeaveInvoice.objects.filter(leave_type='companion_leave', leave_id=updated_companion_leave.leave_id)
+                invoices = updated_companion_leave.leave_invoices.all()
 
             # تحديث الفواتير المرتبطة إذا تغيرت مدة الإجازة أو العميل
             if invoices.exists() and ('duration_days' in form.changed_data or 'client' in form.changed_data):
@@ -642,7 +651,7 @@ def companion_leave_delete(request, companion_leave_id):
     companion_leave = get_object_or_404(CompanionLeave, id=companion_leave_id)
 
     # التحقق من وجود فواتير مرتبطة بالإجازة
-    invoices = LeaveInvoice.objects.filter(leave_type='companion_leave', leave_id=companion_leave.leave_id)
+    invoices = companion_leave.leave_invoices.all()
 
     if request.method == 'POST':
         leave_id = companion_leave.leave_id  # حفظ رقم الإجازة قبل الحذف
@@ -658,17 +667,15 @@ def companion_leave_delete(request, companion_leave_id):
     return render(request, 'core/companion_leaves/delete.html', context)
 
 
-@login_required
-def companion_leave_print(request, companion_leave_id):
-    """طباعة إجازة المرافق"""
-    companion_leave = get_object_or_404(CompanionLeave, id=companion_leave_id)
-
+def get_companion_leave_print_options(request, companion_leave):
+    """قالب طباعة إجازة المرافق وسياقه ونوعه (البادئة)"""
     # الحصول على الفواتير المرتبطة بالإجازة
-    invoices = LeaveInvoice.objects.filter(leave_type='companion_leave', leave_id=companion_leave.leave_id)
+    invoices = companion_leave.leave_invoices.all()
 
     # الحصول على البادئة من الطلب أو استخراجها من رقم الإجازة
+    # البادئة تدخل في اسم ملف PDF المخزن، لذلك تُقبل القيم المعروفة فقط
     prefix = request.GET.get('prefix')
-    if not prefix:
+    if prefix not in ('PSL', 'GSL'):
         # استخراج البادئة من رقم الإجازة
         prefix = 'PSL'  # القيمة الافتراضية
         if companion_leave.leave_id.startswith('GSL'):
@@ -686,4 +693,46 @@ def companion_leave_print(request, companion_leave_id):
         'prefix': prefix
     }
 
+    return template_path, context, prefix
+
+
+@login_required
+def companion_leave_print(request, companion_leave_id):
+    """طباعة إجازة المرافق (format=pdf لملف PDF من الخادم)"""
+    companion_leave = get_object_or_404(CompanionLeave.objects.select_related(*CompanionLeave.print_related),
+                                        id=companion_leave_id)
+    template_path, context, variant = get_companion_leave_print_options(request, companion_leave)
+
+    if request.GET.get('format') == 'pdf':
+        try:
+            version_parts = PDFRenderService.get_version_parts(companion_leave, *companion_leave.print_related)
+            data = PDFRenderService.get_pdf('companion_leave', companion_leave.id, template_path, context, variant,
+                                            version_parts, request=request)
+            return PDFRenderService.make_response(data, f'{companion_leave.leave_id}.pdf')
+        except PDFRenderError as e:
+            messages.warning(request, f'تعذر إنشاء ملف PDF: {str(e)}')
+
     return render(request, template_path, context)
+
+
+@login_required
+def companion_leave_print_batch(request):
+    """طباعة عدة إجازات مرافقين في ملف PDF واحد (ids=1&ids=2...)"""
+    ids = [int(value) for value in request.GET.getlist('ids') if value.isdigit()][:PDF_BATCH_LIMIT]
+    companion_leaves = CompanionLeave.objects.select_related(*CompanionLeave.print_related).in_bulk(ids)
+
+    items = []
+    for companion_leave_id in ids:
+        companion_leave = companion_leaves.get(companion_leave_id)
+        if companion_leave is not None:
+            template_path, context, variant = get_companion_leave_print_options(request, companion_leave)
+            items.append((companion_leave.id, template_path, context, variant,
+                          PDFRenderService.get_version_parts(companion_leave, *companion_leave.print_related)))
+
+    try:
+        data = PDFRenderService.get_batch_pdf('companion_leave', items, request=request)
+    except PDFRenderError as e:
+        messages.error(request, f'تعذر إنشاء ملف PDF: {str(e)}')
+        return redirect('core:companion_leave_list')
+
+    return PDFRenderService.make_response(data, 'companion_leaves.pdf')
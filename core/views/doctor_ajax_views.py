@@ -5,7 +5,6 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 from core.models import Doctor, Hospital
-from core.utils import translate_text
 
 
 @login_required
@@ -86,9 +85,9 @@ def doctor_create_ajax(request):
         # إنشاء الطبيب
         doctor = Doctor(
             name=name,
-            name_en=name_en or translate_text(name),
+            name_en=name_en,
             position=position,
-            position_en=position_en or translate_text(position),
+            position_en=position_en,
             national_id=national_id,
             phone=phone,
             email=email
@@ -5,7 +5,6 @@ from django.views.decorators.http import require_POST
 
 from core.forms import HospitalForm
 from core.models import Doctor, Hospital
-from core.utils import translate_text
 
 
 @login_required
@@ -33,9 +32,9 @@ def hospital_create_ajax(request):
         # إنشاء المستشفى
         hospital = Hospital(
             name=name,
-            name_en=name_en or translate_text(name),
+            name_en=name_en,
             address=address,
-            address_en=address_en or translate_text(address),
+            address_en=address_en,
             contact_info=contact_info
         )
         hospital.save()
@@ -2,13 +2,15 @@ from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q, Sum
+from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from core.forms import LeaveInvoiceForm
 from core.models import Client, CompanionLeave, LeaveInvoice, SickLeave
+from core.pagination import paginate_keyset
+from core.services.invoice_leave_service import InvoiceLeaveService
+from core.services.pdf_service import PDFRenderError, PDFRenderService
 from core.utils import generate_unique_number
 
 
@@ -72,32 +74,15 @@ def leave_invoice_list(request):
                       'created_at', '-created_at']:
         sort_by = '-created_at'
 
-    invoices = invoices.order_by(sort_by)
+    # الترقيم الصفحي بالمؤشر (المبلغ المدفوع والمتبقي محسوبان لكل فاتورة في نفس استعلام الصفحة)
+    page_obj = paginate_keyset(request, invoices.with_paid_amounts(), (sort_by,), 10)  # 10 فواتير في كل صفحة
 
-    # الترقيم الصفحي
-    paginator = Paginator(invoices, 10)  # 10 فواتير في كل صفحة
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    # حساب الإحصائيات
-    total_invoices = invoices.count()
-    total_amount = invoices.aggregate(total=Sum('amount'))['total'] or 0
-
-    # حساب إجمالي المدفوعات والمتبقي
-    total_paid = 0
-    total_remaining = 0
-
-    # نستخدم عينة من الفواتير لحساب الإحصائيات لتجنب استهلاك الذاكرة
-    sample_invoices = invoices[:100]  # نأخذ أول 100 فاتورة كعينة
-    for invoice in sample_invoices:
-        total_paid += invoice.get_total_paid()
-        total_remaining += invoice.get_remaining()
-
-    # تقدير القيم الإجمالية بناءً على العينة إذا كان عدد الفواتير كبيرًا
-    if total_invoices > 100:
-        ratio = total_invoices / 100
-        total_paid *= ratio
-        total_remaining *= ratio
+    # حساب الإحصائيات الدقيقة لجميع الفواتير المصفاة
+    totals = invoices.totals()
+    total_invoices = totals['count']
+    total_amount = totals['total_amount']
+    total_paid = totals['total_paid']
+    total_remaining = totals['total_remaining']
 
     context = {
         'leave_invoices': page_obj,  # تغيير الاسم ليتوافق مع القالب
@@ -214,49 +199,13 @@ def leave_invoice_create(request):
 @login_required
 def leave_invoice_detail(request, leave_invoice_id):
     """تفاصيل فاتورة إجازة"""
-    invoice = get_object_or_404(LeaveInvoice, id=leave_invoice_id)
+    # جلب الفاتورة مع العميل والإجازة المرتبطة ومريضها وطبيبها في استعلام واحد
+    invoice = get_object_or_404(
+        LeaveInvoice.objects.select_related('client', *LeaveInvoice.LEAVE_RELATED), id=leave_invoice_id
+    )
 
     # الحصول على معلومات الإجازة المرتبطة بالفاتورة
-    leave_info = None
-    if invoice.leave_type == 'sick_leave':
-        try:
-            # استخدام select_related لتحسين الأداء
-            leave = SickLeave.objects.select_related('patient', 'doctor').get(leave_id=invoice.leave_id)
-            leave_info = {
-                'type': 'sick_leave',
-                'type_display': 'إجازة مرضية',
-                'leave': leave,
-                'id': leave.id,  # إضافة معرف الإجازة للاستخدام في الروابط
-                'leave_id': leave.leave_id,
-                'patient': leave.patient,
-                'doctor': leave.doctor,
-                'start_date': leave.start_date,
-                'end_date': leave.end_date,
-                'duration_days': leave.duration_days,
-                'status': leave.status
-            }
-        except SickLeave.DoesNotExist:
-            pass
-    elif invoice.leave_type == 'companion_leave':
-        try:
-            # استخدام select_related لتحسين الأداء
-            leave = CompanionLeave.objects.select_related('patient', 'companion', 'doctor').get(leave_id=invoice.leave_id)
-            leave_info = {
-                'type': 'companion_leave',
-                'type_display': 'إجازة مرافق',
-                'leave': leave,
-                'id': leave.id,  # إضافة معرف الإجازة للاستخدام في الروابط
-                'leave_id': leave.leave_id,
-                'patient': leave.patient,
-                'companion': leave.companion,
-                'doctor': leave.doctor,
-                'start_date': leave.start_date,
-                'end_date': leave.end_date,
-                'duration_days': leave.duration_days,
-                'status': leave.status
-            }
-        except CompanionLeave.DoesNotExist:
-            pass
+    leave_info = InvoiceLeaveService.get_leave_info(invoice)
 
     # الحصول على تفاصيل المدفوعات المرتبطة بالفاتورة
     payment_details = invoice.get_payments()
@@ -324,50 +273,14 @@ def leave_invoice_delete(request, leave_invoice_id):
 
 @login_required
 def leave_invoice_print(request, leave_invoice_id):
-    """طباعة فاتورة إجازة"""
-    invoice = get_object_or_404(LeaveInvoice, id=leave_invoice_id)
+    """طباعة فاتورة إجازة (format=pdf لملف PDF من الخادم)"""
+    # جلب الفاتورة مع العميل والإجازة المرتبطة ومريضها وطبيبها في استعلام واحد
+    invoice = get_object_or_404(
+        LeaveInvoice.objects.select_related('client', *LeaveInvoice.LEAVE_RELATED), id=leave_invoice_id
+    )
 
     # الحصول على معلومات الإجازة المرتبطة بالفاتورة
-    leave_info = None
-    if invoice.leave_type == 'sick_leave':
-        try:
-            # استخدام select_related لتحسين الأداء
-            leave = SickLeave.objects.select_related('patient', 'doctor').get(leave_id=invoice.leave_id)
-            leave_info = {
-                'type': 'sick_leave',
-                'type_display': 'إجازة مرضية',
-                'leave': leave,
-                'id': leave.id,
-                'leave_id': leave.leave_id,
-                'patient': leave.patient,
-                'doctor': leave.doctor,
-                'start_date': leave.start_date,
-                'end_date': leave.end_date,
-                'duration_days': leave.duration_days,
-                'status': leave.status
-            }
-        except SickLeave.DoesNotExist:
-            pass
-    elif invoice.leave_type == 'companion_leave':
-        try:
-            # استخدام select_related لتحسين الأداء
-            leave = CompanionLeave.objects.select_related('patient', 'companion', 'doctor').get(leave_id=invoice.leave_id)
-            leave_info = {
-                'type': 'companion_leave',
-                'type_display': 'إجازة مرافق',
-                'leave': leave,
-                'id': leave.id,
-                'leave_id': leave.leave_id,
-                'patient': leave.patient,
-                'companion': leave.companion,
-                'doctor': leave.doctor,
-                'start_date': leave.start_date,
-                'end_date': leave.end_date,
-                'duration_days': leave.duration_days,
-                'status': leave.status
-            }
-        except CompanionLeave.DoesNotExist:
-            pass
+    leave_info = InvoiceLeaveService.get_leave_info(invoice)
 
     # الحصول على تفاصيل المدفوعات المرتبطة بالفاتورة
     payment_details = invoice.get_payments()
@@ -385,4 +298,17 @@ def leave_invoice_print(request, leave_invoice_id):
         'print_mode': True
     }
 
+    if request.GET.get('format') == 'pdf':
+        try:
+            # المبلغ المدفوع يتغير مع الدفعات دون تحديث updated_at للفاتورة،
+            # والعميل والإجازة ومريضها وطبيبها معروضة في الفاتورة
+            version_parts = PDFRenderService.get_version_parts(
+                invoice, 'client', 'sick_leave', 'companion_leave', *LeaveInvoice.LEAVE_RELATED
+            ) + (invoice.paid_amount,)
+            data = PDFRenderService.get_pdf('leave_invoice', invoice.id, 'core/leave_invoices/print.html', context,
+                                            version_parts=version_parts, request=request)
+            return PDFRenderService.make_response(data, f'{invoice.invoice_number}.pdf')
+        except PDFRenderError as e:
+            messages.warning(request, f'تعذر إنشاء ملف PDF: {str(e)}')
+
     return render(request, 'core/leave_invoices/print.html', context)
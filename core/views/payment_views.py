@@ -1,12 +1,12 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q, Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
 from core.forms import PaymentDetailForm, PaymentForm
 from core.models import Client, LeaveInvoice, Payment, PaymentDetail
+from core.pagination import paginate_keyset
 from core.utils import generate_unique_number
 
 
@@ -48,12 +48,8 @@ def payment_list(request):
                       'payment_date', '-payment_date', 'created_at', '-created_at']:
         sort_by = '-payment_date'
 
-    payments = payments.order_by(sort_by)
-
-    # الترقيم الصفحي
-    paginator = Paginator(payments, 10)  # 10 مدفوعات في كل صفحة
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # الترقيم الصفحي بالمؤشر مع العدد التقريبي (10 مدفوعات في كل صفحة)
+    page_obj = paginate_keyset(request, payments, (sort_by,), 10, estimate_total=True)
 
     # حساب إجمالي المبالغ
     total_amount = payments.aggregate(total=Sum('amount'))['total'] or 0
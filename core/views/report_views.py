@@ -1,9 +1,46 @@
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Sum
-from django.shortcuts import render
-
-from core.models import (Client, CompanionLeave, LeaveInvoice, Payment,
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import ExtractMonth, TruncMonth
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (Client, CompanionLeave, Doctor, Hospital,
+                         LeaveInvoice, Patient, Payment, PaymentDetail,
                          SickLeave)
+from core.pagination import paginate_keyset
+from core.services.cache_service import VersionedCacheService
+from core.services.export_service import ExportError, ReportExportService
+from core.services.hijri_service import HijriCalendar
+from core.services.settings_service import SettingsService
+from core.services.statistics_service import DailyStatisticsService
+
+# عدد صفوف التفاصيل في كل صفحة من التقرير، وعدد المجموعات في جداول "الأعلى"
+REPORT_PAGE_SIZE = 50
+REPORT_TOP_GROUPS = 10
+REPORT_MONTHS = 12
+
+LEAVE_STATUSES = ('active', 'cancelled', 'expired')
+INVOICE_STATUSES = ('unpaid', 'partially_paid', 'paid', 'cancelled')
+LEAVE_TYPES = ('sick_leave', 'companion_leave')
+
+# فئات المدة في رسم توزيع الإجازات
+LEAVE_DURATION_BUCKETS = (
+    ('short', Q(duration_days__lte=3)),
+    ('medium', Q(duration_days__gte=4, duration_days__lte=7)),
+    ('long', Q(duration_days__gte=8, duration_days__lte=14)),
+    ('very_long', Q(duration_days__gte=15, duration_days__lte=30)),
+    ('extended', Q(duration_days__gt=30)),
+)
+
+# النماذج التي تعتمد عليها نتيجة كل تقرير في الكاش
+SICK_LEAVE_REPORT_MODELS = (SickLeave, Patient, Doctor, Hospital)
+COMPANION_LEAVE_REPORT_MODELS = (CompanionLeave, Patient, Doctor, Hospital)
+INVOICE_REPORT_MODELS = (LeaveInvoice, PaymentDetail, Client)
+PAYMENT_REPORT_MODELS = (Payment, Client)
+CLIENT_REPORT_MODELS = (Client, LeaveInvoice, Payment, PaymentDetail)
 
 
 @login_required
@@ -12,110 +49,159 @@ def report_index(request):
     return render(request, 'core/reports/index.html')
 
 
-@login_required
-def report_sick_leaves(request):
-    """تقرير الإجازات المرضية"""
-    # الحصول على جميع الإجازات المرضية
-    sick_leaves = SickLeave.objects.all().order_by('-start_date')
+def get_report_params(request):
+    """معلمات الطلب التي تغير إحصائيات التقرير: الفلاتر بدون مؤشر الصفحة"""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    params.pop('page', None)
+    return params
+
 
-    # تطبيق الفلاتر
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    status = request.GET.get('status')
+def filter_leave_report(queryset, params):
+    """تطبيق فلاتر تقرير الإجازات (المرضية أو المرافقين) ويعيد (الاستعلام، الفلاتر)"""
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    status = params.get('status')
 
     if start_date:
-        sick_leaves = sick_leaves.filter(start_date__gte=start_date)
+        queryset = queryset.filter(start_date__gte=start_date)
 
     if end_date:
-        sick_leaves = sick_leaves.filter(end_date__lte=end_date)
+        queryset = queryset.filter(end_date__lte=end_date)
 
     if status:
-        sick_leaves = sick_leaves.filter(status=status)
+        queryset = queryset.filter(status=status)
+
+    hijri_year = params.get('hijri_year')
+    hijri_month = params.get('hijri_month')
+    queryset = queryset.filter_hijri(hijri_year, hijri_month)
+
+    filters = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+        'hijri_year': hijri_year,
+        'hijri_month': hijri_month
+    }
+    return queryset, filters
+
+
+def get_leave_report_stats(leaves):
+    """
+    إحصائيات تقرير الإجازات بتجميعات SQL: ملخص واحد (العدد، الأيام، الحالات، فئات
+    المدة) ثم GROUP BY حسب الشهر الهجري والمستشفى والطبيب
+    """
+    summary = leaves.order_by().aggregate(
+        total_count=Count('id'),
+        total_days=Sum('duration_days'),
+        avg_days=Avg('duration_days'),
+        **{status: Count('id', filter=Q(status=status)) for status in LEAVE_STATUSES},
+        **{name: Count('id', filter=condition) for name, condition in LEAVE_DURATION_BUCKETS},
+    )
+
+    top_groups = leaves.order_by()
+    hospital_stats = top_groups.values('hospital__name').annotate(
+        count=Count('id'), days=Sum('duration_days')
+    ).order_by('-count', 'hospital__name')[:REPORT_TOP_GROUPS]
+    doctor_stats = top_groups.filter(doctor__isnull=False).values('doctor__name').annotate(
+        count=Count('id'), days=Sum('duration_days')
+    ).order_by('-count', 'doctor__name')[:REPORT_TOP_GROUPS]
+
+    # إحصائيات حسب الشهر الهجري لتاريخ البداية (تجميع في قاعدة البيانات على العمود الرقمي)
+    hijri_month_stats = [
+        {'hijri_month': row['hijri_month'], 'label': HijriCalendar.month_label(row['hijri_month']), 'count': row['count']}
+        for row in leaves.count_by_hijri_month()
+    ]
+
+    return {
+        'total_count': summary['total_count'],
+        'total_days': summary['total_days'] or 0,
+        'avg_days': summary['avg_days'] or 0,
+        'status_counts': {status: summary[status] for status in LEAVE_STATUSES},
+        'duration_counts': {name: summary[name] for name, condition in LEAVE_DURATION_BUCKETS},
+        # أسماء السياق السابقة
+        'total_leaves': summary['total_count'],
+        'active_leaves': summary['active'],
+        'expired_leaves': summary['expired'],
+        'cancelled_leaves': summary['cancelled'],
+        'hospital_stats': list(hospital_stats),
+        'doctor_stats': list(doctor_stats),
+        'hijri_month_stats': hijri_month_stats,
+        'hijri_months': HijriCalendar.MONTH_NAMES,
+    }
+
+
+def get_sick_leaves_report_context(request):
+    """سياق تقرير الإجازات المرضية"""
+    # الحصول على جميع الإجازات المرضية مع تطبيق الفلاتر
+    sick_leaves, filters = filter_leave_report(SickLeave.objects.all(), request.GET)
 
-    # إحصائيات
-    total_leaves = sick_leaves.count()
-    active_leaves = sick_leaves.filter(status='active').count()
-    expired_leaves = sick_leaves.filter(status='expired').count()
-    cancelled_leaves = sick_leaves.filter(status='cancelled').count()
+    # الإحصائيات واحدة لكل الصفحات، فتُخزن في الكاش حسب الفلاتر فقط
+    stats = VersionedCacheService.get_or_set(
+        'report_sick_leaves', SICK_LEAVE_REPORT_MODELS,
+        lambda: get_leave_report_stats(sick_leaves), params=get_report_params(request),
+    )
 
-    # إحصائيات حسب المدة
-    duration_stats = sick_leaves.values('duration_days').annotate(count=Count('id')).order_by('duration_days')
+    # صفوف التفاصيل صفحة بصفحة بالمؤشر (استعلام واحد لكل صفحة)
+    page = paginate_keyset(request, sick_leaves.select_related('patient', 'doctor'),
+                           ('-start_date', '-id'), REPORT_PAGE_SIZE)
 
     context = {
-        'sick_leaves': sick_leaves,
-        'total_leaves': total_leaves,
-        'active_leaves': active_leaves,
-        'expired_leaves': expired_leaves,
-        'cancelled_leaves': cancelled_leaves,
-        'duration_stats': duration_stats,
-        'filters': {
-            'start_date': start_date,
-            'end_date': end_date,
-            'status': status
-        }
+        'sick_leaves': page.object_list,
+        'page': page,
+        'filters': filters,
+        **stats,
     }
 
-    return render(request, 'core/reports/sick_leaves.html', context)
+    return context
 
 
 @login_required
-def report_companion_leaves(request):
-    """تقرير إجازات المرافقين"""
-    # الحصول على جميع إجازات المرافقين
-    companion_leaves = CompanionLeave.objects.all().order_by('-start_date')
+def report_sick_leaves(request):
+    """تقرير الإجازات المرضية"""
+    return render(request, 'core/reports/sick_leaves.html', get_sick_leaves_report_context(request))
 
-    # تطبيق الفلاتر
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    status = request.GET.get('status')
 
-    if start_date:
-        companion_leaves = companion_leaves.filter(start_date__gte=start_date)
+def get_companion_leaves_report_context(request):
+    """سياق تقرير إجازات المرافقين"""
+    # الحصول على جميع إجازات المرافقين مع تطبيق الفلاتر
+    companion_leaves, filters = filter_leave_report(CompanionLeave.objects.all(), request.GET)
 
-    if end_date:
-        companion_leaves = companion_leaves.filter(end_date__lte=end_date)
+    # الإحصائيات واحدة لكل الصفحات، فتُخزن في الكاش حسب الفلاتر فقط
+    stats = VersionedCacheService.get_or_set(
+        'report_companion_leaves', COMPANION_LEAVE_REPORT_MODELS,
+        lambda: get_leave_report_stats(companion_leaves), params=get_report_params(request),
+    )
 
-    if status:
-        companion_leaves = companion_leaves.filter(status=status)
-
-    # إحصائيات
-    total_leaves = companion_leaves.count()
-    active_leaves = companion_leaves.filter(status='active').count()
-    expired_leaves = companion_leaves.filter(status='expired').count()
-    cancelled_leaves = companion_leaves.filter(status='cancelled').count()
-
-    # إحصائيات حسب المدة
-    duration_stats = companion_leaves.values('duration_days').annotate(count=Count('id')).order_by('duration_days')
+    # صفوف التفاصيل صفحة بصفحة بالمؤشر (استعلام واحد لكل صفحة)
+    page = paginate_keyset(request, companion_leaves.select_related('patient', 'companion', 'doctor'),
+                           ('-start_date', '-id'), REPORT_PAGE_SIZE)
 
     context = {
-        'companion_leaves': companion_leaves,
-        'total_leaves': total_leaves,
-        'active_leaves': active_leaves,
-        'expired_leaves': expired_leaves,
-        'cancelled_leaves': cancelled_leaves,
-        'duration_stats': duration_stats,
-        'filters': {
-            'start_date': start_date,
-            'end_date': end_date,
-            'status': status
-        }
+        'companion_leaves': page.object_list,
+        'page': page,
+        'filters': filters,
+        **stats,
     }
 
-    return render(request, 'core/reports/companion_leaves.html', context)
+    return context
 
 
 @login_required
-def report_invoices(request):
-    """تقرير الفواتير"""
-    # الحصول على جميع الفواتير
+def report_companion_leaves(request):
+    """تقرير إجازات المرافقين"""
+    return render(request, 'core/reports/companion_leaves.html', get_companion_leaves_report_context(request))
+
+
+def filter_invoice_report(params):
+    """تطبيق فلاتر تقرير الفواتير ويعيد (الاستعلام، الفلاتر)"""
     invoices = LeaveInvoice.objects.all().order_by('-issue_date')
 
-    # تطبيق الفلاتر
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    status = request.GET.get('status')
-    client_id = request.GET.get('client_id')
-    leave_type = request.GET.get('leave_type')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    status = params.get('status')
+    client_id = params.get('client_id')
+    leave_type = params.get('leave_type')
 
     if start_date:
         invoices = invoices.filter(issue_date__gte=start_date)
@@ -132,63 +218,100 @@ def report_invoices(request):
     if leave_type:
         invoices = invoices.filter(leave_type=leave_type)
 
-    # إحصائيات
-    total_invoices = invoices.count()
-    total_amount = invoices.aggregate(total=Sum('amount'))['total'] or 0
-    paid_invoices = invoices.filter(status='paid').count()
-    paid_amount = invoices.filter(status='paid').aggregate(total=Sum('amount'))['total'] or 0
-    unpaid_invoices = invoices.filter(status='unpaid').count()
-    unpaid_amount = invoices.filter(status='unpaid').aggregate(total=Sum('amount'))['total'] or 0
-    partially_paid_invoices = invoices.filter(status='partially_paid').count()
-    partially_paid_amount = invoices.filter(status='partially_paid').aggregate(total=Sum('amount'))['total'] or 0
-
-    # إحصائيات حسب نوع الإجازة
-    leave_type_stats = invoices.values('leave_type').annotate(
+    filters = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+        'client_id': client_id,
+        'leave_type': leave_type
+    }
+    return invoices, filters
+
+
+def get_invoice_report_stats(invoices):
+    """إحصائيات تقرير الفواتير المفلترة (بدون صفوف التفاصيل)"""
+    grouped = invoices.order_by()
+
+    # ملخص واحد: العدد والمبالغ لكل حالة ونوع إجازة
+    summary = grouped.aggregate(
+        total_count=Count('id'),
+        total_amount=Sum('amount'),
+        total_paid=Sum('paid_amount'),
+        total_remaining=Sum('remaining_amount'),
+        **{f'{status}_count': Count('id', filter=Q(status=status)) for status in INVOICE_STATUSES},
+        **{f'{status}_amount': Sum('amount', filter=Q(status=status)) for status in INVOICE_STATUSES},
+        **{f'{leave_type}_count': Count('id', filter=Q(leave_type=leave_type)) for leave_type in LEAVE_TYPES},
+    )
+
+    # إحصائيات حسب العميل والشهر
+    client_stats = list(grouped.values('client__name').annotate(
         count=Count('id'),
         total=Sum('amount')
-    ).order_by('leave_type')
-
-    # إحصائيات حسب العميل
-    client_stats = invoices.values('client__name').annotate(
+    ).order_by('-total', 'client__name')[:REPORT_TOP_GROUPS])
+    monthly_stats = grouped.annotate(month=TruncMonth('issue_date')).values('month').annotate(
         count=Count('id'),
-        total=Sum('amount')
-    ).order_by('-total')[:10]
+        total=Sum('amount'),
+        paid=Sum('paid_amount')
+    ).order_by('-month')[:REPORT_MONTHS]
+
+    return {
+        'total_count': summary['total_count'],
+        'total_invoices': summary['total_count'],
+        'total_amount': summary['total_amount'] or 0,
+        'total_paid': summary['total_paid'] or 0,
+        'total_remaining': summary['total_remaining'] or 0,
+        'status_counts': {status: summary[f'{status}_count'] for status in INVOICE_STATUSES},
+        'paid_invoices': summary['paid_count'],
+        'paid_amount': summary['paid_amount'] or 0,
+        'unpaid_invoices': summary['unpaid_count'],
+        'unpaid_amount': summary['unpaid_amount'] or 0,
+        'partially_paid_invoices': summary['partially_paid_count'],
+        'partially_paid_amount': summary['partially_paid_amount'] or 0,
+        'leave_type_counts': {leave_type: summary[f'{leave_type}_count'] for leave_type in LEAVE_TYPES},
+        'client_stats': client_stats,
+        'client_counts': {row['client__name']: row['count'] for row in client_stats},
+        'monthly_stats': list(monthly_stats),
+        'clients': list(Client.objects.only('id', 'name').order_by('name')),
+    }
+
+
+def get_invoices_report_context(request):
+    """سياق تقرير الفواتير"""
+    # الحصول على جميع الفواتير مع تطبيق الفلاتر
+    invoices, filters = filter_invoice_report(request.GET)
+
+    # الإحصائيات واحدة لكل الصفحات، فتُخزن في الكاش حسب الفلاتر فقط
+    stats = VersionedCacheService.get_or_set(
+        'report_invoices', INVOICE_REPORT_MODELS,
+        lambda: get_invoice_report_stats(invoices), params=get_report_params(request),
+    )
+
+    page = paginate_keyset(request, invoices.select_related('client'), ('-issue_date', '-id'), REPORT_PAGE_SIZE)
 
     context = {
-        'invoices': invoices,
-        'total_invoices': total_invoices,
-        'total_amount': total_amount,
-        'paid_invoices': paid_invoices,
-        'paid_amount': paid_amount,
-        'unpaid_invoices': unpaid_invoices,
-        'unpaid_amount': unpaid_amount,
-        'partially_paid_invoices': partially_paid_invoices,
-        'partially_paid_amount': partially_paid_amount,
-        'leave_type_stats': leave_type_stats,
-        'client_stats': client_stats,
-        'filters': {
-            'start_date': start_date,
-            'end_date': end_date,
-            'status': status,
-            'client_id': client_id,
-            'leave_type': leave_type
-        }
+        'invoices': page.object_list,
+        'page': page,
+        'filters': filters,
+        **stats,
     }
 
-    return render(request, 'core/reports/invoices.html', context)
+    return context
 
 
 @login_required
-def report_payments(request):
-    """تقرير المدفوعات"""
-    # الحصول على جميع المدفوعات
+def report_invoices(request):
+    """تقرير الفواتير"""
+    return render(request, 'core/reports/invoices.html', get_invoices_report_context(request))
+
+
+def filter_payment_report(params):
+    """تطبيق فلاتر تقرير المدفوعات ويعيد (الاستعلام، الفلاتر)"""
     payments = Payment.objects.all().order_by('-payment_date')
 
-    # تطبيق الفلاتر
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    payment_method = request.GET.get('payment_method')
-    client_id = request.GET.get('client_id')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    payment_method = params.get('payment_method')
+    client_id = params.get('client_id')
 
     if start_date:
         payments = payments.filter(payment_date__gte=start_date)
@@ -202,78 +325,256 @@ def report_payments(request):
     if client_id:
         payments = payments.filter(client_id=client_id)
 
-    # إحصائيات
-    total_payments = payments.count()
-    total_amount = payments.aggregate(total=Sum('amount'))['total'] or 0
+    filters = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'payment_method': payment_method,
+        'client_id': client_id
+    }
+    return payments, filters
+
+
+def get_payment_report_stats(payments, filters):
+    """إحصائيات تقرير المدفوعات المفلترة (بدون صفوف التفاصيل)"""
+    grouped = payments.order_by()
+
+    summary = grouped.aggregate(total_count=Count('id'), total_amount=Sum('amount'))
 
     # إحصائيات حسب طريقة الدفع
-    payment_method_stats = payments.values('payment_method').annotate(
+    payment_method_stats = list(grouped.values('payment_method').annotate(
         count=Count('id'),
         total=Sum('amount')
-    ).order_by('payment_method')
+    ).order_by('payment_method'))
 
     # إحصائيات حسب العميل
-    client_stats = payments.values('client__name').annotate(
+    client_stats = list(grouped.values('client__name').annotate(
         count=Count('id'),
         total=Sum('amount')
-    ).order_by('-total')[:10]
+    ).order_by('-total', 'client__name')[:REPORT_TOP_GROUPS])
+
+    # المدفوعات حسب الشهر للسنة الحالية
+    current_year = timezone.localdate().year
+    if filters['client_id']:
+        monthly_payments = {
+            row['month']: row['total']
+            for row in grouped.filter(payment_date__year=current_year)
+            .annotate(month=ExtractMonth('payment_date')).values('month')
+            .annotate(total=Sum('amount')).order_by('month')
+        }
+    else:
+        # بدون فلتر العميل تكفي الإحصائيات اليومية (طريقة الدفع هي حالة الدفعة فيها)
+        monthly_payments = {
+            month: row['amount']
+            for month, row in DailyStatisticsService.get_monthly_totals(
+                'payment', current_year,
+                statuses=[filters['payment_method']] if filters['payment_method'] else None,
+                start_date=filters['start_date'], end_date=filters['end_date'],
+            ).items()
+        }
 
-    context = {
-        'payments': payments,
-        'total_payments': total_payments,
-        'total_amount': total_amount,
+    return {
+        'total_count': summary['total_count'],
+        'total_payments': summary['total_count'],
+        'total_amount': summary['total_amount'] or 0,
         'payment_method_stats': payment_method_stats,
+        'payment_method_counts': {row['payment_method']: row['count'] for row in payment_method_stats},
+        'payment_method_amounts': {row['payment_method']: row['total'] for row in payment_method_stats},
         'client_stats': client_stats,
-        'filters': {
-            'start_date': start_date,
-            'end_date': end_date,
-            'payment_method': payment_method,
-            'client_id': client_id
-        }
+        'client_counts': {row['client__name']: row['count'] for row in client_stats},
+        'monthly_payments': monthly_payments,
+        'current_year': current_year,
+        'clients': list(Client.objects.only('id', 'name').order_by('name')),
     }
 
-    return render(request, 'core/reports/payments.html', context)
+
+def get_payments_report_context(request):
+    """سياق تقرير المدفوعات"""
+    # الحصول على جميع المدفوعات مع تطبيق الفلاتر
+    payments, filters = filter_payment_report(request.GET)
+
+    # الإحصائيات واحدة لكل الصفحات، فتُخزن في الكاش حسب الفلاتر فقط
+    stats = VersionedCacheService.get_or_set(
+        'report_payments', PAYMENT_REPORT_MODELS,
+        lambda: get_payment_report_stats(payments, filters), params=get_report_params(request),
+    )
+
+    page = paginate_keyset(request, payments.select_related('client'), ('-payment_date', '-id'), REPORT_PAGE_SIZE)
+
+    context = {
+        'payments': page.object_list,
+        'page': page,
+        'filters': filters,
+        **stats,
+    }
+
+    return context
 
 
 @login_required
-def report_clients(request):
-    """تقرير العملاء"""
-    # الحصول على جميع العملاء
-    clients = Client.objects.all().order_by('name')
-
-    # إحصائيات
-    total_clients = clients.count()
-
-    # إحصائيات الفواتير والمدفوعات لكل عميل
-    client_stats = []
-    for client in clients:
-        invoices = LeaveInvoice.objects.filter(client=client)
-        payments = Payment.objects.filter(client=client)
-        
-        total_invoices = invoices.count()
-        total_invoices_amount = invoices.aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_payments = payments.count()
-        total_payments_amount = payments.aggregate(total=Sum('amount'))['total'] or 0
-        
-        balance = total_invoices_amount - total_payments_amount
-        
-        client_stats.append({
-            'client': client,
-            'total_invoices': total_invoices,
-            'total_invoices_amount': total_invoices_amount,
-            'total_payments': total_payments,
-            'total_payments_amount': total_payments_amount,
-            'balance': balance
-        })
-    
-    # ترتيب العملاء حسب الرصيد
-    client_stats.sort(key=lambda x: x['balance'], reverse=True)
+def report_payments(request):
+    """تقرير المدفوعات"""
+    return render(request, 'core/reports/payments.html', get_payments_report_context(request))
+
+
+def filter_client_report(params):
+    """تطبيق فلاتر تقرير العملاء ويعيد (الاستعلام، الفلاتر)"""
+    # تصفية البيانات حسب المعايير
+    search_query = params.get('search')
+    balance_filter = params.get('balance_filter')
+
+    # جميع إجماليات العملاء تُحسب في استعلام واحد عبر with_balances
+    clients = Client.objects.with_balances(status_counts=True)
+
+    if search_query:
+        clients = clients.filter(
+            Q(name__icontains=search_query) |
+            Q(phone__icontains=search_query) |
+            Q(email__icontains=search_query)
+        )
+
+    # تصفية حسب الرصيد
+    if balance_filter == 'positive':
+        clients = clients.filter(balance__gt=0)
+    elif balance_filter == 'negative':
+        clients = clients.filter(balance__lt=0)
+    elif balance_filter == 'zero':
+        clients = clients.filter(balance=0)
+
+    # ترتيب البيانات حسب الرصيد (من الأعلى إلى الأقل)
+    clients = clients.order_by('-balance', 'name')
+
+    filters = {
+        'search': search_query,
+        'balance_filter': balance_filter
+    }
+    return clients, filters
+
+
+def get_client_report_row(client):
+    """بيانات صف العميل في التقرير من حقول with_balances"""
+    return {
+        'client': client,
+        'total_invoices': client.invoices_total,
+        'total_payments': client.payments_total,
+        'balance': client.balance,
+        'invoices_count': client.invoices_count,
+        'payments_count': client.payments_count,
+        'unpaid_invoices': client.unpaid_invoices,
+        'partially_paid_invoices': client.partially_paid_invoices,
+        'paid_invoices': client.paid_invoices,
+    }
+
+
+def get_client_report_stats(clients):
+    """إجماليات تقرير العملاء المفلترين والعملاء الأكثر نشاطًا (بدون صفوف التفاصيل)"""
+    # الإجماليات بتجميع واحد على كل العملاء المطابقين
+    summary = clients.order_by().aggregate(
+        total_clients=Count('id'),
+        total_invoices=Sum('invoices_total'),
+        total_payments=Sum('payments_total'),
+    )
+    total_invoices = summary['total_invoices'] or 0
+    total_payments = summary['total_payments'] or 0
+
+    return {
+        'total_clients': summary['total_clients'],
+        'total_invoices': total_invoices,
+        'total_payments': total_payments,
+        'total_balance': total_invoices - total_payments,
+        # العملاء الأكثر نشاطًا (أعلى 5 عملاء من حيث عدد الفواتير)
+        'top_active_clients': [
+            get_client_report_row(client) for client in clients.order_by('-invoices_count', 'name')[:5]
+        ],
+    }
+
+
+def get_clients_report_context(request):
+    """سياق تقرير العملاء"""
+    clients, filters = filter_client_report(request.GET)
+
+    # الإحصائيات واحدة لكل الصفحات، فتُخزن في الكاش حسب الفلاتر فقط
+    stats = VersionedCacheService.get_or_set(
+        'report_clients', CLIENT_REPORT_MODELS,
+        lambda: get_client_report_stats(clients), params=get_report_params(request),
+    )
+
+    page = paginate_keyset(request, clients, ('-balance', 'name', 'id'), REPORT_PAGE_SIZE)
+    client_data = [get_client_report_row(client) for client in page.object_list]
+
+    # العملاء ذوو الرصيد الأعلى (أعلى 5 عملاء): من الصفحة الأولى إن أمكن
+    if not page.has_previous:
+        top_balance_clients = client_data[:5]
+    else:
+        top_balance_clients = [get_client_report_row(client) for client in clients[:5]]
 
     context = {
-        'clients': clients,
-        'total_clients': total_clients,
-        'client_stats': client_stats
+        'client_data': client_data,
+        'page': page,
+        'search_query': filters['search'],
+        'balance_filter': filters['balance_filter'],
+        'top_balance_clients': top_balance_clients,
+        **stats,
     }
 
-    return render(request, 'core/reports/clients.html', context)
+    return context
+
+
+@login_required
+def report_clients(request):
+    """تقرير العملاء"""
+    return render(request, 'core/reports/clients.html', get_clients_report_context(request))
+
+
+# أعمدة تصدير كل تقرير: (دالة الاستعلام المفلتر، الأعمدة، اسم الملف)
+REPORT_EXPORTS = {
+    'sick_leaves': (
+        lambda params: filter_leave_report(SickLeave.objects.order_by('-start_date'), params)[0],
+        ['leave_id', 'prefix', 'patient__national_id', 'patient__name', 'hospital__name', 'doctor__name',
+         'start_date', 'start_date_hijri', 'end_date', 'end_date_hijri', 'duration_days', 'issue_date', 'status'],
+        'sick-leaves',
+    ),
+    'companion_leaves': (
+        lambda params: filter_leave_report(CompanionLeave.objects.order_by('-start_date'), params)[0],
+        ['leave_id', 'prefix', 'patient__national_id', 'patient__name', 'companion__national_id', 'companion__name',
+         'hospital__name', 'doctor__name', 'start_date', 'start_date_hijri', 'end_date', 'end_date_hijri',
+         'duration_days', 'issue_date', 'status'],
+        'companion-leaves',
+    ),
+    'invoices': (
+        lambda params: filter_invoice_report(params)[0],
+        ['invoice_number', 'client__name', 'leave_type', 'leave_id', 'amount', 'paid_amount', 'remaining_amount',
+         'issue_date', 'due_date', 'status'],
+        'invoices',
+    ),
+    'payments': (
+        lambda params: filter_payment_report(params)[0],
+        ['payment_number', 'client__name', 'amount', 'payment_method', 'payment_date', 'reference_number'],
+        'payments',
+    ),
+    'clients': (
+        lambda params: filter_client_report(params)[0],
+        ['name', 'phone', 'email', ('invoices_count', 'عدد الفواتير'), ('invoices_total', 'إجمالي الفواتير'),
+         ('payments_count', 'عدد المدفوعات'), ('payments_total', 'إجمالي المدفوعات'), ('balance', 'الرصيد')],
+        'clients',
+    ),
+}
+
+
+@login_required
+def report_export(request, report):
+    """تصدير التقرير بنفس فلاتر صفحته (format=csv أو xlsx)"""
+    if report not in REPORT_EXPORTS:
+        raise Http404("التقرير غير موجود")
+
+    get_queryset, columns, filename = REPORT_EXPORTS[report]
+    export_format = request.GET.get('format') or ReportExportService.get_default_format(
+        SettingsService.get_setting('default_export_format', 'xlsx')
+    )
+
+    try:
+        return ReportExportService.export(get_queryset(request.GET), columns, export_format, filename)
+    except ExportError as e:
+        messages.error(request, str(e))
+        params = request.GET.copy()
+        params.pop('format', None)
+        return redirect(f"{reverse(f'core:report_{report}')}?{params.urlencode()}")
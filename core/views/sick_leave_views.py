@@ -2,7 +2,6 @@ from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db.models import Q, Sum
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -10,6 +9,11 @@ from django.utils import timezone
 from core.forms import SickLeaveForm, SickLeaveWithInvoiceForm
 from core.models import (Doctor, Hospital, LeaveInvoice, LeavePrice, Patient,
                          SickLeave)
+from core.pagination import paginate_keyset
+from core.services.count_service import CountService
+from core.services.hijri_service import HijriCalendar
+from core.services.pdf_service import (PDF_BATCH_LIMIT, PDFRenderError,
+                                      PDFRenderService)
 from core.utils import (convert_to_hijri, generate_sick_leave_id,
                         generate_unique_number, translate_text)
 
@@ -60,6 +64,11 @@ def sick_leave_list(request):
     if end_date_to:
         sick_leaves = sick_leaves.filter(end_date__lte=end_date_to)
 
+    # فلتر السنة والشهر الهجريين لتاريخ البداية (عبر العمود الرقمي المفهرس)
+    hijri_year = request.GET.get('hijri_year')
+    hijri_month = request.GET.get('hijri_month')
+    sick_leaves = sick_leaves.filter_hijri(hijri_year, hijri_month)
+
     # الترتيب
     sort_by = request.GET.get('sort', '-created_at')
     if sort_by not in ['leave_id', '-leave_id', 'patient__name', '-patient__name', 'doctor__name', '-doctor__name',
@@ -67,15 +76,12 @@ def sick_leave_list(request):
                       'status', '-status', 'created_at', '-created_at']:
         sort_by = '-created_at'
 
-    sick_leaves = sick_leaves.order_by(sort_by)
-
-    # الترقيم الصفحي
-    paginator = Paginator(sick_leaves, 10)  # 10 إجازات في كل صفحة
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # الترقيم الصفحي بالمؤشر على حقل الترتيب (10 إجازات في كل صفحة، بدون OFFSET)
+    page_obj = paginate_keyset(request, sick_leaves, (sort_by,), 10)
 
     context = {
         'sick_leaves': page_obj,
+        'status_counts': CountService.status_counts(sick_leaves),
         'leave_id': leave_id,
         'patient': patient,
         'doctor': doctor,
@@ -84,6 +90,9 @@ def sick_leave_list(request):
         'start_date_to': start_date_to,
         'end_date_from': end_date_from,
         'end_date_to': end_date_to,
+        'hijri_year': hijri_year,
+        'hijri_month': hijri_month,
+        'hijri_months': HijriCalendar.MONTH_NAMES,
         'sort': sort_by
     }
 
@@ -241,6 +250,7 @@ def sick_leave_create(request):
                     invoice_number=invoice_number,
                     client=client,
                     leave_type='sick_leave',
+                    sick_leave=sick_leave,
                     leave_id=sick_leave.leave_id,
                     amount=price,
                     issue_date=sick_leave.issue_date,
@@ -408,6 +418,7 @@ def sick_leave_create_with_invoice(request):
                     invoice_number=invoice_number,
                     client=client,
                     leave_type='sick_leave',
+                    sick_leave=sick_leave,
                     leave_id=leave_id,
                     amount=price,
                     issue_date=issue_date,
@@ -433,18 +444,15 @@ def sick_leave_create_with_invoice(request):
 @login_required
 def sick_leave_detail(request, sick_leave_id):
     """تفاصيل إجازة مرضية"""
-    sick_leave = get_object_or_404(SickLeave, id=sick_leave_id)
+    sick_leave = get_object_or_404(SickLeave.objects.select_related('patient', 'doctor'), id=sick_leave_id)
 
     # الحصول على الفواتير المرتبطة بالإجازة
-    related_invoices = LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id=sick_leave.leave_id)
+    related_invoices = sick_leave.leave_invoices.all()
 
-    # حساب المعلومات المالية
-    total_invoices_amount = related_invoices.aggregate(total=Sum('amount'))['total'] or 0
-
-    # حساب إجمالي المدفوعات
-    total_paid_amount = 0
-    for invoice in related_invoices:
-        total_paid_amount += invoice.get_total_paid()
+    # حساب المعلومات المالية وإجمالي المدفوعات من المجاميع المخزنة في استعلام واحد
+    totals = related_invoices.aggregate(total=Sum('amount'), paid=Sum('paid_amount'))
+    total_invoices_amount = totals['total'] or 0
+    total_paid_amount = totals['paid'] or 0
 
     # حساب المبلغ المتبقي
     remaining_amount = total_invoices_amount - total_paid_amount
@@ -602,7 +610,7 @@ def sick_leave_edit(request, sick_leave_id):
             updated_sick_leave = form.save()
 
             # الحصول على الفواتير المرتبطة بالإجازة
-            invoices = LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id=updated_sick_leave.leave_id)
+            invoices = updated_sick_leave.leave_invoices.all()
 
             # إذا لم تكن هناك فواتير مرتبطة بالإجازة وتم تحديد عميل، نقوم بإنشاء فاتورة جديدة
             if not invoices.exists() and new_client:
@@ -618,6 +626,7 @@ def sick_leave_edit(request, sick_leave_id):
                     invoice_number=invoice_number,
                     client=new_client,
                     leave_type='sick_leave',
+                    sick_leave=updated_sick_leave,
                     leave_id=updated_sick_leave.leave_id,
                     amount=price,
                     issue_date=updated_sick_leave.issue_date,
@@ -629,7 +638,7 @@ def sick_leave_edit(request, sick_leave_id):
                 messages.success(request, f'تم إنشاء فاتورة جديدة برقم {invoice.invoice_number}')
 
                 # تحديث قائمة الفواتير
-                invoices = LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id=updated_sick_leave.leave_id)
+                invoices = updated_sick_leave.leave_invoices.all()
 
             # تحديث الفواتير المرتبطة إذا تغيرت مدة الإجازة أو العميل
             if invoices.exists() and ('duration_days' in form.changed_data or 'client' in form.changed_data):
@@ -677,7 +686,7 @@ def sick_leave_delete(request, sick_leave_id):
     sick_leave = get_object_or_404(SickLeave, id=sick_leave_id)
     # sickleave_ivoice=get_object_or_404(LeaveInvoice,leave_invoice.objects.filter(sick_leave_id=sick_leave_id).first().id)
     # التحقق من وجود فواتير مرتبطة بالإجازة
-    invoices = LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id=sick_leave.leave_id)
+    invoices = sick_leave.leave_invoices.all()
 
     if request.method == 'POST':
         leave_id = sick_leave.leave_id  # حفظ رقم الإجازة قبل الحذف
@@ -694,20 +703,20 @@ def sick_leave_delete(request, sick_leave_id):
     return render(request, 'core/sick_leaves/delete.html', context)
 
 
-@login_required
-def sick_leave_print(request, sick_leave_id):
-    """طباعة الإجازة المرضية"""
-    sick_leave = get_object_or_404(SickLeave, id=sick_leave_id)
-
+def get_sick_leave_print_options(request, sick_leave):
+    """قالب طباعة الإجازة المرضية وسياقه ونوعه (مثل new-PSL)"""
     # الحصول على الفواتير المرتبطة بالإجازة
-    invoices = LeaveInvoice.objects.filter(leave_type='sick_leave', leave_id=sick_leave.leave_id)
+    invoices = sick_leave.leave_invoices.all()
 
     # الحصول على نوع الطباعة من الطلب
     print_type = request.GET.get('print_type', 'new')  # القيمة الافتراضية هي 'new'
+    if print_type not in ('old', 'new'):
+        print_type = 'new'
 
     # الحصول على البادئة من الطلب أو استخراجها من رقم الإجازة
+    # القيمتان تدخلان في اسم ملف PDF المخزن، لذلك تُقبل القيم المعروفة فقط
     prefix = request.GET.get('prefix')
-    if not prefix:
+    if prefix not in ('PSL', 'GSL'):
         # استخراج البادئة من رقم الإجازة أو من حقل prefix في النموذج
         if hasattr(sick_leave, 'prefix') and sick_leave.prefix in ['PSL', 'GSL']:
             prefix = sick_leave.prefix
@@ -741,4 +750,45 @@ def sick_leave_print(request, sick_leave_id):
         'prefix': prefix
     }
 
+    return template_path, context, f'{print_type}-{prefix}'
+
+
+@login_required
+def sick_leave_print(request, sick_leave_id):
+    """طباعة الإجازة المرضية (format=pdf لملف PDF من الخادم)"""
+    sick_leave = get_object_or_404(SickLeave.objects.select_related(*SickLeave.print_related), id=sick_leave_id)
+    template_path, context, variant = get_sick_leave_print_options(request, sick_leave)
+
+    if request.GET.get('format') == 'pdf':
+        try:
+            version_parts = PDFRenderService.get_version_parts(sick_leave, *sick_leave.print_related)
+            data = PDFRenderService.get_pdf('sick_leave', sick_leave.id, template_path, context, variant,
+                                            version_parts, request=request)
+            return PDFRenderService.make_response(data, f'{sick_leave.leave_id}.pdf')
+        except PDFRenderError as e:
+            messages.warning(request, f'تعذر إنشاء ملف PDF: {str(e)}')
+
     return render(request, template_path, context)
+
+
+@login_required
+def sick_leave_print_batch(request):
+    """طباعة عدة إجازات مرضية في ملف PDF واحد (ids=1&ids=2...)"""
+    ids = [int(value) for value in request.GET.getlist('ids') if value.isdigit()][:PDF_BATCH_LIMIT]
+    sick_leaves = SickLeave.objects.select_related(*SickLeave.print_related).in_bulk(ids)
+
+    items = []
+    for sick_leave_id in ids:
+        sick_leave = sick_leaves.get(sick_leave_id)
+        if sick_leave is not None:
+            template_path, context, variant = get_sick_leave_print_options(request, sick_leave)
+            items.append((sick_leave.id, template_path, context, variant,
+                          PDFRenderService.get_version_parts(sick_leave, *sick_leave.print_related)))
+
+    try:
+        data = PDFRenderService.get_batch_pdf('sick_leave', items, request=request)
+    except PDFRenderError as e:
+        messages.error(request, f'تعذر إنشاء ملف PDF: {str(e)}')
+        return redirect('core:sick_leave_list')
+
+    return PDFRenderService.make_response(data, 'sick_leaves.pdf')
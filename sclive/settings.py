@@ -184,6 +184,40 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'core:home'
 LOGOUT_REDIRECT_URL = 'login'
 
+# محرك الترجمة المستخدم في معالجة طابور الترجمة (أمر process_translations)
+TRANSLATION_BACKEND = os.environ.get(
+    'TRANSLATION_BACKEND',
+    'core.services.translation_service.GoogleTranslatorBackend'
+)
+
+# ذاكرة التخزين المؤقت المشتركة بين عمليات Gunicorn
+# أرقام إصدارات الكاش (VersionedCacheService) وإصدار جدول الأسعار تُقرأ من هنا، فيجب أن تكون
+# مشتركة بين كل العمليات حتى تظهر التعديلات في كل العمليات (LocMemCache خاصة بكل عملية)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'var', 'cache')),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+        },
+    }
+}
+
+# عدد الترجمات المحفوظة في ذاكرة LRU داخل كل عملية
+TRANSLATION_MEMO_SIZE = int(os.environ.get('TRANSLATION_MEMO_SIZE', 2048))
+
+# عدد الأرقام التي تحجزها كل عملية من جدول التسلسل في كل مرة (الإجازات والفواتير والمدفوعات)
+NUMBER_SEQUENCE_BLOCK_SIZE = int(os.environ.get('NUMBER_SEQUENCE_BLOCK_SIZE', 20))
+
+# صور QR المخزنة مؤقتًا: عددها في ذاكرة كل عملية، ومجلد حفظها على القرص
+QRCODE_CACHE_SIZE = int(os.environ.get('QRCODE_CACHE_SIZE', 256))
+QRCODE_CACHE_DIR = os.environ.get('QRCODE_CACHE_DIR', os.path.join(MEDIA_ROOT, 'qrcodes'))
+
+# مجلد ملفات PDF المحفوظة لطباعة الإجازات والفواتير (يتطلب تثبيت weasyprint)
+# الملفات تحتوي بيانات المرضى، لذلك تُحفظ خارج MEDIA_ROOT الذي يُخدم بدون تسجيل دخول
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(BASE_DIR, 'var', 'pdf_cache'))
+
 # تكوين Sentry لمراقبة الأخطاء
 if not DEBUG:
     sentry_sdk.init(